@@ -1,16 +1,45 @@
+import os
+
 from flask import Flask, render_template
 
+from games import state_store
+from games.backgammon import bearoff
 from games.catalog import GAMES
 from games.chess.routes import chess_bp
 from games.checkers.routes import checkers_bp
+from games.lite import cube_solver, mahjong, npy_cache
 from games.lite.routes import lite_bp
 from games.mancala.routes import mancala_bp
 from games.placeholder.routes import placeholder_bp
 
 
-def create_app() -> Flask:
+def create_app(config=None) -> Flask:
     app = Flask(__name__)
     app.config["SECRET_KEY"] = "mind-games-dev-secret-key"
+    app.config["SUDOKU_BANK_PATH"] = os.path.join(app.instance_path, "sudoku.bank")
+    app.config["CUBE_TABLES_PATH"] = os.path.join(app.instance_path, "cube_tables")
+    app.config["HAND_TABLES_PATH"] = os.path.join(app.instance_path, "hand_tables")
+    app.config["BEAROFF_PATH"] = os.path.join(app.instance_path, "bearoff")
+    app.config["MAHJONG_TABLES_PATH"] = os.path.join(app.instance_path, "mahjong_tables")
+    # Game state is kept server-side; see games/state_store.py.
+    app.config["STATE_STORE"] = "sqlite"
+    app.config["STATE_DB_PATH"] = os.path.join(app.instance_path, "state.sqlite3")
+    app.config["STATE_TTL_SECONDS"] = state_store.TTL_SECONDS
+    app.config.update(config or {})
+    state_store.init_app(app)
+
+    # Map the Mahjong shanten tables now when they were built offline;
+    # otherwise the first Mahjong request builds them.
+    if os.path.exists(os.path.join(app.config["MAHJONG_TABLES_PATH"], "suits.npy")):
+        mahjong.open_tables(app.config["MAHJONG_TABLES_PATH"])
+
+    # Likewise the backgammon bear-off table and the cube solver tables.
+    # Until they exist they are built in the background on first use: the
+    # computer plays races by pip count and the cube hint asks to wait.
+    if npy_cache.has_arrays(app.config["BEAROFF_PATH"], bearoff.TABLE_NAMES):
+        bearoff.open_database(app.config["BEAROFF_PATH"])
+    if npy_cache.has_arrays(app.config["CUBE_TABLES_PATH"], cube_solver.TABLE_NAMES):
+        cube_solver.load_tables(app.config["CUBE_TABLES_PATH"])
 
     app.register_blueprint(checkers_bp)
     app.register_blueprint(chess_bp)
@@ -25,7 +54,11 @@ def create_app() -> Flask:
     return app
 
 
-app = create_app()
+# Worker processes spawned by the Minesweeper pool and the equity
+# calculator re-import this module as __mp_main__ when it is run as a
+# script; they only need the engine modules, not an app.
+if __name__ != "__mp_main__":
+    app = create_app()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,856 @@
+import argparse
+import time
+
+import numpy as np
+
+
+def _rate(count, seconds):
+    return count / seconds if seconds > 0 else float("inf")
+
+
+def bench_sliding_batch(args):
+    from games.lite import sliding_batch
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'mode':<7} {'size':>4} {'batch':>7} {'boards/s':>14}")
+    for mode in ("2048", "threes"):
+        for size in args.sizes:
+            for batch in args.batches:
+                boards = sliding_batch.new_boards(batch, size, mode, rng)
+                for _ in range(4):
+                    boards, _ = sliding_batch.move_boards(boards, "up", mode)
+                    sliding_batch.spawn_tiles(boards, mode, rng)
+
+                moved = 0
+                started = time.perf_counter()
+                while time.perf_counter() - started < args.seconds:
+                    for direction in ("left", "right", "up", "down"):
+                        sliding_batch.move_boards(boards, direction, mode)
+                        moved += batch
+                elapsed = time.perf_counter() - started
+                print(f"{mode:<7} {size:>4} {batch:>7} {_rate(moved, elapsed):>14,.0f}")
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def bench_minesweeper(args):
+    from games.minesweeper import engine as minesweeper
+
+    rng = np.random.default_rng(args.seed)
+    boards = [(name, *size) for name, size in minesweeper.TIERS.items()]
+    boards.append(("custom", args.rows, args.cols, args.mines))
+    print(f"{'board':<13} {'size':>10} {'generate ms':>12} {'click p50 ms':>13} {'click p99 ms':>13}")
+    for name, rows, cols, mine_count in boards:
+        started = time.perf_counter()
+        cells_text = minesweeper.encode_cells(minesweeper.generate_cells(rows, cols, mine_count, rng))
+        generate_ms = (time.perf_counter() - started) * 1000
+
+        revealed_text = "0" * (rows * cols)
+        samples = []
+        for index in rng.choice(rows * cols, size=min(args.clicks, rows * cols), replace=False):
+            started = time.perf_counter()
+            cells = minesweeper.decode_cells(cells_text)
+            revealed = minesweeper.decode_revealed(revealed_text)
+            minesweeper.flood_reveal(cells, revealed, rows, cols, int(index))
+            revealed_text = minesweeper.encode_revealed(revealed)
+            samples.append((time.perf_counter() - started) * 1000)
+        print(
+            f"{name:<13} {f'{rows}x{cols}':>10} {generate_ms:>12.2f} "
+            f"{_percentile(samples, 0.5):>13.3f} {_percentile(samples, 0.99):>13.3f}"
+        )
+
+
+def _dense_minesweeper_position(minesweeper, rows, cols, mine_count, reveal_fraction, rng):
+    cells = minesweeper.generate_cells(rows, cols, mine_count, rng)
+    revealed = bytearray(rows * cols)
+    safe = [index for index in range(rows * cols) if cells[index] != minesweeper.MINE]
+    target = int(len(safe) * reveal_fraction)
+    opened = 0
+    for index in rng.permutation(safe):
+        if opened >= target:
+            break
+        opened += len(minesweeper.flood_reveal(cells, revealed, rows, cols, int(index)))
+    return cells, revealed
+
+
+def bench_minesweeper_solver(args):
+    from games.minesweeper import engine as minesweeper
+    from games.minesweeper import solver
+
+    rng = np.random.default_rng(args.seed)
+    rows, cols, mine_count = minesweeper.TIERS[args.tier]
+    print(f"{'revealed':>8} {'positions':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for fraction in args.reveal:
+        samples = []
+        for _ in range(args.positions):
+            cells, revealed = _dense_minesweeper_position(minesweeper, rows, cols, mine_count, fraction, rng)
+            started = time.perf_counter()
+            solver.mine_probabilities(cells, revealed, rows, cols, mine_count)
+            samples.append((time.perf_counter() - started) * 1000)
+        print(
+            f"{fraction:>8.0%} {len(samples):>9} {_percentile(samples, 0.5):>9.2f} "
+            f"{_percentile(samples, 0.99):>9.2f} {max(samples):>9.2f}"
+        )
+
+
+def bench_sudoku(args):
+    import random
+
+    from games.sudoku import engine as sudoku
+
+    rng = random.Random(args.seed)
+    print(f"{'grade':<7} {'generated/s':>12} {'solved/s':>10} {'unique-checked/s':>17}")
+    for level in sudoku.GRADES:
+        puzzles = []
+        started = time.perf_counter()
+        while time.perf_counter() - started < args.seconds:
+            puzzles.append(sudoku.generate(level, rng)[0])
+        generated = _rate(len(puzzles), time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for puzzle in puzzles:
+            sudoku.solve(puzzle)
+        solved = _rate(len(puzzles), time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for puzzle in puzzles:
+            sudoku.count_solutions(puzzle, 2)
+        checked = _rate(len(puzzles), time.perf_counter() - started)
+        print(f"{level:<7} {generated:>12,.1f} {solved:>10,.0f} {checked:>17,.0f}")
+
+
+def bench_duel_board(args):
+    import random
+
+    from games.lite.duel_board import AI, HUMAN, DuelBoard
+
+    rng = random.Random(args.seed)
+    print(f"{'size':>5} {'place p50 us':>13} {'place p99 us':>13} {'contested p50 us':>17} {'load ms':>8}")
+    for size in args.sizes:
+        board = DuelBoard(size)
+        places = []
+        contested = []
+        owner = HUMAN
+        while not board.is_full():
+            index = board.empty.choice(rng)
+            started = time.perf_counter()
+            board.place(index, owner, rng.choice((4, 7)), rng.randrange(4), rng)
+            places.append((time.perf_counter() - started) * 1e6)
+            started = time.perf_counter()
+            board.contested()
+            contested.append((time.perf_counter() - started) * 1e6)
+            owner = AI if owner == HUMAN else HUMAN
+        started = time.perf_counter()
+        DuelBoard(size, board.cells)
+        load = (time.perf_counter() - started) * 1000
+        print(
+            f"{size:>5} {_percentile(places, 0.5):>13.1f} {_percentile(places, 0.99):>13.1f} "
+            f"{_percentile(contested, 0.5):>17.1f} {load:>8.2f}"
+        )
+
+
+def bench_duel_mcts(args):
+    import numpy as np
+
+    from games.lite import duel_mcts
+    from games.lite.routes import DUEL_ACTIONS
+
+    actions = DUEL_ACTIONS["azul"]
+    attacks = np.array([action[1] for action in actions])
+    defenses = np.array([action[2] for action in actions])
+    rng = np.random.default_rng(args.seed)
+    print(f"{'size':>4} {'batch':>6} {'playouts/s':>11} {'search playouts':>16} {'search ms':>10}")
+    for size in args.sizes:
+        cells = size * size
+        neighbors = duel_mcts.neighbor_table(size)
+        for batch in args.batches:
+            played = 0
+            started = time.perf_counter()
+            while time.perf_counter() - started < args.seconds:
+                boards = np.zeros((batch, cells + 1), dtype=np.int8)
+                boards[:, cells] = duel_mcts.SENTINEL
+                empties = np.full(batch, cells, dtype=np.int64)
+                duel_mcts.random_playouts(boards, empties, 1, attacks, defenses, neighbors, rng)
+                played += batch
+            rate = _rate(played, time.perf_counter() - started)
+            _, _, stats = duel_mcts.choose_move([0] * cells, size, actions, budget=args.budget, rng=rng)
+            print(f"{size:>4} {batch:>6} {rate:>11,.0f} {stats['playouts']:>16,} {stats['seconds'] * 1000:>10.1f}")
+
+
+def bench_go(args):
+    import random
+
+    from games.go import engine as go
+
+    rng = random.Random(args.seed)
+    print(f"{'size':>4} {'playouts/s':>11} {'moves/s':>9} {'moves/playout':>14} {'search playouts':>16}")
+    for size in args.sizes:
+        played = moves = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < args.seconds:
+            board = go.playout(go.GoBoard(size), rng)
+            played += 1
+            moves += len(board.moves)
+        elapsed = time.perf_counter() - started
+
+        opening = go.GoBoard(size)
+        for _ in range(size):
+            opening.play(opening.random_move(rng))
+        _, stats = go.choose_move(opening, budget=args.budget, rng=rng)
+        print(
+            f"{size:>4} {_rate(played, elapsed):>11,.0f} {_rate(moves, elapsed):>9,.0f} "
+            f"{moves / max(played, 1):>14.0f} {stats['playouts']:>16,}"
+        )
+
+
+def bench_onitama(args):
+    import random
+
+    from games.onitama import engine as onitama
+
+    rng = random.Random(args.seed)
+    positions = []
+    while len(positions) < args.positions:
+        position = onitama.new_game(rng)
+        for _ in range(rng.randrange(12)):
+            position = onitama.apply_move(position, rng.choice(onitama.legal_moves(position)))
+        if onitama.winner(position) is None:
+            positions.append(position)
+
+    print(f"{'budget ms':>9} {'nodes/s':>9} {'depth p50':>10} {'depth min':>10}")
+    for budget in args.budgets:
+        nodes = seconds = 0
+        depths = []
+        for position in positions:
+            _, stats = onitama.choose_move(position, budget=budget / 1000)
+            nodes += stats["nodes"]
+            seconds += stats["seconds"]
+            depths.append(stats["depth"])
+        print(f"{budget:>9.0f} {_rate(nodes, seconds):>9,.0f} {_percentile(depths, 0.5):>10} {min(depths):>10}")
+
+
+def bench_santorini(args):
+    import random
+
+    from games.santorini import engine as santorini
+
+    rng = random.Random(args.seed)
+    positions = []
+    while len(positions) < args.positions:
+        workers = rng.sample(range(25), 4)
+        position = santorini.new_game(workers[:2], workers[2:])
+        for _ in range(rng.randrange(4, 16)):
+            moves = [move for move in santorini.legal_moves(position) if not santorini.is_win(move)]
+            if not moves:
+                break
+            position = santorini.apply_move(position, rng.choice(moves))
+        if santorini.winner(position) is None:
+            positions.append(position)
+
+    generated = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < args.seconds:
+        for position in positions:
+            generated += len(santorini.legal_moves(position))
+    print(f"move generation: {_rate(generated, time.perf_counter() - started):,.0f} moves/s")
+
+    print(f"{'budget ms':>9} {'nodes/s':>9} {'depth p50':>10} {'depth min':>10}")
+    for budget in args.budgets:
+        nodes = seconds = 0
+        depths = []
+        for position in positions:
+            _, stats = santorini.choose_move(position, budget=budget / 1000)
+            nodes += stats["nodes"]
+            seconds += stats["seconds"]
+            depths.append(stats["depth"])
+        print(f"{budget:>9.0f} {_rate(nodes, seconds):>9,.0f} {_percentile(depths, 0.5):>10} {min(depths):>10}")
+
+
+def bench_backgammon(args):
+    import random
+    import tempfile
+
+    from games.backgammon import bearoff
+    from games.backgammon import engine as backgammon
+
+    directory = args.tables or tempfile.mkdtemp()
+    started = time.perf_counter()
+    database = bearoff.open_database(directory)
+    print(f"bear-off table ready in {time.perf_counter() - started:.2f}s ({directory})")
+
+    # Both sides bearing off: the evaluator must answer from the table.
+    race = [0] * 26
+    race[1], race[2], race[5] = 5, 5, 5
+    race[19], race[20], race[24] = -5, -5, -5
+    expected = 2 * database.win_probability((5, 5, 0, 0, 5, 0), (5, 0, 0, 0, 5, 5)) - 1
+    if backgammon.Evaluator(database).evaluate(tuple(race)) != expected:
+        print("FAIL pure bear-off was not evaluated from the table")
+
+    rng = random.Random(args.seed)
+    positions = []
+    while len(positions) < args.positions:
+        board = backgammon.initial_position()
+        for _ in range(rng.randrange(0, 60)):
+            board = backgammon.flip(rng.choice(list(backgammon.legal_plays(board, backgammon.roll(rng)))))
+            if backgammon.CHECKERS in backgammon.borne_off(board):
+                break
+        else:
+            positions.append((board, backgammon.roll(rng)))
+
+    generated = calls = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < args.seconds:
+        for board, dice in positions:
+            generated += len(backgammon.legal_plays(board, dice))
+            calls += 1
+    elapsed = time.perf_counter() - started
+    print(f"play generation: {_rate(calls, elapsed):,.0f} rolls/s, {_rate(generated, elapsed):,.0f} distinct plays/s")
+
+    evaluator = backgammon.Evaluator(database)
+    started = time.perf_counter()
+    while time.perf_counter() - started < args.seconds:
+        for board, _ in positions:
+            evaluator.evaluate(board)
+    print(f"static evaluation: {_rate(evaluator.evaluations, time.perf_counter() - started):,.0f} positions/s")
+
+    print(f"{'budget ms':>9} {'positions/s':>12} {'depth p50':>10} {'max ms':>8}")
+    for budget in args.budgets:
+        evaluations = seconds = 0
+        depths = []
+        slowest = 0.0
+        for board, dice in positions:
+            _, _, stats = backgammon.choose_play(board, dice, database, budget / 1000)
+            evaluations += stats["evaluations"]
+            seconds += stats["seconds"]
+            depths.append(stats["depth"])
+            slowest = max(slowest, stats["seconds"] * 1000)
+        print(f"{budget:>9.0f} {_rate(evaluations, seconds):>12,.0f} {_percentile(depths, 0.5):>10} {slowest:>8.1f}")
+
+
+def bench_hive(args):
+    import random
+
+    from games.hive import engine as hive
+
+    rng = random.Random(args.seed)
+    boards = []
+    while len(boards) < args.positions:
+        board = hive.HiveBoard()
+        for _ in range(rng.randrange(8, 40)):
+            board.apply(rng.choice(board.legal_moves()))
+            if board.winner() is not None:
+                break
+        else:
+            boards.append(board)
+
+    samples = []
+    generated = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < args.seconds:
+        for board in boards:
+            begun = time.perf_counter()
+            generated += len(board.legal_moves())
+            samples.append((time.perf_counter() - begun) * 1000)
+    print(
+        f"move generation: {_rate(len(samples), time.perf_counter() - started):,.0f} positions/s, "
+        f"p50 {_percentile(samples, 0.5):.3f} ms, p99 {_percentile(samples, 0.99):.3f} ms, "
+        f"{generated / len(samples):.0f} moves per position"
+    )
+
+    print(f"{'budget ms':>9} {'nodes/s':>9} {'depth p50':>10} {'depth min':>10}")
+    for budget in args.budgets:
+        nodes = seconds = 0
+        depths = []
+        for board in boards:
+            _, stats = hive.choose_move(board, budget=budget / 1000)
+            nodes += stats["nodes"]
+            seconds += stats["seconds"]
+            depths.append(stats["depth"])
+        print(f"{budget:>9.0f} {_rate(nodes, seconds):>9,.0f} {_percentile(depths, 0.5):>10} {min(depths):>10}")
+
+
+def bench_arimaa(args):
+    import random
+
+    from games.arimaa import engine as arimaa
+
+    # The opening, then boards after a number of random turns per side.
+    rng = random.Random(args.seed)
+    positions = [("opening", arimaa.initial_position(), arimaa.GOLD)]
+    for plies in args.plies:
+        while True:
+            board, player = arimaa.initial_position(), arimaa.GOLD
+            for _ in range(plies):
+                board = rng.choice(list(arimaa.legal_turns(board, player)))
+                if arimaa.winner(board, player) is not None:
+                    break
+                player = 1 - player
+            else:
+                positions.append((f"ply {plies}", board, player))
+                break
+
+    print(f"{'position':>9} {'turns':>8} {'expanded':>9} {'ms':>8} {'turns/s':>9}")
+    for name, board, player in positions:
+        runs = 0
+        stats = {}
+        started = time.perf_counter()
+        while True:
+            turns = arimaa.legal_turns(board, player, stats=stats)
+            runs += 1
+            if time.perf_counter() - started >= args.seconds:
+                break
+        seconds = time.perf_counter() - started
+        print(
+            f"{name:>9} {len(turns):>8,} {stats['expanded'] // runs:>9,} {seconds / runs * 1000:>8.1f} "
+            f"{_rate(len(turns) * runs, seconds):>9,.0f}"
+        )
+
+
+def bench_yinsh(args):
+    import random
+
+    from games.lite import yinsh
+
+    # Boards after the rings are placed and a number of random moves.
+    rng = random.Random(args.seed)
+    positions = []
+    for plies in args.plies:
+        while True:
+            position = yinsh.initial_position()
+            while yinsh.in_setup(position):
+                position = yinsh.place_ring(position, rng.choice(yinsh.setup_cells(position)))
+            for _ in range(plies):
+                moves = yinsh.legal_moves(position)
+                if not moves or yinsh.winner(position) is not None:
+                    break
+                position = yinsh.play(position, rng.choice(moves))
+            else:
+                positions.append((f"ply {plies}", position))
+                break
+
+    print(f"{'position':>9} {'moves':>6} {'moves/s':>11} {'row checks/s':>13}")
+    for name, position in positions:
+        moves = yinsh.legal_moves(position)
+        runs = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < args.seconds / 2:
+            yinsh.legal_moves(position)
+            runs += 1
+        generation = _rate(len(moves) * runs, time.perf_counter() - started)
+        checks = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < args.seconds / 2:
+            player = position[6]
+            for move in moves:
+                after, touched = yinsh.apply_move(position, move)
+                yinsh.complete_rows(after, player, touched)
+                yinsh.complete_rows(after, 1 - player, touched)
+            checks += len(moves)
+        print(f"{name:>9} {len(moves):>6} {generation:>11,.0f} {_rate(checks, time.perf_counter() - started):>13,.0f}")
+
+    print(f"{'budget ms':>9} {'positions/s':>12} {'depth p50':>10} {'max ms':>8}")
+    for budget in args.budgets:
+        nodes = seconds = 0
+        depths = []
+        slowest = 0.0
+        for _, position in positions:
+            _, stats = yinsh.choose_move(position, budget / 1000)
+            nodes += stats["nodes"]
+            seconds += stats["seconds"]
+            depths.append(stats["depth"])
+            slowest = max(slowest, stats["seconds"] * 1000)
+        print(f"{budget:>9.0f} {_rate(nodes, seconds):>12,.0f} {_percentile(depths, 0.5):>10} {slowest:>8.1f}")
+
+
+def bench_diplomacy(args):
+    import random
+
+    from games.diplomacy import engine as diplomacy
+    from games.diplomacy import standard_map
+    from games.diplomacy.adjudicator import adjudicate
+    from games.diplomacy.cases import CASES, check
+
+    failures = 0
+    for case in CASES:
+        for problem in check(adjudicate, case):
+            print(f"FAIL {case['name']}: {problem}")
+            failures += 1
+    started = time.perf_counter()
+    runs = 0
+    while time.perf_counter() - started < args.seconds:
+        for case in CASES:
+            adjudicate(case["units"], case["orders"])
+        runs += 1
+    elapsed = time.perf_counter() - started
+    print(f"{len(CASES)} test cases, {failures} failures, {_rate(runs * len(CASES), elapsed):,.0f} cases/s")
+
+    # A unit on every supply centre with random legal orders: a full
+    # 34-centre turn.
+    rng = random.Random(args.seed)
+    owners = {center: power for power, centers in standard_map.HOME_CENTERS.items() for center in centers}
+    turns = []
+    for _ in range(args.turns):
+        units = {}
+        for center in standard_map.SUPPLY_CENTERS:
+            power = owners.get(center) or rng.choice(standard_map.POWERS)
+            fleet = center in standard_map.COASTAL and center not in standard_map.SPLIT_COASTS and rng.random() < 0.4
+            units[center] = (power, "F" if fleet else "A", center)
+        orders = {province: rng.choice(diplomacy.legal_orders(units, province)) for province in units}
+        turns.append((units, orders))
+    times = []
+    for units, orders in turns:
+        started = time.perf_counter()
+        adjudicate(units, orders)
+        times.append((time.perf_counter() - started) * 1000)
+    print(
+        f"34-unit turns: p50 {_percentile(times, 0.5):.3f} ms, p99 {_percentile(times, 0.99):.3f} ms, "
+        f"{_rate(len(times), sum(times) / 1000):,.0f} turns/s"
+    )
+
+    game = diplomacy.new_game()
+    started = time.perf_counter()
+    _, stats = diplomacy.choose_orders(game, standard_map.POWERS, budget=60.0, samples=args.samples, rng=rng)
+    elapsed = time.perf_counter() - started
+    print(
+        f"order search: {stats['candidates']:,} candidates, {_rate(stats['adjudications'], elapsed):,.0f} "
+        f"adjudications/s, {elapsed * 1000:.0f} ms for all seven powers"
+    )
+
+
+def bench_gin(args):
+    import random
+
+    from games.lite import gin_rummy
+
+    rng = random.Random(args.seed)
+    hands = [gin_rummy.mask_of(rng.sample(range(52), gin_rummy.HAND_SIZE + 1)) for _ in range(args.hands)]
+
+    print(f"{'memo':>5} {'hands/s':>10}")
+    for warm in (False, True):
+        count = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < args.seconds:
+            for hand in hands:
+                if not warm:
+                    gin_rummy.clear_memo()
+                gin_rummy.deadwood(hand)
+                count += 1
+        print(f"{'warm' if warm else 'cold':>5} {_rate(count, time.perf_counter() - started):>10,.0f}")
+
+    samples = []
+    for hand in hands[:200]:
+        cards = gin_rummy.cards_of(hand)
+        upcard = cards.pop()
+        seen = set(cards) | {upcard}
+        unseen = [card for card in range(52) if card not in seen]
+        gin_rummy.clear_memo()
+        started = time.perf_counter()
+        gin_rummy.computer_turn(cards, upcard, unseen, unseen[:1])
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"computer turn (cold memo): p50 {_percentile(samples, 0.5):.2f} ms, p99 {_percentile(samples, 0.99):.2f} ms")
+
+
+def bench_mahjong(args):
+    import random
+    import tempfile
+
+    from games.lite import mahjong
+
+    directory = args.tables or tempfile.mkdtemp()
+    started = time.perf_counter()
+    tables = mahjong.open_tables(directory)
+    print(f"tables ready in {time.perf_counter() - started:.2f}s ({directory})")
+    rng = random.Random(args.seed)
+    hands = [mahjong.counts_of(mahjong.new_wall(rng)[:mahjong.HAND_SIZE + 1]) for _ in range(args.hands)]
+
+    count = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < args.seconds:
+        for hand in hands:
+            tables.shanten(hand)
+            count += 1
+    print(f"shanten: {_rate(count, time.perf_counter() - started):,.0f} hands/s")
+
+    samples = []
+    for hand in hands[:200]:
+        started = time.perf_counter()
+        tables.discard_options(hand, hand)
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"discard hint: p50 {_percentile(samples, 0.5):.2f} ms, p99 {_percentile(samples, 0.99):.2f} ms")
+
+
+def bench_hand_eval(args):
+    import tempfile
+
+    import numpy as np
+
+    from games.lite import hand_eval
+
+    directory = args.tables or tempfile.mkdtemp()
+    started = time.perf_counter()
+    evaluator = hand_eval.open_evaluator(directory)
+    print(f"tables ready in {time.perf_counter() - started:.2f}s ({directory})")
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'cards':>5} {'vectorized/s':>13} {'scalar/s':>10}")
+    for size in (3, 5, 7):
+        hands = np.argsort(rng.random((args.hands, 52)), axis=1)[:, :size]
+        many = evaluator.teen_patti_many if size == 3 else evaluator.evaluate_many
+        one = evaluator.teen_patti if size == 3 else evaluator.evaluate
+        started = time.perf_counter()
+        many(hands)
+        vectorized = _rate(len(hands), time.perf_counter() - started)
+        listed = hands[:args.hands // 10].tolist()
+        started = time.perf_counter()
+        for hand in listed:
+            one(hand)
+        scalar = _rate(len(listed), time.perf_counter() - started)
+        print(f"{size:>5} {vectorized:>13,.0f} {scalar:>10,.0f}")
+
+
+def bench_equity(args):
+    import tempfile
+
+    from games.lite import cards, equity, hand_eval
+
+    directory = args.tables or tempfile.mkdtemp()
+    hand_eval.open_evaluator(directory)
+    calculator = equity.EquityCalculator(args.workers) if args.workers else equity.calculator
+    rng = np.random.default_rng(args.seed)
+    queries = [
+        ("holdem", ["AsKd", None], ""),
+        ("holdem", ["AsKd", "QhQc"], ""),
+        ("holdem", ["AsKd", None, None], ""),
+        ("holdem", ["AsKd", "QhQc"], "2c7d9h"),
+        ("holdem", ["AsKd", None], "2c7d9hTs"),
+        ("teen-patti", ["AsKdQh", None], ""),
+        ("teen-patti", ["AsKdQh", None, None], ""),
+    ]
+    print(f"{'game':<10} {'hands':<18} {'board':<9} {'method':<11} {'equity %':>13} {'p50 ms':>8}")
+    for game, hands, board in queries:
+        hands = [None if hand is None else cards.parse_cards(hand) for hand in hands]
+        samples = []
+        for _ in range(args.repeats):
+            result = calculator.calculate(directory, game, hands, cards.parse_cards(board), args.samples, rng=rng)
+            samples.append(result["seconds"] * 1000)
+        hero = result["players"][0]
+        label = " ".join(player["hand"] or "??" for player in result["players"])
+        print(
+            f"{game:<10} {label:<18} {board or '-':<9} {result['method']:<11} "
+            f"{hero['equity']:>6.2f} ±{hero['margin']:<5.2f} {_percentile(samples, 0.5):>8.1f}"
+        )
+    calculator.shutdown()
+
+
+def bench_cube(args):
+    import random
+    import tempfile
+
+    from games.lite import cube, cube_solver
+
+    directory = args.tables or tempfile.mkdtemp()
+    started = time.perf_counter()
+    cube_solver.load_tables(directory)
+    print(f"tables ready in {time.perf_counter() - started:.2f}s ({directory})")
+
+    rng = random.Random(args.seed)
+    scrambles = [cube.random_cube(rng) for _ in range(args.scrambles)]
+    # The budget only bounds improving a solution; "first" is the time to
+    # the first one, which the budget does not cap.
+    print(
+        f"{'budget ms':>9} {'avg len':>8} {'max len':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8} "
+        f"{'first p50':>10} {'first p99':>10}"
+    )
+    for budget in args.budgets:
+        lengths = []
+        samples = []
+        firsts = []
+        for scramble in scrambles:
+            stats = {}
+            solution = cube_solver.solve(scramble, directory, budget / 1000, stats=stats)
+            samples.append(stats["seconds"] * 1000)
+            firsts.append(stats["first_seconds"] * 1000)
+            lengths.append(len(solution))
+        print(
+            f"{budget:>9g} {sum(lengths) / len(lengths):>8.2f} {max(lengths):>8} "
+            f"{_percentile(samples, 0.5):>8.1f} {_percentile(samples, 0.99):>8.1f} {max(samples):>8.1f} "
+            f"{_percentile(firsts, 0.5):>10.1f} {_percentile(firsts, 0.99):>10.1f}"
+        )
+
+
+def bench_state_store(args):
+    import os
+    import tempfile
+
+    from app import create_app
+
+    # One scripted visitor per session: open a set of games, then keep
+    # playing the quick ones. Cookie bytes are what the browser sends back
+    # on every request; Set-Cookie bytes are what each response carries;
+    # unchanged counts the saves skipped by the dirty check.
+    pages = ["checkers", "chess", "mancala", "2048", "threes", "sudoku", "go", "backgammon", "santorini",
+             "onitama", "hive", "arimaa", "yinsh-dvonn", "diplomacy", "gin-rummy", "mahjong-card"]
+    script = [("get", f"/games/{slug}/", None) for slug in pages]
+    for turn in range(args.turns):
+        direction = ("left", "up", "right", "down")[turn % 4]
+        script += [
+            ("post", "/games/2048/", {"action": direction}),
+            ("post", "/games/threes/", {"action": direction}),
+            ("post", "/games/mancala/", {"action": "move", "pit": str(turn % 6)}),
+            ("post", "/games/checkers/", {"action": "move", "move_index": "0"}),
+            ("get", "/games/go/", None),
+        ]
+        # A double-submitted Sudoku entry: the second changes nothing.
+        entry = {"action": "set", "row": str(turn % 9), "col": str(turn * 4 % 9), "value": str(turn % 9 + 1)}
+        script += [("post", "/games/sudoku/", entry)] * 2
+
+    directory = tempfile.mkdtemp()
+    print(
+        f"{'store':<7} {'cookie B':>9} {'max':>6} {'set-cookie B':>13} {'body B':>8} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'written':>8} {'unchanged':>10}"
+    )
+    for kind in args.stores:
+        app = create_app({"STATE_STORE": kind, "STATE_DB_PATH": os.path.join(directory, f"{kind}.sqlite3")})
+        cookie_bytes = []
+        set_cookie_bytes = []
+        body_bytes = []
+        samples = []
+        for _ in range(args.sessions):
+            client = app.test_client()
+            for method, url, data in script:
+                cookie = client.get_cookie("session")
+                started = time.perf_counter()
+                response = client.post(url, data=data) if method == "post" else client.get(url)
+                samples.append((time.perf_counter() - started) * 1000)
+                cookie_bytes.append(len(cookie.value) if cookie else 0)
+                set_cookie_bytes.append(sum(len(header) for header in response.headers.getlist("Set-Cookie")))
+                body_bytes.append(len(response.get_data()))
+        store = app.extensions["state_store"]
+        store.close()
+        print(
+            f"{kind:<7} {sum(cookie_bytes) / len(cookie_bytes):>9,.0f} {max(cookie_bytes):>6,} "
+            f"{sum(set_cookie_bytes) / len(set_cookie_bytes):>13,.0f} {sum(body_bytes) / len(body_bytes):>8,.0f} "
+            f"{_percentile(samples, 0.5):>8.2f} {_percentile(samples, 0.99):>8.2f} "
+            f"{store.writes:>8,} {store.unchanged:>10,}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the game engines.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time spent per measurement.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    sliding_parser = commands.add_parser("sliding-batch", help="Batched NumPy 2048/Threes moves.")
+    sliding_parser.add_argument("--sizes", type=int, nargs="+", default=[4, 5, 6, 8])
+    sliding_parser.add_argument("--batches", type=int, nargs="+", default=[1, 100, 10000, 100000])
+    sliding_parser.set_defaults(handler=bench_sliding_batch)
+
+    minesweeper_parser = commands.add_parser("minesweeper", help="Minesweeper generation and reveal latency.")
+    minesweeper_parser.add_argument("--rows", type=int, default=1000)
+    minesweeper_parser.add_argument("--cols", type=int, default=1000)
+    minesweeper_parser.add_argument("--mines", type=int, default=150000)
+    minesweeper_parser.add_argument("--clicks", type=int, default=200)
+    minesweeper_parser.set_defaults(handler=bench_minesweeper)
+
+    solver_parser = commands.add_parser("minesweeper-solver", help="Mine probability solver latency.")
+    solver_parser.add_argument("--tier", default="expert")
+    solver_parser.add_argument("--positions", type=int, default=100)
+    solver_parser.add_argument("--reveal", type=float, nargs="+", default=[0.1, 0.3, 0.5, 0.7])
+    solver_parser.set_defaults(handler=bench_minesweeper_solver)
+
+    sudoku_parser = commands.add_parser("sudoku", help="Sudoku generation and solve throughput.")
+    sudoku_parser.set_defaults(handler=bench_sudoku)
+
+    board_parser = commands.add_parser("duel-board", help="Incremental duel board placement latency.")
+    board_parser.add_argument("--sizes", type=int, nargs="+", default=[9, 19, 49, 101])
+    board_parser.set_defaults(handler=bench_duel_board)
+
+    duel_parser = commands.add_parser("duel-mcts", help="Batched duel playouts and per-move MCTS search.")
+    duel_parser.add_argument("--sizes", type=int, nargs="+", default=[7, 9, 19])
+    duel_parser.add_argument("--batches", type=int, nargs="+", default=[256, 2048])
+    duel_parser.add_argument("--budget", type=float, default=0.25, help="Seconds per search move.")
+    duel_parser.set_defaults(handler=bench_duel_mcts)
+
+    go_parser = commands.add_parser("go", help="Go random playouts and per-move search.")
+    go_parser.add_argument("--sizes", type=int, nargs="+", default=[9, 13, 19])
+    go_parser.add_argument("--budget", type=float, default=0.5, help="Seconds per search move.")
+    go_parser.set_defaults(handler=bench_go)
+
+    onitama_parser = commands.add_parser("onitama", help="Onitama alpha-beta search speed and depth.")
+    onitama_parser.add_argument("--positions", type=int, default=10)
+    onitama_parser.add_argument("--budgets", type=float, nargs="+", default=[100, 500, 1000], help="Milliseconds.")
+    onitama_parser.set_defaults(handler=bench_onitama)
+
+    santorini_parser = commands.add_parser("santorini", help="Santorini move generation and search depth.")
+    santorini_parser.add_argument("--positions", type=int, default=10)
+    santorini_parser.add_argument("--budgets", type=float, nargs="+", default=[100, 700, 2000], help="Milliseconds.")
+    santorini_parser.set_defaults(handler=bench_santorini)
+
+    backgammon_parser = commands.add_parser("backgammon", help="Backgammon play generation and expectiminimax speed.")
+    backgammon_parser.add_argument("--tables", default=None, help="Table directory (default: build into a temp dir).")
+    backgammon_parser.add_argument("--positions", type=int, default=20)
+    backgammon_parser.add_argument("--budgets", type=float, nargs="+", default=[0, 100, 500], help="Milliseconds.")
+    backgammon_parser.set_defaults(handler=bench_backgammon)
+
+    hive_parser = commands.add_parser("hive", help="Hive move generation latency and search depth.")
+    hive_parser.add_argument("--positions", type=int, default=20)
+    hive_parser.add_argument("--budgets", type=float, nargs="+", default=[100, 500, 2000], help="Milliseconds.")
+    hive_parser.set_defaults(handler=bench_hive)
+
+    arimaa_parser = commands.add_parser("arimaa", help="Arimaa unique turns generated per second.")
+    arimaa_parser.add_argument("--plies", type=int, nargs="+", default=[10, 20, 30], help="Random turns played first.")
+    arimaa_parser.set_defaults(handler=bench_arimaa)
+
+    yinsh_parser = commands.add_parser("yinsh", help="YINSH ring moves, row detection and search depth.")
+    yinsh_parser.add_argument("--plies", type=int, nargs="+", default=[0, 10, 30], help="Random moves played first.")
+    yinsh_parser.add_argument("--budgets", type=float, nargs="+", default=[100, 700, 2000], help="Milliseconds.")
+    yinsh_parser.set_defaults(handler=bench_yinsh)
+
+    diplomacy_parser = commands.add_parser("diplomacy", help="Diplomacy adjudication test cases and full-turn latency.")
+    diplomacy_parser.add_argument("--turns", type=int, default=1000, help="Random 34-unit turns to adjudicate.")
+    diplomacy_parser.add_argument("--samples", type=int, default=60, help="Order sets sampled per power.")
+    diplomacy_parser.set_defaults(handler=bench_diplomacy)
+
+    gin_parser = commands.add_parser("gin", help="Gin Rummy deadwood optimizer throughput.")
+    gin_parser.add_argument("--hands", type=int, default=10_000)
+    gin_parser.set_defaults(handler=bench_gin)
+
+    mahjong_parser = commands.add_parser("mahjong", help="Mahjong shanten and discard hint throughput.")
+    mahjong_parser.add_argument("--tables", default=None, help="Table directory (default: build into a temp dir).")
+    mahjong_parser.add_argument("--hands", type=int, default=10_000)
+    mahjong_parser.set_defaults(handler=bench_mahjong)
+
+    hand_parser = commands.add_parser("hand-eval", help="Card hand evaluator throughput.")
+    hand_parser.add_argument("--tables", default=None, help="Table directory (default: build into a temp dir).")
+    hand_parser.add_argument("--hands", type=int, default=1_000_000)
+    hand_parser.set_defaults(handler=bench_hand_eval)
+
+    equity_parser = commands.add_parser("equity", help="Hold'em and Teen Patti equity latency.")
+    equity_parser.add_argument("--tables", default=None, help="Table directory (default: build into a temp dir).")
+    equity_parser.add_argument("--samples", type=int, default=20_000, help="Monte-Carlo samples per query.")
+    equity_parser.add_argument("--repeats", type=int, default=20)
+    equity_parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: up to 4).")
+    equity_parser.set_defaults(handler=bench_equity)
+
+    cube_parser = commands.add_parser("cube", help="Two-phase cube solver time and solution length.")
+    cube_parser.add_argument("--tables", default=None, help="Table directory (default: build into a temp dir).")
+    cube_parser.add_argument("--scrambles", type=int, default=100)
+    cube_parser.add_argument("--budgets", type=float, nargs="+", default=[0, 50, 200])
+    cube_parser.set_defaults(handler=bench_cube)
+
+    state_parser = commands.add_parser("state-store", help="Cookie bytes and latency per state store backend.")
+    state_parser.add_argument("--stores", nargs="+", default=["cookie", "memory", "sqlite"])
+    state_parser.add_argument("--sessions", type=int, default=5)
+    state_parser.add_argument("--turns", type=int, default=20, help="Rounds of moves after opening the games.")
+    state_parser.set_defaults(handler=bench_state_store)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
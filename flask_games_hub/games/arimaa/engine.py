@@ -0,0 +1,418 @@
+import time
+
+# Arimaa on 64-bit bitboards: square = row * 8 + col, row 0 is rank 1 (Gold's
+# home row, the player) and row 7 rank 8 (Silver's, the computer). A board
+# is a 12-tuple of bitboards indexed player * 6 + kind, kinds ordered by
+# strength from rabbit to elephant. Boards are hashable, so they key the
+# turn generator's transposition set directly.
+#
+# A step is (board index, from square, to square). step_moves() generates
+# the atomic moves of one player: single steps and the two-step pushes and
+# pulls, all with shift masks. Trap captures are resolved after every step,
+# only at the traps next to the square a piece left or on the trap it
+# entered. A turn is up to four steps; legal_turns() composes them
+# depth-first and keeps each resulting board once.
+#
+# Not handled: the setup phase (both sides start from a fixed setup) and
+# the third-time repetition rule.
+
+GOLD = 0
+SILVER = 1
+RABBIT, CAT, DOG, HORSE, CAMEL, ELEPHANT = range(6)
+PIECE_LETTERS = "RCDHME"
+STEPS = 4
+SQUARES = 64
+FULL = (1 << SQUARES) - 1
+NOT_A_FILE = FULL ^ sum(1 << (row * 8) for row in range(8))
+NOT_H_FILE = FULL ^ sum(1 << (row * 8 + 7) for row in range(8))
+TRAPS = (18, 21, 42, 45)
+TRAP_MASK = sum(1 << trap for trap in TRAPS)
+GOAL_ROWS = (0xFF << 56, 0xFF)
+SETUP = ("RRRRRRRR", "CDHMEHDC")
+
+PIECE_VALUES = (100, 250, 300, 500, 800, 1200)
+RABBIT_ADVANCE = (0, 0, 6, 14, 28, 50, 90, 0)
+TRAP_CONTROL_VALUE = 12
+FROZEN_FRACTION = 0.15
+WIN_SCORE = 100_000
+BUDGET_SECONDS = 1.0
+CANDIDATES = 8
+REPLY_STEPS = 2
+CHECK_EVERY = 256
+
+
+def _neighbors(square):
+    row, col = divmod(square, 8)
+    return tuple(
+        (row + dr) * 8 + col + dc
+        for dr, dc in ((1, 0), (-1, 0), (0, 1), (0, -1))
+        if 0 <= row + dr < 8 and 0 <= col + dc < 8
+    )
+
+
+NEIGHBORS = tuple(_neighbors(square) for square in range(SQUARES))
+NEIGHBOR_MASKS = tuple(sum(1 << other for other in NEIGHBORS[square]) for square in range(SQUARES))
+# Rabbits may not step backwards: Gold's never south, Silver's never north.
+RABBIT_MASKS = tuple(
+    tuple(sum(1 << other for other in NEIGHBORS[square] if other != square + (-8 if player == GOLD else 8))
+          for square in range(SQUARES))
+    for player in (GOLD, SILVER)
+)
+# Traps whose support can change when a piece moves off each square.
+NEARBY_TRAPS = tuple(tuple(trap for trap in TRAPS if trap in NEIGHBORS[square]) for square in range(SQUARES))
+DIRECTION_LETTERS = {8: "n", -8: "s", 1: "e", -1: "w"}
+
+
+def spread(mask):
+    # Squares orthogonally next to any square of `mask`.
+    return ((mask << 8) & FULL) | (mask >> 8) | ((mask << 1) & NOT_A_FILE) | ((mask >> 1) & NOT_H_FILE)
+
+
+def _forward_spread(mask, player):
+    sideways = ((mask << 1) & NOT_A_FILE) | ((mask >> 1) & NOT_H_FILE)
+    return sideways | (((mask << 8) & FULL) if player == GOLD else (mask >> 8))
+
+
+def squares_of(mask):
+    squares = []
+    while mask:
+        low = mask & -mask
+        squares.append(low.bit_length() - 1)
+        mask ^= low
+    return squares
+
+
+def initial_position():
+    board = [0] * 12
+    for player, (rabbit_row, piece_row) in ((GOLD, (0, 1)), (SILVER, (7, 6))):
+        for row, letters in ((rabbit_row, SETUP[0]), (piece_row, SETUP[1])):
+            for col, letter in enumerate(letters):
+                board[player * 6 + PIECE_LETTERS.index(letter)] |= 1 << (row * 8 + col)
+    return tuple(board)
+
+
+def pieces(board, player):
+    base = player * 6
+    return board[base] | board[base + 1] | board[base + 2] | board[base + 3] | board[base + 4] | board[base + 5]
+
+
+def piece_at(board, square):
+    # Board index of the piece on `square`, or None.
+    bit = 1 << square
+    for index in range(12):
+        if board[index] & bit:
+            return index
+    return None
+
+
+def apply_step(board, step):
+    index, source, target = step
+    board = list(board)
+    board[index] ^= (1 << source) | (1 << target)
+    base = index - index % 6
+    own = board[base] | board[base + 1] | board[base + 2] | board[base + 3] | board[base + 4] | board[base + 5]
+    traps = NEARBY_TRAPS[source] + ((target,) if TRAP_MASK >> target & 1 else ())
+    for trap in traps:
+        bit = 1 << trap
+        if own & bit and not own & NEIGHBOR_MASKS[trap]:
+            for kind in range(base, base + 6):
+                if board[kind] & bit:
+                    board[kind] ^= bit
+                    break
+    return tuple(board)
+
+
+def step_moves(board, player):
+    # [(steps, resulting board)] for every single step, push and pull of
+    # `player`. A piece is frozen next to a stronger enemy piece unless a
+    # friendly piece is next to it too; only unfrozen pieces move, push
+    # (a weaker enemy piece aside, then into its square) or pull (a weaker
+    # enemy piece into the square they leave).
+    base = player * 6
+    enemy_base = 6 - base
+    own_all = pieces(board, player)
+    enemy_all = pieces(board, 1 - player)
+    empty = FULL ^ own_all ^ enemy_all
+    supported = spread(own_all)
+    weaker = [0] * 6
+    for kind in range(1, 6):
+        weaker[kind] = weaker[kind - 1] | board[enemy_base + kind - 1]
+    moves = []
+    stronger = 0
+    for kind in range(ELEPHANT, RABBIT - 1, -1):
+        index = base + kind
+        movable = board[index] & ~(spread(stronger) & ~supported)
+        stronger |= board[enemy_base + kind]
+        while movable:
+            low = movable & -movable
+            movable ^= low
+            source = low.bit_length() - 1
+            reach = (RABBIT_MASKS[player][source] if kind == RABBIT else NEIGHBOR_MASKS[source]) & empty
+            stepped = {}
+            for target in squares_of(reach):
+                step = (index, source, target)
+                stepped[target] = after = apply_step(board, step)
+                moves.append(((step,), after))
+            victims = NEIGHBOR_MASKS[source] & weaker[kind]
+            if not victims:
+                continue
+            for victim in squares_of(victims):
+                victim_index = piece_at(board, victim)
+                for target in squares_of(NEIGHBOR_MASKS[victim] & empty):
+                    push = (victim_index, victim, target)
+                    follow = (index, source, victim)
+                    moves.append(((push, follow), apply_step(apply_step(board, push), follow)))
+                for target in squares_of(NEIGHBOR_MASKS[source] & empty):
+                    lead = (index, source, target)
+                    pulled = (victim_index, victim, source)
+                    after = stepped.get(target) or apply_step(board, lead)
+                    moves.append(((lead, pulled), apply_step(after, pulled)))
+    return moves
+
+
+class _Timeout(Exception):
+    pass
+
+
+def legal_turns(board, player, max_steps=STEPS, deadline=None, stats=None):
+    # {resulting board: steps} over every turn of 1 to `max_steps` steps
+    # that changes the board. Each intermediate board is expanded once per
+    # number of steps left, and not at all when it was already reached with
+    # as many steps to spare. Stops early (with the turns found so far) once
+    # `deadline` passes.
+    turns = {}
+    best_left = {board: max_steps}
+    expanded = [0]
+
+    def expand(current, steps, left):
+        expanded[0] += 1
+        if deadline is not None and not expanded[0] % CHECK_EVERY and time.perf_counter() > deadline:
+            raise _Timeout
+        for move, after in step_moves(current, player):
+            remaining = left - len(move)
+            if remaining < 0 or best_left.get(after, -1) >= remaining:
+                continue
+            best_left[after] = remaining
+            if after != board and after not in turns:
+                turns[after] = steps + move
+            if remaining:
+                expand(after, steps + move, remaining)
+
+    try:
+        expand(board, (), max_steps)
+    except _Timeout:
+        pass
+    if stats is not None:
+        stats["expanded"] = stats.get("expanded", 0) + expanded[0]
+    return turns
+
+
+def continuations(board, player, steps):
+    # (legal next steps, whether `steps` is a complete turn so far) for a
+    # turn being entered one step at a time. The steps taken must split into
+    # atomic moves, except that the last one may be the first half of a
+    # push (then only its completions may follow) or an own step that a
+    # pull can still follow.
+    steps = tuple(tuple(step) for step in steps)
+
+    def split(current, previous, position):
+        if position == len(steps):
+            return current, previous, None
+        options = step_moves(current, player)
+        for move, after in options:
+            if steps[position:position + len(move)] == move:
+                found = split(after, current if len(move) == 1 else None, position + len(move))
+                if found is not None:
+                    return found
+        if position == len(steps) - 1 and len(steps) < STEPS:
+            follows = {move[1] for move, _ in options if len(move) == 2 and move[0] == steps[position]}
+            if follows:
+                return current, None, follows
+        return None
+
+    found = split(board, None, 0)
+    if found is None:
+        return set(), False
+    current, previous, follows = found
+    if follows is not None:
+        return follows, False
+    left = STEPS - len(steps)
+    if not left:
+        return set(), True
+    following = {move[0] for move, _ in step_moves(current, player) if len(move) <= left}
+    if previous is not None:
+        following |= {
+            move[1] for move, _ in step_moves(previous, player)
+            if len(move) == 2 and move[0] == steps[-1] and move[1][0] // 6 != player
+        }
+    return following, True
+
+
+def replay(board, steps):
+    for step in steps:
+        board = apply_step(board, step)
+    return board
+
+
+def rabbits_left(board, player):
+    return board[player * 6 + RABBIT] != 0
+
+
+def winner(board, mover):
+    # Checked after `mover` completes a turn: a rabbit on its goal row wins
+    # (the mover's first), then losing every rabbit loses.
+    opponent = 1 - mover
+    if board[mover * 6 + RABBIT] & GOAL_ROWS[mover]:
+        return mover
+    if board[opponent * 6 + RABBIT] & GOAL_ROWS[opponent]:
+        return opponent
+    if not rabbits_left(board, opponent):
+        return mover
+    if not rabbits_left(board, mover):
+        return opponent
+    return None
+
+
+def goal_distance(board, player, limit=STEPS):
+    # Fewest steps (up to `limit`) for an unfrozen rabbit of `player` to
+    # walk to its goal row over empty squares, or None. Ignores freezing
+    # along the way, pieces moved out of the path and captures.
+    base = player * 6
+    own_all = pieces(board, player)
+    empty = FULL ^ own_all ^ pieces(board, 1 - player)
+    stronger = pieces(board, 1 - player) ^ board[6 - base]
+    reach = board[base + RABBIT] & ~(spread(stronger) & ~spread(own_all))
+    for distance in range(1, limit + 1):
+        reach |= _forward_spread(reach, player) & empty
+        if reach & GOAL_ROWS[player]:
+            return distance
+    return None
+
+
+def evaluate(board, player):
+    # Static score for `player`: material (rabbits worth more as they run
+    # out), rabbit advancement, trap control and frozen pieces.
+    score = 0
+    for side, sign in ((player, 1), (1 - player, -1)):
+        base = side * 6
+        own_all = pieces(board, side)
+        supported = spread(own_all)
+        stronger = 0
+        for kind in range(ELEPHANT, RABBIT - 1, -1):
+            mask = board[base + kind]
+            count = mask.bit_count()
+            if kind == RABBIT:
+                score += sign * (PIECE_VALUES[RABBIT] + 10 * (8 - count)) * count
+                for square in squares_of(mask):
+                    row = square >> 3
+                    score += sign * RABBIT_ADVANCE[row if side == GOLD else 7 - row]
+            else:
+                score += sign * PIECE_VALUES[kind] * count
+            frozen = mask & spread(stronger) & ~supported
+            if frozen:
+                score -= sign * int(FROZEN_FRACTION * PIECE_VALUES[kind]) * frozen.bit_count()
+            stronger |= board[(6 - base) + kind]
+        for trap in TRAPS:
+            score += sign * TRAP_CONTROL_VALUE * (own_all & NEIGHBOR_MASKS[trap]).bit_count()
+    return score
+
+
+class Searcher:
+    # Full turns are too many to search in depth, so search() ranks every
+    # unique turn by static evaluation and then re-scores the best
+    # CANDIDATES against the opponent's short replies: every push, pull and
+    # step pair (REPLY_STEPS steps), which is where captures come from,
+    # plus checks for a rabbit of either side that can reach the goal.
+
+    def __init__(self):
+        self.deadline = None
+        self.evaluations = 0
+
+    def _reply_score(self, board, player, deadline):
+        opponent = 1 - player
+        if goal_distance(board, opponent) is not None:
+            return -WIN_SCORE
+        worst = evaluate(board, player)
+        self.evaluations += 1
+        replies = legal_turns(board, opponent, REPLY_STEPS, deadline)
+        for after in replies:
+            won = winner(after, opponent)
+            if won is not None:
+                return WIN_SCORE if won == player else -WIN_SCORE
+            score = evaluate(after, player)
+            if score < worst and goal_distance(after, player) is not None:
+                score = WIN_SCORE // 2
+            if score < worst:
+                worst = score
+        self.evaluations += len(replies)
+        return worst
+
+    def search(self, board, player, budget=BUDGET_SECONDS):
+        # Returns (steps, resulting board, stats); steps is None when the
+        # player has no legal turn.
+        started = time.perf_counter()
+        self.deadline = started + budget
+        self.evaluations = 0
+        counters = {}
+        turns = legal_turns(board, player, STEPS, started + 0.4 * budget, counters)
+        stats = {"turns": len(turns), "expanded": counters["expanded"], "candidates": 0,
+                 "evaluations": 0, "seconds": 0.0}
+        if not turns:
+            stats["seconds"] = time.perf_counter() - started
+            return None, board, stats
+        ranked = []
+        for count, after in enumerate(turns):
+            if not count % CHECK_EVERY and count and time.perf_counter() > started + 0.8 * budget:
+                break
+            won = winner(after, player)
+            if won == player:
+                stats["seconds"] = time.perf_counter() - started
+                return turns[after], after, stats
+            ranked.append((-WIN_SCORE if won is not None else evaluate(after, player), after))
+        self.evaluations += len(ranked)
+        ranked.sort(key=lambda item: item[0], reverse=True)
+        best_score, best = ranked[0]
+        for _, after in ranked[:CANDIDATES]:
+            if time.perf_counter() > self.deadline:
+                break
+            score = self._reply_score(after, player, self.deadline)
+            if stats["candidates"] and time.perf_counter() > self.deadline:
+                # Its replies were cut short, so the score is not comparable.
+                break
+            stats["candidates"] += 1
+            if stats["candidates"] == 1 or score > best_score:
+                best_score, best = score, after
+        stats["evaluations"] = self.evaluations
+        stats["seconds"] = time.perf_counter() - started
+        return turns[best], best, stats
+
+
+def choose_turn(board, player, budget=BUDGET_SECONDS):
+    return Searcher().search(board, player, budget)
+
+
+def square_name(square):
+    return f"{'abcdefgh'[square % 8]}{square // 8 + 1}"
+
+
+def step_text(board, step):
+    # Standard notation, e.g. "Ed2n", with a capture such as "rc3x" after.
+    index, source, target = step
+    letter = PIECE_LETTERS[index % 6]
+    text = f"{letter if index < 6 else letter.lower()}{square_name(source)}{DIRECTION_LETTERS[target - source]}"
+    after = apply_step(board, step)
+    for kind in range(12):
+        for square in squares_of(board[kind] & ~after[kind] & ~(1 << source)):
+            piece = PIECE_LETTERS[kind % 6]
+            text += f" {piece if kind < 6 else piece.lower()}{square_name(square)}x"
+        if kind == index and not after[kind] >> target & 1:
+            text += f" {letter if index < 6 else letter.lower()}{square_name(target)}x"
+    return text, after
+
+
+def turn_text(board, steps):
+    texts = []
+    for step in steps:
+        text, board = step_text(board, step)
+        texts.append(text)
+    return " ".join(texts)
@@ -0,0 +1,146 @@
+from itertools import product
+from math import comb
+
+import numpy as np
+
+from games.lite import npy_cache
+
+# One-sided bear-off database: for every way of placing up to 15 checkers on
+# the six home points, the probability of bearing them all off in exactly
+# n rolls (n < MAX_ROLLS, the last column holding the rest) when always
+# playing to minimise the expected number of rolls. That is 54,264 positions,
+# stored as uint16 fixed point in a single .npy file of about 3.5 MB.
+#
+# Two one-sided distributions give the race between both players: the
+# player on roll wins when they need no more rolls than the opponent.
+
+CHECKERS = 15
+POINTS = 6
+MAX_ROLLS = 32
+SCALE = 65535
+TABLE_NAMES = ("bearoff",)
+
+
+def _positions():
+    # Every home-board position, ordered by pip count so that each one comes
+    # after all the positions a roll can lead to.
+    positions = [counts for counts in product(range(CHECKERS + 1), repeat=POINTS) if sum(counts) <= CHECKERS]
+    positions.sort(key=lambda counts: sum(point * count for point, count in enumerate(counts, 1)))
+    return positions
+
+
+def _die_moves(counts, die):
+    # Positions after playing one die; counts[0] is the one point.
+    highest = max(point for point in range(POINTS) if counts[point])
+    results = set()
+    for point in range(highest, -1, -1):
+        if not counts[point]:
+            continue
+        target = point - die
+        if target < -1 and point != highest:
+            continue
+        after = list(counts)
+        after[point] -= 1
+        if target >= 0:
+            after[target] += 1
+        results.add(tuple(after))
+    return results
+
+
+def build_tables():
+    positions = _positions()
+    index = {counts: number for number, counts in enumerate(positions)}
+    successors = [
+        [[index[after] for after in _die_moves(counts, die)] if any(counts) else [0] for die in range(1, 7)]
+        for counts in positions
+    ]
+    rolls = [(a, b, 1 / 36 if a == b else 1 / 18) for a in range(1, 7) for b in range(a, 7)]
+    probabilities = np.array([probability for _, _, probability in rolls])
+    distribution = np.zeros((len(positions), MAX_ROLLS))
+    distribution[0, 0] = 1.0
+    means = [0.0] * len(positions)
+    # best[die - 1][k][p]: the best position reachable from p by playing k
+    # more dice of that value, filled in as p goes up; since every move
+    # lowers the pip count, the means it compares are already final.
+    best = [[list(range(len(positions)))] + [[0] * len(positions) for _ in range(4)] for _ in range(6)]
+    for number in range(len(positions)):
+        for die in range(6):
+            for dice in range(1, 5):
+                previous = best[die][dice - 1]
+                best[die][dice][number] = min(
+                    (previous[after] for after in successors[number][die]), key=means.__getitem__,
+                ) if number else 0
+        if not number:
+            continue
+        finals = []
+        for a, b, _ in rolls:
+            if a == b:
+                finals.append(best[a - 1][4][number])
+            else:
+                finals.append(min(
+                    [best[b - 1][1][after] for after in successors[number][a - 1]]
+                    + [best[a - 1][1][after] for after in successors[number][b - 1]],
+                    key=means.__getitem__,
+                ))
+        total = probabilities @ distribution[finals]
+        means[number] = 1.0 + sum(probability * means[final] for probability, final in zip(probabilities, finals))
+        distribution[number, 1:] = total[:-1]
+        distribution[number, -1] += total[-1]
+    # Reorder by rank so lookups can compute the row from the counts.
+    order = np.array(sorted(range(len(positions)), key=lambda number: rank(positions[number])))
+    return {"bearoff": np.round(distribution[order] * SCALE).astype(np.uint16)}
+
+
+def _count(points, checkers):
+    # Positions with at most `checkers` checkers on `points` points.
+    return comb(checkers + points, points)
+
+
+def rank(counts):
+    # Row of `counts` in the table: positions are ranked by the count on the
+    # six point, then the five point, and so on.
+    row = 0
+    remaining = CHECKERS
+    for point in range(POINTS - 1, -1, -1):
+        for count in range(counts[point]):
+            row += _count(point, remaining - count)
+        remaining -= counts[point]
+    return row
+
+
+class BearoffDatabase:
+
+    def __init__(self, table):
+        self.table = table
+
+    def distribution(self, counts):
+        return self.table[rank(counts)].astype(np.float64) / SCALE
+
+    def expected_rolls(self, counts):
+        return float(self.distribution(counts) @ np.arange(MAX_ROLLS))
+
+    def win_probability(self, mover, opponent):
+        # Chance that the player on roll, with home-board `mover`, bears off
+        # before the opponent with `opponent`.
+        mine = self.distribution(mover)
+        theirs = self.distribution(opponent)
+        at_least = np.cumsum(theirs[::-1])[::-1]
+        return float(np.clip(mine @ at_least, 0.0, 1.0))
+
+
+_databases = {}
+
+
+def open_database(directory):
+    # Cached per directory; builds and saves the table on first use.
+    if directory not in _databases:
+        _databases[directory] = BearoffDatabase(npy_cache.load_arrays(directory, TABLE_NAMES, build_tables)["bearoff"])
+    return _databases[directory]
+
+
+def database_if_ready(directory):
+    # The database, or None while it is being built in the background (about
+    # 9 seconds); the AI plays races by pip count meanwhile.
+    if directory in _databases:
+        return _databases[directory]
+    return npy_cache.open_in_background(directory, TABLE_NAMES, open_database)
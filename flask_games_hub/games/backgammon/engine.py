@@ -0,0 +1,279 @@
+import math
+import random
+import time
+
+# Backgammon positions are 26-tuples from the view of the player to move:
+# board[1..24] are the points (positive: the mover's checkers, negative: the
+# opponent's), the mover moves from 24 towards 1 and bears off below 1.
+# board[25] is the mover's bar and board[0] the opponent's bar (both counts
+# are non-negative). flip() turns a position round for the other player.
+#
+# A play is a tuple of (from, to) steps, with 25 for the bar and 0 for off.
+# Plays that lead to the same position are generated once: doubles only move
+# checkers in non-increasing point order, and every result is keyed by the
+# position it reaches.
+
+CHECKERS = 15
+BAR = 25
+OFF = 0
+HOME = range(1, 7)
+ROLLS = tuple((a, b, (1 if a == b else 2) / 36) for a in range(1, 7) for b in range(a, 7))
+
+BUDGET_SECONDS = 0.5
+CANDIDATES = 6
+MAX_DEPTH = 2
+WIN = 1.0
+
+
+def initial_position():
+    board = [0] * 26
+    board[24], board[13], board[8], board[6] = 2, 5, 3, 5
+    board[1], board[12], board[17], board[19] = -2, -5, -3, -5
+    return tuple(board)
+
+
+def flip(board):
+    return (board[BAR],) + tuple(-board[BAR - point] for point in range(1, 25)) + (board[OFF],)
+
+
+def borne_off(board):
+    # (mover's, opponent's) checkers already borne off.
+    mover = board[BAR] + sum(count for count in board[1:25] if count > 0)
+    opponent = board[OFF] - sum(count for count in board[1:25] if count < 0)
+    return CHECKERS - mover, CHECKERS - opponent
+
+
+def pip_counts(board):
+    mover = BAR * board[BAR]
+    opponent = BAR * board[OFF]
+    for point in range(1, 25):
+        count = board[point]
+        if count > 0:
+            mover += point * count
+        elif count < 0:
+            opponent -= (BAR - point) * count
+    return mover, opponent
+
+
+def _step(board, source, die):
+    # Moves one checker `die` pips from `source` in the list `board`, or
+    # returns False (leaving it unchanged) when that is not allowed.
+    if board[BAR] and source != BAR:
+        return False
+    target = source - die
+    if target <= 0:
+        for point in range(7, 26):
+            if board[point] > 0:
+                return False
+        if target < 0:
+            for point in range(source + 1, 7):
+                if board[point] > 0:
+                    return False
+        board[source] -= 1
+        return True
+    count = board[target]
+    if count < -1:
+        return False
+    board[source] -= 1
+    if count == -1:
+        board[target] = 1
+        board[OFF] += 1
+    else:
+        board[target] = count + 1
+    return True
+
+
+def legal_plays(board, dice):
+    # {resulting position (still from the mover's view): play} over every
+    # play that uses as many dice as possible (the larger die if only one
+    # can be used). With no legal play, the position itself maps to ().
+    first, second = dice
+    orders = [(first,) * 4] if first == second else [(first, second), (second, first)]
+    results = {}
+    most = [0, 0]
+
+    def expand(current, remaining, steps, highest, largest):
+        moved = False
+        if remaining:
+            die = remaining[0]
+            sources = (BAR,) if current[BAR] else range(highest, 0, -1)
+            for source in sources:
+                if current[source] <= 0:
+                    continue
+                trial = current[:]
+                if _step(trial, source, die):
+                    moved = True
+                    expand(trial, remaining[1:], steps + ((source, max(source - die, OFF)),),
+                           source if first == second else 24, max(largest, die))
+        if moved:
+            return
+        # Prefer plays using more dice, then (with one die) the larger one.
+        used = [len(steps), largest]
+        if used < most:
+            return
+        if used > most:
+            most[:] = used
+            results.clear()
+        results.setdefault(tuple(current), steps)
+
+    for order in orders:
+        expand(list(board), order, (), 24, 0)
+    return results
+
+
+def play_text(play):
+    if not play:
+        return "no move"
+    return " ".join(
+        f"{'bar' if source == BAR else source}/{'off' if target == OFF else target}" for source, target in play
+    )
+
+
+def has_contact(board):
+    # Whether any of the mover's checkers still has to pass an opponent's.
+    rearmost = BAR if board[BAR] else max((point for point in range(1, 25) if board[point] > 0), default=0)
+    opponent_rearmost = 0 if board[OFF] else min((point for point in range(1, 25) if board[point] < 0), default=BAR)
+    return rearmost > opponent_rearmost
+
+
+class Evaluator:
+    # Estimated equity (-1 to 1) for the player to move, about to roll.
+    # Pure bear-offs use the one-sided bear-off database, other races a pip
+    # count formula and contact positions a hand-weighted feature sum.
+
+    def __init__(self, bearoff=None):
+        self.bearoff = bearoff
+        self.evaluations = 0
+
+    def evaluate(self, board):
+        self.evaluations += 1
+        mover_off, opponent_off = borne_off(board)
+        if mover_off == CHECKERS:
+            return WIN
+        if opponent_off == CHECKERS:
+            return -WIN
+        mover_pips, opponent_pips = pip_counts(board)
+        if not has_contact(board):
+            if self.bearoff is not None and mover_pips <= 6 * CHECKERS and opponent_pips <= 6 * CHECKERS \
+                    and all(count <= 0 for count in board[7:26]) and all(count >= 0 for count in board[0:19]):
+                mover = tuple(board[point] for point in HOME)
+                opponent = tuple(-board[BAR - point] for point in HOME)
+                return 2 * self.bearoff.win_probability(mover, opponent) - 1
+            # The mover rolls first, worth about four pips.
+            lead = opponent_pips - mover_pips + 4
+            return math.tanh(lead / (0.08 * (mover_pips + opponent_pips) + 4))
+        return math.tanh(_contact_score(board, mover_pips, opponent_pips))
+
+
+def _blot_shots(board, point, direction):
+    # Rough count of enemy checkers within direct range (1-11 pips) of a
+    # blot on `point`; `direction` is +1 for the mover's blots (hit by the
+    # opponent moving up) and -1 for the opponent's.
+    shots = 0
+    for distance in range(1, 12):
+        source = point - direction * distance
+        if source <= 0 or source >= 25:
+            shots += board[OFF] if direction == 1 and source <= 0 else board[BAR] if source >= 25 else 0
+            break
+        count = board[source]
+        if (direction == 1 and count < 0) or (direction == -1 and count > 0):
+            shots += 1
+    return shots
+
+
+def _contact_score(board, mover_pips, opponent_pips):
+    score = (opponent_pips - mover_pips + 8) / 40
+    score += 0.35 * board[OFF] - 0.35 * board[BAR]
+    run = best_run = 0
+    opponent_run = opponent_best = 0
+    for point in range(1, 25):
+        count = board[point]
+        if count >= 2:
+            run += 1
+            best_run = max(best_run, run)
+            if point <= 6:
+                score += 0.06 + (0.04 if point >= 4 else 0.0)
+            elif point >= 19:
+                score += 0.05
+        else:
+            run = 0
+        if count <= -2:
+            opponent_run += 1
+            opponent_best = max(opponent_best, opponent_run)
+            if point >= 19:
+                score -= 0.06 + (0.04 if point <= 21 else 0.0)
+            elif point <= 6:
+                score -= 0.05
+        else:
+            opponent_run = 0
+        if count == 1:
+            # The mover rolls first: the opponent's blots are under fire
+            # now, the mover's own only after this turn.
+            score -= 0.025 * _blot_shots(board, point, 1) * (1.5 if point <= 12 else 1.0)
+        elif count == -1:
+            score += 0.04 * _blot_shots(board, point, -1) * (1.5 if point >= 13 else 1.0)
+    score += 0.05 * best_run * best_run / 6 - 0.05 * opponent_best * opponent_best / 6
+    return score
+
+
+class _Timeout(Exception):
+    pass
+
+
+class Searcher:
+    # Expectiminimax over the 21 distinct rolls. search() ranks the plays
+    # for a known roll at 0-ply (static evaluation of each result), then
+    # re-scores the best CANDIDATES at 1 ply, 2 ply, ... (averaging over
+    # the opponent's rolls and best replies) while the budget lasts.
+
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+        self.deadline = None
+
+    def _value(self, board, depth):
+        # Expected equity for the player to move on `board`, before rolling.
+        if depth == 0 or CHECKERS in borne_off(board):
+            return self.evaluator.evaluate(board)
+        total = 0.0
+        for first, second, probability in ROLLS:
+            if time.perf_counter() > self.deadline:
+                raise _Timeout
+            best = -WIN - 1
+            for result in legal_plays(board, (first, second)):
+                value = -self._value(flip(result), depth - 1)
+                if value > best:
+                    best = value
+            total += probability * best
+        return total
+
+    def search(self, board, dice, budget=BUDGET_SECONDS, max_depth=MAX_DEPTH):
+        # Returns (play, resulting position, stats) for the mover on `board`
+        # with `dice`; the position is still from the mover's view.
+        started = time.perf_counter()
+        self.deadline = started + budget
+        self.evaluator.evaluations = 0
+        plays = legal_plays(board, dice)
+        stats = {"plays": len(plays), "depth": 0, "evaluations": 0, "seconds": 0.0}
+        ranked = sorted(plays, key=lambda result: self.evaluator.evaluate(flip(result)))
+        best = ranked[0]
+        if len(ranked) > 1:
+            candidates = ranked[:CANDIDATES]
+            for depth in range(1, max_depth + 1):
+                try:
+                    scores = {result: -self._value(flip(result), depth) for result in candidates}
+                except _Timeout:
+                    break
+                best = max(candidates, key=scores.get)
+                stats["depth"] = depth
+        stats["evaluations"] = self.evaluator.evaluations
+        stats["seconds"] = time.perf_counter() - started
+        return plays[best], best, stats
+
+
+def choose_play(board, dice, bearoff=None, budget=BUDGET_SECONDS):
+    return Searcher(Evaluator(bearoff)).search(board, dice, budget)
+
+
+def roll(rng=None):
+    rng = rng or random
+    return rng.randint(1, 6), rng.randint(1, 6)
@@ -1,12 +1,45 @@
-from flask import Blueprint, redirect, render_template, request, session, url_for
+from flask import Blueprint, redirect, render_template, request, url_for
 
+from games import state_store
 from games.checkers.engine import apply_move, choose_ai_move, initial_board, legal_moves, winner
 
 checkers_bp = Blueprint("checkers", __name__, url_prefix="/games/checkers")
 
+STATE_FIELDS = {"board", "turn", "message", "game_over"}
+# The 32 dark squares, row by row; the light ones are always empty.
+DARK_SQUARES = [(row, col) for row in range(8) for col in range(8) if (row + col) % 2 == 1]
+
+
+def _pack_state(state):
+    # One nibble per dark square (piece + 2, so kings and men of both sides
+    # fit): 16 bytes, a flag byte, then the message.
+    if set(state) != STATE_FIELDS or state["turn"] not in ("human", "ai"):
+        return None
+    board = state["board"]
+    nibbles = [board[row][col] + 2 for row, col in DARK_SQUARES]
+    packed = bytes(nibbles[index] << 4 | nibbles[index + 1] for index in range(0, 32, 2))
+    flags = (state["turn"] == "ai") | state["game_over"] << 1
+    return packed + bytes((flags,)) + state["message"].encode()
+
+
+def _unpack_state(data):
+    board = [[0] * 8 for _ in range(8)]
+    for index, (row, col) in enumerate(DARK_SQUARES):
+        board[row][col] = (data[index // 2] >> (0 if index % 2 else 4) & 0xF) - 2
+    flags = data[16]
+    return {
+        "board": board,
+        "turn": "ai" if flags & 1 else "human",
+        "message": bytes(data[17:]).decode(),
+        "game_over": bool(flags & 2),
+    }
+
+
+state_store.register_codec("checkers_state", _pack_state, _unpack_state)
+
 
 def _get_state():
-    state = session.get("checkers_state")
+    state = state_store.load("checkers_state")
     if state:
         return state
     state = {
@@ -15,13 +48,12 @@ def _get_state():
         "message": "Your turn.",
         "game_over": False,
     }
-    session["checkers_state"] = state
+    state_store.save("checkers_state", state)
     return state
 
 
 def _save_state(state):
-    session["checkers_state"] = state
-    session.modified = True
+    state_store.save("checkers_state", state)
 
 
 @checkers_bp.route("/", methods=["GET", "POST"])
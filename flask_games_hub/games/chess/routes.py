@@ -1,6 +1,7 @@
 import chess
-from flask import Blueprint, redirect, render_template, request, session, url_for
+from flask import Blueprint, redirect, render_template, request, url_for
 
+from games import state_store
 from games.chess.engine import (
     board_from_fen,
     board_matrix,
@@ -12,6 +13,40 @@ from games.chess.engine import (
 
 chess_bp = Blueprint("chess", __name__, url_prefix="/games/chess")
 
+STATE_FIELDS = {"fen", "selected", "legal_destinations", "message", "game_over"}
+NO_SQUARE = 0xFF
+
+
+def _pack_state(state):
+    # The FEN stays as text (the engine works from it); squares are one
+    # byte each: game over, selected square, destination count and
+    # squares, FEN length and FEN, then the message.
+    if set(state) != STATE_FIELDS:
+        return None
+    selected = NO_SQUARE if state["selected"] is None else chess.parse_square(state["selected"])
+    destinations = [chess.parse_square(name) for name in state["legal_destinations"]]
+    fen = state["fen"].encode()
+    return (
+        bytes((state["game_over"], selected, len(destinations), *destinations, len(fen)))
+        + fen + state["message"].encode()
+    )
+
+
+def _unpack_state(data):
+    count = data[2]
+    fen_start = 4 + count
+    fen_end = fen_start + data[fen_start - 1]
+    return {
+        "fen": bytes(data[fen_start:fen_end]).decode(),
+        "selected": None if data[1] == NO_SQUARE else chess.SQUARE_NAMES[data[1]],
+        "legal_destinations": [chess.SQUARE_NAMES[square] for square in data[3:3 + count]],
+        "message": bytes(data[fen_end:]).decode(),
+        "game_over": bool(data[0]),
+    }
+
+
+state_store.register_codec("chess_state", _pack_state, _unpack_state)
+
 
 def _new_state():
     return {
@@ -24,17 +59,16 @@ def _new_state():
 
 
 def _get_state():
-    state = session.get("chess_state")
+    state = state_store.load("chess_state")
     if state:
         return state
     state = _new_state()
-    session["chess_state"] = state
+    state_store.save("chess_state", state)
     return state
 
 
 def _save_state(state):
-    session["chess_state"] = state
-    session.modified = True
+    state_store.save("chess_state", state)
 
 
 def _handle_square_click(state, square_name):
@@ -0,0 +1,363 @@
+from games.diplomacy.standard_map import (
+    ARMY_ADJACENT,
+    COASTAL,
+    FLEET_ADJACENT,
+    FLEET_REACH,
+    SEAS,
+    fleet_locations,
+    province_of,
+)
+
+# Movement-phase adjudication. Units are {province: (power, kind, location)}
+# with kind "A" or "F" and the location carrying a fleet's coast. Orders are
+# {province: order} (missing units hold), an order being one of
+#
+#     ("hold",)
+#     ("move", target location, via convoy)
+#     ("support", supported province, target province or None to hold)
+#     ("convoy", army province, target province)
+#
+# Every valid move, support and convoy is a yes/no decision (does the move
+# succeed, is the support given, does the fleet survive to convoy). Each
+# decision is a function of a few others, following the strength rules of
+# the DATC: attack, hold, defend and prevent strengths. Those dependencies
+# form a graph whose strongly connected components are resolved in
+# dependency order, so most decisions are computed exactly once. A
+# component with a cycle is solved by guess-and-check over its decisions:
+# one consistent outcome is taken as is; none or several means circular
+# movement (all the moves succeed) or, when convoys are involved, a convoy
+# paradox, settled by the Szykman rule (the armies convoyed by fleets in
+# the cycle fail and cut nothing).
+
+# Cycles larger than this are settled by fixed-point iteration instead of
+# trying every guess.
+MAX_GUESSES = 12
+
+
+class Adjudicator:
+
+    def __init__(self, units, orders):
+        self.units = units
+        self.orders = {}
+        self.void = set()
+        self.moves = {}
+        self.targets = {}
+        self.convoyed = set()
+        self.moves_into = {}
+        self.move_supports = {}
+        self.hold_supports = {}
+        self.supports = {}
+        self.convoyers = {}
+        self.convoys = set()
+        self.disrupted = set()
+        self.value = {}
+        self._validate(orders)
+
+    def _validate(self, orders):
+        # Keeps the valid orders; anything else is void and the unit holds.
+        units = self.units
+        moves = {}
+        for province, order in orders.items():
+            unit = units.get(province)
+            if unit is None or order[0] != "move":
+                continue
+            _, kind, location = unit
+            target = order[1]
+            target_province = province_of(target)
+            if target_province == province:
+                continue
+            if kind == "F":
+                if target not in FLEET_ADJACENT[location]:
+                    coasts = [coast for coast in fleet_locations(target) if coast in FLEET_ADJACENT[location]]
+                    if target != target_province or len(coasts) != 1:
+                        continue
+                    target = coasts[0]
+                moves[province] = (target, False)
+            elif target_province in ARMY_ADJACENT.get(province, ()) and not order[2]:
+                moves[province] = (target_province, False)
+            elif province in COASTAL and target_province in COASTAL:
+                moves[province] = (target_province, True)
+
+        for province, order in orders.items():
+            unit = units.get(province)
+            if unit is None or order[0] != "convoy":
+                continue
+            army, target = order[1], order[2]
+            planned = moves.get(army)
+            if unit[1] == "F" and province in SEAS and planned is not None and planned[1] \
+                    and province_of(planned[0]) == target:
+                self.convoyers.setdefault(army, []).append(province)
+                self.convoys.add(province)
+                self.orders[province] = order
+
+        for province, (target, via) in moves.items():
+            if via and not self._path(province, province_of(target), every=True):
+                self.convoyers.pop(province, None)
+                continue
+            self.moves[province] = province_of(target)
+            self.targets[province] = target
+            if via:
+                self.convoyed.add(province)
+            self.moves_into.setdefault(province_of(target), []).append(province)
+            self.orders[province] = orders[province]
+        for fleet in list(self.convoys):
+            if self.orders[fleet][1] not in self.moves:
+                self.convoys.discard(fleet)
+                del self.orders[fleet]
+
+        for province, order in orders.items():
+            unit = units.get(province)
+            if unit is None or order[0] != "support" or order[1] not in units or order[1] == province:
+                continue
+            supported, target = order[1], order[2]
+            reach_target = supported if target is None else target
+            _, kind, location = unit
+            reach = ARMY_ADJACENT.get(province, ()) if kind == "A" else FLEET_REACH[location]
+            if reach_target not in reach:
+                continue
+            if target is None and supported not in self.moves:
+                self.hold_supports.setdefault(supported, []).append(province)
+            elif target is not None and self.moves.get(supported) == target:
+                self.move_supports.setdefault(supported, []).append(province)
+            else:
+                continue
+            self.supports[province] = (supported, target)
+            self.orders[province] = order
+        self.void = {province for province, order in orders.items() if order[0] != "hold"} - set(self.orders)
+
+    def _path(self, army, target, every=False):
+        # Whether a chain of convoying fleets links `army` to `target`; with
+        # `every`, any fleet ordered to convoy counts, else only the fleets
+        # whose convoy decision holds.
+        if army in self.disrupted:
+            return False
+        fleets = self.convoyers.get(army, ())
+        if not every:
+            fleets = [fleet for fleet in fleets if self.value[fleet]]
+        fleets = set(fleets)
+        frontier = [fleet for fleet in fleets if army in FLEET_REACH[fleet]]
+        seen = set(frontier)
+        while frontier:
+            fleet = frontier.pop()
+            if target in FLEET_REACH[fleet]:
+                return True
+            for other in FLEET_ADJACENT[fleet]:
+                if other in fleets and other not in seen:
+                    seen.add(other)
+                    frontier.append(other)
+        return False
+
+    def _given(self, supporters, exclude_power=None):
+        count = 0
+        for supporter in supporters:
+            if self.value[supporter] and (exclude_power is None or self.units[supporter][0] != exclude_power):
+                count += 1
+        return count
+
+    def _head_to_head(self, origin):
+        target = self.moves[origin]
+        return self.moves.get(target) == origin and origin not in self.convoyed and target not in self.convoyed
+
+    def _attack_strength(self, origin):
+        if origin in self.convoyed and not self._path(origin, self.moves[origin]):
+            return 0
+        target = self.moves[origin]
+        defender = self.units.get(target)
+        supporters = self.move_supports.get(origin, ())
+        if defender is None or (target in self.moves and not self._head_to_head(origin) and self.value[target]):
+            return 1 + self._given(supporters)
+        if defender[0] == self.units[origin][0]:
+            return 0
+        return 1 + self._given(supporters, exclude_power=defender[0])
+
+    def _hold_strength(self, province):
+        if province not in self.units:
+            return 0
+        if province in self.moves:
+            return 0 if self.value[province] else 1
+        return 1 + self._given(self.hold_supports.get(province, ()))
+
+    def _prevent_strength(self, origin):
+        if origin in self.convoyed and not self._path(origin, self.moves[origin]):
+            return 0
+        if self._head_to_head(origin) and self.value[self.moves[origin]]:
+            return 0
+        return 1 + self._given(self.move_supports.get(origin, ()))
+
+    def _evaluate(self, province):
+        if province in self.moves:
+            attack = self._attack_strength(province)
+            target = self.moves[province]
+            if self._head_to_head(province):
+                if attack <= 1 + self._given(self.move_supports.get(target, ())):
+                    return False
+            elif attack <= self._hold_strength(target):
+                return False
+            for other in self.moves_into[target]:
+                if other != province and attack <= self._prevent_strength(other):
+                    return False
+            return True
+        if province in self.supports:
+            power = self.units[province][0]
+            target = self.supports[province][1]
+            for attacker in self.moves_into.get(province, ()):
+                if attacker == target or self.units[attacker][0] == power:
+                    continue
+                if attacker in self.convoyed and not self._path(attacker, province):
+                    continue
+                return False
+            return not (target is not None and self.moves.get(target) == province and self.value[target])
+        return not any(self.value[attacker] for attacker in self.moves_into.get(province, ()))
+
+    def _dependencies(self, province):
+        decisions = self.orders
+        found = []
+        if province in self.moves:
+            target = self.moves[province]
+            found += self.move_supports.get(province, [])
+            found += self.convoyers.get(province, [])
+            if target in self.moves:
+                found.append(target)
+                found += self.move_supports.get(target, [])
+                found += self.convoyers.get(target, [])
+            found += self.hold_supports.get(target, [])
+            for other in self.moves_into[target]:
+                if other != province:
+                    found += self.move_supports.get(other, [])
+                    found += self.convoyers.get(other, [])
+        elif province in self.supports:
+            target = self.supports[province][1]
+            for attacker in self.moves_into.get(province, ()):
+                found += self.convoyers.get(attacker, [])
+                if attacker in self.convoyed:
+                    found.append(attacker)
+            if target is not None and self.moves.get(target) == province:
+                found.append(target)
+        else:
+            found += self.moves_into.get(province, [])
+        return [other for other in found if other in decisions]
+
+    def _components(self):
+        # Tarjan's algorithm, iterative; components come out dependencies
+        # first.
+        graph = {province: self._dependencies(province) for province in self.orders}
+        index = {}
+        low = {}
+        stack = []
+        on_stack = set()
+        components = []
+        for root in graph:
+            if root in index:
+                continue
+            work = [(root, iter(graph[root]))]
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            while work:
+                node, children = work[-1]
+                for child in children:
+                    if child not in index:
+                        index[child] = low[child] = len(index)
+                        stack.append(child)
+                        on_stack.add(child)
+                        work.append((child, iter(graph[child])))
+                        break
+                    if child in on_stack:
+                        low[node] = min(low[node], index[child])
+                else:
+                    work.pop()
+                    if work:
+                        low[work[-1][0]] = min(low[work[-1][0]], low[node])
+                    if low[node] == index[node]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append((component, len(component) > 1 or node in graph[node]))
+        return components
+
+    def _consistent(self, nodes):
+        # Every assignment of the cyclic decisions `nodes` that reproduces
+        # itself when each decision is evaluated.
+        found = []
+        for guess in range(1 << len(nodes)):
+            for bit, node in enumerate(nodes):
+                self.value[node] = bool(guess >> bit & 1)
+            if all(self._evaluate(node) == self.value[node] for node in nodes):
+                found.append({node: self.value[node] for node in nodes})
+        return found
+
+    def _iterate(self, nodes):
+        for node in nodes:
+            self.value[node] = False
+        for _ in range(2 * len(nodes)):
+            changed = False
+            for node in nodes:
+                value = self._evaluate(node)
+                if value != self.value[node]:
+                    self.value[node] = value
+                    changed = True
+            if not changed:
+                return
+
+    def _resolve_cycle(self, nodes):
+        if len(nodes) > MAX_GUESSES:
+            self._iterate(nodes)
+            return
+        outcomes = self._consistent(nodes)
+        if len(outcomes) == 1:
+            self.value.update(outcomes[0])
+            return
+        # The armies convoyed by fleets in the cycle; the army itself may
+        # sit outside it, as in Pandin's paradox.
+        paradox = {self.orders[node][1] for node in nodes if node in self.convoys} - self.disrupted
+        if paradox:
+            # Szykman rule: the convoyed moves caught in the paradox fail.
+            self.disrupted.update(paradox)
+            for army in paradox:
+                self.value[army] = False
+            rest = [node for node in nodes if node not in self.disrupted]
+            if rest:
+                self._resolve_cycle(rest)
+            return
+        if outcomes:
+            # Circular movement: take the outcome where the most moves succeed.
+            self.value.update(max(outcomes, key=lambda outcome: sum(
+                1 for node, value in outcome.items() if value and node in self.moves)))
+            return
+        self._iterate(nodes)
+
+    def run(self):
+        for nodes, cyclic in self._components():
+            if cyclic:
+                self._resolve_cycle(nodes)
+            else:
+                self.value[nodes[0]] = self._evaluate(nodes[0])
+        moved = {origin: self.targets[origin] for origin in self.moves if self.value[origin]}
+        dislodged = {}
+        for province in self.units:
+            if province in moved:
+                continue
+            for attacker in self.moves_into.get(province, ()):
+                if self.value[attacker]:
+                    dislodged[province] = attacker
+        occupied_targets = {self.moves[origin] for origin in moved}
+        contested = {target for target in self.moves_into if target not in occupied_targets}
+        return {
+            "moved": moved,
+            "dislodged": dislodged,
+            "contested": contested,
+            "succeeded": dict(self.value),
+            "void": self.void,
+        }
+
+
+def adjudicate(units, orders):
+    # Returns {"moved": {origin: target location}, "dislodged": {province:
+    # attacker's origin}, "contested": provinces left empty by a standoff or
+    # bounce, "succeeded": {province: decision}, "void": provinces whose
+    # order was invalid}.
+    return Adjudicator(units, orders).run()
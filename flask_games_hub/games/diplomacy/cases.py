@@ -0,0 +1,388 @@
+from games.diplomacy.standard_map import province_of
+
+# Adjudication test cases, most of them from the DATC (Diplomacy
+# Adjudicator Test Cases). Each case lists its units as "Power kind
+# location", its orders, the origins whose moves succeed and the
+# dislodged units with the origin of the unit that dislodged them. Used by
+# `bench.py diplomacy` to check the adjudicator before timing it.
+
+
+def _units(*lines):
+    units = {}
+    for line in lines:
+        power, kind, location = line.split()
+        units[province_of(location)] = (power, kind, location)
+    return units
+
+
+def _hold():
+    return ("hold",)
+
+
+def _move(target, via=False):
+    return ("move", target, via)
+
+
+def _support(supported, target=None):
+    return ("support", supported, target)
+
+
+def _convoy(army, target):
+    return ("convoy", army, target)
+
+
+CASES = (
+    {
+        "name": "simple move",
+        "units": _units("England F nth"),
+        "orders": {"nth": _move("eng")},
+        "moved": {"nth"},
+        "dislodged": {},
+    },
+    {
+        "name": "bounce",
+        "units": _units("Austria A vie", "Italy A ven"),
+        "orders": {"vie": _move("tyr"), "ven": _move("tyr")},
+        "moved": set(),
+        "dislodged": {},
+    },
+    {
+        "name": "supported attack dislodges",
+        "units": _units("France A par", "France A mar", "Germany A bur"),
+        "orders": {"par": _move("bur"), "mar": _support("par", "bur"), "bur": _hold()},
+        "moved": {"par"},
+        "dislodged": {"bur": "par"},
+    },
+    {
+        "name": "support cut by attack",
+        "units": _units("France A par", "France A mar", "Germany A bur", "Italy A pie"),
+        "orders": {"par": _move("bur"), "mar": _support("par", "bur"), "bur": _hold(), "pie": _move("mar")},
+        "moved": set(),
+        "dislodged": {},
+    },
+    {
+        "name": "support not cut from the province it is given into",
+        "units": _units("Germany A ber", "Germany A sil", "Russia A pru"),
+        "orders": {"ber": _move("pru"), "sil": _support("ber", "pru"), "pru": _move("sil")},
+        "moved": {"ber"},
+        "dislodged": {"pru": "ber"},
+    },
+    {
+        "name": "support to hold beats an attack",
+        "units": _units("Germany A bur", "Germany A mun", "France A par", "France A gas"),
+        "orders": {"bur": _hold(), "mun": _support("bur"), "par": _move("bur"), "gas": _support("par", "bur")},
+        "moved": set(),
+        "dislodged": {},
+    },
+    {
+        "name": "an own unit does not cut support",
+        "units": _units("France A par", "France A mar", "France A gas", "Germany A bur"),
+        "orders": {"par": _move("bur"), "mar": _support("par", "bur"), "gas": _move("mar"), "bur": _hold()},
+        "moved": {"par"},
+        "dislodged": {"bur": "par"},
+    },
+    {
+        "name": "no self-dislodgement",
+        "units": _units("Germany A ber", "Germany F kie", "Germany A mun"),
+        "orders": {"ber": _hold(), "kie": _move("ber"), "mun": _support("kie", "ber")},
+        "moved": set(),
+        "dislodged": {},
+    },
+    {
+        "name": "circular movement",
+        "units": _units("Turkey F ank", "Turkey A con", "Turkey A smy"),
+        "orders": {"ank": _move("con"), "con": _move("smy"), "smy": _move("ank")},
+        "moved": {"ank", "con", "smy"},
+        "dislodged": {},
+    },
+    {
+        "name": "circular movement broken by a bounce",
+        "units": _units("Turkey F ank", "Turkey A con", "Turkey A smy", "Turkey A bul"),
+        "orders": {"ank": _move("con"), "con": _move("smy"), "smy": _move("ank"), "bul": _move("con")},
+        "moved": set(),
+        "dislodged": {},
+    },
+    {
+        "name": "swap without convoy bounces",
+        "units": _units("Germany A ber", "Russia A pru"),
+        "orders": {"ber": _move("pru"), "pru": _move("ber")},
+        "moved": set(),
+        "dislodged": {},
+    },
+    {
+        "name": "supported head-to-head",
+        "units": _units("Germany A ber", "Germany A sil", "Russia A pru"),
+        "orders": {"ber": _move("pru"), "sil": _support("ber", "pru"), "pru": _move("ber")},
+        "moved": {"ber"},
+        "dislodged": {"pru": "ber"},
+    },
+    {
+        "name": "simple convoy",
+        "units": _units("England A lon", "England F nth"),
+        "orders": {"lon": _move("nwy", True), "nth": _convoy("lon", "nwy")},
+        "moved": {"lon"},
+        "dislodged": {},
+    },
+    {
+        "name": "disrupted convoy",
+        "units": _units("England A lon", "England F nth", "France F eng", "France F bel"),
+        "orders": {
+            "lon": _move("hol", True),
+            "nth": _convoy("lon", "hol"),
+            "eng": _move("nth"),
+            "bel": _support("eng", "nth"),
+        },
+        "moved": {"eng"},
+        "dislodged": {"nth": "eng"},
+    },
+    {
+        "name": "swap by convoy",
+        "units": _units("England A nwy", "England F ska", "Russia A swe"),
+        "orders": {"nwy": _move("swe", True), "ska": _convoy("nwy", "swe"), "swe": _move("nwy")},
+        "moved": {"nwy", "swe"},
+        "dislodged": {},
+    },
+    {
+        "name": "beleaguered garrison",
+        "units": _units(
+            "England F nth", "England F hel", "Russia F ska", "Russia F bal",
+            "Germany F den",
+        ),
+        "orders": {
+            "nth": _move("den"),
+            "hel": _support("nth", "den"),
+            "ska": _move("den"),
+            "bal": _support("ska", "den"),
+            "den": _hold(),
+        },
+        "moved": set(),
+        "dislodged": {},
+    },
+    {
+        "name": "a head-to-head loser does not prevent",
+        "units": _units("France A par", "France A pic", "Germany A bur", "Italy A gas"),
+        "orders": {"par": _move("bur"), "pic": _support("par", "bur"), "bur": _move("par"), "gas": _move("par")},
+        "moved": {"par", "gas"},
+        "dislodged": {"bur": "par"},
+    },
+    # Convoy paradoxes, DATC 6.F.14-6.F.24, settled by the Szykman rule. In
+    # 6.F.19-6.F.21 a convoy route nobody attacks means there is no paradox.
+    {
+        "name": "simple convoy paradox (6.F.14)",
+        "units": _units("England F lon", "England F wal", "France A bre", "France F eng"),
+        "orders": {
+            "lon": _support("wal", "eng"),
+            "wal": _move("eng"),
+            "bre": _move("lon", True),
+            "eng": _convoy("bre", "lon"),
+        },
+        "moved": {"wal"},
+        "dislodged": {"eng": "wal"},
+    },
+    {
+        "name": "simple convoy paradox with additional convoy (6.F.15)",
+        "units": _units(
+            "England F lon", "England F wal", "France A bre", "France F eng",
+            "Italy F iri", "Italy F mao", "Italy A naf",
+        ),
+        "orders": {
+            "lon": _support("wal", "eng"),
+            "wal": _move("eng"),
+            "bre": _move("lon", True),
+            "eng": _convoy("bre", "lon"),
+            "iri": _convoy("naf", "wal"),
+            "mao": _convoy("naf", "wal"),
+            "naf": _move("wal", True),
+        },
+        "moved": {"wal", "naf"},
+        "dislodged": {"eng": "wal"},
+    },
+    {
+        "name": "Pandin's paradox (6.F.16)",
+        "units": _units(
+            "England F lon", "England F wal", "France A bre", "France F eng",
+            "Germany F nth", "Germany F bel",
+        ),
+        "orders": {
+            "lon": _support("wal", "eng"),
+            "wal": _move("eng"),
+            "bre": _move("lon", True),
+            "eng": _convoy("bre", "lon"),
+            "nth": _support("bel", "eng"),
+            "bel": _move("eng"),
+        },
+        "moved": set(),
+        "dislodged": {},
+    },
+    {
+        "name": "Pandin's extended paradox (6.F.17)",
+        "units": _units(
+            "England F lon", "England F wal", "France A bre", "France F eng", "France F yor",
+            "Germany F nth", "Germany F bel",
+        ),
+        "orders": {
+            "lon": _support("wal", "eng"),
+            "wal": _move("eng"),
+            "bre": _move("lon", True),
+            "eng": _convoy("bre", "lon"),
+            "yor": _support("bre", "lon"),
+            "nth": _support("bel", "eng"),
+            "bel": _move("eng"),
+        },
+        "moved": set(),
+        "dislodged": {},
+    },
+    {
+        "name": "betrayal paradox (6.F.18)",
+        "units": _units(
+            "England F nth", "England A lon", "England F eng", "France F bel",
+            "Germany F hel", "Germany F ska",
+        ),
+        "orders": {
+            "nth": _convoy("lon", "bel"),
+            "lon": _move("bel", True),
+            "eng": _support("lon", "bel"),
+            "bel": _support("nth"),
+            "hel": _support("ska", "nth"),
+            "ska": _move("nth"),
+        },
+        "moved": set(),
+        "dislodged": {},
+    },
+    {
+        "name": "multi-route convoy disruption paradox (6.F.19)",
+        "units": _units("France A tun", "France F tys", "France F ion", "Italy F nap", "Italy F rom"),
+        "orders": {
+            "tun": _move("nap", True),
+            "tys": _convoy("tun", "nap"),
+            "ion": _convoy("tun", "nap"),
+            "nap": _support("rom", "tys"),
+            "rom": _move("tys"),
+        },
+        "moved": set(),
+        "dislodged": {},
+    },
+    {
+        "name": "unwanted multi-route convoy paradox (6.F.20)",
+        "units": _units(
+            "France A tun", "France F tys", "Italy F nap", "Italy F ion",
+            "Turkey F aeg", "Turkey F eas",
+        ),
+        "orders": {
+            "tun": _move("nap", True),
+            "tys": _convoy("tun", "nap"),
+            "nap": _support("ion"),
+            "ion": _convoy("tun", "nap"),
+            "aeg": _support("eas", "ion"),
+            "eas": _move("ion"),
+        },
+        "moved": {"eas"},
+        "dislodged": {"ion": "eas"},
+    },
+    {
+        "name": "Dad's army convoy (6.F.21)",
+        "units": _units(
+            "Russia A edi", "Russia F nwg", "Russia A nwy", "France F iri", "France F mao",
+            "England A lvp", "England F nao", "England F cly",
+        ),
+        "orders": {
+            "edi": _support("nwy", "cly"),
+            "nwg": _convoy("nwy", "cly"),
+            "nwy": _move("cly", True),
+            "iri": _support("mao", "nao"),
+            "mao": _move("nao"),
+            "lvp": _move("cly", True),
+            "nao": _convoy("lvp", "cly"),
+            "cly": _support("nao"),
+        },
+        "moved": {"nwy", "mao"},
+        "dislodged": {"cly": "nwy", "nao": "mao"},
+    },
+    {
+        "name": "second order paradox with two resolutions (6.F.22)",
+        "units": _units(
+            "England F edi", "England F lon", "France A bre", "France F eng",
+            "Germany F bel", "Germany F pic", "Russia A nwy", "Russia F nth",
+        ),
+        "orders": {
+            "edi": _move("nth"),
+            "lon": _support("edi", "nth"),
+            "bre": _move("lon", True),
+            "eng": _convoy("bre", "lon"),
+            "bel": _support("pic", "eng"),
+            "pic": _move("eng"),
+            "nwy": _move("bel", True),
+            "nth": _convoy("nwy", "bel"),
+        },
+        "moved": {"edi", "pic"},
+        "dislodged": {"nth": "edi", "eng": "pic"},
+    },
+    {
+        "name": "second order paradox with two exclusive convoys (6.F.23)",
+        "units": _units(
+            "England F edi", "England F yor", "France A bre", "France F eng",
+            "Germany F bel", "Germany F lon", "Italy F mao", "Italy F iri",
+            "Russia A nwy", "Russia F nth",
+        ),
+        "orders": {
+            "edi": _move("nth"),
+            "yor": _support("edi", "nth"),
+            "bre": _move("lon", True),
+            "eng": _convoy("bre", "lon"),
+            "bel": _support("eng"),
+            "lon": _support("nth"),
+            "mao": _move("eng"),
+            "iri": _support("mao", "eng"),
+            "nwy": _move("bel", True),
+            "nth": _convoy("nwy", "bel"),
+        },
+        "moved": set(),
+        "dislodged": {},
+    },
+    {
+        "name": "second order paradox with no resolution (6.F.24)",
+        "units": _units(
+            "England F edi", "England F lon", "England F iri", "England F mao",
+            "France A bre", "France F eng", "France F bel", "Russia A nwy", "Russia F nth",
+        ),
+        "orders": {
+            "edi": _move("nth"),
+            "lon": _support("edi", "nth"),
+            "iri": _move("eng"),
+            "mao": _support("iri", "eng"),
+            "bre": _move("lon", True),
+            "eng": _convoy("bre", "lon"),
+            "bel": _support("eng"),
+            "nwy": _move("bel", True),
+            "nth": _convoy("nwy", "bel"),
+        },
+        "moved": {"edi"},
+        "dislodged": {"nth": "edi"},
+    },
+    {
+        "name": "fleet coast is required",
+        "units": _units("France F gas"),
+        "orders": {"gas": _move("spa/sc")},
+        "moved": set(),
+        "dislodged": {},
+    },
+    {
+        "name": "fleet coast inferred when only one fits",
+        "units": _units("France F gas"),
+        "orders": {"gas": _move("spa")},
+        "moved": {"gas"},
+        "dislodged": {},
+    },
+)
+
+
+def check(adjudicate, case):
+    # The differences between `case` and what `adjudicate` makes of it, as
+    # readable lines; empty when the case passes.
+    result = adjudicate(case["units"], case["orders"])
+    problems = []
+    if set(result["moved"]) != case["moved"]:
+        problems.append(f"moved {sorted(result['moved'])}, expected {sorted(case['moved'])}")
+    if result["dislodged"] != case["dislodged"]:
+        problems.append(f"dislodged {result['dislodged']}, expected {case['dislodged']}")
+    return problems
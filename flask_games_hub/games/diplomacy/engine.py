@@ -0,0 +1,412 @@
+import random
+import time
+
+from games.diplomacy.adjudicator import adjudicate
+from games.diplomacy.standard_map import (
+    ARMY_ADJACENT,
+    COASTAL,
+    FLEET_ADJACENT,
+    FLEET_REACH,
+    HOME_CENTERS,
+    POWERS,
+    SEAS,
+    SPLIT_COASTS,
+    STARTING_UNITS,
+    SUPPLY_CENTERS,
+    province_of,
+)
+
+# Diplomacy on the standard map for one human power against six computer
+# powers. A game is {"year", "season", "units", "owners"} with units as
+# {province: (power, kind, location)} and owners as {supply centre:
+# power}; everything is plain lists, strings and dicts so it can live in
+# the session.
+#
+# Only movement phases are played. Retreats and winter adjustments are
+# made automatically: a dislodged unit retreats to the best open province
+# (or disbands), builds go to vacant home centres and disbanding starts
+# with the units furthest from the power's centres.
+#
+# The computer powers search orders by sampling: each samples candidate
+# order sets for its units (moves weighted towards supply centres, idle
+# units supporting the moves next to them), adjudicates every candidate
+# against a few guesses of what everyone else does and keeps the best on
+# average. That search is why adjudication has to be fast.
+
+SPRING = "Spring"
+FALL = "Fall"
+FIRST_YEAR = 1901
+LAST_YEAR = 1910
+VICTORY_CENTERS = 18
+
+BUDGET_SECONDS = 1.5
+SAMPLES = 60
+HOLD_WEIGHT = 1.5
+SUPPORT_CHANCE = 0.8
+CENTER_SCORE = 10
+OCCUPIED_CENTER_SCORE = 5
+DISLODGED_SCORE = 8
+PRESSURE_SCORE = 1
+
+
+def new_game():
+    units = {}
+    for power, placed in STARTING_UNITS.items():
+        for kind, location in placed:
+            units[province_of(location)] = [power, kind, location]
+    owners = {center: power for power, centers in HOME_CENTERS.items() for center in centers}
+    return {"year": FIRST_YEAR, "season": SPRING, "units": units, "owners": owners}
+
+
+def unit_map(game):
+    return {province: tuple(unit) for province, unit in game["units"].items()}
+
+
+def location_name(location):
+    province, _, coast = location.partition("/")
+    name = province.upper() if province in SEAS else province.capitalize()
+    return f"{name}/{coast}" if coast else name
+
+
+def unit_text(unit):
+    return f"{unit[1]} {location_name(unit[2])}"
+
+
+def order_text(units, province, order):
+    head = unit_text(units[province])
+    if order[0] == "move":
+        return f"{head} - {location_name(order[1])}{' via convoy' if order[2] else ''}"
+    if order[0] == "support":
+        supported = unit_text(units[order[1]])
+        if order[2] is None:
+            return f"{head} S {supported}"
+        return f"{head} S {supported} - {location_name(order[2])}"
+    if order[0] == "convoy":
+        return f"{head} C A {location_name(order[1])} - {location_name(order[2])}"
+    return f"{head} H"
+
+
+def _fleet_component(units, start):
+    # Sea provinces linked to `start` through seas that hold a fleet.
+    component = {start}
+    frontier = [start]
+    while frontier:
+        sea = frontier.pop()
+        for other in FLEET_ADJACENT[sea]:
+            if other in SEAS and other not in component and other in units and units[other][1] == "F":
+                component.add(other)
+                frontier.append(other)
+    return component
+
+
+def _convoy_destinations(units, province):
+    # Coastal provinces an army on `province` could be convoyed to by the
+    # fleets now at sea.
+    reached = set()
+    for sea in SEAS:
+        if sea not in reached and sea in units and units[sea][1] == "F" and province in FLEET_REACH[sea]:
+            reached |= _fleet_component(units, sea)
+    destinations = set()
+    for sea in reached:
+        destinations |= FLEET_REACH[sea]
+    return {other for other in destinations if other in COASTAL and other != province}
+
+
+def _move_reach(unit, province):
+    # Provinces the unit could move to without a convoy.
+    if unit[1] == "A":
+        return ARMY_ADJACENT.get(province, frozenset())
+    return FLEET_REACH[unit[2]]
+
+
+def legal_orders(units, province, convoys=True):
+    unit = units[province]
+    orders = [("hold",)]
+    if unit[1] == "A":
+        direct = ARMY_ADJACENT.get(province, frozenset())
+        orders += [("move", target, False) for target in sorted(direct)]
+        if convoys and province in COASTAL:
+            orders += [("move", target, True) for target in sorted(_convoy_destinations(units, province) - direct)]
+    else:
+        orders += [("move", target, False) for target in sorted(FLEET_ADJACENT[unit[2]])]
+    reach = _move_reach(unit, province)
+    for other in sorted(units):
+        if other == province:
+            continue
+        if other in reach:
+            orders.append(("support", other, None))
+        for target in sorted((_move_reach(units[other], other) & reach) - {province}):
+            orders.append(("support", other, target))
+    if convoys and unit[1] == "F" and province in SEAS:
+        component = _fleet_component(units, province)
+        shore = set()
+        for sea in component:
+            shore |= FLEET_REACH[sea]
+        shore &= set(COASTAL)
+        for army in sorted(shore):
+            if army in units and units[army][1] == "A":
+                orders += [("convoy", army, target) for target in sorted(shore - {army})]
+    return orders
+
+
+def center_counts(owners):
+    counts = {power: 0 for power in POWERS}
+    for power in owners.values():
+        counts[power] += 1
+    return counts
+
+
+def _retreat_rank(owners, power, province):
+    if province in SUPPLY_CENTERS and owners.get(province) != power:
+        return 0
+    if province in SUPPLY_CENTERS:
+        return 1
+    return 2
+
+
+def _retreat(units, after, owners, province, attacker, contested):
+    power, kind, location = units[province]
+    options = ARMY_ADJACENT.get(province, ()) if kind == "A" else FLEET_ADJACENT[location]
+    open_options = [
+        option for option in options
+        if province_of(option) not in after and province_of(option) != attacker
+        and province_of(option) not in contested
+    ]
+    if not open_options:
+        return None
+    return min(open_options, key=lambda option: (_retreat_rank(owners, power, province_of(option)), option))
+
+
+def _adjust(units, owners, report):
+    # Winter: builds in vacant owned home centres, disbands furthest from
+    # the power's centres first.
+    counts = center_counts(owners)
+    for power in POWERS:
+        mine = sorted(province for province, unit in units.items() if unit[0] == power)
+        change = counts[power] - len(mine)
+        if change > 0:
+            fleets = sum(1 for province in mine if units[province][1] == "F")
+            for home in HOME_CENTERS[power]:
+                if change == 0:
+                    break
+                if owners.get(home) != power or home in units:
+                    continue
+                kind = "F" if home in COASTAL and home not in SPLIT_COASTS and fleets * 2 < len(mine) else "A"
+                units[home] = (power, kind, home)
+                fleets += kind == "F"
+                mine.append(home)
+                change -= 1
+                report.append(f"{power} builds {unit_text(units[home])}.")
+        elif change < 0:
+            centers = {center for center, owner in owners.items() if owner == power}
+
+            def distance(province):
+                if province in centers:
+                    return 0
+                if ARMY_ADJACENT.get(province, frozenset()) & centers or FLEET_REACH.get(province, frozenset()) & centers:
+                    return 1
+                return 2
+
+            for province in sorted(mine, key=lambda province: (-distance(province), province))[:-change]:
+                report.append(f"{power} disbands {unit_text(units[province])}.")
+                del units[province]
+
+
+def resolve_turn(game, orders):
+    # Adjudicates `orders` ({province: order}, every unit; missing units
+    # hold), then retreats, captures and adjustments. Returns the next game
+    # state and a report of what happened.
+    units = unit_map(game)
+    owners = dict(game["owners"])
+    result = adjudicate(units, orders)
+    moved = result["moved"]
+    dislodged = result["dislodged"]
+    report = []
+    after = {}
+    for province, unit in units.items():
+        order = orders.get(province, ("hold",))
+        if province in moved:
+            target = moved[province]
+            after[province_of(target)] = (unit[0], unit[1], target)
+        elif province not in dislodged:
+            after[province] = unit
+        if order[0] == "move" and province not in moved:
+            report.append(f"{unit[0]}: {order_text(units, province, order)} fails.")
+    for province in sorted(dislodged):
+        unit = units[province]
+        retreat = _retreat(units, after, owners, province, dislodged[province], result["contested"])
+        if retreat is None:
+            report.append(f"{unit[0]}: {unit_text(unit)} is dislodged and disbanded.")
+            continue
+        after[province_of(retreat)] = (unit[0], unit[1], retreat)
+        report.append(f"{unit[0]}: {unit_text(unit)} is dislodged and retreats to {location_name(retreat)}.")
+
+    year, season = game["year"], game["season"]
+    if season == SPRING:
+        season = FALL
+    else:
+        for province, unit in after.items():
+            if province in SUPPLY_CENTERS and owners.get(province) != unit[0]:
+                report.append(f"{unit[0]} takes {location_name(province)}.")
+                owners[province] = unit[0]
+        _adjust(after, owners, report)
+        year, season = year + 1, SPRING
+    state = {
+        "year": year,
+        "season": season,
+        "units": {province: list(unit) for province, unit in after.items()},
+        "owners": owners,
+    }
+    return state, report
+
+
+def winner(game):
+    # The power with a majority of centres; after the last year the leader.
+    counts = center_counts(game["owners"])
+    leader = max(POWERS, key=lambda power: counts[power])
+    if counts[leader] >= VICTORY_CENTERS or game["year"] > LAST_YEAR:
+        return leader
+    return None
+
+
+def _target_value(owners, power, province, season):
+    if province in SUPPLY_CENTERS and owners.get(province) != power:
+        return 6.0 if season == FALL else 4.0
+    if province in SUPPLY_CENTERS:
+        return 1.0
+    return 0.5
+
+
+def _sample_orders(units, owners, power, season, rng):
+    # One candidate order set: weighted moves, then supports from the units
+    # left holding.
+    mine = [province for province, unit in units.items() if unit[0] == power]
+    rng.shuffle(mine)
+    orders = {}
+    claimed = set()
+    for province in mine:
+        unit = units[province]
+        choices = [(("hold",), HOLD_WEIGHT)]
+        if unit[1] == "A":
+            targets = ARMY_ADJACENT.get(province, ())
+        else:
+            targets = FLEET_ADJACENT[unit[2]]
+        for target in targets:
+            target_province = province_of(target)
+            if target_province in claimed:
+                continue
+            occupant = units.get(target_province)
+            if occupant is not None and occupant[0] == power:
+                continue
+            choices.append((("move", target, False), _target_value(owners, power, target_province, season)))
+        total = sum(weight for _, weight in choices)
+        pick = rng.random() * total
+        for order, weight in choices:
+            pick -= weight
+            if pick <= 0:
+                break
+        orders[province] = order
+        if order[0] == "move":
+            claimed.add(province_of(order[1]))
+        else:
+            claimed.add(province)
+    for province in mine:
+        if orders[province][0] != "hold":
+            continue
+        reach = _move_reach(units[province], province)
+        helped = [
+            other for other in mine
+            if orders[other][0] == "move" and province_of(orders[other][1]) in reach
+            and province_of(orders[other][1]) != province
+        ]
+        if helped and rng.random() < SUPPORT_CHANCE:
+            other = rng.choice(helped)
+            orders[province] = ("support", other, province_of(orders[other][1]))
+    return orders
+
+
+def _greedy_orders(units, owners, powers, season):
+    # Everyone in `powers` moves each unit to its best-valued neighbour, if
+    # that is better than staying.
+    orders = {}
+    for province, unit in units.items():
+        if unit[0] not in powers:
+            continue
+        targets = ARMY_ADJACENT.get(province, ()) if unit[1] == "A" else FLEET_ADJACENT[unit[2]]
+        best, best_value = None, HOLD_WEIGHT
+        for target in sorted(targets):
+            value = _target_value(owners, unit[0], province_of(target), season)
+            if value > best_value:
+                best, best_value = target, value
+        if best is not None:
+            orders[province] = ("move", best, False)
+    return orders
+
+
+def _score(units, owners, power, season, result):
+    after = {}
+    for province, unit in units.items():
+        if province in result["moved"]:
+            after[province_of(result["moved"][province])] = unit[0]
+        elif province not in result["dislodged"]:
+            after[province] = unit[0]
+    score = 0
+    for center in SUPPLY_CENTERS:
+        occupant = after.get(center)
+        if season == FALL and occupant is not None:
+            score += CENTER_SCORE if occupant == power else 0
+        elif owners.get(center) == power:
+            score += CENTER_SCORE
+        elif occupant == power:
+            score += OCCUPIED_CENTER_SCORE
+    for province in result["dislodged"]:
+        if units[province][0] == power:
+            score -= DISLODGED_SCORE
+    for province, occupant in after.items():
+        if occupant == power:
+            reach = ARMY_ADJACENT.get(province, frozenset()) | FLEET_REACH.get(province, frozenset())
+            score += PRESSURE_SCORE * sum(
+                1 for other in reach if other in SUPPLY_CENTERS and owners.get(other) != power
+            )
+    return score
+
+
+def choose_orders(game, powers, budget=BUDGET_SECONDS, samples=SAMPLES, rng=None):
+    # Orders for every power in `powers`: each power's candidates are
+    # scored against everyone else holding, everyone else greedy and one
+    # random order set for everyone else. Returns (orders, stats).
+    rng = rng or random.Random()
+    units = unit_map(game)
+    owners = game["owners"]
+    season = game["season"]
+    others_by_power = {}
+    for power in POWERS:
+        others = [other for other in POWERS if other != power]
+        scenarios = [{}, _greedy_orders(units, owners, others, season)]
+        guess = {}
+        for other in others:
+            guess.update(_sample_orders(units, owners, other, season, rng))
+        scenarios.append(guess)
+        others_by_power[power] = scenarios
+    deadline = time.perf_counter() + budget
+    per_power = budget / max(1, len(powers))
+    chosen = {}
+    stats = {"candidates": 0, "adjudications": 0}
+    for power in powers:
+        power_deadline = min(deadline, time.perf_counter() + per_power)
+        best, best_score = {}, None
+        for attempt in range(samples + 1):
+            if attempt and time.perf_counter() > power_deadline:
+                break
+            candidate = {} if attempt == 0 else _sample_orders(units, owners, power, season, rng)
+            total = 0
+            for scenario in others_by_power[power]:
+                orders = dict(scenario)
+                orders.update(candidate)
+                total += _score(units, owners, power, season, adjudicate(units, orders))
+                stats["adjudications"] += 1
+            stats["candidates"] += 1
+            if best_score is None or total > best_score:
+                best, best_score = candidate, total
+        chosen.update(best)
+    return chosen, stats
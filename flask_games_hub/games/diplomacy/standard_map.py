@@ -0,0 +1,100 @@
+# The standard Diplomacy map: 75 provinces (14 inland, 42 coastal, 19 sea)
+# and 34 supply centres. Provinces are lower-case abbreviations; fleets on
+# the three split-coast provinces sit on a coast location such as "spa/nc".
+
+POWERS = ("England", "France", "Germany", "Italy", "Austria", "Russia", "Turkey")
+
+INLAND = (
+    "boh", "bud", "bur", "gal", "mos", "mun", "par", "ruh", "ser", "sil", "tyr", "ukr", "vie", "war",
+)
+COASTAL = (
+    "alb", "ank", "apu", "arm", "bel", "ber", "bre", "bul", "cly", "con", "den", "edi", "fin", "gas",
+    "gre", "hol", "kie", "lon", "lvn", "lvp", "mar", "naf", "nap", "nwy", "pic", "pie", "por", "pru",
+    "rom", "rum", "sev", "smy", "spa", "stp", "swe", "syr", "tri", "tun", "tus", "ven", "wal", "yor",
+)
+SEAS = (
+    "adr", "aeg", "bal", "bar", "bla", "bot", "eas", "eng", "gol", "hel", "ion", "iri", "mao", "nao",
+    "nth", "nwg", "ska", "tys", "wes",
+)
+PROVINCES = INLAND + COASTAL + SEAS
+SPLIT_COASTS = {"bul": ("bul/ec", "bul/sc"), "spa": ("spa/nc", "spa/sc"), "stp": ("stp/nc", "stp/sc")}
+
+SUPPLY_CENTERS = (
+    "ank", "bel", "ber", "bre", "bud", "bul", "con", "den", "edi", "gre", "hol", "kie", "lon", "lvp",
+    "mar", "mos", "mun", "nap", "nwy", "par", "por", "rom", "rum", "ser", "sev", "smy", "spa", "stp",
+    "swe", "tri", "tun", "ven", "vie", "war",
+)
+
+# Starting units as (kind, location); their provinces are the home centres.
+STARTING_UNITS = {
+    "England": (("F", "edi"), ("F", "lon"), ("A", "lvp")),
+    "France": (("F", "bre"), ("A", "mar"), ("A", "par")),
+    "Germany": (("F", "kie"), ("A", "ber"), ("A", "mun")),
+    "Italy": (("F", "nap"), ("A", "rom"), ("A", "ven")),
+    "Austria": (("F", "tri"), ("A", "bud"), ("A", "vie")),
+    "Russia": (("F", "sev"), ("F", "stp/sc"), ("A", "mos"), ("A", "war")),
+    "Turkey": (("F", "ank"), ("A", "con"), ("A", "smy")),
+}
+HOME_CENTERS = {
+    power: tuple(location.split("/")[0] for _, location in units) for power, units in STARTING_UNITS.items()
+}
+
+ARMY_BORDERS = """
+alb-gre alb-ser alb-tri ank-arm ank-con ank-smy apu-nap apu-rom apu-ven arm-sev arm-smy arm-syr
+bel-bur bel-hol bel-pic bel-ruh ber-kie ber-mun ber-pru ber-sil boh-gal boh-mun boh-sil boh-tyr
+boh-vie bre-gas bre-par bre-pic bud-gal bud-rum bud-ser bud-tri bud-vie bul-con bul-gre bul-rum
+bul-ser bur-gas bur-mar bur-mun bur-par bur-pic bur-ruh cly-edi cly-lvp con-smy den-kie den-swe
+edi-lvp edi-yor fin-nwy fin-stp fin-swe gal-rum gal-sil gal-ukr gal-vie gal-war gas-mar gas-par
+gas-spa gre-ser hol-kie hol-ruh kie-mun kie-ruh lon-wal lon-yor lvn-mos lvn-pru lvn-stp lvn-war
+lvp-wal lvp-yor mar-pie mar-spa mos-sev mos-stp mos-ukr mos-war mun-ruh mun-sil mun-tyr naf-tun
+nap-rom nwy-stp nwy-swe par-pic pie-tus pie-tyr pie-ven por-spa pru-sil pru-war rom-tus rom-ven
+rum-ser rum-sev rum-ukr ser-tri sev-ukr sil-war smy-syr tri-tyr tri-ven tri-vie tus-ven tyr-ven
+tyr-vie ukr-war wal-yor
+"""
+
+FLEET_BORDERS = """
+adr-alb adr-apu adr-ion adr-tri adr-ven aeg-bul/sc aeg-con aeg-eas aeg-gre aeg-ion aeg-smy
+bal-ber bal-bot bal-den bal-kie bal-lvn bal-pru bal-swe bar-nwg bar-nwy bar-stp/nc
+bla-ank bla-arm bla-bul/ec bla-con bla-rum bla-sev bot-fin bot-lvn bot-stp/sc bot-swe
+eas-ion eas-smy eas-syr eng-bel eng-bre eng-iri eng-lon eng-mao eng-nth eng-pic eng-wal
+gol-mar gol-pie gol-spa/sc gol-tus gol-tys gol-wes hel-den hel-hol hel-kie hel-nth
+ion-alb ion-apu ion-gre ion-nap ion-tun ion-tys iri-lvp iri-mao iri-nao iri-wal
+mao-bre mao-gas mao-naf mao-nao mao-por mao-spa/nc mao-spa/sc mao-wes nao-cly nao-lvp nao-nwg
+nth-bel nth-den nth-edi nth-hol nth-lon nth-nwg nth-nwy nth-ska nth-yor nwg-cly nwg-edi nwg-nwy
+ska-den ska-nwy ska-swe tys-nap tys-rom tys-tun tys-tus tys-wes wes-naf wes-spa/sc wes-tun
+alb-gre alb-tri ank-arm ank-con apu-nap apu-ven arm-sev bel-hol bel-pic ber-kie ber-pru bre-gas
+bre-pic bul/ec-con bul/ec-rum bul/sc-con bul/sc-gre cly-edi cly-lvp con-smy den-kie den-swe
+edi-yor fin-stp/sc fin-swe gas-spa/nc hol-kie lon-wal lon-yor lvn-pru lvn-stp/sc lvp-wal
+mar-pie mar-spa/sc naf-tun nap-rom nwy-stp/nc nwy-swe pie-tus por-spa/nc por-spa/sc rom-tus
+rum-sev smy-syr tri-ven
+"""
+
+
+def _adjacency(borders):
+    adjacent = {}
+    for pair in borders.split():
+        first, second = pair.split("-")
+        adjacent.setdefault(first, set()).add(second)
+        adjacent.setdefault(second, set()).add(first)
+    return {location: frozenset(others) for location, others in adjacent.items()}
+
+
+# Army moves between provinces; fleet moves between locations (seas,
+# coastal provinces and the split coasts).
+ARMY_ADJACENT = _adjacency(ARMY_BORDERS)
+FLEET_ADJACENT = _adjacency(FLEET_BORDERS)
+
+
+def province_of(location):
+    return location.split("/")[0]
+
+
+def fleet_locations(province):
+    return SPLIT_COASTS.get(province, (province,))
+
+
+# Provinces a fleet at each location can reach, ignoring coasts; this is
+# what a fleet may support into.
+FLEET_REACH = {
+    location: frozenset(province_of(other) for other in others) for location, others in FLEET_ADJACENT.items()
+}
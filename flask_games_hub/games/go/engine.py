@@ -0,0 +1,407 @@
+import math
+import random
+import time
+from functools import lru_cache
+
+# Go on a flat size*size board. Stones join chains through a union-find
+# (parent links, union by size, path halving); each chain root keeps its
+# stone count, a pseudo-liberty count and the XOR of its stones' Zobrist
+# keys. Pseudo-liberties count every (stone, empty neighbour) pair, so they
+# update in O(1) per placement and hit zero exactly when the chain has no
+# liberties left; captures and suicide are found without any flood fill.
+#
+# Positional superko: a move is illegal if the position it leads to (the
+# stones on the board, whoever is to move) has occurred before.
+
+EMPTY = 0
+BLACK = 1
+WHITE = 2
+PASS = -1
+SIZES = (9, 13, 19)
+KOMI = 7.5
+ZOBRIST_SEED = 20240917
+RANDOM_TRIES = 8
+
+
+def opponent(color):
+    return 3 - color
+
+
+@lru_cache(maxsize=None)
+def neighbor_lists(size):
+    neighbors = []
+    for point in range(size * size):
+        row, col = divmod(point, size)
+        neighbors.append(tuple(
+            nr * size + nc
+            for nr, nc in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1))
+            if 0 <= nr < size and 0 <= nc < size
+        ))
+    return tuple(neighbors)
+
+
+@lru_cache(maxsize=None)
+def diagonal_lists(size):
+    diagonals = []
+    for point in range(size * size):
+        row, col = divmod(point, size)
+        diagonals.append(tuple(
+            nr * size + nc
+            for nr, nc in ((row - 1, col - 1), (row - 1, col + 1), (row + 1, col - 1), (row + 1, col + 1))
+            if 0 <= nr < size and 0 <= nc < size
+        ))
+    return tuple(diagonals)
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(size):
+    # keys[color][point]; the EMPTY row is all zeros.
+    rng = random.Random(ZOBRIST_SEED + size)
+    return (
+        (0,) * (size * size),
+        tuple(rng.getrandbits(64) for _ in range(size * size)),
+        tuple(rng.getrandbits(64) for _ in range(size * size)),
+    )
+
+
+def point_name(point, size):
+    # GTP-style coordinates: columns A-T without I, rows counted from the bottom.
+    if point == PASS:
+        return "pass"
+    row, col = divmod(point, size)
+    return "ABCDEFGHJKLMNOPQRST"[col] + str(size - row)
+
+
+class IllegalMove(ValueError):
+    pass
+
+
+class GoBoard:
+    def __init__(self, size, komi=KOMI):
+        if size not in SIZES:
+            raise ValueError(f"Board size must be one of {SIZES}.")
+        points = size * size
+        self.size = size
+        self.komi = komi
+        self.neighbors = neighbor_lists(size)
+        self.diagonals = diagonal_lists(size)
+        self.keys = zobrist_keys(size)
+        self.color = [EMPTY] * points
+        self.parent = list(range(points))
+        self.next_stone = list(range(points))
+        self.stones = [1] * points
+        self.liberties = [0] * points
+        self.chain_hash = [0] * points
+        self.empty = list(range(points))
+        self.empty_index = list(range(points))
+        self.hash = 0
+        self.history = {0}
+        self.to_move = BLACK
+        self.passes = 0
+        self.captures = [0, 0, 0]
+        self.moves = []
+
+    @classmethod
+    def from_moves(cls, size, moves, komi=KOMI):
+        board = cls(size, komi)
+        for point in moves:
+            board.play(point)
+        return board
+
+    def copy(self):
+        board = object.__new__(GoBoard)
+        board.size = self.size
+        board.komi = self.komi
+        board.neighbors = self.neighbors
+        board.diagonals = self.diagonals
+        board.keys = self.keys
+        board.color = self.color[:]
+        board.parent = self.parent[:]
+        board.next_stone = self.next_stone[:]
+        board.stones = self.stones[:]
+        board.liberties = self.liberties[:]
+        board.chain_hash = self.chain_hash[:]
+        board.empty = self.empty[:]
+        board.empty_index = self.empty_index[:]
+        board.hash = self.hash
+        board.history = set(self.history)
+        board.to_move = self.to_move
+        board.passes = self.passes
+        board.captures = self.captures[:]
+        board.moves = self.moves[:]
+        return board
+
+    def is_over(self):
+        return self.passes >= 2
+
+    def find(self, point):
+        parent = self.parent
+        while parent[point] != point:
+            parent[point] = parent[parent[point]]
+            point = parent[point]
+        return point
+
+    def _check(self, point, color):
+        # Returns (captured chain roots, resulting hash) if `color` may play
+        # at `point`, else None. Nothing is changed.
+        if self.color[point] != EMPTY:
+            return None
+        board_color = self.color
+        liberties = self.liberties
+        find = self.find
+        open_points = friend_edges = friend_liberties = 0
+        friends = ()
+        enemies = {}
+        for neighbor in self.neighbors[point]:
+            neighbor_color = board_color[neighbor]
+            if neighbor_color == EMPTY:
+                open_points += 1
+            elif neighbor_color == color:
+                root = find(neighbor)
+                friend_edges += 1
+                if root not in friends:
+                    friends += (root,)
+                    friend_liberties += liberties[root]
+            else:
+                root = find(neighbor)
+                enemies[root] = enemies.get(root, 0) + 1
+
+        new_hash = self.hash ^ self.keys[color][point]
+        captured = [root for root, edges in enemies.items() if liberties[root] == edges]
+        if captured:
+            for root in captured:
+                new_hash ^= self.chain_hash[root]
+        elif open_points + friend_liberties - friend_edges == 0:
+            return None
+        if new_hash in self.history:
+            return None
+        return captured, new_hash
+
+    def is_legal(self, point, color=None):
+        if point == PASS:
+            return True
+        return self._check(point, color or self.to_move) is not None
+
+    def legal_moves(self, color=None):
+        color = color or self.to_move
+        return [point for point in self.empty if self._check(point, color) is not None]
+
+    def play(self, point, color=None):
+        # Plays for the side to move (or `color`) and returns the number of
+        # stones captured. Raises IllegalMove.
+        color = color or self.to_move
+        if point == PASS:
+            self.passes += 1
+            self.moves.append(PASS)
+            self.to_move = opponent(color)
+            return 0
+        if not 0 <= point < len(self.color):
+            raise IllegalMove("Point is off the board.")
+        checked = self._check(point, color)
+        if checked is None:
+            raise IllegalMove(f"{point_name(point, self.size)} is not a legal move.")
+        captured, new_hash = checked
+        self._place(point, color)
+        removed = 0
+        for root in captured:
+            removed += self._remove_chain(root, color)
+        self.hash = new_hash
+        self.history.add(new_hash)
+        self.captures[color] += removed
+        self.passes = 0
+        self.moves.append(point)
+        self.to_move = opponent(color)
+        return removed
+
+    def _take_empty(self, point):
+        index = self.empty_index[point]
+        last = self.empty.pop()
+        if last != point:
+            self.empty[index] = last
+            self.empty_index[last] = index
+
+    def _place(self, point, color):
+        self.color[point] = color
+        self._take_empty(point)
+        parent = self.parent
+        liberties = self.liberties
+        stones = self.stones
+        root = point
+        parent[point] = point
+        self.next_stone[point] = point
+        stones[point] = 1
+        liberties[point] = 0
+        self.chain_hash[point] = self.keys[color][point]
+
+        for neighbor in self.neighbors[point]:
+            neighbor_color = self.color[neighbor]
+            if neighbor_color == EMPTY:
+                liberties[root] += 1
+                continue
+            other = self.find(neighbor)
+            liberties[other] -= 1
+            if neighbor_color != color or other == root:
+                continue
+            # Union by size; splicing the two circular stone lists merges them.
+            if stones[other] > stones[root]:
+                root, other = other, root
+            parent[other] = root
+            stones[root] += stones[other]
+            liberties[root] += liberties[other]
+            self.chain_hash[root] ^= self.chain_hash[other]
+            self.next_stone[root], self.next_stone[other] = self.next_stone[other], self.next_stone[root]
+
+    def _remove_chain(self, root, capturer):
+        board_color = self.color
+        neighbors = self.neighbors
+        liberties = self.liberties
+        find = self.find
+        removed = 0
+        stone = root
+        while True:
+            following = self.next_stone[stone]
+            board_color[stone] = EMPTY
+            self.empty_index[stone] = len(self.empty)
+            self.empty.append(stone)
+            for neighbor in neighbors[stone]:
+                if board_color[neighbor] == capturer:
+                    liberties[find(neighbor)] += 1
+            removed += 1
+            stone = following
+            if stone == root:
+                break
+        # Reset the links only after the walk, which still needs them.
+        stone = root
+        for _ in range(removed):
+            following = self.next_stone[stone]
+            self.parent[stone] = stone
+            self.next_stone[stone] = stone
+            stone = following
+        return removed
+
+    def is_eye(self, point, color):
+        # A simple one-point eye: every neighbour is `color`, and at most one
+        # diagonal (none on the edge) belongs to the opponent.
+        board_color = self.color
+        for neighbor in self.neighbors[point]:
+            if board_color[neighbor] != color:
+                return False
+        enemy = opponent(color)
+        bad = sum(1 for diagonal in self.diagonals[point] if board_color[diagonal] == enemy)
+        return bad < (2 if len(self.diagonals[point]) == 4 else 1)
+
+    def random_move(self, rng, color=None):
+        # A uniformly random legal move that does not fill one of `color`'s
+        # own eyes, or PASS if there is none.
+        color = color or self.to_move
+        empty = self.empty
+        for _ in range(RANDOM_TRIES):
+            point = empty[rng.randrange(len(empty))] if empty else PASS
+            if point == PASS:
+                return PASS
+            if not self.is_eye(point, color) and self._check(point, color) is not None:
+                return point
+        candidates = empty[:]
+        while candidates:
+            index = rng.randrange(len(candidates))
+            point = candidates[index]
+            candidates[index] = candidates[-1]
+            candidates.pop()
+            if not self.is_eye(point, color) and self._check(point, color) is not None:
+                return point
+        return PASS
+
+    def area(self):
+        # Area scores (black, white): stones plus empty regions that touch
+        # only that colour's stones, found with one flood fill per region.
+        board_color = self.color
+        neighbors = self.neighbors
+        totals = [0, 0, 0]
+        for stone_color in board_color:
+            totals[stone_color] += 1
+        seen = bytearray(len(board_color))
+        for start in self.empty:
+            if seen[start]:
+                continue
+            seen[start] = 1
+            stack = [start]
+            region = 0
+            borders = 0
+            while stack:
+                point = stack.pop()
+                region += 1
+                for neighbor in neighbors[point]:
+                    neighbor_color = board_color[neighbor]
+                    if neighbor_color == EMPTY:
+                        if not seen[neighbor]:
+                            seen[neighbor] = 1
+                            stack.append(neighbor)
+                    else:
+                        borders |= neighbor_color
+            if borders == BLACK or borders == WHITE:
+                totals[borders] += region
+        return totals[BLACK], totals[WHITE]
+
+    def score(self):
+        # Black's area minus White's area and komi; positive means Black wins.
+        black, white = self.area()
+        return black - white - self.komi
+
+
+def playout(board, rng, max_moves=None):
+    # Plays random moves from the side to move until both sides pass (or
+    # `max_moves`, default three per point, run out). Changes `board`.
+    max_moves = max_moves or 3 * board.size * board.size
+    for _ in range(max_moves):
+        if board.passes >= 2:
+            break
+        board.play(board.random_move(rng))
+    return board
+
+
+def choose_move(board, budget=0.5, rng=None, color=None):
+    # Flat Monte-Carlo search: UCB1 over the candidate moves at the root,
+    # each visit one random playout. Every candidate gets its first visit in
+    # random order, so a budget too short to visit them all still samples
+    # the whole board fairly. Returns (point, stats); point is PASS
+    # when nothing but own-eye filling is left, or when the opponent just
+    # passed and passing already wins.
+    rng = rng or random.Random()
+    color = color or board.to_move
+    started = time.perf_counter()
+    stats = {"playouts": 0, "seconds": 0.0}
+    sign = 1 if color == BLACK else -1
+    if board.passes and board.score() * sign > 0:
+        return PASS, stats
+
+    candidates = [point for point in board.legal_moves(color) if not board.is_eye(point, color)]
+    if not candidates:
+        return PASS, stats
+    rng.shuffle(candidates)
+    wins = [0.0] * len(candidates)
+    visits = [0] * len(candidates)
+    deadline = started + budget
+    total = 0
+    while True:
+        if total < len(candidates):
+            index = total
+        else:
+            log_total = math.log(total)
+            index = max(
+                range(len(candidates)),
+                key=lambda item: wins[item] / visits[item] + math.sqrt(2 * log_total / visits[item]),
+            )
+        trial = board.copy()
+        trial.play(candidates[index], color)
+        margin = playout(trial, rng).score() * sign
+        wins[index] += 1.0 if margin > 0 else 0.0
+        visits[index] += 1
+        total += 1
+        if time.perf_counter() >= deadline:
+            break
+
+    best = max(range(len(candidates)), key=lambda item: (visits[item], wins[item]))
+    stats["playouts"] = total
+    stats["seconds"] = time.perf_counter() - started
+    stats["win_rate"] = wins[best] / visits[best]
+    return candidates[best], stats
@@ -0,0 +1,425 @@
+import time
+
+# Hive (base game, no expansions) on an unbounded hex grid. Cells are axial
+# coordinates (q, r) packed into one int, q * STRIDE + r, so a neighbour is
+# one addition of a precomputed offset; the board is a dict from cell to
+# the stack of pieces there (bottom first). Pieces are ints player * 8 +
+# kind.
+#
+# The one-hive rule is checked once per position, not once per move: the
+# articulation points of the ground graph (Tarjan's low-link DFS) are
+# exactly the pieces pinned in place. Slides check the two "gate" cells
+# shared by the source and target, also from precomputed offsets.
+#
+# A move is (source, target, kind): source None for placing a piece of
+# `kind` from the hand, kind None when moving a piece on the board. PASS is
+# played only when there is nothing else.
+
+WHITE = 0
+BLACK = 1
+QUEEN, BEETLE, GRASSHOPPER, SPIDER, ANT = range(5)
+KIND_NAMES = ("Queen", "Beetle", "Grasshopper", "Spider", "Ant")
+KIND_LETTERS = "QBGSA"
+HAND = (1, 2, 3, 2, 3)
+PASS = (None, None, None)
+
+STRIDE = 1 << 20
+HALF = STRIDE // 2
+ORIGIN = 0
+# Neighbour offsets in order round the hexagon, so that the two cells shared
+# by a cell and its neighbour in direction i are in directions i - 1, i + 1.
+DIRECTIONS = (STRIDE, STRIDE - 1, -1, -STRIDE, -STRIDE + 1, 1)
+GATES = tuple((DIRECTIONS[i], DIRECTIONS[i - 1], DIRECTIONS[(i + 1) % 6]) for i in range(6))
+
+WIN_SCORE = 100_000
+QUEEN_PRESSURE_VALUE = 40
+FREE_PIECE_VALUE = 6
+QUEEN_BY_TURN = 4
+BUDGET_SECONDS = 0.5
+MAX_DEPTH = 12
+CHECK_EVERY = 256
+
+
+def cell(q, r):
+    return q * STRIDE + r
+
+
+def axial(packed):
+    r = (packed + HALF) % STRIDE - HALF
+    return (packed - r) // STRIDE, r
+
+
+def piece_owner(piece):
+    return piece >> 3
+
+
+def piece_kind(piece):
+    return piece & 7
+
+
+class IllegalMove(ValueError):
+    pass
+
+
+def articulation_points(cells):
+    # Cells whose removal disconnects the others (iterative Tarjan).
+    if len(cells) < 3:
+        return set()
+    start = next(iter(cells))
+    order = {start: 0}
+    low = {start: 0}
+    pinned = set()
+    root_children = 0
+    stack = [(start, None, iter(DIRECTIONS))]
+    while stack:
+        node, parent, directions = stack[-1]
+        for offset in directions:
+            neighbour = node + offset
+            if neighbour not in cells or neighbour == parent:
+                continue
+            if neighbour in order:
+                if order[neighbour] < low[node]:
+                    low[node] = order[neighbour]
+                continue
+            order[neighbour] = low[neighbour] = len(order)
+            stack.append((neighbour, node, iter(DIRECTIONS)))
+            break
+        else:
+            stack.pop()
+            if parent is None:
+                continue
+            if low[node] < low[parent]:
+                low[parent] = low[node]
+            if parent == start:
+                root_children += 1
+            elif low[node] >= order[parent]:
+                pinned.add(parent)
+    if root_children > 1:
+        pinned.add(start)
+    return pinned
+
+
+class HiveBoard:
+
+    def __init__(self):
+        self.stacks = {}
+        self.hands = [list(HAND), list(HAND)]
+        self.queens = [None, None]
+        self.placed = [0, 0]
+        self.player = WHITE
+        self.moves = []
+        self.key = 0
+
+    @classmethod
+    def from_moves(cls, moves):
+        board = cls()
+        for move in moves:
+            board.play(tuple(move))
+        return board
+
+    def winner(self):
+        # WHITE or BLACK, "draw" when both queens are surrounded, else None.
+        surrounded = [
+            queen is not None and all(queen + offset in self.stacks for offset in DIRECTIONS)
+            for queen in self.queens
+        ]
+        if surrounded[0] and surrounded[1]:
+            return "draw"
+        if surrounded[0]:
+            return BLACK
+        if surrounded[1]:
+            return WHITE
+        return None
+
+    def top(self, target):
+        stack = self.stacks.get(target)
+        return stack[-1] if stack else None
+
+    def _push(self, target, piece):
+        stack = self.stacks.setdefault(target, [])
+        self.key ^= hash((piece, target, len(stack)))
+        stack.append(piece)
+
+    def _pop(self, source):
+        stack = self.stacks[source]
+        piece = stack.pop()
+        self.key ^= hash((piece, source, len(stack)))
+        if not stack:
+            del self.stacks[source]
+        return piece
+
+    def apply(self, move):
+        # Plays `move` without checking it; undo() takes it back.
+        source, target, kind = move
+        player = self.player
+        if target is not None:
+            if source is None:
+                piece = player * 8 + kind
+                self.hands[player][kind] -= 1
+                self.placed[player] += 1
+            else:
+                piece = self._pop(source)
+            self._push(target, piece)
+            if piece_kind(piece) == QUEEN:
+                self.queens[player] = target
+        self.player = 1 - player
+        self.key ^= 1
+        self.moves.append(move)
+
+    def undo(self):
+        source, target, kind = self.moves.pop()
+        self.player = player = 1 - self.player
+        self.key ^= 1
+        if target is None:
+            return
+        piece = self._pop(target)
+        if source is None:
+            self.hands[player][kind] += 1
+            self.placed[player] -= 1
+            if kind == QUEEN:
+                self.queens[player] = None
+        else:
+            self._push(source, piece)
+            if piece_kind(piece) == QUEEN:
+                self.queens[player] = source
+
+    def play(self, move):
+        if move not in self.legal_moves():
+            raise IllegalMove("That move is not allowed.")
+        self.apply(move)
+
+    def placements(self):
+        player = self.player
+        stacks = self.stacks
+        if not stacks:
+            return [ORIGIN]
+        if len(stacks) == 1:
+            return [ORIGIN + offset for offset in DIRECTIONS]
+        targets = []
+        seen = set()
+        for source, stack in stacks.items():
+            if stack[-1] >> 3 != player:
+                continue
+            for offset in DIRECTIONS:
+                target = source + offset
+                if target in stacks or target in seen:
+                    continue
+                seen.add(target)
+                for around in DIRECTIONS:
+                    neighbour = stacks.get(target + around)
+                    if neighbour and neighbour[-1] >> 3 != player:
+                        break
+                else:
+                    targets.append(target)
+        return targets
+
+    def _slides(self, source):
+        # Ground cells one slide from `source`: empty, with exactly one of
+        # the two gate cells occupied (both would block the gap, neither
+        # would lose touch with the hive).
+        stacks = self.stacks
+        return [
+            source + offset
+            for offset, left, right in GATES
+            if source + offset not in stacks and (source + left in stacks) != (source + right in stacks)
+        ]
+
+    def _beetle_steps(self, source):
+        stacks = self.stacks
+        height = len(stacks.get(source, ()))
+        targets = []
+        for offset, left, right in GATES:
+            target = source + offset
+            over = max(height, len(stacks.get(target, ())))
+            gate_left = len(stacks.get(source + left, ()))
+            gate_right = len(stacks.get(source + right, ()))
+            if over == 0:
+                if (gate_left > 0) != (gate_right > 0):
+                    targets.append(target)
+            elif min(gate_left, gate_right) <= over:
+                targets.append(target)
+        return targets
+
+    def _jumps(self, source):
+        stacks = self.stacks
+        targets = []
+        for offset in DIRECTIONS:
+            target = source + offset
+            if target not in stacks:
+                continue
+            while target in stacks:
+                target += offset
+            targets.append(target)
+        return targets
+
+    def _spider_walks(self, source):
+        paths = [(source,)]
+        for _ in range(3):
+            paths = [path + (step,) for path in paths for step in self._slides(path[-1]) if step not in path]
+        return {path[-1] for path in paths}
+
+    def _ant_walks(self, source):
+        reached = {source}
+        frontier = [source]
+        while frontier:
+            current = frontier.pop()
+            for step in self._slides(current):
+                if step not in reached:
+                    reached.add(step)
+                    frontier.append(step)
+        reached.discard(source)
+        return reached
+
+    def legal_moves(self):
+        if self.winner() is not None:
+            return []
+        player = self.player
+        hand = self.hands[player]
+        kinds = [kind for kind in range(len(HAND)) if hand[kind]]
+        if self.queens[player] is None and self.placed[player] == QUEEN_BY_TURN - 1:
+            kinds = [QUEEN]
+        moves = [(None, target, kind) for target in self.placements() for kind in kinds]
+        if self.queens[player] is not None:
+            stacks = self.stacks
+            pinned = articulation_points(stacks)
+            for source in [source for source, stack in stacks.items() if stack[-1] >> 3 == player]:
+                stack = stacks[source]
+                if len(stack) == 1 and source in pinned:
+                    continue
+                kind = stack[-1] & 7
+                piece = self._pop(source)
+                if kind == BEETLE:
+                    targets = self._beetle_steps(source)
+                elif kind == QUEEN:
+                    targets = self._slides(source)
+                elif kind == GRASSHOPPER:
+                    targets = self._jumps(source)
+                elif kind == SPIDER:
+                    targets = self._spider_walks(source)
+                else:
+                    targets = self._ant_walks(source)
+                self._push(source, piece)
+                moves.extend((source, target, None) for target in targets)
+        return moves or [PASS]
+
+
+def evaluate(board):
+    # Static score from the view of the player to move: pressure on each
+    # queen and how many pieces are free to move.
+    stacks = board.stacks
+    score = 0
+    for player, queen in enumerate(board.queens):
+        if queen is not None:
+            crowd = sum(1 for offset in DIRECTIONS if queen + offset in stacks)
+            score += QUEEN_PRESSURE_VALUE * crowd if player == BLACK else -QUEEN_PRESSURE_VALUE * crowd
+    pinned = articulation_points(stacks)
+    for source, stack in stacks.items():
+        if len(stack) > 1 or source not in pinned:
+            score += FREE_PIECE_VALUE if stack[-1] >> 3 == WHITE else -FREE_PIECE_VALUE
+    return score if board.player == WHITE else -score
+
+
+class _Timeout(Exception):
+    pass
+
+
+class Searcher:
+    # Iterative-deepening negamax with alpha-beta pruning and a
+    # transposition table keyed by the board's incremental hash. The board
+    # is searched in place with apply()/undo().
+
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    def __init__(self, table_size=500_000):
+        self.table = {}
+        self.table_size = table_size
+        self.nodes = 0
+        self.deadline = None
+
+    def _negamax(self, board, depth, alpha, beta, ply):
+        self.nodes += 1
+        if not self.nodes % CHECK_EVERY and time.perf_counter() > self.deadline:
+            raise _Timeout
+
+        won = board.winner()
+        if won is not None:
+            return 0 if won == "draw" else WIN_SCORE - ply if won == board.player else -WIN_SCORE + ply
+        if depth == 0:
+            return evaluate(board)
+
+        original_alpha = alpha
+        key = board.key
+        entry = self.table.get(key)
+        best_move = None
+        if entry is not None:
+            entry_depth, entry_score, bound, best_move = entry
+            if entry_depth >= depth:
+                if bound == self.EXACT:
+                    return entry_score
+                if bound == self.LOWER and entry_score >= beta:
+                    return entry_score
+                if bound == self.UPPER and entry_score <= alpha:
+                    return entry_score
+
+        moves = board.legal_moves()
+        enemy_queen = board.queens[1 - board.player]
+        if enemy_queen is not None:
+            # Moves next to the enemy queen first.
+            around = {enemy_queen + offset for offset in DIRECTIONS}
+            moves.sort(key=lambda move: move[1] in around, reverse=True)
+        if best_move in moves:
+            moves.insert(0, best_move)
+
+        best_score = -WIN_SCORE - 1
+        for move in moves:
+            board.apply(move)
+            try:
+                score = -self._negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.undo()
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_score <= original_alpha:
+            bound = self.UPPER
+        elif best_score >= beta:
+            bound = self.LOWER
+        else:
+            bound = self.EXACT
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+        self.table[key] = (depth, best_score, bound, best_move)
+        return best_score
+
+    def search(self, board, budget=BUDGET_SECONDS, max_depth=MAX_DEPTH):
+        # Returns (move, stats). Deepens until the budget runs out and keeps
+        # the best move of the last finished depth.
+        started = time.perf_counter()
+        self.deadline = started + budget
+        self.nodes = 0
+        moves = board.legal_moves()
+        best_move = moves[0]
+        stats = {"depth": 0, "score": 0, "nodes": 0, "seconds": 0.0}
+        if len(moves) > 1:
+            for depth in range(1, max_depth + 1):
+                try:
+                    score = self._negamax(board, depth, -WIN_SCORE - 1, WIN_SCORE + 1, 0)
+                except _Timeout:
+                    break
+                best_move = self.table[board.key][3]
+                stats["depth"] = depth
+                stats["score"] = score
+                if abs(score) >= WIN_SCORE - MAX_DEPTH:
+                    break
+        stats["nodes"] = self.nodes
+        stats["seconds"] = time.perf_counter() - started
+        return best_move, stats
+
+
+def choose_move(board, budget=BUDGET_SECONDS, searcher=None):
+    return (searcher or Searcher()).search(board, budget)
@@ -0,0 +1,31 @@
+# Helpers for 5x5 boards held in 25-bit ints, square = row * 5 + col. A
+# board splits into a low and a high half whose square lists come from
+# lookup tables, which beats peeling bits one at a time in Python.
+
+SQUARES = 25
+SPLIT = 13
+SPLIT_MASK = (1 << SPLIT) - 1
+FULL = (1 << SQUARES) - 1
+
+LOW_SQUARES = tuple(tuple(square for square in range(SPLIT) if mask >> square & 1) for mask in range(1 << SPLIT))
+HIGH_SQUARES = tuple(
+    tuple(square + SPLIT for square in range(SQUARES - SPLIT) if mask >> square & 1)
+    for mask in range(1 << (SQUARES - SPLIT))
+)
+
+
+def squares_of(mask):
+    return LOW_SQUARES[mask & SPLIT_MASK] + HIGH_SQUARES[mask >> SPLIT]
+
+
+def neighbor_masks(steps):
+    # Per square, the mask of squares one (row, col) step away.
+    masks = []
+    for square in range(SQUARES):
+        row, col = divmod(square, 5)
+        mask = 0
+        for dr, dc in steps:
+            if 0 <= row + dr < 5 and 0 <= col + dc < 5:
+                mask |= 1 << ((row + dr) * 5 + col + dc)
+        masks.append(mask)
+    return tuple(masks)
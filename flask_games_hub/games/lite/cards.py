@@ -0,0 +1,54 @@
+import random
+
+# Cards are ints 0-51: rank * 4 + suit, with ranks 2..A as 0..12 and suits
+# in "cdhs" order. Text form is rank then suit, e.g. "As", "Td", "2c".
+
+RANKS = "23456789TJQKA"
+SUITS = "cdhs"
+SUIT_SYMBOLS = {"c": "♣", "d": "♦", "h": "♥", "s": "♠"}
+DECK_SIZE = 52
+
+
+def rank_of(card):
+    return card >> 2
+
+
+def suit_of(card):
+    return card & 3
+
+
+def make_card(rank, suit):
+    return rank * 4 + suit
+
+
+def parse_card(text):
+    text = text.strip()
+    if len(text) != 2 or text[0].upper() not in RANKS or text[1].lower() not in SUITS:
+        raise ValueError(f"Invalid card: {text!r}")
+    return make_card(RANKS.index(text[0].upper()), SUITS.index(text[1].lower()))
+
+
+def parse_cards(text):
+    # Accepts "As Kd", "AsKd" or a list of card strings.
+    if isinstance(text, str):
+        text = text.replace(",", " ").split()
+        if len(text) == 1 and len(text[0]) > 2:
+            text = [text[0][index:index + 2] for index in range(0, len(text[0]), 2)]
+    cards = [parse_card(item) for item in text]
+    if len(set(cards)) != len(cards):
+        raise ValueError("Duplicate cards.")
+    return cards
+
+
+def card_text(card):
+    return RANKS[rank_of(card)] + SUITS[suit_of(card)]
+
+
+def display_card(card):
+    return RANKS[rank_of(card)] + SUIT_SYMBOLS[SUITS[suit_of(card)]]
+
+
+def deal(count, rng=None, exclude=()):
+    rng = rng or random.Random()
+    excluded = set(exclude)
+    return rng.sample([card for card in range(DECK_SIZE) if card not in excluded], count)
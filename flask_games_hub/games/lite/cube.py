@@ -0,0 +1,201 @@
+import random
+from math import factorial
+
+# Cubie-level 3x3 cube in Kociemba's conventions. A cube is a tuple
+# (cp, co, ep, eo): which corner/edge sits in each slot and its twist/flip.
+
+URF, UFL, ULB, UBR, DFR, DLF, DBL, DRB = range(8)
+UR, UF, UL, UB, DR, DF, DL, DB, FR, FL, BL, BR = range(12)
+
+FACES = "URFDLB"
+MOVE_NAMES = [face + suffix for face in FACES for suffix in ("", "2", "'")]
+PHASE2_MOVES = [MOVE_NAMES.index(name) for name in ("U", "U2", "U'", "R2", "F2", "D", "D2", "D'", "L2", "B2")]
+
+SOLVED = (tuple(range(8)), (0,) * 8, tuple(range(12)), (0,) * 12)
+
+_BASIC_MOVES = {
+    "U": ((UBR, URF, UFL, ULB, DFR, DLF, DBL, DRB), (0,) * 8,
+          (UB, UR, UF, UL, DR, DF, DL, DB, FR, FL, BL, BR), (0,) * 12),
+    "R": ((DFR, UFL, ULB, URF, DRB, DLF, DBL, UBR), (2, 0, 0, 1, 1, 0, 0, 2),
+          (FR, UF, UL, UB, BR, DF, DL, DB, DR, FL, BL, UR), (0,) * 12),
+    "F": ((UFL, DLF, ULB, UBR, URF, DFR, DBL, DRB), (1, 2, 0, 0, 2, 1, 0, 0),
+          (UR, FL, UL, UB, DR, FR, DL, DB, UF, DF, BL, BR), (0, 1, 0, 0, 0, 1, 0, 0, 1, 1, 0, 0)),
+    "D": ((URF, UFL, ULB, UBR, DLF, DBL, DRB, DFR), (0,) * 8,
+          (UR, UF, UL, UB, DF, DL, DB, DR, FR, FL, BL, BR), (0,) * 12),
+    "L": ((URF, ULB, DBL, UBR, DFR, UFL, DLF, DRB), (0, 1, 2, 0, 0, 2, 1, 0),
+          (UR, UF, BL, UB, DR, DF, FL, DB, FR, UL, DL, BR), (0,) * 12),
+    "B": ((URF, UFL, UBR, DRB, DFR, DLF, ULB, DBL), (0, 0, 1, 2, 0, 0, 2, 1),
+          (UR, UF, UL, BR, DR, DF, DL, BL, FR, FL, UB, DB), (0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 1, 1)),
+}
+
+# Facelets are numbered face by face in URFDLB order, 9 per face, reading
+# each face row by row as seen from outside.
+_CORNER_FACELETS = (
+    (8, 9, 20), (6, 18, 38), (0, 36, 47), (2, 45, 11),
+    (29, 26, 15), (27, 44, 24), (33, 53, 42), (35, 17, 51),
+)
+_EDGE_FACELETS = (
+    (5, 10), (7, 19), (3, 37), (1, 46), (32, 16), (28, 25),
+    (30, 43), (34, 52), (23, 12), (21, 41), (50, 39), (48, 14),
+)
+_CORNER_COLORS = ("URF", "UFL", "ULB", "UBR", "DFR", "DLF", "DBL", "DRB")
+_EDGE_COLORS = ("UR", "UF", "UL", "UB", "DR", "DF", "DL", "DB", "FR", "FL", "BL", "BR")
+
+
+def multiply(a, b):
+    a_cp, a_co, a_ep, a_eo = a
+    b_cp, b_co, b_ep, b_eo = b
+    return (
+        tuple(a_cp[b_cp[i]] for i in range(8)),
+        tuple((a_co[b_cp[i]] + b_co[i]) % 3 for i in range(8)),
+        tuple(a_ep[b_ep[i]] for i in range(12)),
+        tuple((a_eo[b_ep[i]] + b_eo[i]) % 2 for i in range(12)),
+    )
+
+
+def _build_moves():
+    moves = []
+    for face in FACES:
+        turned = _BASIC_MOVES[face]
+        for _ in range(3):
+            moves.append(turned)
+            turned = multiply(turned, _BASIC_MOVES[face])
+    return moves
+
+
+MOVES = _build_moves()
+
+
+def apply_move(cube, move):
+    return multiply(cube, MOVES[move])
+
+
+def apply_moves(cube, moves):
+    for move in moves:
+        cube = multiply(cube, MOVES[move])
+    return cube
+
+
+def parse_moves(text):
+    return [MOVE_NAMES.index(token) for token in text.split()]
+
+
+def format_moves(moves):
+    return " ".join(MOVE_NAMES[move] for move in moves)
+
+
+def is_solved(cube):
+    return tuple(map(tuple, cube)) == SOLVED
+
+
+def facelets(cube):
+    cp, co, ep, eo = cube
+    result = [face for face in FACES for _ in range(9)]
+    for slot in range(8):
+        for offset in range(3):
+            result[_CORNER_FACELETS[slot][(offset + co[slot]) % 3]] = _CORNER_COLORS[cp[slot]][offset]
+    for slot in range(12):
+        for offset in range(2):
+            result[_EDGE_FACELETS[slot][(offset + eo[slot]) % 2]] = _EDGE_COLORS[ep[slot]][offset]
+    return "".join(result)
+
+
+def net(cube):
+    # Unfolded cube as 9 rows of 12 cells: U above, L F R B across the
+    # middle, D below. Cells outside the net are empty strings.
+    stickers = facelets(cube)
+    offsets = {"U": (0, 3), "L": (3, 0), "F": (3, 3), "R": (3, 6), "B": (3, 9), "D": (6, 3)}
+    rows = [[""] * 12 for _ in range(9)]
+    for face, (top, left) in offsets.items():
+        base = FACES.index(face) * 9
+        for index in range(9):
+            rows[top + index // 3][left + index % 3] = stickers[base + index]
+    return rows
+
+
+def _parity(permutation):
+    parity = 0
+    for i in range(len(permutation)):
+        for j in range(i + 1, len(permutation)):
+            if permutation[i] > permutation[j]:
+                parity ^= 1
+    return parity
+
+
+def random_cube(rng=None):
+    # A uniformly random reachable state: random permutations with equal
+    # corner and edge parity, and orientations that sum to zero.
+    rng = rng or random.Random()
+    cp = list(range(8))
+    ep = list(range(12))
+    rng.shuffle(cp)
+    rng.shuffle(ep)
+    if _parity(cp) != _parity(ep):
+        ep[0], ep[1] = ep[1], ep[0]
+    co = [rng.randrange(3) for _ in range(7)]
+    co.append(-sum(co) % 3)
+    eo = [rng.randrange(2) for _ in range(11)]
+    eo.append(sum(eo) % 2)
+    return tuple(cp), tuple(co), tuple(ep), tuple(eo)
+
+
+def to_state(cube):
+    return [list(part) for part in cube]
+
+
+def from_state(state):
+    return tuple(tuple(part) for part in state)
+
+
+# Coordinates used by the two-phase solver.
+
+def twist(cube):
+    value = 0
+    for orientation in cube[1][:7]:
+        value = value * 3 + orientation
+    return value
+
+
+def flip(cube):
+    value = 0
+    for orientation in cube[3][:11]:
+        value = value * 2 + orientation
+    return value
+
+
+def slice_combination(cube):
+    # Rank of the set of slots holding the FR, FL, BL, BR edges.
+    value = 0
+    seen = 0
+    for slot in range(11, -1, -1):
+        if cube[2][slot] >= FR:
+            seen += 1
+            value += _combinations(11 - slot, seen)
+    return value
+
+
+def _combinations(n, k):
+    if k > n:
+        return 0
+    return factorial(n) // (factorial(k) * factorial(n - k))
+
+
+def permutation_rank(values):
+    # Lexicographic rank, matching itertools.permutations order.
+    rank = 0
+    for i, value in enumerate(values):
+        smaller = sum(1 for later in values[i + 1:] if later < value)
+        rank += smaller * factorial(len(values) - 1 - i)
+    return rank
+
+
+def corner_permutation(cube):
+    return permutation_rank(cube[0])
+
+
+def ud_edge_permutation(cube):
+    return permutation_rank(cube[2][:8])
+
+
+def slice_permutation(cube):
+    return permutation_rank([edge - FR for edge in cube[2][8:]])
@@ -0,0 +1,313 @@
+import itertools
+import time
+from math import comb, factorial
+
+import numpy as np
+
+from games.lite import cube, npy_cache
+
+# Kociemba's two-phase algorithm. Phase 1 brings the cube into the subgroup
+# <U, D, R2, F2, L2, B2> (all orientations solved, slice edges in the slice);
+# phase 2 solves it using only those moves. Both phases are IDA* searches
+# over coordinates, using move tables and pruning tables of exact distances.
+#
+# The tables are built with NumPy once, saved as .npy files and memory-mapped
+# read-only, so every process shares one page-cache copy.
+
+N_TWIST = 3 ** 7
+N_FLIP = 2 ** 11
+N_SLICE = comb(12, 4)
+N_PERM4 = factorial(4)
+N_MOVES = len(cube.MOVE_NAMES)
+N_PHASE2_MOVES = len(cube.PHASE2_MOVES)
+
+MAX_PHASE1_DEPTH = 12
+MAX_PHASE2_DEPTH = 12
+MAX_LENGTH = 30
+SOLVE_BUDGET_SECONDS = 0.05
+DEADLINE_CHECK_INTERVAL = 1024
+
+_MOVE_FACE = [move // 3 for move in range(N_MOVES)]
+_PHASE2_MOVE_SET = frozenset(cube.PHASE2_MOVES)
+
+
+def _allowed_moves(moves):
+    # Moves worth trying after a turn of each face (index 6: no turn yet).
+    # A face never follows itself, and of two opposite faces, which commute,
+    # only the order with the lower face first is searched.
+    allowed = []
+    for last_face in range(6):
+        allowed.append([
+            (index, _MOVE_FACE[move])
+            for index, move in enumerate(moves)
+            if _MOVE_FACE[move] != last_face and _MOVE_FACE[move] != last_face - 3
+        ])
+    allowed.append([(index, _MOVE_FACE[move]) for index, move in enumerate(moves)])
+    return allowed
+
+
+_PHASE1_ALLOWED = _allowed_moves(range(N_MOVES))
+_PHASE2_ALLOWED = _allowed_moves(cube.PHASE2_MOVES)
+
+
+class SolveTimeout(Exception):
+    pass
+
+
+def _move_arrays():
+    cp = np.array([move[0] for move in cube.MOVES])
+    co = np.array([move[1] for move in cube.MOVES])
+    ep = np.array([move[2] for move in cube.MOVES])
+    eo = np.array([move[3] for move in cube.MOVES])
+    return cp, co, ep, eo
+
+
+def _encode_base(digits, base):
+    value = np.zeros(len(digits), dtype=np.int64)
+    for column in range(digits.shape[1]):
+        value = value * base + digits[:, column]
+    return value
+
+
+def _decode_base(count, length, base):
+    values = np.arange(count)
+    digits = np.zeros((count, length), dtype=np.int64)
+    for column in range(length - 1, -1, -1):
+        digits[:, column] = values % base
+        values //= base
+    return digits
+
+
+def _encode_combinations(masks):
+    # Same ranking as cube.slice_combination, applied to every row at once.
+    value = np.zeros(len(masks), dtype=np.int64)
+    seen = np.zeros(len(masks), dtype=np.int64)
+    binomial = np.array([[comb(n, k) for k in range(5)] for n in range(12)])
+    for slot in range(11, -1, -1):
+        occupied = masks[:, slot].astype(np.int64)
+        seen += occupied
+        value += occupied * binomial[11 - slot, np.minimum(seen, 4)]
+    return value
+
+
+def _encode_permutations(perms):
+    size = perms.shape[1]
+    rank = np.zeros(len(perms), dtype=np.int64)
+    for i in range(size):
+        smaller = (perms[:, i + 1:] < perms[:, i:i + 1]).sum(axis=1)
+        rank += smaller * factorial(size - 1 - i)
+    return rank
+
+
+def _orientation_moves(count, length, base, permutations, orientations):
+    digits = _decode_base(count, length - 1, base)
+    full = np.concatenate([digits, (-digits.sum(axis=1) % base)[:, None]], axis=1)
+    table = np.empty((count, N_MOVES), dtype=np.uint16)
+    for move in range(N_MOVES):
+        turned = (full[:, permutations[move]] + orientations[move]) % base
+        table[:, move] = _encode_base(turned[:, :length - 1], base)
+    return table
+
+
+def _slice_moves(edge_permutations):
+    masks = np.array([
+        [slot in chosen for slot in range(12)] for chosen in itertools.combinations(range(12), 4)
+    ])
+    masks = masks[np.argsort(_encode_combinations(masks))]
+    table = np.empty((N_SLICE, N_MOVES), dtype=np.uint16)
+    for move in range(N_MOVES):
+        table[:, move] = _encode_combinations(masks[:, edge_permutations[move]])
+    return table
+
+
+def _permutation_moves(size, permutations):
+    perms = np.array(list(itertools.permutations(range(size))))
+    table = np.empty((len(perms), len(permutations)), dtype=np.uint16)
+    for column, permutation in enumerate(permutations):
+        table[:, column] = _encode_permutations(perms[:, permutation])
+    return table
+
+
+def _pruning_table(move_a, move_b, size_b):
+    # Breadth-first distances from the solved coordinate pair (0, 0) over
+    # the product of two coordinates, one whole depth layer at a time.
+    depth = np.full(move_a.shape[0] * size_b, 255, dtype=np.uint8)
+    depth[0] = 0
+    frontier = np.zeros(1, dtype=np.int64)
+    distance = 0
+    while frontier.size:
+        following = (move_a[frontier // size_b].astype(np.int64) * size_b + move_b[frontier % size_b]).ravel()
+        following = np.unique(following[depth[following] == 255])
+        distance += 1
+        depth[following] = distance
+        frontier = following
+    return depth
+
+
+def build_tables():
+    cp, co, ep, eo = _move_arrays()
+    phase2 = cube.PHASE2_MOVES
+    tables = {
+        "twist_move": _orientation_moves(N_TWIST, 8, 3, cp, co),
+        "flip_move": _orientation_moves(N_FLIP, 12, 2, ep, eo),
+        "slice_move": _slice_moves(ep),
+        "corner_move": _permutation_moves(8, [cp[move] for move in phase2]),
+        "edge8_move": _permutation_moves(8, [ep[move][:8] for move in phase2]),
+        "slice_perm_move": _permutation_moves(4, [ep[move][8:] - 8 for move in phase2]),
+    }
+    tables["twist_slice_prune"] = _pruning_table(tables["twist_move"], tables["slice_move"], N_SLICE)
+    tables["flip_slice_prune"] = _pruning_table(tables["flip_move"], tables["slice_move"], N_SLICE)
+    tables["corner_slice_prune"] = _pruning_table(tables["corner_move"], tables["slice_perm_move"], N_PERM4)
+    tables["edge8_slice_prune"] = _pruning_table(tables["edge8_move"], tables["slice_perm_move"], N_PERM4)
+    return tables
+
+
+TABLE_NAMES = (
+    "twist_move",
+    "flip_move",
+    "slice_move",
+    "corner_move",
+    "edge8_move",
+    "slice_perm_move",
+    "twist_slice_prune",
+    "flip_slice_prune",
+    "corner_slice_prune",
+    "edge8_slice_prune",
+)
+
+
+_loaded = {}
+
+
+def load_tables(directory):
+    # Memory-maps the tables in `directory`, building and saving them first
+    # if any are missing, and exposes each as a flat memoryview.
+    if directory not in _loaded:
+        arrays = npy_cache.load_arrays(directory, TABLE_NAMES, build_tables)
+        _loaded[directory] = {name: npy_cache.flat_view(array) for name, array in arrays.items()}
+    return _loaded[directory]
+
+
+def tables_if_ready(directory):
+    # The tables, or None while they are being built in the background
+    # (about 5 seconds).
+    if directory in _loaded:
+        return _loaded[directory]
+    return npy_cache.open_in_background(directory, TABLE_NAMES, load_tables)
+
+
+def solve(start, directory, budget=SOLVE_BUDGET_SECONDS, max_length=MAX_LENGTH, phase2_cap=MAX_PHASE2_DEPTH,
+          stats=None):
+    # Returns a list of move indexes that solves `start`. The first solution
+    # found is improved until the budget runs out; a solution is always
+    # returned even if finding the first one takes longer than the budget.
+    # `phase2_cap` bounds each phase-2 search while looking for it. A
+    # `stats` dict gets "first_seconds" (time to the first solution, which
+    # the budget does not bound), "seconds" and "nodes".
+    started = time.perf_counter()
+    if stats is not None:
+        stats.update(first_seconds=0.0, seconds=0.0, nodes=0)
+    if cube.is_solved(start):
+        return []
+    tables = load_tables(directory)
+    twist_move = tables["twist_move"]
+    flip_move = tables["flip_move"]
+    slice_move = tables["slice_move"]
+    corner_move = tables["corner_move"]
+    edge8_move = tables["edge8_move"]
+    slice_perm_move = tables["slice_perm_move"]
+    twist_slice_prune = tables["twist_slice_prune"]
+    flip_slice_prune = tables["flip_slice_prune"]
+    corner_slice_prune = tables["corner_slice_prune"]
+    edge8_slice_prune = tables["edge8_slice_prune"]
+
+    deadline = time.perf_counter() + budget
+    best = [None]
+    first_seconds = [0.0]
+    nodes = [0]
+    phase2_limit = [phase2_cap]
+    path = []
+
+    def check_deadline():
+        nodes[0] += 1
+        if best[0] is not None and nodes[0] % DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+            raise SolveTimeout()
+
+    def phase2(corner, edge8, slice_perm, depth, last_face, moves):
+        if depth == 0:
+            return corner == 0 and edge8 == 0 and slice_perm == 0
+        check_deadline()
+        corner_row = corner * N_PHASE2_MOVES
+        edge8_row = edge8 * N_PHASE2_MOVES
+        slice_row = slice_perm * N_PHASE2_MOVES
+        for index, face in _PHASE2_ALLOWED[last_face]:
+            next_slice = slice_perm_move[slice_row + index]
+            next_corner = corner_move[corner_row + index]
+            if corner_slice_prune[next_corner * N_PERM4 + next_slice] >= depth:
+                continue
+            next_edge8 = edge8_move[edge8_row + index]
+            if edge8_slice_prune[next_edge8 * N_PERM4 + next_slice] >= depth:
+                continue
+            moves.append(cube.PHASE2_MOVES[index])
+            if phase2(next_corner, next_edge8, next_slice, depth - 1, face, moves):
+                return True
+            moves.pop()
+        return False
+
+    def finish(last_face):
+        limit = (len(best[0]) - 1 if best[0] is not None else max_length) - len(path)
+        limit = min(limit, phase2_limit[0])
+        if limit < 0:
+            return
+        position = cube.apply_moves(start, path)
+        corner = cube.corner_permutation(position)
+        edge8 = cube.ud_edge_permutation(position)
+        slice_perm = cube.slice_permutation(position)
+        bound = max(corner_slice_prune[corner * N_PERM4 + slice_perm], edge8_slice_prune[edge8 * N_PERM4 + slice_perm])
+        for depth in range(bound, limit + 1):
+            moves = []
+            if phase2(corner, edge8, slice_perm, depth, last_face, moves):
+                if best[0] is None:
+                    first_seconds[0] = time.perf_counter() - started
+                best[0] = path + moves
+                return
+
+    def phase1(twist, flip, slice_index, depth, last_face):
+        if depth == 0:
+            if twist == 0 and flip == 0 and slice_index == 0 and (not path or path[-1] not in _PHASE2_MOVE_SET):
+                finish(last_face)
+            return
+        check_deadline()
+        twist_row = twist * N_MOVES
+        flip_row = flip * N_MOVES
+        slice_row = slice_index * N_MOVES
+        for move, face in _PHASE1_ALLOWED[last_face]:
+            next_slice = slice_move[slice_row + move]
+            next_twist = twist_move[twist_row + move]
+            if twist_slice_prune[next_twist * N_SLICE + next_slice] >= depth:
+                continue
+            next_flip = flip_move[flip_row + move]
+            if flip_slice_prune[next_flip * N_SLICE + next_slice] >= depth:
+                continue
+            path.append(move)
+            phase1(next_twist, next_flip, next_slice, depth - 1, face)
+            path.pop()
+
+    twist = cube.twist(start)
+    flip = cube.flip(start)
+    slice_index = cube.slice_combination(start)
+    try:
+        # Short phase-2 searches find a first solution fastest; lift the cap
+        # only for the rare cube where no capped combination exists.
+        for phase2_limit[0] in (phase2_cap, max_length):
+            for depth in range(MAX_PHASE1_DEPTH + 1):
+                if best[0] is not None and depth >= len(best[0]):
+                    break
+                phase1(twist, flip, slice_index, depth, 6)
+            if best[0] is not None:
+                break
+    except SolveTimeout:
+        pass
+    if stats is not None:
+        stats.update(first_seconds=first_seconds[0], seconds=time.perf_counter() - started, nodes=nodes[0])
+    return best[0]
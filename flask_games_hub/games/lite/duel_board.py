@@ -0,0 +1,136 @@
+import random
+from functools import lru_cache
+
+# Duel territory board: a flat list of size*size cells, each HUMAN, AI or 0.
+# Cells are only ever claimed or flipped, never emptied again.
+
+HUMAN = 1
+AI = -1
+SPREAD_ATTACK = 7
+
+
+@lru_cache(maxsize=None)
+def neighbor_lists(size):
+    neighbors = []
+    for index in range(size * size):
+        row, col = divmod(index, size)
+        neighbors.append(tuple(
+            nr * size + nc
+            for nr, nc in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1))
+            if 0 <= nr < size and 0 <= nc < size
+        ))
+    return tuple(neighbors)
+
+
+class IndexedSet:
+    # A set with O(1) add, discard and uniform random choice: items live in a
+    # list, and removal swaps the last item into the freed slot.
+
+    __slots__ = ("items", "positions")
+
+    def __init__(self, items=()):
+        # `items` must be distinct.
+        self.items = list(items)
+        self.positions = {item: position for position, item in enumerate(self.items)}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def add(self, item):
+        if item not in self.positions:
+            self.positions[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item):
+        position = self.positions.pop(item, None)
+        if position is None:
+            return
+        last = self.items.pop()
+        if position < len(self.items):
+            self.items[position] = last
+            self.positions[last] = position
+
+    def choice(self, rng=random):
+        return self.items[rng.randrange(len(self.items))]
+
+
+class DuelBoard:
+    # Keeps owner counts, the empty cells and each side's frontier (empty
+    # cells next to its stones) up to date on every claim or flip, so a
+    # placement costs O(cells it touches). Building one from stored cells,
+    # as every request does, is a single O(cells) pass.
+
+    def __init__(self, size, cells=None):
+        self.size = size
+        self.neighbors = neighbor_lists(size)
+        self.cells = list(cells) if cells else [0] * (size * size)
+        self.counts = {HUMAN: self.cells.count(HUMAN), AI: self.cells.count(AI)}
+        self.adjacent = {HUMAN: [0] * (size * size), AI: [0] * (size * size)}
+        empty = []
+        for index, owner in enumerate(self.cells):
+            if owner:
+                adjacent = self.adjacent[owner]
+                for neighbor in self.neighbors[index]:
+                    adjacent[neighbor] += 1
+            else:
+                empty.append(index)
+        self.empty = IndexedSet(empty)
+        self.frontier = {
+            owner: IndexedSet(index for index in empty if self.adjacent[owner][index]) for owner in (HUMAN, AI)
+        }
+
+    def _set(self, index, owner):
+        previous = self.cells[index]
+        if previous == owner:
+            return
+        self.cells[index] = owner
+        self.counts[owner] += 1
+        if previous:
+            self.counts[previous] -= 1
+        else:
+            self.empty.discard(index)
+            self.frontier[HUMAN].discard(index)
+            self.frontier[AI].discard(index)
+
+        for neighbor in self.neighbors[index]:
+            if previous:
+                self.adjacent[previous][neighbor] -= 1
+                if not self.adjacent[previous][neighbor]:
+                    self.frontier[previous].discard(neighbor)
+            self.adjacent[owner][neighbor] += 1
+            if not self.cells[neighbor]:
+                self.frontier[owner].add(neighbor)
+
+    def place(self, index, owner, attack, defense, rng=random):
+        # Claims `index`, flips up to `defense` random adjacent enemies and,
+        # with a strong attack, claims one random adjacent empty cell too.
+        # Returns the cells that changed.
+        self._set(index, owner)
+        changed = [index]
+
+        enemies = [neighbor for neighbor in self.neighbors[index] if self.cells[neighbor] == -owner]
+        rng.shuffle(enemies)
+        for neighbor in enemies[:max(0, defense)]:
+            self._set(neighbor, owner)
+            changed.append(neighbor)
+
+        if attack >= SPREAD_ATTACK:
+            open_cells = [neighbor for neighbor in self.neighbors[index] if not self.cells[neighbor]]
+            if open_cells:
+                extra = rng.choice(open_cells)
+                self._set(extra, owner)
+                changed.append(extra)
+        return changed
+
+    def contested(self):
+        # Empty cells next to either side's stones, in board order.
+        return sorted(set(self.frontier[HUMAN]).union(self.frontier[AI]))
+
+    def is_full(self):
+        return not self.empty
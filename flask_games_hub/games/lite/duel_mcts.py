@@ -0,0 +1,164 @@
+import math
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from games.lite.duel_board import SPREAD_ATTACK
+
+# Monte-Carlo search for the duel territory games. Boards are flat int8 rows
+# of size*size cells (1 human, -1 computer, 0 empty) plus one sentinel column
+# that neighbour lookups use for off-board squares. Many boards are played
+# out at once, one placement per board per NumPy step.
+#
+# Placements are random (which enemies flip, where an attack spreads), so
+# the search runs at the root: sequential halving over (cell, style) moves,
+# each round scoring every surviving move with one batch of random playouts.
+
+BUDGET_SECONDS = 0.25
+FIRST_ROUND_PLAYOUTS = 4
+MAX_BATCH = 2048
+SENTINEL = 2
+MAX_FLIPS = 4
+
+
+@lru_cache(maxsize=None)
+def neighbor_table(size):
+    # (cells, 4) orthogonal neighbours; off-board entries point at the
+    # sentinel column.
+    cells = size * size
+    table = np.full((cells, 4), cells, dtype=np.int64)
+    for index in range(cells):
+        row, col = divmod(index, size)
+        for slot, (nr, nc) in enumerate(((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1))):
+            if 0 <= nr < size and 0 <= nc < size:
+                table[index, slot] = nr * size + nc
+    return table
+
+
+def _place(boards, empties, rows, cells, player, attack, defense, neighbors, rng):
+    # The duel placement rule for every board in `rows` at once: claim the
+    # cell, flip up to `defense` random adjacent enemies, and with a strong
+    # attack also claim one random adjacent empty cell.
+    boards[rows, cells] = player
+    empties[rows] -= 1
+
+    around = neighbors[cells]
+    values = boards[rows[:, None], around]
+    enemy = values == -player
+    keys = rng.random(enemy.shape)
+    keys[~enemy] = 2.0
+    rank = keys.argsort(axis=1).argsort(axis=1)
+    flipped = enemy & (rank < defense[:, None])
+    boards[rows[:, None], around] = np.where(flipped, player, values)
+
+    empty = values == 0
+    keys = rng.random(empty.shape)
+    keys[~empty] = -1.0
+    pick = keys.argmax(axis=1)
+    spread = empty.any(axis=1) & (attack >= SPREAD_ATTACK)
+    if spread.any():
+        spread_rows = rows[spread]
+        boards[spread_rows, around[spread, pick[spread]]] = player
+        empties[spread_rows] -= 1
+
+
+def random_playouts(boards, empties, player, attacks, defenses, neighbors, rng):
+    # Plays every board to the end in place, `player` moving first, with a
+    # uniformly random empty cell and move style on each turn.
+    cells = boards.shape[1] - 1
+    keys = rng.random((len(boards), cells))
+    keys[boards[:, :cells] != 0] = 2.0
+    order = keys.argsort(axis=1)
+    cursor = np.zeros(len(boards), dtype=np.int64)
+
+    while True:
+        rows = np.flatnonzero(empties > 0)
+        if not rows.size:
+            return boards
+        # Each board walks its own random cell order, skipping cells that
+        # were claimed since (by a spread) until it reaches an empty one.
+        chosen = order[rows, cursor[rows]]
+        taken = boards[rows, chosen] != 0
+        while taken.any():
+            cursor[rows[taken]] += 1
+            chosen = order[rows, cursor[rows]]
+            taken = boards[rows, chosen] != 0
+        cursor[rows] += 1
+
+        styles = rng.integers(len(attacks), size=rows.size)
+        _place(boards, empties, rows, chosen, player, attacks[styles], defenses[styles], neighbors, rng)
+        player = -player
+
+
+def candidate_moves(board, actions, cells=None):
+    # Every (cell, style index) on the empty `cells` (default: all empty
+    # cells). Styles that play out identically (same spread, same effective
+    # flips) are only tried once.
+    seen = {}
+    for index, (_, attack, defense) in enumerate(actions):
+        seen.setdefault((attack >= SPREAD_ATTACK, min(max(defense, 0), MAX_FLIPS)), index)
+    styles = sorted(seen.values())
+    if cells is None:
+        cells = np.flatnonzero(np.asarray(board) == 0)
+    cells = np.asarray(cells, dtype=np.int64)
+    return np.repeat(cells, len(styles)), np.tile(styles, len(cells))
+
+
+def choose_move(board, size, actions, player=-1, budget=BUDGET_SECONDS, rng=None, candidates=None):
+    # Returns (cell, style index, stats) for `player` on the flat `board`,
+    # or (None, None, stats) when the board is full. `candidates` limits the
+    # cells searched. At least one round of playouts always runs, so tiny
+    # budgets still give a scored move.
+    rng = rng or np.random.default_rng()
+    started = time.perf_counter()
+    deadline = started + budget
+    board = np.asarray(board, dtype=np.int8)
+    move_cells, move_styles = candidate_moves(board, actions, candidates)
+    stats = {"playouts": 0, "rounds": 0, "seconds": 0.0}
+    if not move_cells.size:
+        return None, None, stats
+
+    neighbors = neighbor_table(size)
+    attacks = np.array([action[1] for action in actions])
+    defenses = np.array([max(action[2], 0) for action in actions])
+    base = np.append(board, SENTINEL).astype(np.int8)
+    remaining = int((board == 0).sum())
+
+    wins = np.zeros(len(move_cells))
+    visits = np.zeros(len(move_cells))
+    alive = np.arange(len(move_cells))
+    per_move = FIRST_ROUND_PLAYOUTS
+    while True:
+        round_started = time.perf_counter()
+        count = max(1, min(per_move, MAX_BATCH // len(alive)))
+        batch = np.repeat(alive, count)
+        boards = np.tile(base, (len(batch), 1))
+        empties = np.full(len(batch), remaining, dtype=np.int64)
+        rows = np.arange(len(batch))
+        styles = move_styles[batch]
+        _place(boards, empties, rows, move_cells[batch], player, attacks[styles], defenses[styles], neighbors, rng)
+        random_playouts(boards, empties, -player, attacks, defenses, neighbors, rng)
+
+        margin = boards[:, :-1].sum(axis=1, dtype=np.int64) * player
+        wins += np.bincount(batch, weights=(margin > 0) + 0.5 * (margin == 0), minlength=len(wins))
+        visits[alive] += count
+        stats["playouts"] += len(batch)
+        stats["rounds"] += 1
+
+        if len(alive) == 1:
+            break
+        means = wins[alive] / visits[alive]
+        alive = alive[np.argsort(-means, kind="stable")[:math.ceil(len(alive) / 2)]]
+        per_move *= 2
+        # Halving the moves while doubling their playouts keeps rounds about
+        # the same size, so stop if another one would overrun the budget.
+        now = time.perf_counter()
+        if now + (now - round_started) > deadline:
+            break
+
+    means = wins[alive] / visits[alive]
+    best = alive[int(np.argmax(means))]
+    stats["seconds"] = time.perf_counter() - started
+    stats["win_rate"] = float(wins[best] / visits[best])
+    return int(move_cells[best]), int(move_styles[best]), stats
@@ -0,0 +1,225 @@
+import atexit
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+
+from games.lite import hand_eval
+from games.lite.cards import DECK_SIZE, card_text
+
+# Win/tie/equity for Hold'em and Teen Patti hands. Some hands may be unknown
+# (None), dealt at random like the missing board cards. Every outcome is
+# enumerated when there are at most EXACT_LIMIT of them; otherwise outcomes
+# are sampled and each equity comes with a 95% confidence margin.
+#
+# Outcomes are rows of dealt cards: the missing board cards first, then the
+# hole cards of each unknown hand. A whole batch of rows is ranked with one
+# vectorized lookup per player.
+
+HOLDEM = "holdem"
+TEEN_PATTI = "teen-patti"
+HOLE_CARDS = {HOLDEM: 2, TEEN_PATTI: 3}
+BOARD_CARDS = {HOLDEM: 5, TEEN_PATTI: 0}
+MAX_PLAYERS = 9
+
+EXACT_LIMIT = 50_000
+SAMPLES = 20_000
+MAX_SAMPLES = 500_000
+CHUNK_SIZE = 25_000
+POOL_WORKERS = min(4, os.cpu_count() or 1)
+Z_95 = 1.96
+
+
+def _validate(game, hands, board):
+    if game not in HOLE_CARDS:
+        raise ValueError(f"Unknown game: {game!r}")
+    if not 2 <= len(hands) <= MAX_PLAYERS:
+        raise ValueError(f"Equity needs 2 to {MAX_PLAYERS} hands.")
+    if len(board) > BOARD_CARDS[game] or (game == HOLDEM and 0 < len(board) < 3):
+        raise ValueError("Board must be empty or hold 3 to 5 cards." if game == HOLDEM else "Teen Patti has no board.")
+    known = list(board)
+    for hand in hands:
+        if hand is not None:
+            if len(hand) != HOLE_CARDS[game]:
+                raise ValueError(f"Hands need {HOLE_CARDS[game]} cards.")
+            known.extend(hand)
+    if len(set(known)) != len(known) or not all(0 <= card < DECK_SIZE for card in known):
+        raise ValueError("Cards must be distinct.")
+    return known
+
+
+def _group_widths(game, hands, board):
+    # Sizes of the card groups each outcome deals: the missing board cards,
+    # then one group per unknown hand.
+    widths = [BOARD_CARDS[game] - len(board)] if len(board) < BOARD_CARDS[game] else []
+    return widths + [HOLE_CARDS[game] for hand in hands if hand is None]
+
+
+def outcome_count(deck_size, widths):
+    count = 1
+    for width in widths:
+        count *= math.comb(deck_size, width)
+        deck_size -= width
+    return count
+
+
+def enumerate_outcomes(deck, widths):
+    rows = [()]
+    for width in widths:
+        rows = [
+            row + group
+            for row in rows
+            for group in combinations([card for card in deck if card not in row], width)
+        ]
+    return np.array(rows, dtype=np.int64).reshape(len(rows), sum(widths))
+
+
+def sample_outcomes(deck, width, count, rng):
+    # A partial Fisher-Yates shuffle of the deck in every row at once.
+    rows = np.tile(np.asarray(deck, dtype=np.int8), (count, 1))
+    index = np.arange(count)
+    for column in range(width):
+        pick = rng.integers(column, len(deck), size=count)
+        chosen = rows[index, pick]
+        rows[index, pick] = rows[:, column]
+        rows[:, column] = chosen
+    return rows[:, :width].astype(np.int64)
+
+
+def tally(evaluator, game, hands, board, dealt):
+    # Returns per-player (wins, ties, equity shares) summed over the rows of
+    # `dealt`. A tie is a shared best hand; its share is split evenly.
+    count = len(dealt)
+    missing = BOARD_CARDS[game] - len(board)
+    full_board = np.hstack([np.broadcast_to(np.asarray(board, dtype=np.int64), (count, len(board))), dealt[:, :missing]])
+    column = missing
+    values = []
+    for hand in hands:
+        if hand is None:
+            hole = dealt[:, column:column + HOLE_CARDS[game]]
+            column += HOLE_CARDS[game]
+        else:
+            hole = np.broadcast_to(np.asarray(hand, dtype=np.int64), (count, len(hand)))
+        if game == HOLDEM:
+            values.append(evaluator.evaluate_many(np.hstack([hole, full_board])))
+        else:
+            values.append(evaluator.teen_patti_many(hole))
+    values = np.stack(values)
+    best = values == values.max(axis=0)
+    sharing = best.sum(axis=0)
+    wins = (best & (sharing == 1)).sum(axis=1)
+    ties = (best & (sharing > 1)).sum(axis=1)
+    shares = (best / sharing).sum(axis=1)
+    return wins, ties, shares
+
+
+def _tally_rows(directory, game, hands, board, dealt):
+    return tally(hand_eval.open_evaluator(directory), game, hands, board, dealt)
+
+
+def _tally_samples(directory, game, hands, board, deck, width, count, seed):
+    dealt = sample_outcomes(deck, width, count, np.random.default_rng(seed))
+    return _tally_rows(directory, game, hands, board, dealt)
+
+
+class EquityCalculator:
+    # Splits big jobs into CHUNK_SIZE pieces across worker processes; small
+    # jobs, and every job when there is only one worker, run inline. As in
+    # the Minesweeper pool, at most `workers` chunks are submitted at a time,
+    # so at exit concurrent.futures only waits for the running ones.
+
+    def __init__(self, workers=POOL_WORKERS):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, workers))
+        self._executor = None
+
+    def start(self):
+        with self._lock:
+            if self._executor is None and self.workers > 1:
+                atexit.register(self.shutdown)
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, jobs):
+        executor = self.start() if len(jobs) > 1 else None
+        if executor is None:
+            results = [job[0](*job[1:]) for job in jobs]
+        else:
+            results = [future.result() for future in [self._submit(executor, job) for job in jobs]]
+        return [sum(parts) for parts in zip(*results)]
+
+    def _submit(self, executor, job):
+        # Waits for a free worker, so chunks queue here rather than in the
+        # executor.
+        self._slots.acquire()
+        try:
+            future = executor.submit(*job)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def calculate(self, directory, game, hands, board=(), samples=SAMPLES, exact_limit=EXACT_LIMIT, rng=None):
+        # `hands` is a list of card-int lists, None for an unknown hand.
+        # Returns {"method", "outcomes", "seconds", "players": [...]} with
+        # win, tie and equity as percentages per player.
+        started = time.perf_counter()
+        known = set(_validate(game, hands, board))
+        deck = [card for card in range(DECK_SIZE) if card not in known]
+        widths = _group_widths(game, hands, board)
+        total = outcome_count(len(deck), widths)
+        if total <= exact_limit:
+            method = "exact"
+            dealt = enumerate_outcomes(deck, widths)
+            jobs = [
+                (_tally_rows, directory, game, hands, board, dealt[start:start + CHUNK_SIZE])
+                for start in range(0, total, CHUNK_SIZE)
+            ]
+        else:
+            method = "monte-carlo"
+            total = max(1, min(samples, MAX_SAMPLES))
+            rng = rng or np.random.default_rng()
+            jobs = [
+                (_tally_samples, directory, game, hands, board, deck, sum(widths),
+                 min(CHUNK_SIZE, total - start), int(rng.integers(2 ** 63)))
+                for start in range(0, total, CHUNK_SIZE)
+            ]
+        wins, ties, shares = self._run(jobs)
+
+        players = []
+        for hand, win, tie, share in zip(hands, wins, ties, shares):
+            equity = share / total
+            margin = 0.0 if method == "exact" else Z_95 * math.sqrt(equity * (1 - equity) / total)
+            players.append({
+                "hand": None if hand is None else "".join(card_text(card) for card in hand),
+                "win": 100 * float(win) / total,
+                "tie": 100 * float(tie) / total,
+                "equity": 100 * float(equity),
+                "margin": 100 * float(margin),
+            })
+        return {
+            "game": game,
+            "method": method,
+            "outcomes": total,
+            "seconds": time.perf_counter() - started,
+            "players": players,
+        }
+
+
+calculator = EquityCalculator()
@@ -0,0 +1,151 @@
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
+from games.lite import sliding
+
+HINT_BUDGET_SECONDS = 0.2
+PROB_CUTOFF = 0.0001
+HINT_CACHE_SIZE = 4096
+DEADLINE_CHECK_INTERVAL = 32
+
+# Row heuristic weights, tuned for 4x4 boards of tile codes.
+SCORE_LOST_PENALTY = 200000.0
+SCORE_EMPTY_WEIGHT = 270.0
+SCORE_MERGES_WEIGHT = 700.0
+SCORE_MONOTONICITY_WEIGHT = 47.0
+SCORE_MONOTONICITY_POWER = 4.0
+SCORE_SUM_WEIGHT = 11.0
+SCORE_SUM_POWER = 3.5
+
+_hint_cache = OrderedDict()
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def _row_score(row, mode):
+    codes = sliding.unpack_row(row)
+    merge = sliding.MERGE_RULES[mode]
+
+    empty = codes.count(0)
+    merges = 0
+    for left, right in zip(codes, codes[1:]):
+        if left and right and merge(left, right) is not None:
+            merges += 1
+
+    rising = 0.0
+    falling = 0.0
+    for left, right in zip(codes, codes[1:]):
+        if left > right:
+            rising += left ** SCORE_MONOTONICITY_POWER - right ** SCORE_MONOTONICITY_POWER
+        else:
+            falling += right ** SCORE_MONOTONICITY_POWER - left ** SCORE_MONOTONICITY_POWER
+
+    return (
+        SCORE_LOST_PENALTY
+        + SCORE_EMPTY_WEIGHT * empty
+        + SCORE_MERGES_WEIGHT * merges
+        - SCORE_MONOTONICITY_WEIGHT * min(rising, falling)
+        - SCORE_SUM_WEIGHT * sum(code ** SCORE_SUM_POWER for code in codes)
+    )
+
+
+def evaluate(board, mode):
+    flipped = sliding.transpose(board)
+    total = 0.0
+    for shift in (0, 16, 32, 48):
+        total += _row_score((board >> shift) & sliding.ROW_MASK, mode)
+        total += _row_score((flipped >> shift) & sliding.ROW_MASK, mode)
+    return total
+
+
+def search_depth(board):
+    empty = len(sliding.empty_cells(board))
+    if empty >= 8:
+        return 2
+    if empty >= 4:
+        return 3
+    return 4
+
+
+def _best_direction(board, mode, depth, deadline):
+    # Expectimax where depth counts player moves. Chance nodes whose
+    # cumulative probability falls below PROB_CUTOFF are scored statically.
+    spawn_weights = sliding.SPAWN_WEIGHTS[mode]
+    table = {}
+    nodes = [0]
+
+    def max_node(position, remaining, probability):
+        best = 0.0
+        for direction in sliding.DIRECTIONS:
+            moved = sliding.move(position, direction, mode)
+            if moved != position:
+                best = max(best, chance_node(moved, remaining, probability))
+        return best
+
+    def chance_node(position, remaining, probability):
+        if remaining == 0 or probability < PROB_CUTOFF:
+            return evaluate(position, mode)
+
+        key = (position, remaining)
+        if key in table:
+            return table[key]
+
+        nodes[0] += 1
+        if deadline is not None and nodes[0] % DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+            raise SearchTimeout()
+
+        empty = sliding.empty_cells(position)
+        if not empty:
+            return max_node(position, remaining - 1, probability)
+
+        cell_probability = probability / len(empty)
+        total = 0.0
+        for index in empty:
+            for code, weight in spawn_weights:
+                child = sliding.set_cell(position, index, code)
+                total += weight * max_node(child, remaining - 1, cell_probability * weight)
+        value = total / len(empty)
+        table[key] = value
+        return value
+
+    best_direction = None
+    best_score = None
+    for direction in sliding.DIRECTIONS:
+        moved = sliding.move(board, direction, mode)
+        if moved == board:
+            continue
+        score = chance_node(moved, depth - 1, 1.0)
+        if best_score is None or score > best_score:
+            best_direction = direction
+            best_score = score
+    return best_direction, best_score
+
+
+def best_direction(board, mode, depth, deadline=None):
+    key = (mode, board, depth)
+    if key in _hint_cache:
+        _hint_cache.move_to_end(key)
+        return _hint_cache[key]
+
+    result = _best_direction(board, mode, depth, deadline)
+    _hint_cache[key] = result
+    if len(_hint_cache) > HINT_CACHE_SIZE:
+        _hint_cache.popitem(last=False)
+    return result
+
+
+def hint(board, mode, budget=HINT_BUDGET_SECONDS):
+    # Iterative deepening: depth 1 always completes, deeper searches are
+    # abandoned once the budget is spent and the last full result is kept.
+    deadline = time.perf_counter() + budget
+    direction, _ = best_direction(board, mode, 1)
+    for depth in range(2, search_depth(board) + 1):
+        try:
+            direction, _ = best_direction(board, mode, depth, deadline)
+        except SearchTimeout:
+            break
+    return direction
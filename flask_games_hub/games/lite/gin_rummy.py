@@ -0,0 +1,205 @@
+import random
+
+from games.lite.cards import DECK_SIZE, make_card, rank_of
+
+# Gin Rummy hands as 52-bit masks over the card ints of games.lite.cards
+# (bit rank * 4 + suit). Every possible meld is precomputed as a mask: 65
+# sets (three or four of a rank) and 264 runs (three or more in a suit, ace
+# low). The least deadwood of a hand is a memoized DP over masks: the
+# lowest card is either deadwood or part of a meld whose lowest card it is,
+# so only the melds indexed under that card are tried.
+
+HAND_SIZE = 10
+KNOCK_LIMIT = 10
+GIN_BONUS = 25
+UNDERCUT_BONUS = 25
+TARGET_SCORE = 100
+STOCK_FLOOR = 2
+MEMO_SIZE = 1_000_000
+
+# The computer knocks as soon as its deadwood is this low.
+AI_KNOCK_DEADWOOD = 7
+# ... and takes the upcard when it beats the average stock draw by this.
+AI_UPCARD_MARGIN = 1.0
+
+
+def _value(card):
+    rank = rank_of(card)
+    return 1 if rank == 12 else min(rank + 2, 10)
+
+
+VALUES = tuple(_value(card) for card in range(DECK_SIZE))
+
+
+def _melds():
+    melds = []
+    for rank in range(13):
+        suits = [make_card(rank, suit) for suit in range(4)]
+        melds.append(sum(1 << card for card in suits))
+        for left_out in suits:
+            melds.append(sum(1 << card for card in suits if card != left_out))
+    for suit in range(4):
+        # Ace low: gin rank 0 is the ace (card rank 12), then 2 up to king.
+        ordered = [make_card((rank - 1) % 13, suit) for rank in range(13)]
+        for start in range(13):
+            for end in range(start + 3, 14):
+                melds.append(sum(1 << card for card in ordered[start:end]))
+    return tuple(melds)
+
+
+MELDS = _melds()
+MELD_SET = frozenset(MELDS)
+MELDS_BY_LOW = tuple(
+    tuple(meld for meld in MELDS if (meld & -meld).bit_length() - 1 == card) for card in range(DECK_SIZE)
+)
+
+_memo = {0: 0}
+
+
+def mask_of(cards):
+    mask = 0
+    for card in cards:
+        mask |= 1 << card
+    return mask
+
+
+def cards_of(mask):
+    cards = []
+    while mask:
+        low = mask & -mask
+        cards.append(low.bit_length() - 1)
+        mask ^= low
+    return cards
+
+
+def clear_memo():
+    _memo.clear()
+    _memo[0] = 0
+
+
+def deadwood(mask):
+    # Least deadwood count of the hand `mask` over all meld arrangements.
+    value = _memo.get(mask)
+    if value is not None:
+        return value
+    low = mask & -mask
+    card = low.bit_length() - 1
+    best = VALUES[card] + deadwood(mask ^ low)
+    for meld in MELDS_BY_LOW[card]:
+        if meld & mask == meld:
+            value = deadwood(mask ^ meld)
+            if value < best:
+                best = value
+    if len(_memo) >= MEMO_SIZE:
+        clear_memo()
+    _memo[mask] = best
+    return best
+
+
+def arrange(mask):
+    # (melds, deadwood mask) of one best arrangement of `mask`.
+    melds = []
+    dead = 0
+    while mask:
+        low = mask & -mask
+        card = low.bit_length() - 1
+        target = deadwood(mask)
+        for meld in MELDS_BY_LOW[card]:
+            if meld & mask == meld and deadwood(mask ^ meld) == target:
+                melds.append(meld)
+                mask ^= meld
+                break
+        else:
+            dead |= low
+            mask ^= low
+    return melds, dead
+
+
+def best_discard(mask, keep=None):
+    # (deadwood after discarding, card to discard) for an 11-card hand; the
+    # highest card goes on ties. `keep` (the card just taken from the
+    # discard pile) may not be thrown straight back.
+    best = None
+    for card in cards_of(mask):
+        if card == keep:
+            continue
+        option = (deadwood(mask ^ (1 << card)), -VALUES[card], card)
+        if best is None or option < best:
+            best = option
+    return best[0], best[2]
+
+
+def choose_draw(mask, upcard, unseen):
+    # "discard" to take `upcard`, "stock" to draw blind. A stock draw is
+    # valued at its average over the cards the computer has not seen.
+    with_upcard, _ = best_discard(mask | 1 << upcard, keep=upcard)
+    expected = sum(best_discard(mask | 1 << card)[0] for card in unseen) / len(unseen) if unseen else with_upcard
+    return "discard" if with_upcard + AI_UPCARD_MARGIN <= expected else "stock"
+
+
+def layoffs(dead, melds):
+    # Deadwood cards of the defender that extend the knocker's melds,
+    # laying off repeatedly so a run can grow card by card.
+    laid = 0
+    grown = list(melds)
+    changed = True
+    while changed:
+        changed = False
+        for card in cards_of(dead & ~laid):
+            bit = 1 << card
+            for index, meld in enumerate(grown):
+                if meld | bit in MELD_SET:
+                    grown[index] = meld | bit
+                    laid |= bit
+                    changed = True
+                    break
+    return laid
+
+
+def settle(knocker, defender):
+    # Scores a knock. `knocker` and `defender` are 10-card masks. Returns
+    # {"gin", "undercut", "points", "knocker_wins", "knocker_deadwood",
+    #  "defender_deadwood", "laid_off"} where points go to the winner.
+    knocker_melds, knocker_dead = arrange(knocker)
+    knocker_count = sum(VALUES[card] for card in cards_of(knocker_dead))
+    _, defender_dead = arrange(defender)
+    gin = knocker_count == 0
+    laid = 0 if gin else layoffs(defender_dead, knocker_melds)
+    defender_count = sum(VALUES[card] for card in cards_of(defender_dead & ~laid))
+    undercut = not gin and defender_count <= knocker_count
+    if gin:
+        points = GIN_BONUS + defender_count
+    elif undercut:
+        points = UNDERCUT_BONUS + knocker_count - defender_count
+    else:
+        points = defender_count - knocker_count
+    return {
+        "gin": gin,
+        "undercut": undercut,
+        "points": points,
+        "knocker_wins": not undercut,
+        "knocker_deadwood": knocker_count,
+        "defender_deadwood": defender_count,
+        "laid_off": cards_of(laid),
+    }
+
+
+def deal(rng=None):
+    # (player hand, computer hand, stock, discard pile) as card-int lists.
+    rng = rng or random.Random()
+    deck = list(range(DECK_SIZE))
+    rng.shuffle(deck)
+    return deck[:HAND_SIZE], deck[HAND_SIZE:2 * HAND_SIZE], deck[2 * HAND_SIZE + 1:], [deck[2 * HAND_SIZE]]
+
+
+def computer_turn(hand, upcard, unseen, stock):
+    # Plays one computer turn; the caller takes the drawn card off the
+    # stock or discard pile. Returns ("discard" or "stock", the new hand,
+    # the card discarded, whether to knock).
+    mask = mask_of(hand)
+    source = choose_draw(mask, upcard, unseen) if upcard is not None else "stock"
+    drawn = upcard if source == "discard" else stock[-1]
+    mask |= 1 << drawn
+    count, discard = best_discard(mask, keep=drawn if source == "discard" else None)
+    mask ^= 1 << discard
+    return source, cards_of(mask), discard, count <= AI_KNOCK_DEADWOOD
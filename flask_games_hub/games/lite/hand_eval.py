@@ -0,0 +1,350 @@
+import numpy as np
+
+from games.lite import npy_cache
+
+# Table-driven hand evaluation for 5-7 card poker hands and 3-card Teen
+# Patti hands. A hand's value is its equivalence class: a small int where a
+# higher value beats a lower one (1-7462 for poker).
+#
+# Non-flush hands depend only on how many cards of each rank they hold. That
+# count vector gets a minimal perfect hash (its lexicographic index among
+# all vectors with the same card total), which indexes a per-size table.
+# Flushes are looked up separately by the 13-bit rank mask of the flush suit.
+#
+# The hash splits into a part for the low ranks (2-8) and one for the high
+# ranks (9-A). Each part is a table lookup on a base-5 count key that is a
+# plain sum of per-card weights, so a hand needs only additions and lookups.
+
+N_RANKS = 13
+MAX_CARDS = 7
+MAX_PER_RANK = 4
+POKER_SIZES = (5, 6, 7)
+TEEN_PATTI_SIZE = 3
+
+POKER_CATEGORIES = (
+    "High card",
+    "Pair",
+    "Two pair",
+    "Three of a kind",
+    "Straight",
+    "Flush",
+    "Full house",
+    "Four of a kind",
+    "Straight flush",
+)
+TEEN_PATTI_CATEGORIES = ("High card", "Pair", "Color", "Sequence", "Pure sequence", "Trail")
+
+TABLE_NAMES = (
+    "low3",
+    "low5",
+    "low6",
+    "low7",
+    "high",
+    "flush_suit",
+    "rank5",
+    "rank6",
+    "rank7",
+    "flush",
+    "poker_categories",
+    "teen3",
+    "teen3_flush",
+    "teen_categories",
+)
+
+ACE = 12
+WHEEL = frozenset((ACE, 0, 1, 2, 3))
+
+
+def _ways():
+    # ways[n][k]: count vectors over n ranks holding k cards in total.
+    ways = [[1] + [0] * MAX_CARDS]
+    for n in range(1, N_RANKS + 1):
+        ways.append([
+            sum(ways[n - 1][k - c] for c in range(min(k, MAX_PER_RANK) + 1))
+            for k in range(MAX_CARDS + 1)
+        ])
+    return ways
+
+
+_WAYS = _ways()
+
+# _OFFSETS[i][r][q]: how many vectors come before one holding q cards of rank
+# i when r cards remain for ranks i.. . A vector's hash is the sum over ranks.
+_OFFSETS = [
+    [
+        [sum(_WAYS[N_RANKS - 1 - i][r - c] for c in range(q) if c <= r) for q in range(MAX_PER_RANK + 1)]
+        for r in range(MAX_CARDS + 1)
+    ]
+    for i in range(N_RANKS)
+]
+
+SPLIT_RANK = 7
+NO_FLUSH = 4
+
+# Per-card weights: base-5 count keys for the low and high ranks, and a
+# suit key with 3 bits per suit.
+LOW_WEIGHTS = [5 ** (card >> 2) if card >> 2 < SPLIT_RANK else 0 for card in range(52)]
+HIGH_WEIGHTS = [5 ** ((card >> 2) - SPLIT_RANK) if card >> 2 >= SPLIT_RANK else 0 for card in range(52)]
+SUIT_WEIGHTS = [8 ** (card & 3) for card in range(52)]
+RANK_BITS = [1 << (card >> 2) for card in range(52)]
+_LOW_WEIGHT_ARRAY = np.array(LOW_WEIGHTS, dtype=np.int64)
+_HIGH_WEIGHT_ARRAY = np.array(HIGH_WEIGHTS, dtype=np.int64)
+_SUIT_WEIGHT_ARRAY = np.array(SUIT_WEIGHTS, dtype=np.int64)
+_RANK_BIT_ARRAY = np.array(RANK_BITS, dtype=np.int64)
+
+
+def count_hash(counts):
+    remaining = sum(counts)
+    value = 0
+    for rank, count in enumerate(counts):
+        if count:
+            value += _OFFSETS[rank][remaining][count]
+            remaining -= count
+    return value
+
+
+def _digits(count, length):
+    values = np.arange(count)
+    digits = np.zeros((count, length), dtype=np.int64)
+    for column in range(length):
+        digits[:, column] = values % 5
+        values //= 5
+    return digits
+
+
+def _partial_hashes(digits, first_rank, remaining):
+    # Sum of _OFFSETS over the ranks in `digits` (one column per rank from
+    # `first_rank`), given the cards remaining when the first is reached.
+    # Keys whose counts don't fit are left at 0; real hands never use them.
+    value = np.zeros(len(digits), dtype=np.int64)
+    valid = (digits <= MAX_PER_RANK).all(axis=1) & (remaining >= 0)
+    offsets = np.array(_OFFSETS, dtype=np.int64)
+    for column in range(digits.shape[1]):
+        counts = digits[:, column]
+        valid &= counts <= remaining
+        safe = np.clip(remaining, 0, MAX_CARDS)
+        value += offsets[first_rank + column, safe, np.minimum(counts, MAX_PER_RANK)]
+        remaining = remaining - counts
+    return np.where(valid, value, 0)
+
+
+def _hash_tables(sizes):
+    low = _digits(5 ** SPLIT_RANK, SPLIT_RANK)
+    tables = {
+        f"low{size}": _partial_hashes(low, 0, np.full(len(low), size)).astype(np.uint32) for size in sizes
+    }
+    # The high ranks start with exactly the cards they hold, whatever the
+    # hand size, so one table serves every size.
+    high = _digits(5 ** (N_RANKS - SPLIT_RANK), N_RANKS - SPLIT_RANK)
+    tables["high"] = _partial_hashes(high, SPLIT_RANK, high.sum(axis=1)).astype(np.uint32)
+
+    flush_suit = np.full(8 ** 4, NO_FLUSH, dtype=np.uint8)
+    for key in range(8 ** 4):
+        for suit in range(4):
+            if key >> (3 * suit) & 7 >= 5:
+                flush_suit[key] = suit
+    tables["flush_suit"] = flush_suit
+    return tables
+
+
+def _count_vectors(total, rank=0):
+    if rank == N_RANKS - 1:
+        if total <= MAX_PER_RANK:
+            yield (total,)
+        return
+    for count in range(min(total, MAX_PER_RANK) + 1):
+        for rest in _count_vectors(total - count, rank + 1):
+            yield (count,) + rest
+
+
+def _mask_ranks(mask):
+    return [rank for rank in range(N_RANKS) if mask >> rank & 1]
+
+
+def _poker_strength(counts, flush):
+    # Sort key for a 5-card hand: (category, tie-break ranks...).
+    groups = sorted(((count, rank) for rank, count in enumerate(counts) if count), reverse=True)
+    shape = tuple(count for count, _ in groups)
+    ranks = tuple(rank for _, rank in groups)
+    straight = None
+    if len(ranks) == 5:
+        if ranks[0] - ranks[4] == 4:
+            straight = ranks[0]
+        elif set(ranks) == WHEEL:
+            straight = 3
+    if straight is not None:
+        return (8 if flush else 4, straight)
+    if flush:
+        return (5,) + ranks
+    category = {(4, 1): 7, (3, 2): 6, (3, 1, 1): 3, (2, 2, 1): 2, (2, 1, 1, 1): 1}.get(shape, 0)
+    return (category,) + ranks
+
+
+def _teen_patti_strength(counts, flush):
+    # Trail > pure sequence > sequence > color > pair > high card. A-K-Q is
+    # the best sequence and A-2-3 the second best.
+    groups = sorted(((count, rank) for rank, count in enumerate(counts) if count), reverse=True)
+    ranks = tuple(rank for _, rank in groups)
+    if len(ranks) == 1:
+        return (5,) + ranks
+    if len(ranks) == 2:
+        return (1,) + ranks
+    sequence = None
+    if set(ranks) == {ACE, 0, 1}:
+        sequence = ACE
+    elif ranks[0] - ranks[2] == 2:
+        sequence = ranks[0] + 1 if ranks[0] == ACE else ranks[0]
+    if sequence is not None:
+        return (4 if flush else 3, sequence)
+    return (2 if flush else 0,) + ranks
+
+
+def _classes(strengths):
+    # Maps each distinct strength to its class value, 1 for the weakest.
+    return {strength: value for value, strength in enumerate(sorted(set(strengths)), start=1)}
+
+
+def build_tables():
+    tables = _hash_tables((TEEN_PATTI_SIZE,) + POKER_SIZES)
+
+    vectors = list(_count_vectors(5))
+    masks = [mask for mask in range(1 << N_RANKS) if mask.bit_count() == 5]
+    plain = {counts: _poker_strength(counts, False) for counts in vectors}
+    flushes = {mask: _poker_strength([mask >> rank & 1 for rank in range(N_RANKS)], True) for mask in masks}
+    classes = _classes(list(plain.values()) + list(flushes.values()))
+
+    tables["rank5"] = np.zeros(_WAYS[N_RANKS][5], dtype=np.uint16)
+    for counts, strength in plain.items():
+        tables["rank5"][count_hash(counts)] = classes[strength]
+    # A 6 or 7 card hand is worth its best 5 cards: the best of the hands
+    # with one card fewer.
+    for size in (6, 7):
+        smaller = tables[f"rank{size - 1}"]
+        table = np.zeros(_WAYS[N_RANKS][size], dtype=np.uint16)
+        for counts in _count_vectors(size):
+            best = 0
+            for rank in range(N_RANKS):
+                if counts[rank]:
+                    fewer = counts[:rank] + (counts[rank] - 1,) + counts[rank + 1:]
+                    best = max(best, smaller[count_hash(fewer)])
+            table[count_hash(counts)] = best
+        tables[f"rank{size}"] = table
+
+    flush = np.zeros(1 << N_RANKS, dtype=np.uint16)
+    for mask, strength in flushes.items():
+        flush[mask] = classes[strength]
+    for mask in sorted(range(1 << N_RANKS), key=int.bit_count):
+        if 5 < mask.bit_count() <= MAX_CARDS:
+            flush[mask] = max(flush[mask ^ (1 << rank)] for rank in _mask_ranks(mask))
+    tables["flush"] = flush
+
+    categories = np.zeros(len(classes) + 1, dtype=np.uint8)
+    for strength, value in classes.items():
+        categories[value] = strength[0]
+    tables["poker_categories"] = categories
+
+    vectors = list(_count_vectors(TEEN_PATTI_SIZE))
+    masks = [mask for mask in range(1 << N_RANKS) if mask.bit_count() == TEEN_PATTI_SIZE]
+    plain = {counts: _teen_patti_strength(counts, False) for counts in vectors}
+    flushes = {mask: _teen_patti_strength([mask >> rank & 1 for rank in range(N_RANKS)], True) for mask in masks}
+    classes = _classes(list(plain.values()) + list(flushes.values()))
+    tables["teen3"] = np.zeros(_WAYS[N_RANKS][TEEN_PATTI_SIZE], dtype=np.uint16)
+    for counts, strength in plain.items():
+        tables["teen3"][count_hash(counts)] = classes[strength]
+    tables["teen3_flush"] = np.zeros(1 << N_RANKS, dtype=np.uint16)
+    for mask, strength in flushes.items():
+        tables["teen3_flush"][mask] = classes[strength]
+    categories = np.zeros(len(classes) + 1, dtype=np.uint8)
+    for strength, value in classes.items():
+        categories[value] = strength[0]
+    tables["teen_categories"] = categories
+    return tables
+
+
+class HandEvaluator:
+    # Scalar methods take a list of card ints; the *_many methods take an
+    # (N, k) int array of hands and return an array of N values.
+
+    def __init__(self, tables):
+        self.tables = tables
+        self._views = {name: npy_cache.flat_view(array) for name, array in tables.items()}
+
+    def _lookup(self, size):
+        if size == TEEN_PATTI_SIZE:
+            return self._views["low3"], self._views["teen3"]
+        if size not in POKER_SIZES:
+            raise ValueError("Poker hands have 5 to 7 cards.")
+        return self._views[f"low{size}"], self._views[f"rank{size}"]
+
+    def evaluate(self, cards):
+        low_hash, rank_table = self._lookup(len(cards))
+        low = high = suit_key = 0
+        for card in cards:
+            low += LOW_WEIGHTS[card]
+            high += HIGH_WEIGHTS[card]
+            suit_key += SUIT_WEIGHTS[card]
+        value = rank_table[low_hash[low] + self._views["high"][high]]
+        suit = self._views["flush_suit"][suit_key]
+        if suit != NO_FLUSH:
+            mask = 0
+            for card in cards:
+                if card & 3 == suit:
+                    mask |= RANK_BITS[card]
+            value = max(value, self._views["flush"][mask])
+        return value
+
+    def evaluate_many(self, hands):
+        hands = np.ascontiguousarray(hands, dtype=np.int64)
+        size = hands.shape[1]
+        self._lookup(size)
+        low = _LOW_WEIGHT_ARRAY[hands].sum(axis=1)
+        high = _HIGH_WEIGHT_ARRAY[hands].sum(axis=1)
+        values = self.tables[f"rank{size}"][self.tables[f"low{size}"][low] + self.tables["high"][high]]
+
+        suits = self.tables["flush_suit"][_SUIT_WEIGHT_ARRAY[hands].sum(axis=1)]
+        flushed = np.flatnonzero(suits != NO_FLUSH)
+        if flushed.size:
+            in_suit = (hands[flushed] & 3) == suits[flushed, None]
+            masks = np.where(in_suit, _RANK_BIT_ARRAY[hands[flushed]], 0).sum(axis=1)
+            values[flushed] = np.maximum(values[flushed], self.tables["flush"][masks])
+        return values
+
+    def teen_patti(self, cards):
+        if len(cards) != TEEN_PATTI_SIZE:
+            raise ValueError("Teen Patti hands have 3 cards.")
+        first, second, third = cards
+        if first & 3 == second & 3 == third & 3:
+            return self._views["teen3_flush"][RANK_BITS[first] | RANK_BITS[second] | RANK_BITS[third]]
+        low = LOW_WEIGHTS[first] + LOW_WEIGHTS[second] + LOW_WEIGHTS[third]
+        high = HIGH_WEIGHTS[first] + HIGH_WEIGHTS[second] + HIGH_WEIGHTS[third]
+        return self._views["teen3"][self._views["low3"][low] + self._views["high"][high]]
+
+    def teen_patti_many(self, hands):
+        hands = np.ascontiguousarray(hands, dtype=np.int64)
+        if hands.shape[1] != TEEN_PATTI_SIZE:
+            raise ValueError("Teen Patti hands have 3 cards.")
+        low = _LOW_WEIGHT_ARRAY[hands].sum(axis=1)
+        high = _HIGH_WEIGHT_ARRAY[hands].sum(axis=1)
+        values = self.tables["teen3"][self.tables["low3"][low] + self.tables["high"][high]]
+        suits = hands & 3
+        flushed = np.flatnonzero((suits == suits[:, :1]).all(axis=1))
+        if flushed.size:
+            masks = _RANK_BIT_ARRAY[hands[flushed]].sum(axis=1)
+            values[flushed] = self.tables["teen3_flush"][masks]
+        return values
+
+    def category(self, value):
+        return POKER_CATEGORIES[self._views["poker_categories"][value]]
+
+    def teen_patti_category(self, value):
+        return TEEN_PATTI_CATEGORIES[self._views["teen_categories"][value]]
+
+
+_evaluators = {}
+
+
+def open_evaluator(directory):
+    # Cached per directory; builds and saves the tables on first use.
+    if directory not in _evaluators:
+        _evaluators[directory] = HandEvaluator(npy_cache.load_arrays(directory, TABLE_NAMES, build_tables))
+    return _evaluators[directory]
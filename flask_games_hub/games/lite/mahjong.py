@@ -0,0 +1,236 @@
+import random
+from functools import lru_cache
+
+import numpy as np
+
+from games.lite import npy_cache
+
+# Riichi-style Mahjong tiles as 34 kinds: 0-8 characters (1m-9m), 9-17
+# circles (1p-9p), 18-26 bamboo (1s-9s) and 27-33 honours (winds then
+# dragons). Hands are 34-length count vectors.
+#
+# Shanten (tiles away from a complete hand, -1 when complete) comes from a
+# precomputed table per suit: each suit's nine counts, read as a base-5
+# number, index an entry holding the most partial blocks (taatsu: pairs
+# and two-tile waits) reachable with m = 0..4 melds, with and without the
+# hand's pair. A hand's entries for its three suits and honours are then
+# combined with shanten = 8 - 2m - min(t, 4 - m) - pair. Seven pairs and
+# thirteen orphans are counted separately.
+#
+# An entry packs ten 3-bit fields (t + 1, 0 for unreachable) into a uint32;
+# the dense table over all 5**9 count vectors is about 7.8 MB.
+
+KINDS = 34
+SUIT_SIZE = 9
+HONORS = range(27, 34)
+TERMINALS_AND_HONORS = (0, 8, 9, 17, 18, 26) + tuple(HONORS)
+HAND_SIZE = 13
+COPIES = 4
+# Tiles left in the wall when a round ends without a winner.
+DEAD_WALL = 14
+HONOR_NAMES = ("East", "South", "West", "North", "White", "Green", "Red")
+
+MAX_MELDS = 4
+MAX_TAATSU = 4
+POWERS = tuple(5 ** index for index in range(SUIT_SIZE))
+TABLE_NAMES = ("suits",)
+UNREACHABLE = -1
+
+
+def tile_name(kind):
+    if kind >= 27:
+        return HONOR_NAMES[kind - 27]
+    return f"{kind % 9 + 1}{'mps'[kind // 9]}"
+
+
+def counts_of(tiles):
+    counts = [0] * KINDS
+    for kind in tiles:
+        counts[kind] += 1
+    return counts
+
+
+def _meld(entry):
+    return tuple(
+        entry[index - 1] if index % 5 else UNREACHABLE
+        for index in range(10)
+    )
+
+
+def _taatsu(entry):
+    return tuple(min(t + 1, MAX_TAATSU) if t >= 0 else UNREACHABLE for t in entry)
+
+
+def _head(entry):
+    return (UNREACHABLE,) * 5 + entry[:5]
+
+
+def _best(*entries):
+    return tuple(max(values) for values in zip(*entries))
+
+
+def build_tables():
+    # Fills every suit vector of at most 14 tiles by peeling blocks off its
+    # lowest tile: leave it unused, or make it part of a triplet, run, pair
+    # (as the hand's pair or a taatsu) or a two-tile wait.
+    entries = {0: (0,) + (UNREACHABLE,) * 9}
+
+    def entry_for(code, counts):
+        found = entries.get(code)
+        if found is not None:
+            return found
+        low = next(index for index in range(SUIT_SIZE) if counts[index])
+
+        def without(*indexes):
+            for index in indexes:
+                counts[index] -= 1
+            result = entry_for(code - sum(POWERS[index] for index in indexes), counts)
+            for index in indexes:
+                counts[index] += 1
+            return result
+
+        options = [without(low)]
+        if counts[low] >= 3:
+            options.append(_meld(without(low, low, low)))
+        if low <= 6 and counts[low + 1] and counts[low + 2]:
+            options.append(_meld(without(low, low + 1, low + 2)))
+        if counts[low] >= 2:
+            paired = without(low, low)
+            options.append(_head(paired))
+            options.append(_taatsu(paired))
+        if low <= 7 and counts[low + 1]:
+            options.append(_taatsu(without(low, low + 1)))
+        if low <= 6 and counts[low + 2]:
+            options.append(_taatsu(without(low, low + 2)))
+        entries[code] = found = _best(*options)
+        return found
+
+    table = np.zeros(5 ** SUIT_SIZE, dtype=np.uint32)
+    counts = [0] * SUIT_SIZE
+    for code in range(5 ** SUIT_SIZE):
+        value = code
+        total = 0
+        for index in range(SUIT_SIZE):
+            value, counts[index] = divmod(value, 5)
+            total += counts[index]
+        if total > 14:
+            continue
+        packed = 0
+        for field, t in enumerate(entry_for(code, counts)):
+            packed |= (t + 1) << (3 * field)
+        table[code] = packed
+    return {"suits": table}
+
+
+@lru_cache(maxsize=None)
+def _unpack(packed):
+    return tuple(((packed >> (3 * field)) & 7) - 1 for field in range(10))
+
+
+@lru_cache(maxsize=100_000)
+def _combine(first, second):
+    combined = [UNREACHABLE] * 10
+    for pair_a in (0, 1):
+        for melds_a in range(MAX_MELDS + 1):
+            t_a = first[pair_a * 5 + melds_a]
+            if t_a < 0:
+                continue
+            for pair_b in (0, 1 - pair_a):
+                for melds_b in range(MAX_MELDS + 1 - melds_a):
+                    t_b = second[pair_b * 5 + melds_b]
+                    if t_b < 0:
+                        continue
+                    index = (pair_a + pair_b) * 5 + melds_a + melds_b
+                    t = min(t_a + t_b, MAX_TAATSU)
+                    if t > combined[index]:
+                        combined[index] = t
+    return tuple(combined)
+
+
+class ShantenTables:
+
+    def __init__(self, tables):
+        self._suits = npy_cache.flat_view(tables["suits"])
+
+    def _entry(self, counts, start):
+        code = 0
+        for index in range(SUIT_SIZE):
+            code += counts[start + index] * POWERS[index]
+        return _unpack(self._suits[code])
+
+    def regular_shanten(self, counts):
+        combined = self._entry(counts, 0)
+        combined = _combine(combined, self._entry(counts, 9))
+        combined = _combine(combined, self._entry(counts, 18))
+        for kind in HONORS:
+            if counts[kind]:
+                # A lone honour has no neighbours, so its suit entry is the
+                # entry of the vector (count, 0, ..., 0), whose code is count.
+                combined = _combine(combined, _unpack(self._suits[counts[kind]]))
+        best = 8
+        for pair in (0, 1):
+            for melds in range(MAX_MELDS + 1):
+                t = combined[pair * 5 + melds]
+                if t >= 0:
+                    best = min(best, 8 - 2 * melds - min(t, MAX_MELDS - melds) - pair)
+        return best
+
+    def shanten(self, counts):
+        # Least shanten over regular hands, seven pairs and thirteen orphans.
+        pairs = sum(1 for count in counts if count >= 2)
+        kinds = sum(1 for count in counts if count)
+        seven_pairs = 6 - pairs + max(0, 7 - kinds)
+        orphans = sum(1 for kind in TERMINALS_AND_HONORS if counts[kind])
+        orphan_pair = any(counts[kind] >= 2 for kind in TERMINALS_AND_HONORS)
+        thirteen_orphans = 13 - orphans - orphan_pair
+        return min(self.regular_shanten(counts), seven_pairs, thirteen_orphans)
+
+    def is_complete(self, counts):
+        return self.shanten(counts) == -1
+
+    def useful_tiles(self, counts, visible):
+        # {kind: copies left} of the draws that lower the shanten of a
+        # 13-tile hand; `visible` counts every tile the player can see.
+        current = self.shanten(counts)
+        useful = {}
+        for kind in range(KINDS):
+            left = COPIES - visible[kind]
+            if left <= 0:
+                continue
+            counts[kind] += 1
+            if self.shanten(counts) < current:
+                useful[kind] = left
+            counts[kind] -= 1
+        return useful
+
+    def discard_options(self, counts, visible):
+        # [(shanten after, useful copies, kind)] for every discard of a
+        # 14-tile hand, best first.
+        options = []
+        for kind in range(KINDS):
+            if not counts[kind]:
+                continue
+            counts[kind] -= 1
+            after = self.shanten(counts)
+            useful = sum(self.useful_tiles(counts, visible).values())
+            counts[kind] += 1
+            options.append((after, -useful, kind))
+        options.sort()
+        return [(after, -useful, kind) for after, useful, kind in options]
+
+
+_loaded = {}
+
+
+def open_tables(directory):
+    # Cached per directory; builds and saves the tables on first use.
+    if directory not in _loaded:
+        _loaded[directory] = ShantenTables(npy_cache.load_arrays(directory, TABLE_NAMES, build_tables))
+    return _loaded[directory]
+
+
+def new_wall(rng=None):
+    rng = rng or random.Random()
+    wall = [kind for kind in range(KINDS) for _ in range(COPIES)]
+    rng.shuffle(wall)
+    return wall
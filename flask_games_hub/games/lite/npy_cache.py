@@ -0,0 +1,73 @@
+import logging
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+# Precomputed tables kept as one .npy file per array in a directory. Loading
+# memory-maps them read-only, so every process shares one page-cache copy.
+
+logger = logging.getLogger(__name__)
+
+
+def save_arrays(directory, arrays):
+    # Each array goes to a temporary file of its own first, so processes
+    # building the same tables at once never write into each other's file;
+    # the last os.replace wins with a complete copy.
+    os.makedirs(directory, exist_ok=True)
+    for name, array in arrays.items():
+        handle, temporary = tempfile.mkstemp(dir=directory, prefix=f"{name}.", suffix=".tmp.npy")
+        try:
+            with os.fdopen(handle, "wb") as output:
+                np.save(output, np.ascontiguousarray(array))
+            os.chmod(temporary, 0o644)
+            os.replace(temporary, os.path.join(directory, f"{name}.npy"))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+
+def has_arrays(directory, names):
+    return all(os.path.exists(os.path.join(directory, f"{name}.npy")) for name in names)
+
+
+def load_arrays(directory, names, build):
+    # Returns {name: read-only memmap}, calling build() and saving its result
+    # first if any of the files is missing.
+    if not has_arrays(directory, names):
+        save_arrays(directory, build())
+    return {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in names}
+
+
+_building = set()
+_building_lock = threading.Lock()
+
+
+def open_in_background(directory, names, open_tables):
+    # For tables that take seconds to build: returns open_tables(directory)
+    # when the files exist, else None after starting one background thread
+    # that calls it (building and saving them), so no request waits. A
+    # failed build is logged and retried on the next call.
+    if has_arrays(directory, names):
+        return open_tables(directory)
+    with _building_lock:
+        if directory not in _building:
+            _building.add(directory)
+            threading.Thread(target=_build, args=(directory, open_tables), daemon=True).start()
+    return None
+
+
+def _build(directory, open_tables):
+    try:
+        open_tables(directory)
+    except Exception:
+        logger.exception("Building the tables in %s failed", directory)
+        with _building_lock:
+            _building.discard(directory)
+
+
+def flat_view(array):
+    # A flat memoryview over `array`; indexing it gives plain ints, which is
+    # much faster than NumPy scalar indexing in pure-Python loops.
+    return memoryview(array.reshape(-1)).cast("B").cast(array.dtype.char)
@@ -0,0 +1,104 @@
+import mmap
+import os
+import random
+import struct
+
+# A puzzle bank is one file of fixed-size records grouped by grade:
+#   header:  magic, version, record size, number of grades
+#   grades:  name, index of the grade's first record, record count
+#   records: record_size bytes each, all grades back to back
+# Servers memory-map the file read-only, so every worker process shares the
+# same page-cache copy and sampling a puzzle is one slice.
+
+MAGIC = b"PZBK"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHH")
+_GRADE = struct.Struct("<16sQQ")
+
+
+class PuzzleBank:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as handle:
+            self._stat = os.fstat(handle.fileno())
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.record_size, grade_count = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {VERSION} puzzle bank.")
+
+        self.grades = {}
+        offset = _HEADER.size
+        for _ in range(grade_count):
+            name, first, count = _GRADE.unpack_from(self._map, offset)
+            self.grades[name.rstrip(b"\0").decode("ascii")] = (first, count)
+            offset += _GRADE.size
+        self._data_start = offset
+
+    def is_stale(self):
+        try:
+            current = os.stat(self.path)
+        except OSError:
+            return True
+        return (current.st_ino, current.st_mtime_ns) != (self._stat.st_ino, self._stat.st_mtime_ns)
+
+    def count(self, grade):
+        return self.grades.get(grade, (0, 0))[1]
+
+    def record(self, grade, index):
+        first, count = self.grades[grade]
+        if not 0 <= index < count:
+            raise IndexError(index)
+        start = self._data_start + (first + index) * self.record_size
+        return self._map[start:start + self.record_size]
+
+    def sample(self, grade, rng=random):
+        return self.record(grade, rng.randrange(self.count(grade)))
+
+    def close(self):
+        self._map.close()
+
+
+def write_bank(path, record_size, grades):
+    # `grades` maps grade name to a list of records. The file is written
+    # beside `path` and renamed over it, so running servers never see a
+    # partial bank and keep reading their old mapping until they reopen.
+    for name, records in grades.items():
+        if len(name.encode("ascii")) > 16:
+            raise ValueError(f"Grade name too long: {name}")
+        if any(len(record) != record_size for record in records):
+            raise ValueError(f"Every {name} record must be {record_size} bytes.")
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "wb") as handle:
+        handle.write(_HEADER.pack(MAGIC, VERSION, record_size, len(grades)))
+        first = 0
+        for name, records in grades.items():
+            handle.write(_GRADE.pack(name.encode("ascii"), first, len(records)))
+            first += len(records)
+        for records in grades.values():
+            for record in records:
+                handle.write(record)
+    os.replace(temporary, path)
+
+
+_open_banks = {}
+
+
+def open_bank(path):
+    # Returns the cached mapping for `path`, reopening it if the file was
+    # rebuilt, or None when there is no usable bank.
+    bank = _open_banks.get(path)
+    if bank is not None and not bank.is_stale():
+        return bank
+    if bank is not None:
+        _open_banks.pop(path).close()
+    try:
+        bank = PuzzleBank(path)
+    except (OSError, ValueError, struct.error):
+        return None
+    _open_banks[path] = bank
+    return bank
@@ -1,9 +1,26 @@
-import random
-from copy import deepcopy
+import struct
 
-from flask import Blueprint, abort, redirect, render_template, request, session, url_for
+import click
+from flask import Blueprint, abort, current_app, jsonify, redirect, render_template, request, url_for
 
+from games import state_store
 from games.catalog import GAME_MAP
+from games.lite import cards, cube, cube_solver, duel_mcts, equity, expectimax, gin_rummy, hand_eval, mahjong, npy_cache
+from games.lite import sliding, yinsh
+from games.lite.duel_board import AI, HUMAN, DuelBoard
+from games.arimaa import engine as arimaa
+from games.backgammon import bearoff
+from games.backgammon import engine as backgammon
+from games.diplomacy import engine as diplomacy
+from games.go import engine as go_engine
+from games.hive import engine as hive
+from games.minesweeper import engine as minesweeper
+from games.onitama import engine as onitama
+from games.santorini import engine as santorini
+from games.minesweeper import solver as minesweeper_solver
+from games.minesweeper.pool import board_pool
+from games.sudoku import bank as sudoku_bank
+from games.sudoku import engine as sudoku
 
 lite_bp = Blueprint("lite", __name__, url_prefix="/games")
 
@@ -17,45 +34,43 @@ CARD_GAMES = {
     "cheat",
 }
 DUEL_GAMES = {
-    "backgammon",
     "chess",
-    "go",
-    "hive",
-    "santorini",
-    "onitama",
-    "yinsh-dvonn",
     "azul",
-    "arimaa",
-    "diplomacy",
 }
 PUZZLE_GAMES = {"sudoku", "minesweeper", "rubiks-cube"}
+BOARD_GAMES = {"go", "onitama", "santorini", "backgammon", "hive", "arimaa", "diplomacy", "yinsh-dvonn"}
 
 DUEL_ACTIONS = {
-    "backgammon": [("race", 5, 2), ("block", 3, 4), ("double", 7, 1)],
     "chess": [("tactic", 6, 1), ("develop", 4, 2), ("sacrifice", 8, 0)],
-    "go": [("influence", 4, 3), ("cut", 6, 1), ("capture", 7, 0)],
-    "hive": [("pin", 5, 2), ("swarm", 6, 1), ("queen-step", 7, 0)],
-    "santorini": [("build", 4, 3), ("climb", 6, 1), ("god-power", 8, 0)],
-    "onitama": [("tiger", 6, 1), ("dragon", 7, 0), ("boar", 4, 2)],
-    "yinsh-dvonn": [("ring-flip", 6, 1), ("stack", 5, 2), ("remove", 8, 0)],
     "azul": [("draft", 5, 2), ("pattern", 6, 1), ("deny", 7, 0)],
-    "arimaa": [("push", 5, 2), ("pull", 6, 1), ("trap", 8, 0)],
-    "diplomacy": [("support", 4, 3), ("convoy", 6, 1), ("betray", 8, 0)],
 }
 
 DUEL_BOARD_SIZES = {
-    "backgammon": 8,
     "chess": 8,
-    "go": 9,
-    "hive": 7,
-    "santorini": 7,
-    "onitama": 7,
-    "yinsh-dvonn": 7,
     "azul": 7,
-    "arimaa": 8,
-    "diplomacy": 8,
 }
 
+# Seconds of Monte-Carlo search per computer move.
+DUEL_AI_BUDGETS = {
+    "chess": 0.3,
+    "azul": 0.2,
+}
+
+# The computer raises, doubling the round's stake, when its hand's equity
+# against a random hand is at least this many percent.
+CARD_AI_RAISE_EQUITY = 55.0
+
+# Seconds of Monte-Carlo search per computer Go move, by board size.
+GO_AI_BUDGETS = {9: 0.5, 13: 0.8, 19: 1.2}
+ONITAMA_AI_BUDGET = 0.5
+SANTORINI_AI_BUDGET = 0.7
+BACKGAMMON_AI_BUDGET = 0.5
+HIVE_AI_BUDGET = 0.5
+ARIMAA_AI_BUDGET = 1.0
+YINSH_AI_BUDGET = 0.7
+# Seconds of order search shared by the six computer powers.
+DIPLOMACY_AI_BUDGET = 1.5
+
 
 def _state_key(slug):
     return f"lite_state_{slug}"
@@ -70,155 +85,93 @@ def _game_mode(slug):
         return "duel"
     if slug in PUZZLE_GAMES:
         return "puzzle"
+    if slug in BOARD_GAMES:
+        return "board"
     return None
 
 
-def _new_board(size=4):
-    return [[0 for _ in range(size)] for _ in range(size)]
-
-
-def _empty_cells(board):
-    cells = []
-    for row in range(len(board)):
-        for col in range(len(board[0])):
-            if board[row][col] == 0:
-                cells.append((row, col))
-    return cells
-
-
-def _spawn_2048_tile(board):
-    empty = _empty_cells(board)
-    if not empty:
-        return
-    row, col = random.choice(empty)
-    board[row][col] = 4 if random.random() < 0.1 else 2
-
-
-def _spawn_threes_tile(board):
-    empty = _empty_cells(board)
-    if not empty:
-        return
-    row, col = random.choice(empty)
-    board[row][col] = random.choice([1, 2])
-
-
-def _compress_line_2048(line):
-    values = [value for value in line if value != 0]
-    merged = []
-    skip = False
-    for index in range(len(values)):
-        if skip:
-            skip = False
-            continue
-        if index + 1 < len(values) and values[index] == values[index + 1]:
-            merged.append(values[index] * 2)
-            skip = True
-        else:
-            merged.append(values[index])
-    return merged + [0] * (len(line) - len(merged))
-
-
-def _compress_line_threes(line):
-    values = [value for value in line if value != 0]
-    merged = []
-    index = 0
-    while index < len(values):
-        if index + 1 < len(values):
-            current = values[index]
-            nxt = values[index + 1]
-            if {current, nxt} == {1, 2}:
-                merged.append(3)
-                index += 2
-                continue
-            if current >= 3 and current == nxt:
-                merged.append(current * 2)
-                index += 2
-                continue
-        merged.append(values[index])
-        index += 1
-    return merged + [0] * (len(line) - len(merged))
+def _sliding_mode(slug):
+    return "2048" if slug == "2048" else "threes"
 
 
-def _transpose(board):
-    return [list(row) for row in zip(*board)]
+def _init_sliding_state(slug):
+    mode = _sliding_mode(slug)
+    board = sliding.spawn_tile(sliding.spawn_tile(0, mode), mode)
+    return {
+        "mode": "sliding",
+        "board": sliding.decode_board(board, mode),
+        "message": "Use arrow buttons to move tiles.",
+        "game_over": False,
+        "target": SLIDING_GAMES[slug],
+    }
 
 
-def _move_board(board, direction, mode):
-    original = deepcopy(board)
-    compressor = _compress_line_2048 if mode == "2048" else _compress_line_threes
+def _card_game(slug):
+    return equity.HOLDEM if slug == "poker-texas-holdem" else equity.TEEN_PATTI
 
-    work = deepcopy(board)
-    if direction in ("up", "down"):
-        work = _transpose(work)
 
-    for row_index in range(len(work)):
-        row = work[row_index]
-        if direction in ("right", "down"):
-            row = list(reversed(row))
-        row = compressor(row)
-        if direction in ("right", "down"):
-            row = list(reversed(row))
-        work[row_index] = row
+def _deal_cards_round(slug):
+    # Returns (player cards, computer cards, board cards) as card ints. Only
+    # Hold'em has a board; it stays hidden until the showdown.
+    game = _card_game(slug)
+    hole = equity.HOLE_CARDS[game]
+    dealt = cards.deal(2 * hole + equity.BOARD_CARDS[game])
+    return dealt[:hole], dealt[hole:2 * hole], dealt[2 * hole:]
 
-    if direction in ("up", "down"):
-        work = _transpose(work)
 
-    changed = work != original
-    return work, changed
+def _hand_equity(slug, hand):
+    # Percentage equity of `hand` against one unknown hand, board unseen.
+    result = equity.calculator.calculate(current_app.config["HAND_TABLES_PATH"], _card_game(slug), [hand, None])
+    return result["players"][0]["equity"]
 
 
-def _can_move(board, mode):
-    for direction in ["left", "right", "up", "down"]:
-        moved, changed = _move_board(board, direction, mode)
-        if changed:
-            return True
-        if moved != board:
-            return True
-    return False
+def _card_showdown(slug, player, ai, board):
+    # Returns (player value, computer value, hand category names). Hold'em
+    # compares the best five of hole cards plus board; the other card games
+    # compare three-card Teen Patti hands.
+    evaluator = hand_eval.open_evaluator(current_app.config["HAND_TABLES_PATH"])
+    if _card_game(slug) == equity.HOLDEM:
+        player_value = evaluator.evaluate(player + board)
+        ai_value = evaluator.evaluate(ai + board)
+        return player_value, ai_value, (evaluator.category(player_value), evaluator.category(ai_value))
+    player_value = evaluator.teen_patti(player)
+    ai_value = evaluator.teen_patti(ai)
+    return player_value, ai_value, (evaluator.teen_patti_category(player_value), evaluator.teen_patti_category(ai_value))
 
 
-def _init_sliding_state(slug):
-    board = _new_board(4)
-    if slug == "2048":
-        _spawn_2048_tile(board)
-        _spawn_2048_tile(board)
-    else:
-        _spawn_threes_tile(board)
-        _spawn_threes_tile(board)
-    return {
-        "mode": "sliding",
-        "board": board,
-        "message": "Use arrow buttons to move tiles.",
+def _init_gin_state():
+    state = {
+        "mode": "cards",
+        "round": 0,
+        "player_score": 0,
+        "ai_score": 0,
+        "message": "",
         "game_over": False,
-        "target": SLIDING_GAMES[slug],
+        "winner": None,
     }
+    _gin_deal(state)
+    return state
 
 
-def _rank_hand(hand):
-    counts = {}
-    for card in hand:
-        counts[card] = counts.get(card, 0) + 1
-    sorted_counts = sorted(counts.values(), reverse=True)
-    unique_sorted = sorted(set(hand))
-    is_run = len(unique_sorted) == len(hand) and max(unique_sorted) - min(unique_sorted) == len(hand) - 1
-
-    if sorted_counts[0] == 3:
-        return 700 + max(hand)
-    if is_run:
-        return 500 + max(hand)
-    if sorted_counts[0] == 2:
-        pair_value = max(value for value, count in counts.items() if count == 2)
-        return 300 + pair_value
-    return 100 + sum(hand)
-
-
-def _deal_hand(size=3):
-    deck = list(range(1, 14)) * 4
-    random.shuffle(deck)
-    return sorted(deck[:size])
+def _init_mahjong_state():
+    state = {
+        "mode": "cards",
+        "round": 0,
+        "player_score": 0,
+        "ai_score": 0,
+        "message": "",
+        "game_over": False,
+        "winner": None,
+    }
+    _mahjong_deal(state)
+    return state
 
 
 def _init_cards_state(slug):
+    if slug == "gin-rummy":
+        return _init_gin_state()
+    if slug == "mahjong-card":
+        return _init_mahjong_state()
     return {
         "mode": "cards",
         "round": 1,
@@ -226,6 +179,8 @@ def _init_cards_state(slug):
         "ai_score": 0,
         "player_hand": [],
         "ai_hand": [],
+        "board_cards": [],
+        "pending": None,
         "message": f"Round 1 in {GAME_MAP[slug]['name']}. Click Deal Round.",
         "game_over": False,
         "winner": None,
@@ -238,7 +193,7 @@ def _init_duel_state(slug):
         "mode": "duel",
         "round": 1,
         "board_size": size,
-        "board": [[0 for _ in range(size)] for _ in range(size)],
+        "cells": [0] * (size * size),
         "player_score": 0,
         "ai_score": 0,
         "selected_move": DUEL_ACTIONS[slug][0][0],
@@ -249,76 +204,164 @@ def _init_duel_state(slug):
     }
 
 
-def _init_sudoku_state():
-    puzzle = [
-        [1, 0, 0, 4],
-        [0, 4, 1, 0],
-        [0, 1, 4, 0],
-        [4, 0, 0, 1],
-    ]
-    solution = [
-        [1, 2, 3, 4],
-        [3, 4, 1, 2],
-        [2, 1, 4, 3],
-        [4, 3, 2, 1],
-    ]
-    fixed = [[value != 0 for value in row] for row in puzzle]
+def _init_sudoku_state(level="easy"):
+    if level not in sudoku.GRADES:
+        level = "easy"
+    puzzle = sudoku_bank.sample_puzzle(current_app.config["SUDOKU_BANK_PATH"], level)
+    if puzzle is None:
+        puzzle, _ = sudoku.generate(level)
+    rows, cols, boxes = sudoku.unit_masks(puzzle)
     return {
         "mode": "puzzle",
         "puzzle_type": "sudoku",
-        "board": puzzle,
-        "fixed": fixed,
-        "solution": solution,
-        "message": "Fill all cells with numbers 1-4.",
+        "grade": level,
+        "board": [puzzle[row * 9:(row + 1) * 9] for row in range(9)],
+        "fixed": [[value != 0 for value in puzzle[row * 9:(row + 1) * 9]] for row in range(9)],
+        "masks": [rows, cols, boxes],
+        "filled": sum(1 for value in puzzle if value),
+        "message": "Fill every row, column and box with 1-9.",
         "game_over": False,
         "winner": None,
     }
 
 
-def _neighbor_cells(row, col, size):
-    for dr in [-1, 0, 1]:
-        for dc in [-1, 0, 1]:
-            if dr == 0 and dc == 0:
-                continue
-            nr, nc = row + dr, col + dc
-            if 0 <= nr < size and 0 <= nc < size:
-                yield nr, nc
-
-
-def _init_minesweeper_state():
-    size = 6
-    mine_count = 8
-    mines = set()
-    while len(mines) < mine_count:
-        mines.add((random.randint(0, size - 1), random.randint(0, size - 1)))
-
-    revealed = [[False for _ in range(size)] for _ in range(size)]
+def _init_minesweeper_state(tier="beginner"):
+    if tier not in minesweeper.TIERS:
+        tier = "beginner"
+    rows, cols, mine_count = minesweeper.TIERS[tier]
+    cells, start, no_guess = board_pool.take(rows, cols, mine_count)
+    revealed = bytearray(rows * cols)
+    opened = []
+    if start is not None:
+        opened = minesweeper.flood_reveal(cells, revealed, rows, cols, start)
     return {
         "mode": "puzzle",
         "puzzle_type": "minesweeper",
-        "size": size,
-        "mines": [list(item) for item in mines],
-        "revealed": revealed,
-        "message": "Reveal safe cells. Avoid mines.",
+        "tier": tier,
+        "rows": rows,
+        "cols": cols,
+        "mine_count": mine_count,
+        "cells": minesweeper.encode_cells(cells),
+        "revealed": minesweeper.encode_revealed(revealed),
+        "safe_left": rows * cols - mine_count - len(opened),
+        "no_guess": no_guess,
+        "message": (
+            "No-guess board: every safe cell can be found by logic from the opened area."
+            if no_guess
+            else "Reveal safe cells. Avoid mines."
+        ),
         "game_over": False,
         "winner": None,
     }
 
 
 def _init_rubiks_state():
-    target = [1, 2, 3, 4, 5, 6]
-    current = target[:]
-    for _ in range(8):
-        if random.random() < 0.5:
-            current = current[1:] + current[:1]
-        else:
-            current[0], current[1] = current[1], current[0]
     return {
         "mode": "puzzle",
         "puzzle_type": "rubiks-cube",
-        "target": target,
-        "current": current,
-        "message": "Rubik's Cube Lite: rotate or swap until order matches target.",
+        "cube": cube.to_state(cube.random_cube()),
+        "moves": 0,
+        "message": "Turn the faces until every side is a single colour.",
+        "game_over": False,
+        "winner": None,
+    }
+
+
+def _init_go_state(size=9):
+    return {
+        "mode": "board",
+        "board_size": size,
+        "moves": [],
+        "player_score": 0,
+        "ai_score": 0,
+        "message": "You play Black. Click a point to place a stone.",
+        "game_over": False,
+        "winner": None,
+    }
+
+
+def _init_onitama_state():
+    return {
+        "mode": "board",
+        "position": list(onitama.new_game()),
+        "selected_card": None,
+        "selected_square": None,
+        "message": "You are Red. Pick one of your cards, then a piece, then where it goes.",
+        "game_over": False,
+        "winner": None,
+    }
+
+
+def _init_santorini_state():
+    return {
+        "mode": "board",
+        "placing": [],
+        "position": None,
+        "selected_worker": None,
+        "selected_step": None,
+        "message": "You are Red. Click two squares to place your workers.",
+        "game_over": False,
+        "winner": None,
+    }
+
+
+def _init_backgammon_state():
+    dice = backgammon.roll()
+    return {
+        "mode": "board",
+        "board": list(backgammon.initial_position()),
+        "dice": list(dice),
+        "message": f"You are White and move from 24 down to 1. You rolled {dice[0]}-{dice[1]}.",
+        "game_over": False,
+        "winner": None,
+    }
+
+
+def _init_hive_state():
+    return {
+        "mode": "board",
+        "moves": [],
+        "selected_cell": None,
+        "selected_kind": None,
+        "message": "You are White. Pick a piece from your hand, then where to place it.",
+        "game_over": False,
+        "winner": None,
+    }
+
+
+def _init_arimaa_state():
+    return {
+        "mode": "board",
+        "board": list(arimaa.initial_position()),
+        "steps": [],
+        "selected": None,
+        "message": "You are Gold. Take up to four steps: pick a piece, then where it goes.",
+        "game_over": False,
+        "winner": None,
+    }
+
+
+def _init_yinsh_state():
+    return {
+        "mode": "board",
+        "position": list(yinsh.initial_position()),
+        "selected": None,
+        "rows": [],
+        "row": None,
+        "after": None,
+        "message": "You are White. Place your five rings, then move them to make rows of five markers.",
+        "game_over": False,
+        "winner": None,
+    }
+
+
+def _init_diplomacy_state(power="England"):
+    return {
+        "mode": "board",
+        "power": power,
+        "game": diplomacy.new_game(),
+        "report": [],
+        "message": f"You are {power}. Give each of your units an order, then submit them.",
         "game_over": False,
         "winner": None,
     }
@@ -338,25 +381,144 @@ def _init_state(slug):
         return _init_minesweeper_state()
     if slug == "rubiks-cube":
         return _init_rubiks_state()
+    if slug == "go":
+        return _init_go_state()
+    if slug == "onitama":
+        return _init_onitama_state()
+    if slug == "santorini":
+        return _init_santorini_state()
+    if slug == "backgammon":
+        return _init_backgammon_state()
+    if slug == "hive":
+        return _init_hive_state()
+    if slug == "arimaa":
+        return _init_arimaa_state()
+    if slug == "diplomacy":
+        return _init_diplomacy_state()
+    if slug == "yinsh-dvonn":
+        return _init_yinsh_state()
     return None
 
 
+# A field each game's current state has; stored states without it predate
+# that layout and are replaced by a new game.
+REQUIRED_FIELDS = {
+    "gin-rummy": ("stock",),
+    "mahjong-card": ("wall",),
+    "sudoku": ("masks",),
+    "minesweeper": ("cells",),
+    "rubiks-cube": ("cube",),
+    "go": ("moves",),
+    "onitama": ("position",),
+    "santorini": ("placing",),
+    "backgammon": ("dice",),
+    "hive": ("selected_kind",),
+    "arimaa": ("steps",),
+    "diplomacy": ("game",),
+    "yinsh-dvonn": ("rows",),
+}
+MODE_REQUIRED_FIELDS = {
+    "duel": ("cells", "board_size"),
+    "cards": ("pending",),
+}
+
+
+def _required_fields(slug):
+    if slug in REQUIRED_FIELDS:
+        return REQUIRED_FIELDS[slug]
+    return MODE_REQUIRED_FIELDS.get(_game_mode(slug), ())
+
+
 def _get_state(slug):
     key = _state_key(slug)
-    state = session.get(key)
-    if state is None:
+    state = state_store.load(key)
+    if state is None or not all(field in state for field in _required_fields(slug)):
         state = _init_state(slug)
-        session[key] = state
-    mode = _game_mode(slug)
-    if mode == "duel" and ("board" not in state or "board_size" not in state):
-        state = _init_duel_state(slug)
-        session[key] = state
+        state_store.save(key, state)
     return state
 
 
 def _save_state(slug, state):
-    session[_state_key(slug)] = state
-    session.modified = True
+    state_store.save(_state_key(slug), state)
+
+
+# Binary state codecs for the fixed-shape puzzles (see state_store). The
+# other games are stored as JSON.
+WINNERS = (None, "You", "Computer", "Draw")
+SLIDING_FIELDS = {"mode", "board", "message", "game_over", "target"}
+SUDOKU_FIELDS = {"mode", "puzzle_type", "grade", "board", "fixed", "masks", "filled", "message", "game_over", "winner"}
+SLIDING_HEADER = struct.Struct("<QHB")
+
+
+def _state_flags(state):
+    return state["game_over"] | WINNERS.index(state.get("winner")) << 1
+
+
+def _sliding_codec(slug):
+    mode = _sliding_mode(slug)
+
+    def pack(state):
+        # The 64-bit board (16 four-bit tile codes), target, flags, message.
+        if not SLIDING_FIELDS <= set(state) <= SLIDING_FIELDS | {"winner"} or state.get("winner") not in WINNERS:
+            return None
+        if state["mode"] != "sliding":
+            return None
+        board = sliding.encode_board(state["board"], mode)
+        return SLIDING_HEADER.pack(board, state["target"], _state_flags(state)) + state["message"].encode()
+
+    def unpack(data):
+        board, target, flags = SLIDING_HEADER.unpack_from(data)
+        state = {
+            "mode": "sliding",
+            "board": sliding.decode_board(board, mode),
+            "message": bytes(data[SLIDING_HEADER.size:]).decode(),
+            "game_over": bool(flags & 1),
+            "target": target,
+        }
+        if flags >> 1:
+            state["winner"] = WINNERS[flags >> 1]
+        return state
+
+    return pack, unpack
+
+
+def _pack_sudoku_state(state):
+    # Grade, flags, the grid two cells per byte, the fixed cells as an
+    # 81-bit mask, then the message. The unit masks and fill count are
+    # rebuilt from the grid.
+    if set(state) != SUDOKU_FIELDS or state["grade"] not in sudoku.GRADES or state["winner"] not in WINNERS:
+        return None
+    fixed = 0
+    for index, cell in enumerate(cell for row in state["fixed"] for cell in row):
+        fixed |= cell << index
+    return (
+        bytes((sudoku.GRADES.index(state["grade"]), _state_flags(state)))
+        + sudoku.pack([value for row in state["board"] for value in row])
+        + fixed.to_bytes(11, "little")
+        + state["message"].encode()
+    )
+
+
+def _unpack_sudoku_state(data):
+    grid = sudoku.unpack(data[2:2 + sudoku.PACKED_SIZE])
+    fixed = int.from_bytes(data[2 + sudoku.PACKED_SIZE:13 + sudoku.PACKED_SIZE], "little")
+    return {
+        "mode": "puzzle",
+        "puzzle_type": "sudoku",
+        "grade": sudoku.GRADES[data[0]],
+        "board": [grid[row * 9:(row + 1) * 9] for row in range(9)],
+        "fixed": [[bool(fixed >> (row * 9 + col) & 1) for col in range(9)] for row in range(9)],
+        "masks": list(sudoku.unit_masks(grid)),
+        "filled": sum(1 for value in grid if value),
+        "message": bytes(data[13 + sudoku.PACKED_SIZE:]).decode(),
+        "game_over": bool(data[1] & 1),
+        "winner": WINNERS[data[1] >> 1],
+    }
+
+
+state_store.register_codec(_state_key("2048"), *_sliding_codec("2048"))
+state_store.register_codec(_state_key("threes"), *_sliding_codec("threes"))
+state_store.register_codec(_state_key("sudoku"), _pack_sudoku_state, _unpack_sudoku_state)
 
 
 def _handle_sliding_action(slug, state, form):
@@ -364,27 +526,30 @@ def _handle_sliding_action(slug, state, form):
     if action == "new":
         return _init_sliding_state(slug)
 
-    if action not in {"left", "right", "up", "down"} or state["game_over"]:
+    if action not in {"left", "right", "up", "down", "hint"} or state["game_over"]:
+        return state
+
+    mode = _sliding_mode(slug)
+    board = sliding.encode_board(state["board"], mode)
+    if action == "hint":
+        direction = expectimax.hint(board, mode)
+        state["message"] = f"Hint: move {direction}." if direction else "No moves left."
         return state
 
-    mode = "2048" if slug == "2048" else "threes"
-    board, changed = _move_board(state["board"], action, mode)
-    if not changed:
+    moved = sliding.move(board, action, mode)
+    if moved == board:
         state["message"] = "No tiles moved with that direction."
         return state
 
-    state["board"] = board
-    if slug == "2048":
-        _spawn_2048_tile(state["board"])
-    else:
-        _spawn_threes_tile(state["board"])
+    board = sliding.spawn_tile(moved, mode)
+    state["board"] = sliding.decode_board(board, mode)
 
-    max_tile = max(max(row) for row in state["board"])
+    max_tile = sliding.code_to_value(sliding.max_code(board), mode)
     if max_tile >= state["target"]:
         state["game_over"] = True
         state["winner"] = "You"
         state["message"] = f"You reached {state['target']}!"
-    elif not _can_move(state["board"], mode):
+    elif not sliding.can_move(board, mode):
         state["game_over"] = True
         state["winner"] = "Computer"
         state["message"] = "No moves left. Try again."
@@ -394,25 +559,57 @@ def _handle_sliding_action(slug, state, form):
 
 
 def _handle_cards_action(slug, state, form):
+    if slug == "gin-rummy":
+        return _handle_gin_action(state, form)
+    if slug == "mahjong-card":
+        return _handle_mahjong_action(state, form)
     action = form.get("action")
     if action == "new":
         return _init_cards_state(slug)
-    if action != "deal" or state["game_over"]:
+    if state["game_over"]:
         return state
 
-    state["player_hand"] = _deal_hand(3)
-    state["ai_hand"] = _deal_hand(3)
-    player_rank = _rank_hand(state["player_hand"])
-    ai_rank = _rank_hand(state["ai_hand"])
+    pending = state["pending"]
+    if action == "deal" and pending is None:
+        player, ai, board = _deal_cards_round(slug)
+        stake = 2 if _hand_equity(slug, ai) >= CARD_AI_RAISE_EQUITY else 1
+        state["pending"] = {"player": player, "ai": ai, "board": board, "stake": stake}
+        state["player_hand"] = [cards.display_card(card) for card in player]
+        state["ai_hand"] = []
+        state["board_cards"] = []
+        odds = f"Your equity against a random hand: {_hand_equity(slug, player):.0f}%."
+        if stake > 1:
+            state["message"] = f"Computer raises: this round is worth {stake} points. {odds} Call or fold?"
+        else:
+            state["message"] = f"Computer checks. {odds} Check to show down."
+        return state
+    if pending is None:
+        return state
+    # After a raise the player calls or folds; after a check they can only
+    # check back, so the round always goes to the showdown.
+    if action not in (("call", "fold") if pending["stake"] > 1 else ("check",)):
+        return state
 
-    if player_rank > ai_rank:
-        state["player_score"] += 1
-        round_result = "You won this round."
-    elif ai_rank > player_rank:
+    state["pending"] = None
+    state["ai_hand"] = [cards.display_card(card) for card in pending["ai"]]
+    if action == "fold":
         state["ai_score"] += 1
-        round_result = "Computer won this round."
+        round_result = "You folded. Computer takes 1 point."
     else:
-        round_result = "Round draw."
+        state["board_cards"] = [cards.display_card(card) for card in pending["board"]]
+        player_value, ai_value, (player_name, ai_name) = _card_showdown(
+            slug, pending["player"], pending["ai"], pending["board"]
+        )
+        stake = pending["stake"]
+        points = f"{stake} point{'s' if stake > 1 else ''}"
+        if player_value > ai_value:
+            state["player_score"] += stake
+            round_result = f"You won {points} with {player_name} against {ai_name}."
+        elif ai_value > player_value:
+            state["ai_score"] += stake
+            round_result = f"Computer won {points} with {ai_name} against {player_name}."
+        else:
+            round_result = f"Round draw: {player_name} each."
 
     if state["player_score"] >= 5 or state["ai_score"] >= 5 or state["round"] >= 9:
         state["game_over"] = True
@@ -431,80 +628,333 @@ def _handle_cards_action(slug, state, form):
     return state
 
 
-def _duel_neighbors(row, col, size):
-    for dr, dc in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-        nr, nc = row + dr, col + dc
-        if 0 <= nr < size and 0 <= nc < size:
-            yield nr, nc
+def _gin_deal(state):
+    # Starts the next hand. The first turn alternates; on the computer's
+    # hands it plays its first turn straight away.
+    player, ai, stock, discard = gin_rummy.deal()
+    state["round"] += 1
+    state.update({
+        "hand": player,
+        "ai_hand": ai,
+        "stock": stock,
+        "discard": discard,
+        "phase": "draw",
+        "taken": None,
+        "reveal": None,
+    })
+    opening = f"Hand {state['round']}."
+    if state["round"] % 2 == 0:
+        _gin_computer_turn(state, opening)
+    else:
+        state["message"] = f"{opening} Draw from the stock or take the {cards.display_card(discard[-1])}."
+
+
+def _gin_points(state, knocker, result):
+    # Adds a settled knock to the scores; returns who scored and a summary.
+    other = "Computer" if knocker == "You" else "You"
+    scorer = knocker if result["knocker_wins"] else other
+    state["player_score" if scorer == "You" else "ai_score"] += result["points"]
+    if result["gin"]:
+        how = f"{knocker} went gin"
+    elif result["undercut"]:
+        how = f"{knocker} knocked with {result['knocker_deadwood']} but {other} undercut with {result['defender_deadwood']}"
+    else:
+        how = f"{knocker} knocked with {result['knocker_deadwood']} against {result['defender_deadwood']}"
+    if result["laid_off"]:
+        how += f" ({other} laid off {' '.join(cards.display_card(card) for card in result['laid_off'])})"
+    return f"{how}: {scorer} {'score' if scorer == 'You' else 'scores'} {result['points']}."
 
 
-def _duel_count_owner(board, owner):
-    total = 0
-    for row in board:
-        for value in row:
-            if value == owner:
-                total += 1
-    return total
+def _gin_end_hand(state, summary):
+    state["phase"] = "over"
+    state["reveal"] = [cards.display_card(card) for card in state["ai_hand"]]
+    if max(state["player_score"], state["ai_score"]) >= gin_rummy.TARGET_SCORE:
+        state["game_over"] = True
+        state["winner"] = "You" if state["player_score"] > state["ai_score"] else "Computer"
+        state["message"] = (
+            f"{summary} Match over: {state['winner']} won {max(state['player_score'], state['ai_score'])} "
+            f"- {min(state['player_score'], state['ai_score'])}."
+        )
+    else:
+        state["message"] = f"{summary} Deal the next hand."
 
 
-def _duel_empty_cells(board):
-    cells = []
-    for row in range(len(board)):
-        for col in range(len(board[row])):
-            if board[row][col] == 0:
-                cells.append((row, col))
-    return cells
+def _gin_computer_turn(state, played):
+    upcard = state["discard"][-1] if state["discard"] else None
+    seen = set(state["ai_hand"]) | set(state["discard"])
+    unseen = [card for card in range(cards.DECK_SIZE) if card not in seen]
+    source, hand, discarded, knock = gin_rummy.computer_turn(state["ai_hand"], upcard, unseen, state["stock"])
+    if source == "discard":
+        state["discard"].pop()
+        drew = f"took the {cards.display_card(upcard)}"
+    else:
+        state["stock"].pop()
+        drew = "drew from the stock"
+    state["ai_hand"] = hand
+    state["discard"].append(discarded)
+    played = f"{played} Computer {drew} and discarded the {cards.display_card(discarded)}"
+    if knock:
+        result = gin_rummy.settle(gin_rummy.mask_of(hand), gin_rummy.mask_of(state["hand"]))
+        _gin_end_hand(state, f"{played}. {_gin_points(state, 'Computer', result)}")
+    elif len(state["stock"]) <= gin_rummy.STOCK_FLOOR:
+        _gin_end_hand(state, f"{played}. The stock ran out: no score this hand.")
+    else:
+        state["phase"] = "draw"
+        state["message"] = f"{played}. Your draw."
 
 
-def _duel_apply_placement(board, row, col, owner, attack, defense):
-    size = len(board)
-    board[row][col] = owner
-
-    enemy = -1 if owner == 1 else 1
-    adjacent_enemy = []
-    for nr, nc in _duel_neighbors(row, col, size):
-        if board[nr][nc] == enemy:
-            adjacent_enemy.append((nr, nc))
-
-    random.shuffle(adjacent_enemy)
-    flips = min(len(adjacent_enemy), max(0, defense))
-    for index in range(flips):
-        nr, nc = adjacent_enemy[index]
-        board[nr][nc] = owner
-
-    if attack >= 7:
-        extra = []
-        for nr, nc in _duel_neighbors(row, col, size):
-            if board[nr][nc] == 0:
-                extra.append((nr, nc))
-        if extra:
-            er, ec = random.choice(extra)
-            board[er][ec] = owner
-
-
-def _duel_pick_ai_cell(board):
-    size = len(board)
-    ai_frontier = []
-    for row in range(size):
-        for col in range(size):
-            if board[row][col] != 0:
-                continue
-            for nr, nc in _duel_neighbors(row, col, size):
-                if board[nr][nc] == -1:
-                    ai_frontier.append((row, col))
-                    break
+def _handle_gin_action(state, form):
+    action = form.get("action")
+    if action == "new":
+        return _init_gin_state()
+    if state["game_over"]:
+        return state
+    if action == "next" and state["phase"] == "over":
+        _gin_deal(state)
+        return state
 
-    if ai_frontier:
-        return random.choice(ai_frontier)
+    if action == "draw" and state["phase"] == "draw":
+        if form.get("source") == "discard":
+            card = state["discard"].pop()
+            state["taken"] = card
+            drew = f"took the {cards.display_card(card)}"
+        else:
+            card = state["stock"].pop()
+            state["taken"] = None
+            drew = f"drew the {cards.display_card(card)}"
+        state["hand"].append(card)
+        state["phase"] = "discard"
+        state["message"] = f"You {drew}. Discard a card, or knock with it."
+        return state
+    if action != "discard" or state["phase"] != "discard":
+        return state
 
-    empty = _duel_empty_cells(board)
-    if not empty:
-        return None
-    return random.choice(empty)
+    try:
+        card = int(form.get("card", "-1"))
+    except ValueError:
+        card = -1
+    if card not in state["hand"] or card == state["taken"]:
+        state["message"] = "Discard a card from your hand (not the one you just took)."
+        return state
+    state["hand"].remove(card)
+    state["discard"].append(card)
+    state["taken"] = None
+    played = f"You discarded the {cards.display_card(card)}."
+    if form.get("knock") == "1":
+        mask = gin_rummy.mask_of(state["hand"])
+        if gin_rummy.deadwood(mask) > gin_rummy.KNOCK_LIMIT:
+            state["hand"].append(state["discard"].pop())
+            state["message"] = f"You need {gin_rummy.KNOCK_LIMIT} or less deadwood to knock."
+            return state
+        result = gin_rummy.settle(mask, gin_rummy.mask_of(state["ai_hand"]))
+        _gin_end_hand(state, f"{played} {_gin_points(state, 'You', result)}")
+        return state
+    if len(state["stock"]) <= gin_rummy.STOCK_FLOOR:
+        _gin_end_hand(state, f"{played} The stock ran out: no score this hand.")
+        return state
+    _gin_computer_turn(state, played)
+    return state
+
+
+def _gin_view(state):
+    # The player's hand grouped into its best melds, then deadwood, with
+    # which discards would leave few enough deadwood to knock.
+    hand = gin_rummy.mask_of(state["hand"])
+    melds, dead = gin_rummy.arrange(hand)
+    discarding = state["phase"] == "discard" and not state["game_over"]
+
+    def card_view(card):
+        return {
+            "card": card,
+            "text": cards.display_card(card),
+            "discard": discarding and card != state["taken"],
+            "knock": discarding and card != state["taken"]
+            and gin_rummy.deadwood(hand ^ (1 << card)) <= gin_rummy.KNOCK_LIMIT,
+        }
+
+    return {
+        "melds": [[card_view(card) for card in gin_rummy.cards_of(meld)] for meld in melds],
+        "deadwood": [card_view(card) for card in gin_rummy.cards_of(dead)],
+        "count": gin_rummy.deadwood(hand),
+        "upcard": cards.display_card(state["discard"][-1]) if state["discard"] else None,
+        "stock": len(state["stock"]),
+    }
+
+
+def _mahjong_tables():
+    return mahjong.open_tables(current_app.config["MAHJONG_TABLES_PATH"])
+
+
+def _mahjong_visible(state, hand):
+    # Tile counts one side can see: its own hand plus both discard rows.
+    return mahjong.counts_of(hand + state["discards"] + state["ai_discards"])
+
+
+def _mahjong_deal(state):
+    # Starts the next round with 13 tiles each. The first turn alternates;
+    # on the computer's rounds it plays its first turn straight away.
+    wall = mahjong.new_wall()
+    state["round"] += 1
+    state.update({
+        "hand": sorted(wall[:mahjong.HAND_SIZE]),
+        "ai_hand": sorted(wall[mahjong.HAND_SIZE:2 * mahjong.HAND_SIZE]),
+        "wall": wall[2 * mahjong.HAND_SIZE:],
+        "discards": [],
+        "ai_discards": [],
+        "drawn": None,
+        "phase": "discard",
+        "reveal": None,
+    })
+    opening = f"Round {state['round']}."
+    if state["round"] % 2 == 0:
+        _mahjong_computer_turn(state, opening)
+    else:
+        _mahjong_player_draw(state, opening)
+
+
+def _mahjong_end_round(state, summary, winner=None):
+    state["phase"] = "over"
+    state["drawn"] = None
+    state["reveal"] = [mahjong.tile_name(kind) for kind in sorted(state["ai_hand"])]
+    if winner is not None:
+        state["player_score" if winner == "You" else "ai_score"] += 1
+    if state["player_score"] >= 5 or state["ai_score"] >= 5 or state["round"] >= 9:
+        state["game_over"] = True
+        if state["player_score"] > state["ai_score"]:
+            state["winner"] = "You"
+            state["message"] = f"{summary} Match over. You win {state['player_score']} - {state['ai_score']}."
+        elif state["ai_score"] > state["player_score"]:
+            state["winner"] = "Computer"
+            state["message"] = f"{summary} Match over. Computer wins {state['ai_score']} - {state['player_score']}."
+        else:
+            state["winner"] = "Draw"
+            state["message"] = f"{summary} Match over. Draw {state['player_score']} - {state['ai_score']}."
+    else:
+        state["message"] = f"{summary} Deal the next round."
+
+
+def _mahjong_player_draw(state, played):
+    if len(state["wall"]) <= mahjong.DEAD_WALL:
+        _mahjong_end_round(state, f"{played} The wall ran out: no score this round.")
+        return
+    tile = state["wall"].pop()
+    state["hand"] = sorted(state["hand"])
+    state["hand"].append(tile)
+    state["drawn"] = tile
+    drew = f"You drew the {mahjong.tile_name(tile)}"
+    if _mahjong_tables().is_complete(mahjong.counts_of(state["hand"])):
+        _mahjong_end_round(state, f"{played} {drew}: a complete hand, you win the round.", "You")
+        return
+    state["phase"] = "discard"
+    state["message"] = f"{played} {drew}. Discard a tile."
 
 
-def _duel_finish_if_needed(state):
-    if _duel_empty_cells(state["board"]):
+def _mahjong_computer_turn(state, played):
+    # The computer draws and keeps the discard that leaves it closest to a
+    # complete hand with the most tiles left that would improve it.
+    tables = _mahjong_tables()
+    if len(state["wall"]) <= mahjong.DEAD_WALL:
+        _mahjong_end_round(state, f"{played} The wall ran out: no score this round.")
+        return
+    hand = state["ai_hand"] + [state["wall"].pop()]
+    counts = mahjong.counts_of(hand)
+    if tables.is_complete(counts):
+        state["ai_hand"] = hand
+        _mahjong_end_round(state, f"{played} Computer drew a complete hand and wins the round.", "Computer")
+        return
+    _, _, discard = tables.discard_options(counts, _mahjong_visible(state, hand))[0]
+    hand.remove(discard)
+    state["ai_hand"] = sorted(hand)
+    state["ai_discards"].append(discard)
+    played = f"{played} Computer discarded the {mahjong.tile_name(discard)}."
+    if tables.is_complete(mahjong.counts_of(state["hand"] + [discard])):
+        state["hand"].append(discard)
+        _mahjong_end_round(state, f"{played} It completes your hand: you win the round.", "You")
+        return
+    _mahjong_player_draw(state, played)
+
+
+def _handle_mahjong_action(state, form):
+    action = form.get("action")
+    if action == "new":
+        return _init_mahjong_state()
+    if state["game_over"]:
+        return state
+    if action == "next" and state["phase"] == "over":
+        _mahjong_deal(state)
+        return state
+    if action != "discard" or state["phase"] != "discard":
+        return state
+
+    try:
+        tile = int(form.get("tile", "-1"))
+    except ValueError:
+        tile = -1
+    if tile not in state["hand"]:
+        state["message"] = "Discard a tile from your hand."
+        return state
+    state["hand"].remove(tile)
+    state["hand"].sort()
+    state["discards"].append(tile)
+    state["drawn"] = None
+    played = f"You discarded the {mahjong.tile_name(tile)}."
+    if _mahjong_tables().is_complete(mahjong.counts_of(state["ai_hand"] + [tile])):
+        state["ai_hand"].append(tile)
+        _mahjong_end_round(state, f"{played} It completes the computer's hand: Computer wins the round.", "Computer")
+        return state
+    _mahjong_computer_turn(state, played)
+    return state
+
+
+def _mahjong_view(state):
+    # The player's tiles with, while discarding, the shanten and number of
+    # useful tiles left after each possible discard, best first in `hint`.
+    tables = _mahjong_tables()
+    hand = state["hand"]
+    discarding = state["phase"] == "discard" and not state["game_over"]
+    options = {}
+    if discarding:
+        ranked = tables.discard_options(mahjong.counts_of(hand), _mahjong_visible(state, hand))
+        options = {kind: (after, useful) for after, useful, kind in ranked}
+    shanten = tables.shanten(mahjong.counts_of(hand))
+
+    def tile_view(kind, drawn=False):
+        after, useful = options.get(kind, (None, None))
+        return {
+            "kind": kind,
+            "text": mahjong.tile_name(kind),
+            "suit": "honor" if kind >= 27 else "mps"[kind // 9],
+            "drawn": drawn,
+            "discard": discarding,
+            "after": after,
+            "useful": useful,
+        }
+
+    tiles = [tile_view(kind) for kind in hand]
+    if state["drawn"] is not None and tiles:
+        tiles[-1]["drawn"] = True
+    hint = None
+    if options:
+        after, useful, kind = ranked[0]
+        hint = {"text": mahjong.tile_name(kind), "after": after, "useful": useful}
+    return {
+        "tiles": tiles,
+        "shanten": shanten,
+        "hint": hint,
+        "discards": [mahjong.tile_name(kind) for kind in state["discards"]],
+        "ai_discards": [mahjong.tile_name(kind) for kind in state["ai_discards"]],
+        "wall": max(len(state["wall"]) - mahjong.DEAD_WALL, 0),
+    }
+
+
+def _duel_record_board(state, board):
+    state["cells"] = board.cells
+    state["player_score"] = board.counts[HUMAN]
+    state["ai_score"] = board.counts[AI]
+
+
+def _duel_finish_if_needed(state, board):
+    if not board.is_full():
         return
 
     state["game_over"] = True
@@ -549,7 +999,8 @@ def _handle_duel_action(slug, state, form):
     if not (0 <= row < size and 0 <= col < size):
         state["message"] = "Cell out of range."
         return state
-    if state["board"][row][col] != 0:
+    board = DuelBoard(size, state["cells"])
+    if board.cells[row * size + col] != 0:
         state["message"] = "That cell is already occupied."
         return state
 
@@ -565,79 +1016,109 @@ def _handle_duel_action(slug, state, form):
         return state
 
     state["selected_move"] = player_action[0]
-    _duel_apply_placement(state["board"], row, col, 1, player_action[1], player_action[2])
-    state["player_score"] = _duel_count_owner(state["board"], 1)
-    state["ai_score"] = _duel_count_owner(state["board"], -1)
+    board.place(row * size + col, HUMAN, player_action[1], player_action[2])
+    _duel_record_board(state, board)
 
-    _duel_finish_if_needed(state)
+    _duel_finish_if_needed(state, board)
     if state["game_over"]:
         return state
 
-    ai_action = random.choice(state["actions"])
-    ai_cell = _duel_pick_ai_cell(state["board"])
-    if ai_cell is not None:
-        ai_row, ai_col = ai_cell
-        _duel_apply_placement(state["board"], ai_row, ai_col, -1, ai_action[1], ai_action[2])
-
-    state["player_score"] = _duel_count_owner(state["board"], 1)
-    state["ai_score"] = _duel_count_owner(state["board"], -1)
+    cell, style, search = duel_mcts.choose_move(
+        board.cells,
+        size,
+        state["actions"],
+        budget=DUEL_AI_BUDGETS.get(slug, duel_mcts.BUDGET_SECONDS),
+        candidates=board.contested() or None,
+    )
+    ai_action = state["actions"][style]
+    ai_cell = divmod(cell, size)
+    board.place(cell, AI, ai_action[1], ai_action[2])
+    _duel_record_board(state, board)
     state["round"] += 1
 
-    _duel_finish_if_needed(state)
+    _duel_finish_if_needed(state, board)
     if not state["game_over"]:
         state["message"] = (
             f"You played {player_action[0]} at ({row},{col}). "
-            f"Computer played {ai_action[0]}"
-            + (f" at ({ai_cell[0]},{ai_cell[1]})." if ai_cell else ".")
+            f"Computer played {ai_action[0]} at ({ai_cell[0]},{ai_cell[1]}) "
+            f"after {search['playouts']} playouts."
         )
 
     return state
 
 
-def _count_adjacent_mines(mines, row, col, size):
-    mine_set = {(item[0], item[1]) for item in mines}
-    count = 0
-    for nr, nc in _neighbor_cells(row, col, size):
-        if (nr, nc) in mine_set:
-            count += 1
-    return count
+def _minesweeper_record_reveal(state, revealed, opened):
+    state["revealed"] = minesweeper.encode_revealed(revealed)
+    state["safe_left"] -= opened
+    if state["safe_left"] <= 0:
+        state["game_over"] = True
+        state["winner"] = "You"
+        state["message"] = "You cleared all safe cells."
 
 
-def _reveal_safe_cells(state, row, col):
-    size = state["size"]
-    mine_set = {(item[0], item[1]) for item in state["mines"]}
-    stack = [(row, col)]
-    seen = set()
+def _handle_minesweeper_action(state, form):
+    action = form.get("action")
+    rows, cols = state["rows"], state["cols"]
+    cells = minesweeper.decode_cells(state["cells"])
+    revealed = minesweeper.decode_revealed(state["revealed"])
 
-    while stack:
-        cr, cc = stack.pop()
-        if (cr, cc) in seen:
-            continue
-        seen.add((cr, cc))
-        if (cr, cc) in mine_set:
-            continue
+    if action == "hint":
+        index, probability = minesweeper_solver.safest_cell(cells, revealed, rows, cols, state["mine_count"])
+        if index is None:
+            return state
+        row, col = divmod(index, cols)
+        if probability == 0:
+            state["message"] = f"Hint: ({row},{col}) is safe."
+        else:
+            state["message"] = f"Hint: no cell is certainly safe. ({row},{col}) has a {probability:.0%} mine chance."
+        return state
+
+    if action == "auto":
+        opened = 0
+        safe = minesweeper_solver.certain_safe_cells(cells, revealed, rows, cols, state["mine_count"])
+        while safe:
+            for index in safe:
+                opened += len(minesweeper.flood_reveal(cells, revealed, rows, cols, index))
+            safe = minesweeper_solver.certain_safe_cells(cells, revealed, rows, cols, state["mine_count"])
+        if opened:
+            state["message"] = f"Auto-play revealed {opened} safe cells."
+        else:
+            state["message"] = "No cell is certainly safe. Take a hint or guess."
+        _minesweeper_record_reveal(state, revealed, opened)
+        return state
 
-        state["revealed"][cr][cc] = True
-        adjacent = _count_adjacent_mines(state["mines"], cr, cc, size)
-        if adjacent == 0:
-            for nr, nc in _neighbor_cells(cr, cc, size):
-                if not state["revealed"][nr][nc]:
-                    stack.append((nr, nc))
+    if action != "reveal":
+        return state
+    try:
+        row = int(form.get("row", "-1"))
+        col = int(form.get("col", "-1"))
+    except ValueError:
+        state["message"] = "Invalid cell."
+        return state
+    if not (0 <= row < rows and 0 <= col < cols):
+        state["message"] = "Cell out of bounds."
+        return state
 
+    index = row * cols + col
+    if cells[index] == minesweeper.MINE:
+        state["game_over"] = True
+        state["winner"] = "Computer"
+        state["message"] = "Mine hit. Game over."
+        return state
 
-def _all_safe_revealed(state):
-    size = state["size"]
-    mine_set = {(item[0], item[1]) for item in state["mines"]}
-    for row in range(size):
-        for col in range(size):
-            if (row, col) not in mine_set and not state["revealed"][row][col]:
-                return False
-    return True
+    opened = minesweeper.flood_reveal(cells, revealed, rows, cols, index)
+    state["message"] = "Safe reveal."
+    _minesweeper_record_reveal(state, revealed, len(opened))
+    return state
 
 
 def _handle_puzzle_action(slug, state, form):
     action = form.get("action")
     if action == "new":
+        if slug == "minesweeper":
+            return _init_minesweeper_state(form.get("tier") or state.get("tier", "beginner"))
+        if slug == "sudoku":
+            return _init_sudoku_state(form.get("grade") or state.get("grade", "easy"))
         return _init_state(slug)
     if state["game_over"]:
         return state
@@ -653,73 +1134,1127 @@ def _handle_puzzle_action(slug, state, form):
             state["message"] = "Invalid input."
             return state
 
-        if not (0 <= row < 4 and 0 <= col < 4 and 1 <= value <= 4):
-            state["message"] = "Use row/col in 0..3 and value in 1..4."
+        if not (0 <= row < 9 and 0 <= col < 9 and 0 <= value <= 9):
+            state["message"] = "Use row/col in 0..8 and value in 1..9 (0 clears)."
             return state
         if state["fixed"][row][col]:
             state["message"] = "That cell is fixed."
             return state
 
-        state["board"][row][col] = value
-        if state["board"] == state["solution"]:
+        rows, cols, boxes = state["masks"]
+        index = row * 9 + col
+        previous = state["board"][row][col]
+        if previous:
+            sudoku.toggle(rows, cols, boxes, index, previous)
+            state["board"][row][col] = 0
+            state["filled"] -= 1
+        if value and sudoku.conflicts(rows, cols, boxes, index, value):
+            if previous:
+                sudoku.toggle(rows, cols, boxes, index, previous)
+                state["board"][row][col] = previous
+                state["filled"] += 1
+            state["message"] = f"{value} is already used in that row, column or box."
+            return state
+        if value:
+            sudoku.toggle(rows, cols, boxes, index, value)
+            state["board"][row][col] = value
+            state["filled"] += 1
+
+        if state["filled"] == 81:
             state["game_over"] = True
             state["winner"] = "You"
             state["message"] = "Sudoku solved."
         else:
-            state["message"] = "Value placed."
+            state["message"] = "Value placed." if value else "Cell cleared."
         return state
 
     if slug == "minesweeper":
-        if action != "reveal":
-            return state
-        try:
-            row = int(form.get("row", "-1"))
-            col = int(form.get("col", "-1"))
-        except ValueError:
-            state["message"] = "Invalid cell."
-            return state
-        if not (0 <= row < state["size"] and 0 <= col < state["size"]):
-            state["message"] = "Cell out of bounds."
-            return state
+        return _handle_minesweeper_action(state, form)
 
-        mine_set = {(item[0], item[1]) for item in state["mines"]}
-        if (row, col) in mine_set:
-            state["game_over"] = True
-            state["winner"] = "Computer"
-            state["revealed"][row][col] = True
-            state["message"] = "Mine hit. Game over."
+    if slug == "rubiks-cube":
+        position = cube.from_state(state["cube"])
+        if action == "hint":
+            if cube_solver.tables_if_ready(current_app.config["CUBE_TABLES_PATH"]) is None:
+                state["message"] = "The solver tables are being built; ask again in a few seconds."
+                return state
+            solution = cube_solver.solve(position, current_app.config["CUBE_TABLES_PATH"])
+            state["message"] = (
+                f"Next move: {cube.MOVE_NAMES[solution[0]]}. "
+                f"Solution ({len(solution)} moves): {cube.format_moves(solution)}"
+            )
+            return state
+        if action != "turn" or form.get("move") not in cube.MOVE_NAMES:
             return state
 
-        _reveal_safe_cells(state, row, col)
-        if _all_safe_revealed(state):
+        position = cube.apply_move(position, cube.MOVE_NAMES.index(form["move"]))
+        state["cube"] = cube.to_state(position)
+        state["moves"] += 1
+        if cube.is_solved(position):
             state["game_over"] = True
             state["winner"] = "You"
-            state["message"] = "You cleared all safe cells."
+            state["message"] = f"Cube solved in {state['moves']} moves."
         else:
-            state["message"] = "Safe reveal."
+            state["message"] = f"Turned {form['move']}."
         return state
 
-    if slug == "rubiks-cube":
-        if action == "rotate":
-            state["current"] = state["current"][1:] + state["current"][:1]
-        elif action == "rotate-back":
-            state["current"] = state["current"][-1:] + state["current"][:-1]
-        elif action == "swap":
-            state["current"][0], state["current"][1] = state["current"][1], state["current"][0]
+    return state
+
+
+def _go_record_board(state, board):
+    state["moves"] = board.moves
+    state["player_score"], state["ai_score"] = board.area()
+    if not board.is_over():
+        return
+    state["game_over"] = True
+    margin = board.score()
+    state["winner"] = "You" if margin > 0 else "Computer"
+    state["message"] = (
+        f"Both sides passed. {'You win' if margin > 0 else 'Computer wins'} by {abs(margin)} "
+        f"({state['player_score']} to {state['ai_score']} + {board.komi} komi)."
+    )
+
+
+def _handle_go_action(state, form):
+    action = form.get("action")
+    if action == "new":
+        try:
+            size = int(form.get("size") or state["board_size"])
+        except ValueError:
+            size = state["board_size"]
+        return _init_go_state(size if size in go_engine.SIZES else 9)
+    if state["game_over"] or action not in ("place", "pass"):
+        return state
+
+    size = state["board_size"]
+    board = go_engine.GoBoard.from_moves(size, state["moves"])
+    if action == "pass":
+        board.play(go_engine.PASS)
+        played = "You passed."
+    else:
+        try:
+            row = int(form.get("row", "-1"))
+            col = int(form.get("col", "-1"))
+        except ValueError:
+            state["message"] = "Invalid board point."
+            return state
+        if not (0 <= row < size and 0 <= col < size):
+            state["message"] = "Point out of range."
+            return state
+        try:
+            captured = board.play(row * size + col)
+        except go_engine.IllegalMove as error:
+            state["message"] = f"{error} Occupied points, suicide and repeating a position are not allowed."
+            return state
+        played = f"You played {go_engine.point_name(row * size + col, size)}" + (
+            f", capturing {captured}." if captured else "."
+        )
+    _go_record_board(state, board)
+    if state["game_over"]:
+        return state
+
+    point, search = go_engine.choose_move(board, budget=GO_AI_BUDGETS.get(size, 0.5))
+    captured = board.play(point)
+    _go_record_board(state, board)
+    if state["game_over"]:
+        return state
+    if point == go_engine.PASS:
+        state["message"] = f"{played} Computer passed; pass too to end the game."
+    else:
+        state["message"] = (
+            f"{played} Computer played {go_engine.point_name(point, size)}"
+            f"{f', capturing {captured}' if captured else ''} after {search['playouts']} playouts."
+        )
+    return state
+
+
+def _onitama_position(state):
+    red, blue, red_master, blue_master, red_cards, blue_cards, side, player = state["position"]
+    return red, blue, red_master, blue_master, tuple(red_cards), tuple(blue_cards), side, player
+
+
+def _onitama_square_name(square):
+    return f"{'ABCDE'[square % 5]}{5 - square // 5}"
+
+
+def _onitama_move_text(move):
+    card, source, target = move
+    if source is None:
+        return f"passed with {onitama.CARD_NAMES[card]}"
+    return f"moved {_onitama_square_name(source)} to {_onitama_square_name(target)} with {onitama.CARD_NAMES[card]}"
+
+
+def _onitama_finish_if_needed(state, position, played):
+    won = onitama.winner(position)
+    if won is None:
+        return
+    state["game_over"] = True
+    state["winner"] = "You" if won == onitama.RED else "Computer"
+    state["message"] = f"{played} {'You win!' if won == onitama.RED else 'Computer wins.'}"
+
+
+def _handle_onitama_action(state, form):
+    action = form.get("action")
+    if action == "new":
+        return _init_onitama_state()
+    if state["game_over"]:
+        return state
+
+    position = _onitama_position(state)
+    moves = onitama.legal_moves(position)
+    try:
+        card = int(form.get("card", state["selected_card"] if state["selected_card"] is not None else -1))
+        square = int(form.get("row", "-1")) * 5 + int(form.get("col", "-1")) if "row" in form else None
+    except ValueError:
+        state["message"] = "Invalid input."
+        return state
+
+    if action == "card":
+        if card in position[4]:
+            state["selected_card"] = card
+            state["message"] = f"Selected {onitama.CARD_NAMES[card]}. Now pick a piece."
+        return state
+    if action == "select":
+        if square is not None and 0 <= square < onitama.SQUARES and position[0] >> square & 1:
+            state["selected_square"] = square
+            state["message"] = "Now pick where the piece goes."
+        return state
+    if action == "move":
+        move = (card, state["selected_square"], square)
+    elif action == "pass_card":
+        move = (card, None, None)
+    else:
+        return state
+    if move not in moves:
+        state["message"] = "That move is not allowed with the selected card."
+        return state
+
+    position = onitama.apply_move(position, move)
+    state["selected_card"] = state["selected_square"] = None
+    state["position"] = list(position)
+    played = f"You {_onitama_move_text(move)}."
+    _onitama_finish_if_needed(state, position, played)
+    if state["game_over"]:
+        return state
+
+    reply, search = onitama.choose_move(position, budget=ONITAMA_AI_BUDGET)
+    position = onitama.apply_move(position, reply)
+    state["position"] = list(position)
+    played = f"{played} Computer {_onitama_move_text(reply)}"
+    _onitama_finish_if_needed(state, position, f"{played}.")
+    if not state["game_over"]:
+        state["message"] = f"{played} after searching {search['depth']} plies ({search['nodes']:,} positions)."
+    return state
+
+
+def _onitama_view(state):
+    # Board cells and card patterns for the template.
+    position = _onitama_position(state)
+    moves = onitama.legal_moves(position) if not state["game_over"] else []
+    targets = {
+        move[2] for move in moves
+        if move[0] == state["selected_card"] and move[1] == state["selected_square"]
+    }
+    cells = []
+    for square in range(onitama.SQUARES):
+        owner = "red" if position[0] >> square & 1 else "blue" if position[1] >> square & 1 else None
+        cells.append({
+            "owner": owner,
+            "master": square in (position[2], position[3]),
+            "temple": square in onitama.TEMPLES,
+            "target": square in targets,
+            "selected": square == state["selected_square"],
+        })
+
+    def card_view(card, player):
+        # The card's moves drawn from the centre square.
+        reach = onitama.TARGETS[player][card][12]
+        marks = ["o" if square == 12 else "x" if square in reach else "" for square in range(onitama.SQUARES)]
+        return {"index": card, "name": onitama.CARD_NAMES[card], "grid": [marks[row:row + 5] for row in range(0, 25, 5)]}
+
+    return {
+        "cells": cells,
+        "red_cards": [card_view(card, onitama.RED) for card in position[4]],
+        "blue_cards": [card_view(card, onitama.BLUE) for card in position[5]],
+        "side_card": card_view(position[6], onitama.RED),
+        "must_pass": bool(moves) and moves[0][1] is None,
+    }
+
+
+def _santorini_position(state):
+    level1, level2, level3, dome, red, blue, player = state["position"]
+    return level1, level2, level3, dome, tuple(red), tuple(blue), player
+
+
+def _santorini_square_name(square):
+    return f"{'ABCDE'[square % 5]}{5 - square // 5}"
+
+
+def _santorini_move_text(move):
+    worker, destination, build = move
+    text = f"moved {_santorini_square_name(worker)} to {_santorini_square_name(destination)}"
+    return text if build is None else f"{text} and built on {_santorini_square_name(build)}"
+
+
+def _santorini_finish_if_needed(state, position, last_move, played):
+    won = santorini.winner(position, last_move)
+    if won is None:
+        return
+    state["game_over"] = True
+    state["winner"] = "You" if won == santorini.RED else "Computer"
+    climbed = last_move is not None and santorini.is_win(last_move)
+    reason = "climbed to the third level" if climbed else "left the other side stuck"
+    state["message"] = f"{played} {state['winner']} {reason} and won."
+
+
+def _handle_santorini_action(state, form):
+    action = form.get("action")
+    if action == "new":
+        return _init_santorini_state()
+    if state["game_over"]:
+        return state
+    try:
+        square = int(form.get("row", "-1")) * 5 + int(form.get("col", "-1"))
+    except ValueError:
+        state["message"] = "Invalid board square."
+        return state
+    if not 0 <= square < santorini.SQUARES:
+        return state
+
+    if state["position"] is None:
+        if action == "place" and square not in state["placing"]:
+            state["placing"].append(square)
+        if len(state["placing"]) < 2:
+            state["message"] = "Place your second worker."
+            return state
+        blue = santorini.choose_placement(state["placing"])
+        state["position"] = list(santorini.new_game(state["placing"], blue))
+        state["message"] = (
+            f"Computer placed its workers on {_santorini_square_name(blue[0])} and {_santorini_square_name(blue[1])}. "
+            "Your move: pick a worker."
+        )
+        return state
+
+    position = _santorini_position(state)
+    moves = santorini.legal_moves(position)
+    if action == "select":
+        if square in position[4]:
+            state["selected_worker"] = square
+            state["selected_step"] = None
+            state["message"] = "Pick a square to step to."
+        return state
+    if action == "step":
+        steps = [move for move in moves if move[0] == state["selected_worker"] and move[1] == square]
+        if not steps:
+            state["message"] = "Your worker cannot step there."
+            return state
+        if not santorini.is_win(steps[0]):
+            state["selected_step"] = square
+            state["message"] = "Pick a square to build on."
+            return state
+        move = steps[0]
+    elif action == "build":
+        move = (state["selected_worker"], state["selected_step"], square)
+        if move not in moves:
+            state["message"] = "You cannot build there."
+            return state
+    else:
+        return state
+
+    position = santorini.apply_move(position, move)
+    state["position"] = list(position)
+    state["selected_worker"] = state["selected_step"] = None
+    played = f"You {_santorini_move_text(move)}."
+    _santorini_finish_if_needed(state, position, move, played)
+    if state["game_over"]:
+        return state
+
+    reply, search = santorini.choose_move(position, budget=SANTORINI_AI_BUDGET)
+    position = santorini.apply_move(position, reply)
+    state["position"] = list(position)
+    played = f"{played} Computer {_santorini_move_text(reply)}"
+    _santorini_finish_if_needed(state, position, reply, f"{played}.")
+    if not state["game_over"]:
+        state["message"] = f"{played} after searching {search['depth']} plies ({search['nodes']:,} positions)."
+    return state
+
+
+def _santorini_view(state):
+    # Board cells for the template: height, worker and what a click does.
+    if state["position"] is None:
+        return [
+            {"height": 0, "owner": "red" if square in state["placing"] else None, "click": "place"}
+            for square in range(santorini.SQUARES)
+        ]
+    position = _santorini_position(state)
+    moves = santorini.legal_moves(position) if not state["game_over"] else []
+    worker, step = state["selected_worker"], state["selected_step"]
+    steps = {move[1] for move in moves if move[0] == worker}
+    builds = {move[2] for move in moves if move[0] == worker and move[1] == step}
+    cells = []
+    for square in range(santorini.SQUARES):
+        owner = "red" if square in position[4] else "blue" if square in position[5] else None
+        if step is not None:
+            occupant = None if square == worker else "red" if square == step else owner
+            click = "build" if square in builds else None
+        else:
+            occupant = owner
+            click = "step" if square in steps else "select" if owner == "red" and moves else None
+        cells.append({"height": santorini.height(position, square), "owner": occupant, "click": click})
+    return cells
+
+
+def _backgammon_play_text(play, computer=False):
+    # The computer's plays are generated from its side of the board; show
+    # them in the player's point numbers.
+    if computer:
+        play = tuple(
+            (backgammon.BAR if source == backgammon.BAR else backgammon.BAR - source,
+             backgammon.OFF if target == backgammon.OFF else backgammon.BAR - target)
+            for source, target in play
+        )
+    return backgammon.play_text(play)
+
+
+def _backgammon_plays(state):
+    # {play text: resulting position} for the player's roll.
+    plays = backgammon.legal_plays(tuple(state["board"]), tuple(state["dice"]))
+    return {_backgammon_play_text(play): position for position, play in plays.items()}
+
+
+def _backgammon_finish_if_needed(state, board, mover, played):
+    # `board` is from the view of `mover`, who just played.
+    if backgammon.borne_off(board)[0] < backgammon.CHECKERS:
+        return
+    state["game_over"] = True
+    state["winner"] = mover
+    state["message"] = f"{played} {mover} bore off every checker and won."
+
+
+def _handle_backgammon_action(state, form):
+    action = form.get("action")
+    if action == "new":
+        return _init_backgammon_state()
+    if state["game_over"] or action != "play":
+        return state
+    plays = _backgammon_plays(state)
+    text = form.get("play", "")
+    if text not in plays:
+        state["message"] = "That play is not legal with your roll."
+        return state
+
+    board = plays[text]
+    state["board"] = list(board)
+    played = f"You played {text}."
+    _backgammon_finish_if_needed(state, board, "You", played)
+    if state["game_over"]:
+        return state
+
+    dice = backgammon.roll()
+    database = bearoff.database_if_ready(current_app.config["BEAROFF_PATH"])
+    reply, result, search = backgammon.choose_play(
+        backgammon.flip(board), dice, database, budget=BACKGAMMON_AI_BUDGET,
+    )
+    state["board"] = list(backgammon.flip(result))
+    played = (
+        f"{played} Computer rolled {dice[0]}-{dice[1]} and played {_backgammon_play_text(reply, computer=True)}"
+    )
+    _backgammon_finish_if_needed(state, result, "Computer", f"{played}.")
+    if state["game_over"]:
+        return state
+
+    state["dice"] = list(backgammon.roll())
+    depth = f"{search['depth']} ply" if search["depth"] == 1 else f"{search['depth']} plies"
+    state["message"] = (
+        f"{played} after looking {depth} ahead ({search['evaluations']:,} positions). "
+        f"You rolled {state['dice'][0]}-{state['dice'][1]}."
+    )
+    return state
+
+
+def _backgammon_view(state):
+    board = state["board"]
+
+    def point(number):
+        count = board[number]
+        return {"number": number, "count": abs(count), "owner": "white" if count > 0 else "black" if count < 0 else None}
+
+    player_pips, computer_pips = backgammon.pip_counts(board)
+    player_off, computer_off = backgammon.borne_off(board)
+    return {
+        "top": [point(number) for number in range(13, 25)],
+        "bottom": [point(number) for number in range(12, 0, -1)],
+        "bar": (board[backgammon.BAR], board[backgammon.OFF]),
+        "off": (player_off, computer_off),
+        "pips": (player_pips, computer_pips),
+        "plays": sorted(_backgammon_plays(state)) if not state["game_over"] else [],
+    }
+
+
+def _hive_cell_name(packed):
+    q, r = hive.axial(packed)
+    return f"({q}, {r})"
+
+
+def _hive_move_text(board, move):
+    # Call before `move` is played on `board`.
+    source, target, kind = move
+    if target is None:
+        return "passed"
+    if source is None:
+        name = hive.KIND_NAMES[kind]
+        return f"placed {'an' if name == 'Ant' else 'a'} {name} at {_hive_cell_name(target)}"
+    name = hive.KIND_NAMES[hive.piece_kind(board.top(source))]
+    return f"moved the {name} from {_hive_cell_name(source)} to {_hive_cell_name(target)}"
+
+
+def _hive_finish_if_needed(state, board, played):
+    won = board.winner()
+    if won is None:
+        return
+    state["game_over"] = True
+    if won == "draw":
+        state["winner"] = "Draw"
+        state["message"] = f"{played} Both queens are surrounded: a draw."
+        return
+    state["winner"] = "You" if won == hive.WHITE else "Computer"
+    state["message"] = f"{played} {state['winner']} surrounded the other queen and won."
+
+
+def _handle_hive_action(state, form):
+    action = form.get("action")
+    if action == "new":
+        return _init_hive_state()
+    if state["game_over"]:
+        return state
+    board = hive.HiveBoard.from_moves(state["moves"])
+    moves = board.legal_moves()
+
+    if action == "hand":
+        try:
+            kind = int(form.get("kind", "-1"))
+        except ValueError:
+            kind = -1
+        if not any(move[0] is None and move[2] == kind for move in moves):
+            state["message"] = "You cannot place that piece now."
+            return state
+        state["selected_kind"], state["selected_cell"] = kind, None
+        state["message"] = f"Place your {hive.KIND_NAMES[kind]} on a highlighted cell."
+        return state
+    if action == "pass":
+        if moves != [hive.PASS]:
+            state["message"] = "You can only pass with no legal move."
+            return state
+        move = hive.PASS
+    elif action == "cell":
+        try:
+            target = hive.cell(int(form.get("q", "")), int(form.get("r", "")))
+        except ValueError:
+            state["message"] = "Invalid cell."
+            return state
+        if state["selected_kind"] is not None:
+            move = (None, target, state["selected_kind"])
         else:
+            move = (state["selected_cell"], target, None)
+        if move not in moves:
+            top = board.top(target)
+            if top is not None and hive.piece_owner(top) == hive.WHITE:
+                state["selected_cell"], state["selected_kind"] = target, None
+                state["message"] = f"Move your {hive.KIND_NAMES[hive.piece_kind(top)]} to a highlighted cell."
+            else:
+                state["message"] = "Pick one of your pieces or a highlighted cell."
+            return state
+    else:
+        return state
+
+    played = f"You {_hive_move_text(board, move)}."
+    board.apply(move)
+    state["moves"].append(list(move))
+    state["selected_cell"] = state["selected_kind"] = None
+    _hive_finish_if_needed(state, board, played)
+    if state["game_over"]:
+        return state
+
+    reply, search = hive.choose_move(board, budget=HIVE_AI_BUDGET)
+    played = f"{played} Computer {_hive_move_text(board, reply)}"
+    board.apply(reply)
+    state["moves"].append(list(reply))
+    _hive_finish_if_needed(state, board, f"{played}.")
+    if not state["game_over"]:
+        state["message"] = f"{played} after searching {search['depth']} plies ({search['nodes']:,} positions)."
+    return state
+
+
+def _hive_view(state):
+    # Rows of hex cells for the template, offset by half a cell per row.
+    board = hive.HiveBoard.from_moves(state["moves"])
+    moves = board.legal_moves() if not state["game_over"] else []
+    if state["selected_kind"] is not None:
+        targets = {move[1] for move in moves if move[0] is None and move[2] == state["selected_kind"]}
+    elif state["selected_cell"] is not None:
+        targets = {move[1] for move in moves if move[0] == state["selected_cell"]}
+    else:
+        targets = set()
+    shown = set(board.stacks) | targets | {hive.ORIGIN}
+    points = [hive.axial(packed) for packed in shown]
+    low_row = min(r for _, r in points) - 1
+    high_row = max(r for _, r in points) + 1
+    # Columns in half cells: 2q + r.
+    left = min(2 * q + r for q, r in points) - 2
+    right = max(2 * q + r for q, r in points) + 2
+    rows = []
+    for r in range(low_row, high_row + 1):
+        first = -((r - left) // 2)
+        cells = []
+        for q in range(first, (right - r) // 2 + 1):
+            packed = hive.cell(q, r)
+            stack = board.stacks.get(packed, ())
+            top = stack[-1] if stack else None
+            cells.append({
+                "q": q,
+                "r": r,
+                "letter": hive.KIND_LETTERS[hive.piece_kind(top)] if top is not None else "",
+                "owner": None if top is None else "white" if hive.piece_owner(top) == hive.WHITE else "black",
+                "height": len(stack),
+                "target": packed in targets,
+                "selected": packed == state["selected_cell"],
+            })
+        rows.append({"indent": 2 * first + r - left, "cells": cells})
+    hand = board.hands[hive.WHITE]
+    placeable = {move[2] for move in moves if move[0] is None and board.player == hive.WHITE}
+    return {
+        "rows": rows,
+        "hand": [
+            {"kind": kind, "name": hive.KIND_NAMES[kind], "count": hand[kind], "placeable": kind in placeable}
+            for kind in range(len(hive.HAND))
+        ],
+        "computer_hand": sum(board.hands[hive.BLACK]),
+        "must_pass": moves == [hive.PASS],
+    }
+
+
+def _arimaa_finish_if_needed(state, board, mover, played):
+    won = arimaa.winner(board, mover)
+    if won is None:
+        return
+    state["game_over"] = True
+    state["winner"] = "You" if won == arimaa.GOLD else "Computer"
+    state["message"] = f"{played} {'You win!' if won == arimaa.GOLD else 'Computer wins.'}"
+
+
+def _arimaa_end_turn(state):
+    board = tuple(state["board"])
+    steps = [tuple(step) for step in state["steps"]]
+    board_after = arimaa.replay(board, steps)
+    played = f"You played {arimaa.turn_text(board, steps)}."
+    state["board"] = list(board_after)
+    state["steps"] = []
+    state["selected"] = None
+    _arimaa_finish_if_needed(state, board_after, arimaa.GOLD, played)
+    if state["game_over"]:
+        return
+
+    reply, reply_board, search = arimaa.choose_turn(board_after, arimaa.SILVER, budget=ARIMAA_AI_BUDGET)
+    if reply is None:
+        state["game_over"] = True
+        state["winner"] = "You"
+        state["message"] = f"{played} Computer has no legal turn. You win!"
+        return
+    state["board"] = list(reply_board)
+    played = f"{played} Computer played {arimaa.turn_text(board_after, reply)}"
+    _arimaa_finish_if_needed(state, reply_board, arimaa.SILVER, f"{played}.")
+    if state["game_over"]:
+        return
+    if not arimaa.continuations(reply_board, arimaa.GOLD, [])[0]:
+        state["game_over"] = True
+        state["winner"] = "Computer"
+        state["message"] = f"{played}. You have no legal step. Computer wins."
+        return
+    state["message"] = (
+        f"{played} after comparing {search['turns']:,} turns ({search['evaluations']:,} positions)."
+    )
+
+
+def _handle_arimaa_action(state, form):
+    action = form.get("action")
+    if action == "new":
+        return _init_arimaa_state()
+    if state["game_over"]:
+        return state
+
+    board = tuple(state["board"])
+    if action == "undo" and state["steps"]:
+        state["steps"].pop()
+        state["selected"] = None
+        state["message"] = "Step taken back."
+        return state
+    if action == "reset":
+        state["steps"] = []
+        state["selected"] = None
+        state["message"] = "Turn reset."
+        return state
+    following, complete = arimaa.continuations(board, arimaa.GOLD, state["steps"])
+    if action == "end":
+        if not state["steps"] or not complete or arimaa.replay(board, state["steps"]) == board:
+            state["message"] = "Finish a turn that changes the board first."
+            return state
+        _arimaa_end_turn(state)
+        return state
+    if action != "cell":
+        return state
+
+    try:
+        square = int(form.get("row", "-1")) * 8 + int(form.get("col", "-1"))
+    except ValueError:
+        state["message"] = "Invalid input."
+        return state
+    selected = state["selected"]
+    if selected is not None and square != selected:
+        step = next((step for step in following if step[1] == selected and step[2] == square), None)
+        if step is not None:
+            state["steps"].append(list(step))
+            state["selected"] = None
+            following, complete = arimaa.continuations(board, arimaa.GOLD, state["steps"])
+            if complete and not following:
+                _arimaa_end_turn(state)
+            elif not complete:
+                state["message"] = "Now push: move your stronger piece into the square it left."
+            else:
+                state["message"] = f"{arimaa.STEPS - len(state['steps'])} steps left. Step again or end the turn."
             return state
+    if square == selected:
+        state["selected"] = None
+        state["message"] = "Selection cleared."
+    elif any(step[1] == square for step in following):
+        state["selected"] = square
+        state["message"] = "Now pick where it goes."
+    else:
+        state["message"] = "That piece cannot step now."
+    return state
+
+
+def _arimaa_view(state):
+    # Board cells (rank 8 first) with the pieces after the steps taken so
+    # far, which squares can be picked and where the selected piece can go.
+    board = tuple(state["board"])
+    current = arimaa.replay(board, state["steps"])
+    following, complete = (set(), False) if state["game_over"] else \
+        arimaa.continuations(board, arimaa.GOLD, state["steps"])
+    sources = {step[1] for step in following}
+    targets = {step[2] for step in following if step[1] == state["selected"]}
+    rows = []
+    for row in range(7, -1, -1):
+        cells = []
+        for col in range(8):
+            square = row * 8 + col
+            index = arimaa.piece_at(current, square)
+            letter = arimaa.PIECE_LETTERS[index % 6] if index is not None else ""
+            cells.append({
+                "row": row,
+                "col": col,
+                "piece": letter if index is None or index < 6 else letter.lower(),
+                "owner": None if index is None else "gold" if index < 6 else "silver",
+                "trap": square in arimaa.TRAPS,
+                "selected": square == state["selected"],
+                "click": square in targets or square in sources,
+                "target": square in targets,
+            })
+        rows.append({"rank": row + 1, "cells": cells})
+    steps = [tuple(step) for step in state["steps"]]
+    return {
+        "rows": rows,
+        "files": "abcdefgh",
+        "steps": arimaa.turn_text(board, steps) if steps else "",
+        "left": arimaa.STEPS - len(steps),
+        "can_end": bool(steps) and complete and current != board,
+    }
+
+
+def _yinsh_finish_if_needed(state, position, played):
+    won = yinsh.winner(position)
+    if won is None:
+        return
+    state["game_over"] = True
+    if won == yinsh.DRAW:
+        state["winner"] = "Draw"
+        state["message"] = f"{played} The markers ran out with the rings level: a draw."
+        return
+    state["winner"] = "You" if won == yinsh.WHITE else "Computer"
+    state["message"] = f"{played} {'You win!' if won == yinsh.WHITE else 'Computer wins.'}"
+
+
+def _yinsh_offer_rows(state, rows, after):
+    # The player picks which of their complete rows to remove (skipped when
+    # there is only one), then one of their rings.
+    state["rows"] = rows
+    state["row"] = rows[0] if len(rows) == 1 else None
+    state["after"] = after
 
-        if state["current"] == state["target"]:
+
+def _yinsh_computer_turn(state, position, played):
+    move, search = yinsh.choose_move(position, budget=YINSH_AI_BUDGET)
+    touched = 0
+    if move is None:
+        played = f"{played} Computer cannot move and passes."
+    else:
+        text = yinsh.move_text(position, move)
+        position, touched = yinsh.apply_move(position, move)
+        position = yinsh.auto_remove(position, yinsh.BLACK, touched)
+        played = (
+            f"{played} Computer played {text} after searching {search['depth']} plies "
+            f"({search['nodes']:,} positions)."
+        )
+    position = yinsh.pass_turn(position)
+    state["position"] = list(position)
+    _yinsh_finish_if_needed(state, position, played)
+    if state["game_over"]:
+        return
+    rows = yinsh.complete_rows(position, yinsh.WHITE, touched)
+    if rows:
+        _yinsh_offer_rows(state, rows, "computer")
+        state["message"] = f"{played} That completed a row of yours: remove it and one of your rings."
+        return
+    if not yinsh.legal_moves(position):
+        position = yinsh.pass_turn(position)
+        state["position"] = list(position)
+        if move is None or not yinsh.legal_moves(position):
             state["game_over"] = True
-            state["winner"] = "You"
-            state["message"] = "Rubik's Cube Lite solved."
+            state["winner"] = "Draw" if position[4] == position[5] else "You" if position[4] > position[5] else "Computer"
+            state["message"] = f"{played} Neither side can move. Game over."
+            return
+        _yinsh_computer_turn(state, position, f"{played} You cannot move and pass.")
+        return
+    state["message"] = played
+
+
+def _yinsh_after_player(state, position, played):
+    # The computer removes any rows the player's move made for it, then
+    # replies.
+    position = yinsh.pass_turn(yinsh.auto_remove(position, yinsh.BLACK))
+    state["position"] = list(position)
+    _yinsh_finish_if_needed(state, position, played)
+    if not state["game_over"]:
+        _yinsh_computer_turn(state, position, played)
+
+
+def _handle_yinsh_action(state, form):
+    action = form.get("action")
+    if action == "new":
+        return _init_yinsh_state()
+    if state["game_over"]:
+        return state
+
+    position = tuple(state["position"])
+    if action == "row" and state["rows"] and state["row"] is None:
+        try:
+            state["row"] = state["rows"][int(form.get("row", "-1"))]
+        except (ValueError, IndexError):
+            state["message"] = "Invalid input."
+            return state
+        state["message"] = "Now pick the ring to remove."
+        return state
+    if action != "cell":
+        return state
+    try:
+        cell = int(form.get("cell", "-1"))
+    except ValueError:
+        cell = -1
+    if not 0 <= cell < yinsh.CELLS:
+        state["message"] = "Invalid input."
+        return state
+
+    if yinsh.in_setup(position):
+        if (position[0] | position[1]) >> cell & 1:
+            state["message"] = "That point already has a ring."
+            return state
+        position = yinsh.place_ring(position, cell)
+        reply = yinsh.choose_ring_cell(position)
+        position = yinsh.place_ring(position, reply)
+        state["position"] = list(position)
+        placed = f"You placed a ring on {yinsh.cell_name(cell)}; Computer placed one on {yinsh.cell_name(reply)}."
+        if yinsh.in_setup(position):
+            state["message"] = placed
+        else:
+            state["message"] = f"{placed} All rings are placed: pick a ring to move."
+        return state
+
+    if state["rows"]:
+        if state["row"] is None:
+            state["message"] = "Pick the row to remove first."
+            return state
+        if not position[yinsh.WHITE] >> cell & 1:
+            state["message"] = "Pick one of your rings to remove."
+            return state
+        position = yinsh.remove_row(position, yinsh.WHITE, state["row"], cell)
+        state["position"] = list(position)
+        played = f"You removed the row {yinsh.row_text(state['row'])} and your ring on {yinsh.cell_name(cell)}."
+        rows = [window for window in state["rows"] if window != state["row"] and window & position[2] == window]
+        _yinsh_finish_if_needed(state, position, played)
+        if state["game_over"]:
+            return state
+        if rows:
+            _yinsh_offer_rows(state, rows, state["after"])
+            state["message"] = f"{played} You have another row to remove."
+            return state
+        after = state["after"]
+        state["rows"], state["row"], state["after"] = [], None, None
+        if after == "player":
+            _yinsh_after_player(state, position, played)
         else:
-            state["message"] = "Move applied."
+            state["message"] = f"{played} Your move."
         return state
 
+    selected = state["selected"]
+    if selected is not None and yinsh.ring_targets(position, selected) >> cell & 1:
+        move = (selected, cell)
+        played = f"You played {yinsh.move_text(position, move)}."
+        position, touched = yinsh.apply_move(position, move)
+        state["position"] = list(position)
+        state["selected"] = None
+        rows = yinsh.complete_rows(position, yinsh.WHITE, touched)
+        if rows:
+            _yinsh_offer_rows(state, rows, "player")
+            state["message"] = f"{played} You made a row: remove it and one of your rings."
+            return state
+        _yinsh_after_player(state, position, played)
+        return state
+    if cell == selected:
+        state["selected"] = None
+        state["message"] = "Selection cleared."
+    elif position[yinsh.WHITE] >> cell & 1 and yinsh.ring_targets(position, cell):
+        state["selected"] = cell
+        state["message"] = "Now pick where the ring goes."
+    else:
+        state["message"] = "Pick one of your rings that can move."
     return state
 
 
+def _yinsh_view(state):
+    # Rows numbered 11 down to 1 by columns a-k; off-board points are None.
+    position = tuple(state["position"])
+    setup = yinsh.in_setup(position)
+    targets = 0
+    if state["selected"] is not None:
+        targets = yinsh.ring_targets(position, state["selected"])
+    highlighted = state["row"] or 0
+    playing = not state["game_over"]
+    rows = []
+    for number in range(11, 0, -1):
+        cells = []
+        for column in range(len(yinsh.COLUMNS)):
+            cell = yinsh.cell_at(column, number)
+            if cell is None:
+                cells.append(None)
+                continue
+            bit = 1 << cell
+            ring = "white" if position[0] & bit else "black" if position[1] & bit else None
+            marker = "white" if position[2] & bit else "black" if position[3] & bit else None
+            if not playing or (state["rows"] and state["row"] is None):
+                click = False
+            elif setup:
+                click = ring is None
+            elif state["rows"]:
+                click = ring == "white"
+            else:
+                click = bool(targets & bit) or (ring == "white" and bool(yinsh.ring_targets(position, cell)))
+            cells.append({
+                "cell": cell,
+                "name": yinsh.cell_name(cell),
+                "ring": ring,
+                "marker": marker,
+                "selected": cell == state["selected"],
+                "target": bool(targets & bit),
+                "in_row": bool(highlighted & bit),
+                "click": click,
+            })
+        rows.append({"number": number, "cells": cells})
+    return {
+        "rows": rows,
+        "columns": yinsh.COLUMNS,
+        "setup": setup,
+        "choices": [] if state["row"] is not None else [
+            {"index": index, "text": yinsh.row_text(window)} for index, window in enumerate(state["rows"])
+        ],
+        "removed": (position[4], position[5]),
+        "win_rings": yinsh.WIN_RINGS,
+        "markers_left": yinsh.MARKERS - (position[2] | position[3]).bit_count(),
+    }
+
+
+def _handle_diplomacy_action(state, form):
+    action = form.get("action")
+    if action == "new":
+        power = form.get("power", state.get("power"))
+        return _init_diplomacy_state(power if power in diplomacy.POWERS else "England")
+    if state["game_over"] or action != "orders":
+        return state
+
+    game = state["game"]
+    units = diplomacy.unit_map(game)
+    power = state["power"]
+    orders = {}
+    for province, unit in units.items():
+        if unit[0] != power:
+            continue
+        text = form.get(f"order-{province}", "")
+        options = {diplomacy.order_text(units, province, order): order for order in diplomacy.legal_orders(units, province)}
+        orders[province] = options.get(text, ("hold",))
+    others = [other for other in diplomacy.POWERS if other != power]
+    computer, search = diplomacy.choose_orders(game, others, budget=DIPLOMACY_AI_BUDGET)
+    orders.update(computer)
+    played = f"{game['season']} {game['year']} resolved."
+    state["game"], state["report"] = diplomacy.resolve_turn(game, orders)
+
+    counts = diplomacy.center_counts(state["game"]["owners"])
+    alive = counts[power] or any(unit[0] == power for unit in state["game"]["units"].values())
+    won = diplomacy.winner(state["game"])
+    if not alive:
+        state["game_over"] = True
+        state["winner"] = max(others, key=lambda other: counts[other])
+        state["message"] = f"{played} You have been eliminated. {state['winner']} leads."
+    elif won is not None:
+        state["game_over"] = True
+        state["winner"] = "You" if won == power else won
+        state["message"] = f"{played} {'You win!' if won == power else f'{won} wins with {counts[won]} centres.'}"
+    else:
+        state["message"] = (
+            f"{played} The computer powers compared {search['candidates']:,} order sets "
+            f"({search['adjudications']:,} adjudications)."
+        )
+    return state
+
+
+def _diplomacy_view(state):
+    # The player's units with their legal orders, then every power's
+    # centres and units.
+    game = state["game"]
+    units = diplomacy.unit_map(game)
+    counts = diplomacy.center_counts(game["owners"])
+    mine = []
+    if not state["game_over"]:
+        for province in sorted(units):
+            if units[province][0] == state["power"]:
+                mine.append({
+                    "province": province,
+                    "unit": diplomacy.unit_text(units[province]),
+                    "orders": [
+                        diplomacy.order_text(units, province, order)
+                        for order in diplomacy.legal_orders(units, province)
+                    ],
+                })
+    powers = []
+    for power in diplomacy.POWERS:
+        powers.append({
+            "name": power,
+            "player": power == state["power"],
+            "centers": counts[power],
+            "units": [diplomacy.unit_text(units[province]) for province in sorted(units) if units[province][0] == power],
+            "owned": [diplomacy.location_name(center) for center, owner in sorted(game["owners"].items()) if owner == power],
+        })
+    return {
+        "turn": f"{game['season']} {game['year']}",
+        "mine": mine,
+        "powers": powers,
+        "choices": diplomacy.POWERS,
+        "victory": diplomacy.VICTORY_CENTERS,
+        "last_year": diplomacy.LAST_YEAR,
+    }
+
+
+def _handle_board_action(slug, state, form):
+    if slug == "go":
+        return _handle_go_action(state, form)
+    if slug == "onitama":
+        return _handle_onitama_action(state, form)
+    if slug == "santorini":
+        return _handle_santorini_action(state, form)
+    if slug == "backgammon":
+        return _handle_backgammon_action(state, form)
+    if slug == "hive":
+        return _handle_hive_action(state, form)
+    if slug == "arimaa":
+        return _handle_arimaa_action(state, form)
+    if slug == "diplomacy":
+        return _handle_diplomacy_action(state, form)
+    if slug == "yinsh-dvonn":
+        return _handle_yinsh_action(state, form)
+    return state
+
+
+@lite_bp.cli.command("build-sudoku-bank")
+@click.option("--per-grade", default=1000, show_default=True, help="Puzzles to generate for each grade.")
+@click.option("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+@click.option("--seed", default=0, show_default=True)
+@click.option("--output", default=None, help="Bank file (default: SUDOKU_BANK_PATH).")
+def build_sudoku_bank(per_grade, workers, seed, output):
+    path = output or current_app.config["SUDOKU_BANK_PATH"]
+
+    def progress(level, count):
+        if count % 100 == 0 or count == per_grade:
+            click.echo(f"{level}: {count}/{per_grade}")
+
+    counts = sudoku_bank.build(path, per_grade, workers, seed, progress)
+    click.echo(f"Wrote {sum(counts.values())} puzzles to {path}.")
+
+
+@lite_bp.cli.command("build-cube-tables")
+@click.option("--output", default=None, help="Table directory (default: CUBE_TABLES_PATH).")
+def build_cube_tables(output):
+    directory = output or current_app.config["CUBE_TABLES_PATH"]
+    npy_cache.save_arrays(directory, cube_solver.build_tables())
+    click.echo(f"Wrote cube tables to {directory}.")
+
+
+@lite_bp.cli.command("build-hand-tables")
+@click.option("--output", default=None, help="Table directory (default: HAND_TABLES_PATH).")
+def build_hand_tables(output):
+    directory = output or current_app.config["HAND_TABLES_PATH"]
+    npy_cache.save_arrays(directory, hand_eval.build_tables())
+    click.echo(f"Wrote hand tables to {directory}.")
+
+
+@lite_bp.cli.command("build-bearoff-table")
+@click.option("--output", default=None, help="Table directory (default: BEAROFF_PATH).")
+def build_bearoff_table(output):
+    directory = output or current_app.config["BEAROFF_PATH"]
+    npy_cache.save_arrays(directory, bearoff.build_tables())
+    click.echo(f"Wrote the bear-off table to {directory}.")
+
+
+@lite_bp.cli.command("build-mahjong-tables")
+@click.option("--output", default=None, help="Table directory (default: MAHJONG_TABLES_PATH).")
+def build_mahjong_tables(output):
+    directory = output or current_app.config["MAHJONG_TABLES_PATH"]
+    npy_cache.save_arrays(directory, mahjong.build_tables())
+    click.echo(f"Wrote Mahjong shanten tables to {directory}.")
+
+
+@lite_bp.get("/minesweeper/pool-metrics")
+def minesweeper_pool_metrics():
+    return jsonify(board_pool.metrics())
+
+
+@lite_bp.get("/cards/equity")
+def card_equity():
+    # e.g. ?game=holdem&hand=AsKd&hand=random&board=Qh7c2d; a hand of
+    # "random" (or "?") is dealt at random.
+    try:
+        hands = [
+            None if text.strip().lower() in ("random", "?") else cards.parse_cards(text)
+            for text in request.args.getlist("hand")
+        ]
+        board = cards.parse_cards(request.args.get("board", ""))
+        result = equity.calculator.calculate(
+            current_app.config["HAND_TABLES_PATH"],
+            request.args.get("game", equity.HOLDEM),
+            hands,
+            board,
+            samples=request.args.get("samples", equity.SAMPLES, type=int),
+        )
+    except ValueError as error:
+        return jsonify({"error": str(error)}), 400
+    return jsonify(result)
+
+
 @lite_bp.route("/<slug>/", methods=["GET", "POST"])
 def play_lite_game(slug):
     game = GAME_MAP.get(slug)
@@ -739,26 +2274,33 @@ def play_lite_game(slug):
             state = _handle_cards_action(slug, state, request.form)
         elif mode == "duel":
             state = _handle_duel_action(slug, state, request.form)
+        elif mode == "board":
+            state = _handle_board_action(slug, state, request.form)
         else:
             state = _handle_puzzle_action(slug, state, request.form)
 
         _save_state(slug, state)
         return redirect(url_for("lite.play_lite_game", slug=slug))
 
-    mines_counts = None
-    if slug == "minesweeper":
-        mines_counts = []
-        for row in range(state["size"]):
-            count_row = []
-            for col in range(state["size"]):
-                count_row.append(_count_adjacent_mines(state["mines"], row, col, state["size"]))
-            mines_counts.append(count_row)
-
     return render_template(
         "lite_game.html",
         game=game,
         slug=slug,
         mode=mode,
         state=state,
-        mines_counts=mines_counts,
+        minesweeper_tiers=minesweeper.TIERS,
+        sudoku_grades=sudoku.GRADES,
+        cube_moves=cube.MOVE_NAMES,
+        cube_net=cube.net(cube.from_state(state["cube"])) if slug == "rubiks-cube" else None,
+        go_sizes=go_engine.SIZES,
+        go_stones=go_engine.GoBoard.from_moves(state["board_size"], state["moves"]).color if slug == "go" else None,
+        onitama_view=_onitama_view(state) if slug == "onitama" else None,
+        santorini_cells=_santorini_view(state) if slug == "santorini" else None,
+        backgammon_view=_backgammon_view(state) if slug == "backgammon" else None,
+        hive_view=_hive_view(state) if slug == "hive" else None,
+        arimaa_view=_arimaa_view(state) if slug == "arimaa" else None,
+        diplomacy_view=_diplomacy_view(state) if slug == "diplomacy" else None,
+        yinsh_view=_yinsh_view(state) if slug == "yinsh-dvonn" else None,
+        gin_view=_gin_view(state) if slug == "gin-rummy" else None,
+        mahjong_view=_mahjong_view(state) if slug == "mahjong-card" else None,
     )
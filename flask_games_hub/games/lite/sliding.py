@@ -0,0 +1,184 @@
+import random
+
+# A 4x4 sliding board is packed into one int: cell (row, col) is the nibble at
+# bit 4 * (4 * row + col). Nibbles hold tile codes, not tile values:
+#   2048:  code e -> 2 ** e
+#   threes: code 1 -> 1, code 2 -> 2, code e >= 3 -> 3 * 2 ** (e - 3)
+# Code 15 is the largest tile a nibble can hold, so it never merges further.
+
+SIZE = 4
+DIRECTIONS = ("left", "right", "up", "down")
+MAX_CODE = 15
+ROW_MASK = 0xFFFF
+
+# (code, probability) pairs for a newly spawned tile.
+SPAWN_WEIGHTS = {
+    "2048": ((1, 0.9), (2, 0.1)),
+    "threes": ((1, 0.5), (2, 0.5)),
+}
+
+
+def _merge_2048(left, right):
+    if left == right and left < MAX_CODE:
+        return left + 1
+    return None
+
+
+def _merge_threes(left, right):
+    if left + right == 3 and left != right:
+        return 3
+    if left == right and 3 <= left < MAX_CODE:
+        return left + 1
+    return None
+
+
+def _compress_codes(codes, merge):
+    values = [code for code in codes if code != 0]
+    merged = []
+    index = 0
+    while index < len(values):
+        if index + 1 < len(values):
+            combined = merge(values[index], values[index + 1])
+            if combined is not None:
+                merged.append(combined)
+                index += 2
+                continue
+        merged.append(values[index])
+        index += 1
+    return merged + [0] * (len(codes) - len(merged))
+
+
+def unpack_row(row):
+    return [(row >> (4 * col)) & 0xF for col in range(SIZE)]
+
+
+def _pack_row(codes):
+    row = 0
+    for col, code in enumerate(codes):
+        row |= code << (4 * col)
+    return row
+
+
+def _reverse_row(row):
+    return ((row & 0xF) << 12) | ((row & 0xF0) << 4) | ((row >> 4) & 0xF0) | (row >> 12)
+
+
+def _build_tables(merge):
+    left = [0] * (ROW_MASK + 1)
+    for row in range(ROW_MASK + 1):
+        left[row] = _pack_row(_compress_codes(unpack_row(row), merge))
+    right = [0] * (ROW_MASK + 1)
+    for row in range(ROW_MASK + 1):
+        right[row] = _reverse_row(left[_reverse_row(row)])
+    return left, right
+
+
+MERGE_RULES = {
+    "2048": _merge_2048,
+    "threes": _merge_threes,
+}
+
+ROW_TABLES = {mode: _build_tables(merge) for mode, merge in MERGE_RULES.items()}
+
+
+def transpose(board):
+    a1 = board & 0xF0F00F0FF0F00F0F
+    a2 = board & 0x0000F0F00000F0F0
+    a3 = board & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def _apply_rows(board, table):
+    return (
+        table[board & ROW_MASK]
+        | (table[(board >> 16) & ROW_MASK] << 16)
+        | (table[(board >> 32) & ROW_MASK] << 32)
+        | (table[board >> 48] << 48)
+    )
+
+
+def move(board, direction, mode):
+    left, right = ROW_TABLES[mode]
+    if direction == "left":
+        return _apply_rows(board, left)
+    if direction == "right":
+        return _apply_rows(board, right)
+    if direction == "up":
+        return transpose(_apply_rows(transpose(board), left))
+    if direction == "down":
+        return transpose(_apply_rows(transpose(board), right))
+    raise ValueError(f"Unknown direction: {direction}")
+
+
+def can_move(board, mode):
+    left, right = ROW_TABLES[mode]
+    if _apply_rows(board, left) != board or _apply_rows(board, right) != board:
+        return True
+    flipped = transpose(board)
+    return _apply_rows(flipped, left) != flipped or _apply_rows(flipped, right) != flipped
+
+
+def empty_cells(board):
+    return [index for index in range(SIZE * SIZE) if (board >> (4 * index)) & 0xF == 0]
+
+
+def set_cell(board, index, code):
+    shift = 4 * index
+    return (board & ~(0xF << shift)) | (code << shift)
+
+
+def spawn_tile(board, mode):
+    empty = empty_cells(board)
+    if not empty:
+        return board
+    roll = random.random()
+    code = SPAWN_WEIGHTS[mode][-1][0]
+    for candidate, probability in SPAWN_WEIGHTS[mode]:
+        if roll < probability:
+            code = candidate
+            break
+        roll -= probability
+    return set_cell(board, random.choice(empty), code)
+
+
+def max_code(board):
+    return max((board >> (4 * index)) & 0xF for index in range(SIZE * SIZE))
+
+
+def code_to_value(code, mode):
+    if code == 0:
+        return 0
+    if mode == "2048":
+        return 1 << code
+    if code < 3:
+        return code
+    return 3 << (code - 3)
+
+
+def value_to_code(value, mode):
+    if value == 0:
+        return 0
+    if mode == "2048":
+        return value.bit_length() - 1
+    if value < 3:
+        return value
+    return (value // 3).bit_length() + 2
+
+
+def encode_board(rows, mode):
+    board = 0
+    for row_index, row in enumerate(rows):
+        for col_index, value in enumerate(row):
+            board |= value_to_code(value, mode) << (4 * (SIZE * row_index + col_index))
+    return board
+
+
+def decode_board(board, mode):
+    return [
+        [code_to_value((board >> (4 * (SIZE * row + col))) & 0xF, mode) for col in range(SIZE)]
+        for row in range(SIZE)
+    ]
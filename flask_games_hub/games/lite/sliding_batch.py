@@ -0,0 +1,147 @@
+import numpy as np
+
+from games.lite import sliding
+
+# Batched sliding engine: a stack of N boards of size k x k is an
+# (N, k, k) uint8 array of the same tile codes used by games.lite.sliding.
+# Every operation is applied to the whole stack at once.
+
+MIN_SIZE = 4
+MAX_SIZE = 8
+MAX_CODE = 255
+
+
+def _check_boards(boards):
+    if boards.ndim != 3 or boards.shape[1] != boards.shape[2]:
+        raise ValueError("Boards must be an (N, k, k) array.")
+    if not MIN_SIZE <= boards.shape[1] <= MAX_SIZE:
+        raise ValueError(f"Board size must be between {MIN_SIZE} and {MAX_SIZE}.")
+
+
+def _compact(rows):
+    order = np.argsort(rows == 0, axis=1, kind="stable")
+    return np.take_along_axis(rows, order, axis=1)
+
+
+def _merge_mask(left, right, mode):
+    both = (left != 0) & (right != 0)
+    same = both & (left == right) & (left < MAX_CODE)
+    if mode == "2048":
+        return same, left + 1
+    ones_and_twos = both & (left != right) & (left.astype(np.uint16) + right == 3)
+    same &= left >= 3
+    return same | ones_and_twos, np.where(ones_and_twos, 3, left + 1).astype(np.uint8)
+
+
+def _move_rows_left(rows, mode):
+    rows = _compact(rows)
+    for col in range(rows.shape[1] - 1):
+        left = rows[:, col]
+        right = rows[:, col + 1]
+        mask, merged = _merge_mask(left, right, mode)
+        rows[:, col] = np.where(mask, merged, left)
+        rows[:, col + 1] = np.where(mask, 0, right)
+    return _compact(rows)
+
+
+def _oriented(boards, direction):
+    if direction == "left":
+        return boards
+    if direction == "right":
+        return boards[:, :, ::-1]
+    if direction == "up":
+        return boards.transpose(0, 2, 1)
+    if direction == "down":
+        return boards.transpose(0, 2, 1)[:, :, ::-1]
+    raise ValueError(f"Unknown direction: {direction}")
+
+
+def move_boards(boards, direction, mode):
+    _check_boards(boards)
+    count, size, _ = boards.shape
+    view = _oriented(boards, direction)
+    rows = _move_rows_left(view.reshape(count * size, size), mode)
+    moved = np.empty_like(boards)
+    _oriented(moved, direction)[...] = rows.reshape(count, size, size)
+    changed = (moved != boards).any(axis=(1, 2))
+    return moved, changed
+
+
+def can_move_boards(boards, mode):
+    _check_boards(boards)
+    count, size, _ = boards.shape
+    movable = (boards == 0).any(axis=(1, 2))
+    for view in (boards, boards.transpose(0, 2, 1)):
+        left = view[:, :, :-1]
+        right = view[:, :, 1:]
+        mask, _ = _merge_mask(left.reshape(-1), right.reshape(-1), mode)
+        movable |= mask.reshape(count, size, size - 1).any(axis=(1, 2))
+    return movable
+
+
+def spawn_tiles(boards, mode, rng, active=None):
+    _check_boards(boards)
+    count, size, _ = boards.shape
+    empty = (boards == 0).reshape(count, size * size)
+    targets = empty.any(axis=1)
+    if active is not None:
+        targets &= active
+
+    keys = rng.random((count, size * size))
+    keys[~empty] = -1.0
+    cells = keys.argmax(axis=1)
+
+    codes, weights = zip(*sliding.SPAWN_WEIGHTS[mode])
+    spawned = rng.choice(np.array(codes, dtype=np.uint8), size=count, p=weights)
+
+    rows = np.nonzero(targets)[0]
+    boards[rows, cells[rows] // size, cells[rows] % size] = spawned[rows]
+    return boards
+
+
+def new_boards(count, size, mode, rng):
+    boards = np.zeros((count, size, size), dtype=np.uint8)
+    spawn_tiles(boards, mode, rng)
+    spawn_tiles(boards, mode, rng)
+    return boards
+
+
+def random_playouts(boards, mode, rng, max_moves=1000):
+    # Play uniformly random moves on every board until it is stuck or
+    # max_moves is reached. Returns moves survived per board and the final boards.
+    boards = boards.copy()
+    count = boards.shape[0]
+    survived = np.zeros(count, dtype=np.int32)
+    alive = can_move_boards(boards, mode)
+    directions = np.array(sliding.DIRECTIONS)
+
+    for _ in range(max_moves):
+        if not alive.any():
+            break
+        picks = directions[rng.integers(0, len(directions), size=count)]
+        changed = np.zeros(count, dtype=bool)
+        for direction in sliding.DIRECTIONS:
+            chosen = alive & (picks == direction)
+            if not chosen.any():
+                continue
+            moved, moved_changed = move_boards(boards[chosen], direction, mode)
+            boards[chosen] = moved
+            changed[np.nonzero(chosen)[0][moved_changed]] = True
+        spawn_tiles(boards, mode, rng, active=changed)
+        survived += changed
+        alive &= can_move_boards(boards, mode)
+    return survived, boards
+
+
+def from_lists(boards, mode):
+    return np.array(
+        [[[sliding.value_to_code(value, mode) for value in row] for row in board] for board in boards],
+        dtype=np.uint8,
+    )
+
+
+def to_lists(boards, mode):
+    return [
+        [[sliding.code_to_value(int(code), mode) for code in row] for row in board]
+        for board in boards
+    ]
@@ -0,0 +1,390 @@
+import random
+import time
+
+# YINSH on its 85 intersections: a hexagon of radius 5 on a triangular grid
+# with the six corners cut off. Cells are numbered in (column, row) order;
+# a position is a 7-tuple (white rings, black rings, white markers, black
+# markers, rings white has removed, rings black has removed, player to
+# move), the first four being 85-bit sets. Positions are hashable and key
+# the search's transposition table directly.
+#
+# Everything runs on tables built once at import: each cell's six rays as
+# bitmasks, the cells strictly between any two cells on a line, and every
+# window of five cells in a line. A ring's moves come from bit tricks on
+# its ray masks (the first ring blocks, the first empty cell after a run
+# of markers ends the ray), flipping is an XOR with the between-mask, and
+# rows are found by testing the windows through the cells a move touched.
+#
+# Removing rows and rings is chosen by the player; the computer, and the
+# search for both sides, removes the first complete row and the ring with
+# the fewest lines through its cell.
+
+WHITE = 0
+BLACK = 1
+DRAW = 2
+RINGS = 5
+ROW = 5
+WIN_RINGS = 3
+MARKERS = 51
+COLUMNS = "abcdefghijk"
+
+RING_VALUE = 10_000
+MARKER_VALUE = 4
+WINDOW_VALUES = (0, 0, 2, 10, 40, 0)
+WIN_SCORE = 1_000_000
+BUDGET_SECONDS = 0.7
+MAX_DEPTH = 20
+CHECK_EVERY = 256
+
+# Axial directions; the first three step to higher cell numbers.
+DIRECTIONS = ((0, 1), (1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1))
+CORNERS = {(5, 0), (-5, 0), (0, 5), (0, -5), (5, -5), (-5, 5)}
+
+
+def _coordinates():
+    cells = []
+    for q in range(-5, 6):
+        for r in range(-5, 6):
+            if max(abs(q), abs(r), abs(q + r)) <= 5 and (q, r) not in CORNERS:
+                cells.append((q, r))
+    return cells
+
+
+COORDINATES = _coordinates()
+INDEX = {coordinate: cell for cell, coordinate in enumerate(COORDINATES)}
+CELLS = len(COORDINATES)
+FULL = (1 << CELLS) - 1
+
+
+def _ray(cell, direction):
+    q, r = COORDINATES[cell]
+    dq, dr = direction
+    cells = []
+    while (q + dq, r + dr) in INDEX:
+        q, r = q + dq, r + dr
+        cells.append(INDEX[(q, r)])
+    return cells
+
+
+RAYS = tuple(tuple(sum(1 << other for other in _ray(cell, direction)) for direction in DIRECTIONS)
+             for cell in range(CELLS))
+# BETWEEN[(a, b)]: the cells strictly between two cells on a common line.
+BETWEEN = {}
+for _cell in range(CELLS):
+    for _direction in DIRECTIONS:
+        _passed = 0
+        for _other in _ray(_cell, _direction):
+            BETWEEN[(_cell, _other)] = _passed
+            _passed |= 1 << _other
+WINDOWS = tuple(
+    (1 << cell) | sum(1 << other for other in _ray(cell, direction)[:ROW - 1])
+    for cell in range(CELLS)
+    for direction in DIRECTIONS[:3]
+    if len(_ray(cell, direction)) >= ROW - 1
+)
+CELL_WINDOWS = tuple(tuple(window for window in WINDOWS if window >> cell & 1) for cell in range(CELLS))
+LINE_COUNTS = tuple(len(CELL_WINDOWS[cell]) for cell in range(CELLS))
+
+
+def squares_of(mask):
+    cells = []
+    while mask:
+        low = mask & -mask
+        cells.append(low.bit_length() - 1)
+        mask ^= low
+    return cells
+
+
+def cell_name(cell):
+    # Board notation: columns a-k, rows numbered up each column.
+    q, r = COORDINATES[cell]
+    return f"{COLUMNS[q + 5]}{q + r + 6}"
+
+
+def cell_at(column, row):
+    # The cell in column index `column` (0 for "a") and numbered row `row`;
+    # None off the board.
+    return INDEX.get((column - 5, row - column - 1))
+
+
+def initial_position():
+    return (0, 0, 0, 0, 0, 0, WHITE)
+
+
+def in_setup(position):
+    return any(position[player].bit_count() + position[4 + player] < RINGS for player in (WHITE, BLACK))
+
+
+def place_ring(position, cell):
+    player = position[6]
+    placed = list(position)
+    placed[player] |= 1 << cell
+    placed[6] = 1 - player
+    return tuple(placed)
+
+
+def setup_cells(position):
+    return squares_of(FULL & ~(position[0] | position[1]))
+
+
+def ring_targets(position, cell):
+    # Where the ring on `cell` can go, as a bitmask.
+    rings = position[0] | position[1]
+    markers = position[2] | position[3]
+    targets = 0
+    for direction in range(6):
+        ray = RAYS[cell][direction]
+        if direction < 3:
+            blocking = ray & rings
+            if blocking:
+                ray &= (blocking & -blocking) - 1
+            jumped = ray & markers
+            if not jumped:
+                targets |= ray
+                continue
+            first = jumped & -jumped
+            targets |= ray & (first - 1)
+            landing = ray & ~markers & ~((first << 1) - 1)
+            targets |= landing & -landing
+        else:
+            blocking = ray & rings
+            if blocking:
+                ray &= ~((1 << blocking.bit_length()) - 1)
+            jumped = ray & markers
+            if not jumped:
+                targets |= ray
+                continue
+            first = 1 << (jumped.bit_length() - 1)
+            targets |= ray & ~((first << 1) - 1)
+            landing = ray & ~markers & (first - 1)
+            if landing:
+                targets |= 1 << (landing.bit_length() - 1)
+    return targets
+
+
+def legal_moves(position):
+    moves = []
+    for cell in squares_of(position[position[6]]):
+        for target in squares_of(ring_targets(position, cell)):
+            moves.append((cell, target))
+    return moves
+
+
+def apply_move(position, move):
+    # Places a marker in the ring, moves the ring and flips the markers it
+    # jumped. Returns (position, touched cells) with the turn not yet
+    # passed on; rows are left on the board for the caller to remove.
+    source, target = move
+    player = position[6]
+    rings = [position[0], position[1]]
+    rings[player] ^= (1 << source) | (1 << target)
+    markers = [position[2], position[3]]
+    markers[player] |= 1 << source
+    between = BETWEEN[(source, target)]
+    white, black = markers[WHITE] & between, markers[BLACK] & between
+    markers[WHITE] ^= white | black
+    markers[BLACK] ^= white | black
+    touched = (1 << source) | white | black
+    return (rings[0], rings[1], markers[0], markers[1], position[4], position[5], player), touched
+
+
+def complete_rows(position, player, touched=None):
+    # The windows of five `player` markers among those through `touched`
+    # (all windows when None).
+    markers = position[2 + player]
+    if touched is None:
+        return [window for window in WINDOWS if window & markers == window]
+    found = []
+    for cell in squares_of(touched & markers):
+        for window in CELL_WINDOWS[cell]:
+            if window & markers == window and window not in found:
+                found.append(window)
+    return found
+
+
+def remove_row(position, player, window, ring):
+    removed = list(position)
+    removed[2 + player] &= ~window
+    removed[player] &= ~(1 << ring)
+    removed[4 + player] += 1
+    return tuple(removed)
+
+
+def auto_remove(position, player, touched=None):
+    # Removes `player`'s rows one at a time: the first complete row and the
+    # ring on the cell with the fewest lines.
+    rows = complete_rows(position, player, touched)
+    while rows and position[4 + player] < WIN_RINGS:
+        window = rows[0]
+        ring = min(squares_of(position[player]), key=lambda cell: (LINE_COUNTS[cell], cell))
+        position = remove_row(position, player, window, ring)
+        markers = position[2 + player]
+        rows = [other for other in rows[1:] if other & markers == other]
+    return position
+
+
+def pass_turn(position):
+    return position[:6] + (1 - position[6],)
+
+
+def play(position, move):
+    # A full turn as the computer plays it: the move, both sides' rows
+    # removed (the mover's first), then the turn passes.
+    position, touched = apply_move(position, move)
+    player = position[6]
+    position = auto_remove(position, player, touched)
+    position = auto_remove(position, 1 - player, touched)
+    return pass_turn(position)
+
+
+def winner(position):
+    # WHITE, BLACK, DRAW or None while the game goes on. The game also ends
+    # when the marker supply runs out, won by whoever removed more rings.
+    for player in (WHITE, BLACK):
+        if position[4 + player] >= WIN_RINGS:
+            return player
+    if (position[2] | position[3]).bit_count() >= MARKERS:
+        if position[4] == position[5]:
+            return DRAW
+        return WHITE if position[4] > position[5] else BLACK
+    return None
+
+
+def evaluate(position):
+    # From the side to move: removed rings, markers, and windows one side
+    # is building with no opposing marker in them.
+    player = position[6]
+    own, other = position[2 + player], position[3 - player]
+    score = RING_VALUE * (position[4 + player] - position[5 - player])
+    score += MARKER_VALUE * (own.bit_count() - other.bit_count())
+    for window in WINDOWS:
+        mine = window & own
+        theirs = window & other
+        if mine and not theirs:
+            score += WINDOW_VALUES[mine.bit_count()]
+        elif theirs and not mine:
+            score -= WINDOW_VALUES[theirs.bit_count()]
+    return score
+
+
+def choose_ring_cell(position, rng=None):
+    # Setup: a free cell on many lines, near the middle, away from the
+    # board edge.
+    rng = rng or random.Random()
+    cells = setup_cells(position)
+    best = max(LINE_COUNTS[cell] for cell in cells)
+    return rng.choice([cell for cell in cells if LINE_COUNTS[cell] >= best - 2])
+
+
+class _Timeout(Exception):
+    pass
+
+
+class Searcher:
+    # Iterative-deepening negamax with alpha-beta pruning and a
+    # transposition table, like the Onitama searcher. A turn in the tree
+    # is play(): rows are removed automatically for both sides.
+
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    def __init__(self, table_size=500_000):
+        self.table = {}
+        self.table_size = table_size
+        self.nodes = 0
+        self.deadline = None
+
+    def _negamax(self, position, depth, alpha, beta, ply):
+        self.nodes += 1
+        if not self.nodes % CHECK_EVERY and time.perf_counter() > self.deadline:
+            raise _Timeout
+
+        won = winner(position)
+        if won is not None:
+            if won == DRAW:
+                return 0
+            return WIN_SCORE - ply if won == position[6] else -WIN_SCORE + ply
+        if depth == 0:
+            return evaluate(position)
+
+        original_alpha = alpha
+        entry = self.table.get(position)
+        best_move = None
+        if entry is not None:
+            entry_depth, entry_score, bound, best_move = entry
+            if entry_depth >= depth:
+                if bound == self.EXACT:
+                    return entry_score
+                if bound == self.LOWER and entry_score >= beta:
+                    return entry_score
+                if bound == self.UPPER and entry_score <= alpha:
+                    return entry_score
+
+        moves = legal_moves(position)
+        if not moves:
+            return -self._negamax(pass_turn(position), depth - 1, -beta, -alpha, ply + 1)
+        if best_move in moves:
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+
+        best_score = -WIN_SCORE - 1
+        for move in moves:
+            score = -self._negamax(play(position, move), depth - 1, -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_score <= original_alpha:
+            bound = self.UPPER
+        elif best_score >= beta:
+            bound = self.LOWER
+        else:
+            bound = self.EXACT
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+        self.table[position] = (depth, best_score, bound, best_move)
+        return best_score
+
+    def search(self, position, budget=BUDGET_SECONDS, max_depth=MAX_DEPTH):
+        # Returns (move, stats); move is None when the side to move has no
+        # ring move.
+        started = time.perf_counter()
+        self.deadline = started + budget
+        self.nodes = 0
+        moves = legal_moves(position)
+        stats = {"depth": 0, "score": 0, "moves": len(moves)}
+        best_move = moves[0] if moves else None
+        for depth in range(1, max_depth + 1):
+            if not moves:
+                break
+            try:
+                score = self._negamax(position, depth, -WIN_SCORE - 1, WIN_SCORE + 1, 0)
+            except _Timeout:
+                break
+            best_move = self.table[position][3]
+            stats["depth"] = depth
+            stats["score"] = score
+            if abs(score) >= WIN_SCORE - MAX_DEPTH:
+                break
+        stats["nodes"] = self.nodes
+        stats["seconds"] = time.perf_counter() - started
+        return best_move, stats
+
+
+def choose_move(position, budget=BUDGET_SECONDS, searcher=None):
+    return (searcher or Searcher()).search(position, budget)
+
+
+def move_text(position, move):
+    source, target = move
+    flipped = (BETWEEN[(source, target)] & (position[2] | position[3])).bit_count()
+    text = f"{cell_name(source)}-{cell_name(target)}"
+    return f"{text} flipping {flipped}" if flipped else text
+
+
+def row_text(window):
+    cells = squares_of(window)
+    return f"{cell_name(cells[0])}-{cell_name(cells[-1])}"
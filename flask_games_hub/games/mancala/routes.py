@@ -1,5 +1,6 @@
-from flask import Blueprint, redirect, render_template, request, session, url_for
+from flask import Blueprint, redirect, render_template, request, url_for
 
+from games import state_store
 from games.mancala.engine import (
     AI_PITS,
     AI_STORE,
@@ -14,9 +15,32 @@ from games.mancala.engine import (
 
 mancala_bp = Blueprint("mancala", __name__, url_prefix="/games/mancala")
 
+STATE_FIELDS = {"board", "turn", "message", "game_over"}
+
+
+def _pack_state(state):
+    # 14 pit counts (48 stones at most), a flag byte, then the message.
+    if set(state) != STATE_FIELDS or state["turn"] not in ("human", "ai"):
+        return None
+    flags = (state["turn"] == "ai") | state["game_over"] << 1
+    return bytes(state["board"]) + bytes((flags,)) + state["message"].encode()
+
+
+def _unpack_state(data):
+    flags = data[14]
+    return {
+        "board": list(data[:14]),
+        "turn": "ai" if flags & 1 else "human",
+        "message": bytes(data[15:]).decode(),
+        "game_over": bool(flags & 2),
+    }
+
+
+state_store.register_codec("mancala_state", _pack_state, _unpack_state)
+
 
 def _get_state():
-    state = session.get("mancala_state")
+    state = state_store.load("mancala_state")
     if state:
         return state
     state = {
@@ -25,13 +49,12 @@ def _get_state():
         "message": "Your turn.",
         "game_over": False,
     }
-    session["mancala_state"] = state
+    state_store.save("mancala_state", state)
     return state
 
 
 def _save_state(state):
-    session["mancala_state"] = state
-    session.modified = True
+    state_store.save("mancala_state", state)
 
 
 def _is_game_over(board):
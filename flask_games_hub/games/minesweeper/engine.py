@@ -0,0 +1,101 @@
+import numpy as np
+
+# Boards are flat row-major arrays. `cells` is a bytes object where each byte
+# is the adjacent-mine count (0-8) or MINE; `revealed` is a bytearray of 0/1.
+# Both are stored in session state as strings of the same length.
+
+MINE = 9
+
+TIERS = {
+    "beginner": (9, 9, 10),
+    "intermediate": (16, 16, 40),
+    "expert": (16, 30, 99),
+}
+
+_CELL_CHARS = b"012345678*"
+_CELLS_TO_TEXT = bytes.maketrans(bytes(range(len(_CELL_CHARS))), _CELL_CHARS)
+_TEXT_TO_CELLS = bytes.maketrans(_CELL_CHARS, bytes(range(len(_CELL_CHARS))))
+_REVEALED_TO_TEXT = bytes.maketrans(b"\x00\x01", b"01")
+_TEXT_TO_REVEALED = bytes.maketrans(b"01", b"\x00\x01")
+
+
+def neighbor_counts(mines):
+    rows, cols = mines.shape
+    padded = np.zeros((rows + 2, cols + 2), dtype=np.uint8)
+    padded[1:-1, 1:-1] = mines
+    counts = np.zeros((rows, cols), dtype=np.uint8)
+    for dr in range(3):
+        for dc in range(3):
+            if dr == 1 and dc == 1:
+                continue
+            counts += padded[dr:dr + rows, dc:dc + cols]
+    return counts
+
+
+def cells_from_mines(mines):
+    cells = neighbor_counts(mines)
+    cells[mines.astype(bool)] = MINE
+    return cells.tobytes()
+
+
+def generate_cells(rows, cols, mine_count, rng=None, safe=()):
+    # `safe` lists cells that must not hold a mine, e.g. an opening area.
+    candidates = np.setdiff1d(np.arange(rows * cols), np.asarray(safe, dtype=np.int64))
+    if not 0 <= mine_count < rows * cols or mine_count > len(candidates):
+        raise ValueError("Mine count must leave at least one safe cell.")
+    rng = rng or np.random.default_rng()
+    mines = np.zeros(rows * cols, dtype=np.uint8)
+    mines[rng.choice(candidates, size=mine_count, replace=False)] = 1
+    return cells_from_mines(mines.reshape(rows, cols))
+
+
+def neighbors(index, rows, cols):
+    row, col = divmod(index, cols)
+    for nr in range(max(row - 1, 0), min(row + 2, rows)):
+        for nc in range(max(col - 1, 0), min(col + 2, cols)):
+            if nr != row or nc != col:
+                yield nr * cols + nc
+
+
+def flood_reveal(cells, revealed, rows, cols, start):
+    # Reveals `start` and, through zero cells, everything connected to it.
+    # Marks cells in `revealed` as it goes and returns only the new ones.
+    if revealed[start] or cells[start] == MINE:
+        return []
+    revealed[start] = 1
+    stack = [start]
+    opened = []
+    while stack:
+        index = stack.pop()
+        opened.append(index)
+        if cells[index] != 0:
+            continue
+        row, col = divmod(index, cols)
+        for nr in range(max(row - 1, 0), min(row + 2, rows)):
+            base = nr * cols
+            for nc in range(max(col - 1, 0), min(col + 2, cols)):
+                neighbor = base + nc
+                if not revealed[neighbor]:
+                    revealed[neighbor] = 1
+                    stack.append(neighbor)
+    return opened
+
+
+def count_mines(cells):
+    return cells.count(MINE)
+
+
+def encode_cells(cells):
+    return cells.translate(_CELLS_TO_TEXT).decode("ascii")
+
+
+def decode_cells(text):
+    return text.encode("ascii").translate(_TEXT_TO_CELLS)
+
+
+def encode_revealed(revealed):
+    return bytes(revealed).translate(_REVEALED_TO_TEXT).decode("ascii")
+
+
+def decode_revealed(text):
+    return bytearray(text.encode("ascii").translate(_TEXT_TO_REVEALED))
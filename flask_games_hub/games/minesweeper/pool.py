@@ -0,0 +1,164 @@
+import atexit
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from games.minesweeper import engine as minesweeper
+from games.minesweeper import solver
+
+POOL_CAPACITY = 8
+POOL_WORKERS = 2
+WORKER_ATTEMPTS = 500
+FALLBACK_ATTEMPTS = 20
+
+
+def generate_no_guess_board(rows, cols, mine_count, attempts, rng=None):
+    # Places mines away from a random start cell so the start opens an area,
+    # then keeps the first layout the solver clears without guessing.
+    # Returns (cells, start, tries), with cells None if every attempt failed.
+    rng = rng or np.random.default_rng()
+    for tries in range(1, attempts + 1):
+        start = int(rng.integers(rows * cols))
+        opening = [start, *minesweeper.neighbors(start, rows, cols)]
+        if rows * cols - len(opening) < mine_count:
+            opening = [start]
+        cells = minesweeper.generate_cells(rows, cols, mine_count, rng, safe=opening)
+        revealed = bytearray(rows * cols)
+        minesweeper.flood_reveal(cells, revealed, rows, cols, start)
+        if solver.solve_without_guessing(cells, revealed, rows, cols, mine_count):
+            return cells, start, tries
+    return None, None, attempts
+
+
+class BoardPool:
+    # Keeps up to `capacity` verified no-guess boards per (rows, cols, mines)
+    # tier. Worker processes refill a tier whenever a board is taken from it;
+    # take() is an O(1) pop, or a synchronous fallback when the tier is empty.
+    # At most `workers` boards are submitted at a time, the emptiest tier
+    # first, so the executor never queues work: at exit, concurrent.futures
+    # only waits for the boards being generated.
+
+    def __init__(self, tiers, capacity=POOL_CAPACITY, workers=POOL_WORKERS):
+        self.capacity = capacity
+        self.workers = workers
+        self._boards = {tier: deque() for tier in tiers}
+        self._pending = {tier: 0 for tier in tiers}
+        self._metrics = {
+            tier: {
+                "generated": 0,
+                "served": 0,
+                "fallbacks": 0,
+                "fallback_failures": 0,
+                "attempts": 0,
+                "worker_seconds": 0.0,
+                "errors": 0,
+            }
+            for tier in tiers
+        }
+        self._lock = threading.RLock()
+        self._executor = None
+
+    def start(self):
+        with self._lock:
+            if self._executor is not None:
+                return
+            atexit.register(self.shutdown)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        self._refill()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _refill(self):
+        with self._lock:
+            if self._executor is None:
+                return
+            while sum(self._pending.values()) < self.workers:
+                tier = max(self._boards, key=self._missing)
+                if self._missing(tier) <= 0:
+                    return
+                try:
+                    future = self._executor.submit(_timed_generate, *tier, WORKER_ATTEMPTS)
+                except RuntimeError:
+                    # Shut down by concurrent.futures at interpreter exit.
+                    return
+                self._pending[tier] += 1
+                future.add_done_callback(lambda done, tier=tier: self._collect(tier, done))
+
+    def _missing(self, tier):
+        return self.capacity - len(self._boards[tier]) - self._pending[tier]
+
+    def _collect(self, tier, future):
+        with self._lock:
+            self._pending[tier] -= 1
+            metrics = self._metrics[tier]
+            if future.cancelled() or future.exception() is not None:
+                metrics["errors"] += 1
+                return
+            cells, start, tries, seconds = future.result()
+            metrics["attempts"] += tries
+            metrics["worker_seconds"] += seconds
+            if cells is not None:
+                metrics["generated"] += 1
+                self._boards[tier].append((cells, start))
+        self._refill()
+
+    def take(self, rows, cols, mine_count):
+        # Returns (cells, start, no_guess).
+        tier = (rows, cols, mine_count)
+        if tier not in self._boards:
+            cells, start, _ = generate_no_guess_board(rows, cols, mine_count, FALLBACK_ATTEMPTS)
+            return _plain_board_if_missing(cells, start, rows, cols, mine_count)
+
+        self.start()
+        with self._lock:
+            board = self._boards[tier].popleft() if self._boards[tier] else None
+            self._metrics[tier]["served" if board else "fallbacks"] += 1
+        self._refill()
+        if board is not None:
+            return board[0], board[1], True
+
+        cells, start, _ = generate_no_guess_board(rows, cols, mine_count, FALLBACK_ATTEMPTS)
+        if cells is None:
+            with self._lock:
+                self._metrics[tier]["fallback_failures"] += 1
+        return _plain_board_if_missing(cells, start, rows, cols, mine_count)
+
+    def metrics(self):
+        with self._lock:
+            return [
+                {
+                    "rows": tier[0],
+                    "cols": tier[1],
+                    "mines": tier[2],
+                    "ready": len(self._boards[tier]),
+                    "pending": self._pending[tier],
+                    **self._metrics[tier],
+                }
+                for tier in self._boards
+            ]
+
+
+def _timed_generate(rows, cols, mine_count, attempts):
+    started = time.perf_counter()
+    cells, start, tries = generate_no_guess_board(rows, cols, mine_count, attempts)
+    return cells, start, tries, time.perf_counter() - started
+
+
+def _plain_board_if_missing(cells, start, rows, cols, mine_count):
+    if cells is not None:
+        return cells, start, True
+    return minesweeper.generate_cells(rows, cols, mine_count), None, False
+
+
+board_pool = BoardPool(list(minesweeper.TIERS.values()))
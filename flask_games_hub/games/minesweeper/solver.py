@@ -0,0 +1,293 @@
+from collections import deque
+from math import comb
+
+from games.minesweeper.engine import MINE, flood_reveal, neighbors
+
+# The solver only looks at what the player can see: the numbers on revealed
+# cells and the total mine count. Each revealed number gives a constraint
+# "these unknown neighbours hold exactly n mines".
+
+
+class InconsistentBoard(ValueError):
+    pass
+
+
+def _constraints(cells, revealed, rows, cols):
+    constraints = []
+    for index, is_revealed in enumerate(revealed):
+        if not is_revealed or cells[index] == 0 or cells[index] == MINE:
+            continue
+        unknown = frozenset(n for n in neighbors(index, rows, cols) if not revealed[n])
+        if unknown:
+            constraints.append((unknown, cells[index]))
+    return constraints
+
+
+def propagate(constraints, mines=None, safe=None):
+    # Single-constraint rules plus the subset rule (A within B means B - A
+    # holds count(B) - count(A) mines), repeated until nothing changes.
+    mines = set() if mines is None else mines
+    safe = set() if safe is None else safe
+    changed = True
+    while changed:
+        changed = False
+        reduced = {}
+        for variables, count in constraints:
+            unknown = frozenset(v for v in variables if v not in mines and v not in safe)
+            count -= sum(1 for v in variables if v in mines)
+            if count < 0 or count > len(unknown):
+                raise InconsistentBoard("Constraints contradict each other.")
+            if not unknown:
+                continue
+            if count == 0:
+                safe.update(unknown)
+                changed = True
+            elif count == len(unknown):
+                mines.update(unknown)
+                changed = True
+            elif reduced.setdefault(unknown, count) != count:
+                raise InconsistentBoard("Constraints contradict each other.")
+        constraints = list(reduced.items())
+        if changed:
+            continue
+
+        by_variable = {}
+        for variables, count in constraints:
+            for variable in variables:
+                by_variable.setdefault(variable, []).append((variables, count))
+        for variables, count in constraints:
+            for variable in variables:
+                for other, other_count in by_variable[variable]:
+                    if variables < other and other - variables not in reduced:
+                        reduced[other - variables] = other_count - count
+                        changed = True
+        constraints = list(reduced.items())
+    return constraints, mines, safe
+
+
+def _components(constraints):
+    parent = {}
+
+    def find(item):
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    for variables, _ in constraints:
+        for variable in variables:
+            parent.setdefault(variable, variable)
+        first = find(next(iter(variables)))
+        for variable in variables:
+            root = find(variable)
+            if root != first:
+                parent[root] = first
+
+    grouped = {}
+    for variables, count in constraints:
+        grouped.setdefault(find(next(iter(variables))), []).append((variables, count))
+    return list(grouped.values())
+
+
+def _variable_order(constraints):
+    # Breadth-first order over shared constraints keeps the set of
+    # partially assigned constraints (the DP state) small.
+    adjacency = {}
+    for variables, _ in constraints:
+        for variable in variables:
+            adjacency.setdefault(variable, set()).update(variables)
+    start = min(adjacency, key=lambda variable: (len(adjacency[variable]), variable))
+    order = [start]
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        for neighbour in sorted(adjacency[queue.popleft()] - seen):
+            seen.add(neighbour)
+            order.append(neighbour)
+            queue.append(neighbour)
+    return order
+
+
+def _add_shifted(target, source, shift, factor=1):
+    for mines, ways in source.items():
+        target[mines + shift] = target.get(mines + shift, 0) + ways * factor
+
+
+def _count_component(constraints):
+    # Memoized forward/backward counting. The DP state at step i is the
+    # remaining mine count of every constraint that has variables on both
+    # sides of i, so equivalent partial assignments are counted once.
+    # Returns (variables, totals, weights): totals[k] is the number of
+    # solutions with k mines and weights[j][k] how many of those put a mine
+    # on variables[j].
+    variables = _variable_order(constraints)
+    position = {variable: index for index, variable in enumerate(variables)}
+    size = len(variables)
+    counts = [count for _, count in constraints]
+    members = [sorted(position[v] for v in cells) for cells, _ in constraints]
+    first = [items[0] for items in members]
+    last = [items[-1] for items in members]
+
+    touching = [[] for _ in range(size)]
+    for constraint, items in enumerate(members):
+        for item in items:
+            touching[item].append(constraint)
+    active = [[c for c in range(len(constraints)) if first[c] < i <= last[c]] for i in range(size + 1)]
+
+    # Per step: where each touched constraint's remaining count comes from
+    # (a slot of the incoming state, or its full count on first touch), how
+    # many of its variables are unassigned afterwards, and where each slot of
+    # the outgoing state comes from.
+    plans = []
+    for step in range(size):
+        incoming = {constraint: slot for slot, constraint in enumerate(active[step])}
+        touched = {constraint: slot for slot, constraint in enumerate(touching[step])}
+        updates = [
+            (incoming.get(constraint), counts[constraint], sum(1 for item in members[constraint] if item > step))
+            for constraint in touching[step]
+        ]
+        outgoing = [
+            (touched[constraint], True) if constraint in touched else (incoming[constraint], False)
+            for constraint in active[step + 1]
+        ]
+        plans.append((updates, outgoing))
+
+    def transition(step, state, value):
+        updates, outgoing = plans[step]
+        updated = []
+        for slot, count, slots_left in updates:
+            left = (count if slot is None else state[slot]) - value
+            if left < 0 or left > slots_left:
+                return None
+            updated.append(left)
+        return tuple(updated[source] if from_update else state[source] for source, from_update in outgoing)
+
+    forward = [dict() for _ in range(size + 1)]
+    forward[0][()] = {0: 1}
+    edges = [dict() for _ in range(size)]
+    for step in range(size):
+        for state, distribution in forward[step].items():
+            moves = []
+            for value in (0, 1):
+                following = transition(step, state, value)
+                if following is not None:
+                    moves.append((value, following))
+                    _add_shifted(forward[step + 1].setdefault(following, {}), distribution, value)
+            edges[step][state] = moves
+
+    backward = [dict() for _ in range(size + 1)]
+    backward[size][()] = {0: 1}
+    weights = [{} for _ in range(size)]
+    for step in range(size - 1, -1, -1):
+        for state, distribution in forward[step].items():
+            completions = {}
+            for value, following in edges[step][state]:
+                after = backward[step + 1].get(following)
+                if after is None:
+                    continue
+                _add_shifted(completions, after, value)
+                if value:
+                    for before, ways_before in distribution.items():
+                        _add_shifted(weights[step], after, before + 1, ways_before)
+            if completions:
+                backward[step][state] = completions
+
+    totals = backward[0].get((), {})
+    if not totals:
+        raise InconsistentBoard("No mine layout fits the revealed numbers.")
+    return variables, totals, weights
+
+
+def _convolve(left, right):
+    result = {}
+    for mines, ways in left.items():
+        _add_shifted(result, right, mines, ways)
+    return result
+
+
+def mine_probabilities(cells, revealed, rows, cols, mine_count):
+    # Returns (probabilities, other): exact mine probabilities for every
+    # unrevealed cell that touches a revealed number, and the probability
+    # shared by all remaining unrevealed cells.
+    constraints, mines, safe = propagate(_constraints(cells, revealed, rows, cols))
+    components = [_count_component(group) for group in _components(constraints)]
+
+    constrained = set(mines) | set(safe)
+    for variables, _, _ in components:
+        constrained.update(variables)
+    unconstrained = sum(1 for value in revealed if not value) - len(constrained)
+    remaining = mine_count - len(mines)
+
+    prefix = [{0: 1}]
+    for _, totals, _ in components:
+        prefix.append(_convolve(prefix[-1], totals))
+    suffix = [{0: 1}]
+    for _, totals, _ in reversed(components):
+        suffix.append(_convolve(suffix[-1], totals))
+    suffix.reverse()
+
+    def layouts(placed):
+        left = remaining - placed
+        return comb(unconstrained, left) if 0 <= left <= unconstrained else 0
+
+    everything = prefix[-1]
+    total = sum(ways * layouts(placed) for placed, ways in everything.items())
+    if total == 0:
+        raise InconsistentBoard("No mine layout fits the mine count.")
+
+    probabilities = {index: 1.0 for index in mines}
+    probabilities.update({index: 0.0 for index in safe})
+    for number, (variables, _, weights) in enumerate(components):
+        others = _convolve(prefix[number], suffix[number + 1])
+        completion = {}
+        for placed in {k for w in weights for k in w}:
+            completion[placed] = sum(ways * layouts(placed + extra) for extra, ways in others.items())
+        for variable, weight in zip(variables, weights):
+            probabilities[variable] = sum(ways * completion[placed] for placed, ways in weight.items()) / total
+
+    other = 0.0
+    if unconstrained:
+        expected = sum(ways * layouts(placed) * (remaining - placed) for placed, ways in everything.items())
+        other = expected / total / unconstrained
+    return probabilities, other
+
+
+def safest_cell(cells, revealed, rows, cols, mine_count):
+    probabilities, other = mine_probabilities(cells, revealed, rows, cols, mine_count)
+    best = None
+    if probabilities:
+        best = min(probabilities, key=lambda index: (probabilities[index], index))
+    if best is None or other < probabilities[best]:
+        fallback = next(
+            (index for index, value in enumerate(revealed) if not value and index not in probabilities),
+            None,
+        )
+        if fallback is not None:
+            return fallback, other
+    return best, probabilities.get(best, other)
+
+
+def certain_safe_cells(cells, revealed, rows, cols, mine_count):
+    probabilities, other = mine_probabilities(cells, revealed, rows, cols, mine_count)
+    certain = [index for index, probability in probabilities.items() if probability == 0.0]
+    if other == 0.0:
+        certain.extend(
+            index for index, value in enumerate(revealed) if not value and index not in probabilities
+        )
+    return sorted(certain)
+
+
+def solve_without_guessing(cells, revealed, rows, cols, mine_count):
+    # Reveals cells that logic proves safe until the board is cleared or
+    # progress stops. Cheap propagation is tried before full enumeration.
+    # Returns True when every safe cell ends up revealed.
+    safe_left = sum(1 for index, value in enumerate(revealed) if not value and cells[index] != MINE)
+    while safe_left:
+        _, _, safe = propagate(_constraints(cells, revealed, rows, cols))
+        if not safe:
+            safe = certain_safe_cells(cells, revealed, rows, cols, mine_count)
+        if not safe:
+            return False
+        for index in safe:
+            safe_left -= len(flood_reveal(cells, revealed, rows, cols, index))
+    return True
@@ -0,0 +1,272 @@
+import random
+import time
+
+from games.lite.bitboards import HIGH_SQUARES, LOW_SQUARES, SPLIT, SPLIT_MASK, SQUARES, squares_of
+
+# Onitama on 25-bit bitboards: square = row * 5 + col, row 0 on Blue's side
+# (the computer) and row 4 on Red's (the player). A position is the tuple
+#
+#     (red pieces, blue pieces, red master, blue master,
+#      red cards, blue cards, side card, player to move)
+#
+# where pieces include the master, a captured master's square is NO_MASTER
+# and each hand is a sorted pair of card indexes. Positions are hashable, so
+# they key the search's transposition table directly.
+#
+# Card moves are (dx, dy) with dy pointing away from the mover. They are
+# precomputed into per-player, per-card, per-square target lists.
+
+RED = 0
+BLUE = 1
+NO_MASTER = -1
+TEMPLES = (22, 2)
+
+CARDS = (
+    ("Tiger", ((0, 2), (0, -1))),
+    ("Dragon", ((-2, 1), (2, 1), (-1, -1), (1, -1))),
+    ("Frog", ((-2, 0), (-1, 1), (1, -1))),
+    ("Rabbit", ((2, 0), (1, 1), (-1, -1))),
+    ("Crab", ((0, 1), (-2, 0), (2, 0))),
+    ("Elephant", ((-1, 1), (1, 1), (-1, 0), (1, 0))),
+    ("Goose", ((-1, 1), (-1, 0), (1, 0), (1, -1))),
+    ("Rooster", ((1, 1), (-1, 0), (1, 0), (-1, -1))),
+    ("Monkey", ((-1, 1), (1, 1), (-1, -1), (1, -1))),
+    ("Mantis", ((-1, 1), (1, 1), (0, -1))),
+    ("Horse", ((0, 1), (-1, 0), (0, -1))),
+    ("Ox", ((0, 1), (1, 0), (0, -1))),
+    ("Crane", ((0, 1), (-1, -1), (1, -1))),
+    ("Boar", ((0, 1), (-1, 0), (1, 0))),
+    ("Eel", ((-1, 1), (-1, -1), (1, 0))),
+    ("Cobra", ((1, 1), (1, -1), (-1, 0))),
+)
+CARD_NAMES = tuple(name for name, _ in CARDS)
+
+WIN_SCORE = 100_000
+STUDENT_VALUE = 100
+MASTER_DISTANCE_VALUE = 4
+STUDENT_ADVANCE_VALUE = 2
+BUDGET_SECONDS = 0.5
+MAX_DEPTH = 30
+CHECK_EVERY = 1024
+
+
+def _targets():
+    # TARGETS[player][card][square] -> squares that card moves to from there.
+    tables = []
+    for player in (RED, BLUE):
+        forward = -1 if player == RED else 1
+        side = 1 if player == RED else -1
+        per_card = []
+        for _, offsets in CARDS:
+            per_square = []
+            for square in range(SQUARES):
+                row, col = divmod(square, 5)
+                per_square.append(tuple(
+                    (row + dy * forward) * 5 + col + dx * side
+                    for dx, dy in offsets
+                    if 0 <= row + dy * forward < 5 and 0 <= col + dx * side < 5
+                ))
+            per_card.append(tuple(per_square))
+        tables.append(tuple(per_card))
+    return tuple(tables)
+
+
+TARGETS = _targets()
+
+# Summed rows advanced by the pieces in each half of a bitboard.
+ADVANCE_ROWS = ((4, 3, 2, 1, 0), (0, 1, 2, 3, 4))
+LOW_ADVANCE = tuple(
+    tuple(sum(ADVANCE_ROWS[player][square // 5] for square in squares) for squares in LOW_SQUARES)
+    for player in (RED, BLUE)
+)
+HIGH_ADVANCE = tuple(
+    tuple(sum(ADVANCE_ROWS[player][square // 5] for square in squares) for squares in HIGH_SQUARES)
+    for player in (RED, BLUE)
+)
+TEMPLE_DISTANCE = tuple(
+    tuple(max(abs(square // 5 - TEMPLES[1 - player] // 5), abs(square % 5 - TEMPLES[1 - player] % 5))
+          for square in range(SQUARES))
+    for player in (RED, BLUE)
+)
+
+
+def new_game(rng=None, cards=None):
+    # Deals five cards (or uses `cards`: two for Red, two for Blue, then the
+    # side card). Red moves first.
+    rng = rng or random.Random()
+    cards = list(cards) if cards is not None else rng.sample(range(len(CARDS)), 5)
+    red = sum(1 << square for square in range(20, 25))
+    blue = sum(1 << square for square in range(5))
+    return (red, blue, TEMPLES[RED], TEMPLES[BLUE], tuple(sorted(cards[:2])), tuple(sorted(cards[2:4])), cards[4], RED)
+
+
+def winner(position):
+    red, blue, red_master, blue_master = position[:4]
+    if red_master == NO_MASTER or blue_master == TEMPLES[RED]:
+        return BLUE
+    if blue_master == NO_MASTER or red_master == TEMPLES[BLUE]:
+        return RED
+    return None
+
+
+def legal_moves(position):
+    # Moves are (card, from square, to square). A player with no legal move
+    # must still pass a card: that is (card, None, None).
+    player = position[7]
+    own = position[player]
+    hand = position[4 + player]
+    sources = squares_of(own)
+    moves = []
+    for card in hand:
+        card_targets = TARGETS[player][card]
+        for source in sources:
+            for target in card_targets[source]:
+                if not own >> target & 1:
+                    moves.append((card, source, target))
+    if not moves:
+        moves = [(card, None, None) for card in hand]
+    return moves
+
+
+def apply_move(position, move):
+    red, blue, red_master, blue_master, red_cards, blue_cards, side, player = position
+    card, source, target = move
+    if player == RED:
+        red_cards = tuple(sorted((red_cards[1] if red_cards[0] == card else red_cards[0], side)))
+    else:
+        blue_cards = tuple(sorted((blue_cards[1] if blue_cards[0] == card else blue_cards[0], side)))
+    if source is not None:
+        step = (1 << source) | (1 << target)
+        if player == RED:
+            red ^= step
+            blue &= ~(1 << target)
+            if source == red_master:
+                red_master = target
+            if target == blue_master:
+                blue_master = NO_MASTER
+        else:
+            blue ^= step
+            red &= ~(1 << target)
+            if source == blue_master:
+                blue_master = target
+            if target == red_master:
+                red_master = NO_MASTER
+    return (red, blue, red_master, blue_master, red_cards, blue_cards, card, 1 - player)
+
+
+def evaluate(position):
+    # Static score from the view of the player to move.
+    red, blue, red_master, blue_master = position[:4]
+    score = STUDENT_VALUE * (red.bit_count() - blue.bit_count())
+    score += MASTER_DISTANCE_VALUE * (TEMPLE_DISTANCE[BLUE][blue_master] - TEMPLE_DISTANCE[RED][red_master])
+    score += STUDENT_ADVANCE_VALUE * (
+        LOW_ADVANCE[RED][red & SPLIT_MASK] + HIGH_ADVANCE[RED][red >> SPLIT]
+        - LOW_ADVANCE[BLUE][blue & SPLIT_MASK] - HIGH_ADVANCE[BLUE][blue >> SPLIT]
+    )
+    return score if position[7] == RED else -score
+
+
+class _Timeout(Exception):
+    pass
+
+
+class Searcher:
+    # Iterative-deepening negamax with alpha-beta pruning and a
+    # transposition table of (depth, score, bound, best move) per position.
+    # The table persists between calls, so consecutive moves reuse it.
+
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    def __init__(self, table_size=1_000_000):
+        self.table = {}
+        self.table_size = table_size
+        self.nodes = 0
+        self.deadline = None
+
+    def _negamax(self, position, depth, alpha, beta, ply):
+        self.nodes += 1
+        if not self.nodes % CHECK_EVERY and time.perf_counter() > self.deadline:
+            raise _Timeout
+
+        if winner(position) is not None:
+            # Only the player who just moved can have won.
+            return -WIN_SCORE + ply
+        if depth == 0:
+            return evaluate(position)
+
+        original_alpha = alpha
+        entry = self.table.get(position)
+        best_move = None
+        if entry is not None:
+            entry_depth, entry_score, bound, best_move = entry
+            if entry_depth >= depth:
+                if bound == self.EXACT:
+                    return entry_score
+                if bound == self.LOWER and entry_score >= beta:
+                    return entry_score
+                if bound == self.UPPER and entry_score <= alpha:
+                    return entry_score
+
+        moves = legal_moves(position)
+        player = position[7]
+        enemy = position[1 - player]
+        enemy_master = position[3 - player]
+        own_master = position[2 + player]
+        win_square = TEMPLES[1 - player]
+        # Winning moves, then the table move, then captures, then the rest.
+        moves.sort(key=lambda move: (
+            move[2] is not None and (move[2] == enemy_master or (move[1] == own_master and move[2] == win_square)),
+            move == best_move,
+            move[2] is not None and bool(enemy >> move[2] & 1),
+        ), reverse=True)
+
+        best_score = -WIN_SCORE - 1
+        for move in moves:
+            score = -self._negamax(apply_move(position, move), depth - 1, -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if best_score <= original_alpha:
+            bound = self.UPPER
+        elif best_score >= beta:
+            bound = self.LOWER
+        else:
+            bound = self.EXACT
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+        self.table[position] = (depth, best_score, bound, best_move)
+        return best_score
+
+    def search(self, position, budget=BUDGET_SECONDS, max_depth=MAX_DEPTH):
+        # Returns (move, stats). Deepens until the budget runs out and keeps
+        # the best move of the last finished depth.
+        started = time.perf_counter()
+        self.deadline = started + budget
+        self.nodes = 0
+        best_move = None
+        stats = {"depth": 0, "score": 0}
+        for depth in range(1, max_depth + 1):
+            try:
+                score = self._negamax(position, depth, -WIN_SCORE - 1, WIN_SCORE + 1, 0)
+            except _Timeout:
+                break
+            best_move = self.table[position][3]
+            stats["depth"] = depth
+            stats["score"] = score
+            if abs(score) >= WIN_SCORE - MAX_DEPTH:
+                break
+        if best_move is None:
+            best_move = legal_moves(position)[0]
+        stats["nodes"] = self.nodes
+        stats["seconds"] = time.perf_counter() - started
+        stats["nodes_per_second"] = self.nodes / stats["seconds"] if stats["seconds"] > 0 else 0.0
+        return best_move, stats
+
+
+def choose_move(position, budget=BUDGET_SECONDS, searcher=None):
+    return (searcher or Searcher()).search(position, budget)
@@ -0,0 +1,255 @@
+import random
+import time
+
+from games.lite.bitboards import FULL, SQUARES, neighbor_masks, squares_of
+
+# Santorini without god powers on a 5x5 board of 25-bit bitboards. Building
+# heights are four cumulative masks: LEVEL1 holds every square of height 1
+# or more, LEVEL2 height 2 or more, LEVEL3 height 3 or more and DOME the
+# capped squares. A position is the tuple
+#
+#     (level1, level2, level3, dome, red workers, blue workers, player)
+#
+# with each side's two worker squares as a sorted pair. Positions are
+# hashable and key the search's transposition table.
+#
+# A move is (worker square, destination, build square): step to a
+# neighbouring square at most one level up, then build next to it. Stepping
+# up onto level 3 wins at once, so those moves carry no build (None).
+
+RED = 0
+BLUE = 1
+NEIGHBORS = neighbor_masks(((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)))
+CENTER_BONUS = tuple(2 - max(abs(square // 5 - 2), abs(square % 5 - 2)) for square in range(SQUARES))
+
+WIN_SCORE = 100_000
+HEIGHT_VALUE = (0, 30, 90, 0)
+CLIMB_VALUE = 10
+CENTER_VALUE = 4
+BUDGET_SECONDS = 0.7
+MAX_DEPTH = 20
+CHECK_EVERY = 512
+
+
+def new_game(red_workers, blue_workers):
+    return (0, 0, 0, 0, tuple(sorted(red_workers)), tuple(sorted(blue_workers)), RED)
+
+
+def height(position, square):
+    return (position[0] >> square & 1) + (position[1] >> square & 1) + (position[2] >> square & 1) \
+        + (position[3] >> square & 1)
+
+
+def heights(position):
+    return [height(position, square) for square in range(SQUARES)]
+
+
+def legal_moves(position, first_win=False):
+    # Climbing moves first, then level moves, then moves down; winning moves
+    # come first of all. With `first_win`, a winning move is returned alone
+    # as soon as one is found.
+    level1, level2, level3, dome, red, blue, player = position
+    own = red if player == RED else blue
+    occupied = (1 << red[0]) | (1 << red[1]) | (1 << blue[0]) | (1 << blue[1])
+    blocked = occupied | dome
+    wins, up, level, down = [], [], [], []
+    for worker in own:
+        start = (level1 >> worker & 1) + (level2 >> worker & 1) + (level3 >> worker & 1)
+        reach = NEIGHBORS[worker] & ~blocked & (~level2 if start == 0 else ~level3 if start == 1 else FULL)
+        free = ~(blocked ^ (1 << worker))
+        for destination in squares_of(reach):
+            end = (level1 >> destination & 1) + (level2 >> destination & 1) + (level3 >> destination & 1)
+            if end == 3:
+                if first_win:
+                    return [(worker, destination, None)]
+                wins.append((worker, destination, None))
+                continue
+            bucket = up if end > start else level if end == start else down
+            for build in squares_of(NEIGHBORS[destination] & free):
+                bucket.append((worker, destination, build))
+    return wins + up + level + down
+
+
+def status(position):
+    # (can win this turn, can move at all) for the player to move, from the
+    # step masks alone. Any step leaves the vacated square to build on, so a
+    # worker that can step can always complete a move.
+    level1, level2, level3, dome, red, blue, player = position
+    blocked = dome | (1 << red[0]) | (1 << red[1]) | (1 << blue[0]) | (1 << blue[1])
+    can_move = False
+    for worker in (red if player == RED else blue):
+        start = (level1 >> worker & 1) + (level2 >> worker & 1) + (level3 >> worker & 1)
+        reach = NEIGHBORS[worker] & ~blocked & (~level2 if start == 0 else ~level3 if start == 1 else FULL)
+        if reach:
+            if start == 2 and reach & level3:
+                return True, True
+            can_move = True
+    return False, can_move
+
+
+def is_win(move):
+    return move[2] is None
+
+
+def apply_move(position, move):
+    level1, level2, level3, dome, red, blue, player = position
+    worker, destination, build = move
+    if player == RED:
+        red = (red[1], destination) if red[0] == worker else (red[0], destination)
+        red = red if red[0] < red[1] else (red[1], red[0])
+    else:
+        blue = (blue[1], destination) if blue[0] == worker else (blue[0], destination)
+        blue = blue if blue[0] < blue[1] else (blue[1], blue[0])
+    if build is not None:
+        bit = 1 << build
+        if not level1 & bit:
+            level1 |= bit
+        elif not level2 & bit:
+            level2 |= bit
+        elif not level3 & bit:
+            level3 |= bit
+        else:
+            dome |= bit
+    return (level1, level2, level3, dome, red, blue, 1 - player)
+
+
+def winner(position, last_move=None):
+    # The player who just moved wins by climbing onto level 3; the player to
+    # move loses when stuck.
+    if last_move is not None and is_win(last_move):
+        return 1 - position[6]
+    if not status(position)[1]:
+        return 1 - position[6]
+    return None
+
+
+def evaluate(position):
+    # Static score from the view of the player to move: worker heights,
+    # reachable higher squares and closeness to the centre.
+    level1, level2, level3, dome, red, blue, player = position
+    blocked = dome | (1 << red[0]) | (1 << red[1]) | (1 << blue[0]) | (1 << blue[1])
+    score = 0
+    for workers, sign in ((red, 1), (blue, -1)):
+        for worker in workers:
+            start = (level1 >> worker & 1) + (level2 >> worker & 1) + (level3 >> worker & 1)
+            around = NEIGHBORS[worker] & ~blocked
+            step_up = around & (level1 & ~level2 if start == 0 else level2 & ~level3 if start == 1 else level3)
+            score += sign * (HEIGHT_VALUE[start] + CLIMB_VALUE * step_up.bit_count() + CENTER_VALUE * CENTER_BONUS[worker])
+    return score if player == RED else -score
+
+
+class _Timeout(Exception):
+    pass
+
+
+class Searcher:
+    # Iterative-deepening negamax with alpha-beta pruning and a
+    # transposition table of (depth, score, bound, best move) per position.
+    # With around a hundred moves per position, ordering decides the depth
+    # reached: the table move goes first, then moves by history score (how
+    # often and how deep each move caused a cutoff).
+
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    def __init__(self, table_size=1_000_000):
+        self.table = {}
+        self.table_size = table_size
+        self.history = {}
+        self.nodes = 0
+        self.deadline = None
+
+    def _negamax(self, position, depth, alpha, beta, ply):
+        self.nodes += 1
+        if not self.nodes % CHECK_EVERY and time.perf_counter() > self.deadline:
+            raise _Timeout
+
+        can_win, can_move = status(position)
+        if can_win:
+            return WIN_SCORE - ply - 1
+        if not can_move:
+            return -WIN_SCORE + ply
+        if depth == 0:
+            return evaluate(position)
+
+        original_alpha = alpha
+        entry = self.table.get(position)
+        best_move = None
+        if entry is not None:
+            entry_depth, entry_score, bound, best_move = entry
+            if entry_depth >= depth:
+                if bound == self.EXACT:
+                    return entry_score
+                if bound == self.LOWER and entry_score >= beta:
+                    return entry_score
+                if bound == self.UPPER and entry_score <= alpha:
+                    return entry_score
+
+        history = self.history
+        moves = legal_moves(position)
+        moves.sort(key=lambda move: history.get(move, 0), reverse=True)
+        if best_move is not None:
+            moves.insert(0, best_move)
+
+        best_score = -WIN_SCORE - 1
+        for move in moves:
+            score = -self._negamax(apply_move(position, move), depth - 1, -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        history[move] = history.get(move, 0) + depth * depth
+                        break
+
+        if best_score <= original_alpha:
+            bound = self.UPPER
+        elif best_score >= beta:
+            bound = self.LOWER
+        else:
+            bound = self.EXACT
+        if len(self.table) >= self.table_size:
+            self.table.clear()
+        self.table[position] = (depth, best_score, bound, best_move)
+        return best_score
+
+    def search(self, position, budget=BUDGET_SECONDS, max_depth=MAX_DEPTH):
+        # Returns (move, stats), or (None, stats) when the player to move is
+        # stuck. Deepens until the budget runs out and keeps the best move
+        # of the last finished depth.
+        started = time.perf_counter()
+        self.deadline = started + budget
+        self.nodes = 0
+        moves = legal_moves(position, first_win=True)
+        self.history.clear()
+        stats = {"depth": 0, "score": 0, "nodes": 0, "seconds": 0.0}
+        if not moves or is_win(moves[0]):
+            return (moves[0] if moves else None), stats
+
+        best_move = moves[0]
+        for depth in range(1, max_depth + 1):
+            try:
+                score = self._negamax(position, depth, -WIN_SCORE - 1, WIN_SCORE + 1, 0)
+            except _Timeout:
+                break
+            best_move = self.table[position][3]
+            stats["depth"] = depth
+            stats["score"] = score
+            if abs(score) >= WIN_SCORE - MAX_DEPTH:
+                break
+        stats["nodes"] = self.nodes
+        stats["seconds"] = time.perf_counter() - started
+        return best_move, stats
+
+
+def choose_move(position, budget=BUDGET_SECONDS, searcher=None):
+    return (searcher or Searcher()).search(position, budget)
+
+
+def choose_placement(occupied, rng=None):
+    # Two free squares for the computer's workers, as central as possible.
+    rng = rng or random.Random()
+    free = [square for square in range(SQUARES) if square not in occupied]
+    rng.shuffle(free)
+    free.sort(key=lambda square: -CENTER_BONUS[square])
+    return tuple(sorted(free[:2]))
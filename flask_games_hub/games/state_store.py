@@ -0,0 +1,338 @@
+import atexit
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, g, session
+from flask.json.tag import TaggedJSONSerializer
+
+# Game state lives on the server, keyed by an opaque session id; the
+# signed session cookie only carries that id. A state is stored encoded
+# under (session id, key), e.g. ("...", "checkers_state"): by the binary
+# codec registered for the key when there is one and the state fits it,
+# else as compact tagged JSON (as in Flask's session cookie, so tuples
+# survive).
+#
+# Saves are dirty-checked: the encoded bytes are compared with what the
+# request loaded, and an unchanged state is not written (nor, with the
+# cookie backend, re-sent). A GET that finds no state still saves the new
+# game it starts; GETs of an existing game save nothing.
+#
+# StateStore reads through an in-process LRU tier to an optional SQLite
+# tier. Writes go to both: the memory tier at once, SQLite in batches
+# flushed every BATCH_SIZE writes or FLUSH_SECONDS after the first
+# unflushed one, and at exit. Entries expire TTL seconds after they were
+# last read or written: a read pushes the expiry back once a seventh of
+# the TTL (a day by default) has run down, so reading a state costs at
+# most one batched expiry update a day. The memory tier is per process,
+# so with several worker processes sessions need to be sticky or the
+# memory tier disabled (capacity 0).
+#
+# STATE_STORE picks the backend: "sqlite" (memory + SQLite, the default),
+# "memory" (memory only, lost on restart) or "cookie" (everything in the
+# signed cookie, as before the store existed).
+
+SESSION_ID_KEY = "sid"
+TTL_SECONDS = 7 * 24 * 3600
+MEMORY_CAPACITY = 10_000
+BATCH_SIZE = 64
+FLUSH_SECONDS = 1.0
+
+
+# Leads every codec-encoded state; tagged JSON always starts with "{".
+CODEC_MARK = b"\x00"
+
+_serializer = TaggedJSONSerializer()
+_codecs = {}
+
+
+def register_codec(key, pack, unpack):
+    # pack(state) returns bytes, or None for a state the codec does not
+    # cover (it is then stored as JSON); unpack(data) reverses it.
+    _codecs[key] = (pack, unpack)
+
+
+def encode(key, state):
+    codec = _codecs.get(key)
+    if codec is not None:
+        packed = codec[0](state)
+        if packed is not None:
+            return CODEC_MARK + packed
+    return _serializer.dumps(state).encode()
+
+
+def decode(key, data):
+    if data[:1] == CODEC_MARK:
+        return _codecs[key][1](data[1:])
+    return _serializer.loads(data)
+
+
+def _loaded():
+    # key -> encoded state as loaded (or last saved) in this request.
+    if "state_loaded" not in g:
+        g.state_loaded = {}
+    return g.state_loaded
+
+
+class MemoryTier:
+    # LRU of (session id, key) -> (data, expiry time). get() returns the
+    # (data, expiry time) pair.
+
+    def __init__(self, capacity=MEMORY_CAPACITY):
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, entry_key, now):
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                return None
+            if entry[1] <= now:
+                del self._entries[entry_key]
+                return None
+            self._entries.move_to_end(entry_key)
+            return entry
+
+    def put(self, entry_key, data, expires):
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._entries[entry_key] = (data, expires)
+            self._entries.move_to_end(entry_key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+
+class SqliteTier:
+    # One table of (session id, key, data, expiry). Writes and expiry
+    # updates are buffered and flushed in one transaction, which also drops
+    # expired rows.
+
+    def __init__(self, path, batch_size=BATCH_SIZE, flush_seconds=FLUSH_SECONDS):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.flushes = 0
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS states ("
+            "session_id TEXT NOT NULL, key TEXT NOT NULL, data BLOB NOT NULL, expires REAL NOT NULL, "
+            "PRIMARY KEY (session_id, key))"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS states_expires ON states (expires)")
+        self._connection.commit()
+        self._pending = {}
+        self._touched = {}
+        self._timer = None
+        self._lock = threading.RLock()
+
+    def get(self, entry_key, now):
+        with self._lock:
+            if entry_key in self._pending:
+                entry = self._pending[entry_key]
+            else:
+                entry = self._connection.execute(
+                    "SELECT data, expires FROM states WHERE session_id = ? AND key = ?", entry_key
+                ).fetchone()
+        if entry is None or entry[1] <= now:
+            return None
+        return bytes(entry[0]), entry[1]
+
+    def put(self, entry_key, data, expires):
+        with self._lock:
+            self._pending[entry_key] = (data, expires)
+            self._touched.pop(entry_key, None)
+            self._buffered()
+
+    def touch(self, entry_key, expires):
+        # Moves an entry's expiry without rewriting its data.
+        with self._lock:
+            if entry_key in self._pending:
+                self._pending[entry_key] = (self._pending[entry_key][0], expires)
+            else:
+                self._touched[entry_key] = expires
+            self._buffered()
+
+    def _buffered(self):
+        if len(self._pending) + len(self._touched) >= self.batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.flush_seconds, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            pending, self._pending = self._pending, {}
+            touched, self._touched = self._touched, {}
+            if self._connection is None:
+                return
+            with self._connection:
+                if pending:
+                    self._connection.executemany(
+                        "INSERT OR REPLACE INTO states (session_id, key, data, expires) VALUES (?, ?, ?, ?)",
+                        [(*entry_key, data, expires) for entry_key, (data, expires) in pending.items()],
+                    )
+                if touched:
+                    self._connection.executemany(
+                        "UPDATE states SET expires = ? WHERE session_id = ? AND key = ?",
+                        [(expires, *entry_key) for entry_key, expires in touched.items()],
+                    )
+                self._connection.execute("DELETE FROM states WHERE expires <= ?", (time.time(),))
+            self.flushes += 1
+
+    def close(self):
+        with self._lock:
+            if self._connection is None:
+                return
+            self.flush()
+            self._connection.close()
+            self._connection = None
+
+
+class StateStore:
+
+    def __init__(self, memory, persistent=None, ttl=TTL_SECONDS):
+        self.memory = memory
+        self.persistent = persistent
+        self.ttl = ttl
+        self.writes = 0
+        self.unchanged = 0
+
+    def _get_data(self, session_id, key):
+        entry_key = (session_id, key)
+        now = time.time()
+        entry = self.memory.get(entry_key, now)
+        if entry is None and self.persistent is not None:
+            entry = self.persistent.get(entry_key, now)
+            if entry is not None:
+                self.memory.put(entry_key, *entry)
+        if entry is None:
+            return None
+        data, expires = entry
+        if expires < now + self.ttl * 6 / 7:
+            expires = now + self.ttl
+            self.memory.put(entry_key, data, expires)
+            if self.persistent is not None:
+                self.persistent.touch(entry_key, expires)
+        return data
+
+    def _put_data(self, session_id, key, data):
+        entry_key = (session_id, key)
+        expires = time.time() + self.ttl
+        self.memory.put(entry_key, data, expires)
+        if self.persistent is not None:
+            self.persistent.put(entry_key, data, expires)
+        self.writes += 1
+
+    def get(self, session_id, key):
+        data = self._get_data(session_id, key)
+        return None if data is None else decode(key, data)
+
+    def put(self, session_id, key, state):
+        self._put_data(session_id, key, encode(key, state))
+
+    def load(self, key):
+        data = self._get_data(_session_id(), key)
+        if data is None:
+            return None
+        _loaded()[key] = data
+        return decode(key, data)
+
+    def save(self, key, state):
+        data = encode(key, state)
+        loaded = _loaded()
+        if loaded.get(key) == data:
+            self.unchanged += 1
+            return
+        self._put_data(_session_id(), key, data)
+        loaded[key] = data
+
+    def close(self):
+        if self.persistent is not None:
+            self.persistent.close()
+
+
+class CookieStore:
+    # The whole state in Flask's signed cookie session. The session only
+    # sends a new cookie when it is marked modified, so an unchanged state
+    # costs nothing on the way out.
+
+    def __init__(self):
+        self.writes = 0
+        self.unchanged = 0
+
+    def load(self, key):
+        state = session.get(key)
+        if state is not None:
+            _loaded()[key] = encode(key, state)
+        return state
+
+    def save(self, key, state):
+        data = encode(key, state)
+        loaded = _loaded()
+        if loaded.get(key) == data:
+            self.unchanged += 1
+            return
+        session[key] = state
+        session.modified = True
+        loaded[key] = data
+        self.writes += 1
+
+    def close(self):
+        pass
+
+
+def _session_id():
+    session_id = session.get(SESSION_ID_KEY)
+    if session_id is None:
+        session_id = session[SESSION_ID_KEY] = secrets.token_urlsafe(16)
+    return session_id
+
+
+def create_store(config):
+    kind = config.get("STATE_STORE", "sqlite")
+    if kind == "cookie":
+        return CookieStore()
+    memory = MemoryTier(config.get("STATE_MEMORY_CAPACITY", MEMORY_CAPACITY))
+    persistent = None
+    if kind == "sqlite":
+        persistent = SqliteTier(
+            config["STATE_DB_PATH"],
+            config.get("STATE_BATCH_SIZE", BATCH_SIZE),
+            config.get("STATE_FLUSH_SECONDS", FLUSH_SECONDS),
+        )
+    elif kind != "memory":
+        raise ValueError(f"Unknown STATE_STORE {kind!r}.")
+    return StateStore(memory, persistent, config.get("STATE_TTL_SECONDS", TTL_SECONDS))
+
+
+def init_app(app):
+    store = create_store(app.config)
+    app.extensions["state_store"] = store
+    atexit.register(store.close)
+    return store
+
+
+def load(key):
+    # The state saved under `key` for this request's session, or None.
+    return current_app.extensions["state_store"].load(key)
+
+
+def save(key, state):
+    current_app.extensions["state_store"].save(key, state)
@@ -0,0 +1,41 @@
+import multiprocessing
+import random
+
+from games.lite import puzzle_bank
+from games.sudoku import engine as sudoku
+
+
+def _generate_packed(job):
+    level, seed = job
+    puzzle, _ = sudoku.generate(level, random.Random(seed))
+    return level, sudoku.pack(puzzle)
+
+
+def build(path, per_grade, workers=None, seed=0, progress=None):
+    # Generates `per_grade` distinct puzzles for every grade on a process
+    # pool and writes them as a puzzle bank at `path`.
+    found = {level: set() for level in sudoku.GRADES}
+    next_seed = seed
+    with multiprocessing.get_context("spawn").Pool(workers) as pool:
+        while any(len(records) < per_grade for records in found.values()):
+            jobs = []
+            for level, records in found.items():
+                for _ in range(per_grade - len(records)):
+                    jobs.append((level, next_seed))
+                    next_seed += 1
+            for level, record in pool.imap_unordered(_generate_packed, jobs, chunksize=8):
+                if len(found[level]) < per_grade:
+                    found[level].add(record)
+                    if progress is not None:
+                        progress(level, len(found[level]))
+
+    grades = {level: sorted(records) for level, records in found.items()}
+    puzzle_bank.write_bank(path, sudoku.PACKED_SIZE, grades)
+    return {level: len(records) for level, records in grades.items()}
+
+
+def sample_puzzle(path, level, rng=random):
+    bank = puzzle_bank.open_bank(path)
+    if bank is None or not bank.count(level):
+        return None
+    return sudoku.unpack(bank.sample(level, rng))
@@ -0,0 +1,217 @@
+import random
+
+# Grids are flat lists of 81 ints, 0 for an empty cell. Digit d is bit d of a
+# mask, so a row, column or box is described by one int of used digits.
+
+SIZE = 9
+CELLS = SIZE * SIZE
+ALL_DIGITS = 0b1111111110
+GRADES = ("easy", "medium", "hard")
+PACKED_SIZE = (CELLS + 1) // 2
+
+ROW_OF = [index // SIZE for index in range(CELLS)]
+COL_OF = [index % SIZE for index in range(CELLS)]
+BOX_OF = [(index // 27) * 3 + (index % SIZE) // 3 for index in range(CELLS)]
+UNITS = (
+    [[row * SIZE + col for col in range(SIZE)] for row in range(SIZE)]
+    + [[row * SIZE + col for row in range(SIZE)] for col in range(SIZE)]
+    + [[index for index in range(CELLS) if BOX_OF[index] == box] for box in range(SIZE)]
+)
+
+# A puzzle's grade is the simplest technique set that solves it: naked
+# singles (easy), naked and hidden singles (medium), or search (hard).
+# Digging stops at these clue counts to make each grade likely.
+MIN_CLUES = {"easy": 36, "medium": 30, "hard": 0}
+
+
+def digit_bits(mask):
+    while mask:
+        bit = mask & -mask
+        yield bit.bit_length() - 1
+        mask ^= bit
+
+
+def pack(grid):
+    # Two cells per byte, high nibble first: 81 cells fit in 41 bytes.
+    padded = list(grid) + [0]
+    return bytes((padded[index] << 4) | padded[index + 1] for index in range(0, CELLS, 2))
+
+
+def unpack(data):
+    grid = []
+    for byte in data:
+        grid.append(byte >> 4)
+        grid.append(byte & 0xF)
+    return grid[:CELLS]
+
+
+def unit_masks(grid):
+    rows = [0] * SIZE
+    cols = [0] * SIZE
+    boxes = [0] * SIZE
+    for index, value in enumerate(grid):
+        if value:
+            bit = 1 << value
+            rows[ROW_OF[index]] |= bit
+            cols[COL_OF[index]] |= bit
+            boxes[BOX_OF[index]] |= bit
+    return rows, cols, boxes
+
+
+def conflicts(rows, cols, boxes, index, value):
+    bit = 1 << value
+    return bool((rows[ROW_OF[index]] | cols[COL_OF[index]] | boxes[BOX_OF[index]]) & bit)
+
+
+def toggle(rows, cols, boxes, index, value):
+    bit = 1 << value
+    rows[ROW_OF[index]] ^= bit
+    cols[COL_OF[index]] ^= bit
+    boxes[BOX_OF[index]] ^= bit
+
+
+def is_valid(grid):
+    rows, cols, boxes = [0] * SIZE, [0] * SIZE, [0] * SIZE
+    for index, value in enumerate(grid):
+        if not value:
+            continue
+        if conflicts(rows, cols, boxes, index, value):
+            return False
+        toggle(rows, cols, boxes, index, value)
+    return True
+
+
+def _search(grid, rows, cols, boxes, limit, solutions, rng):
+    # Depth-first search that always branches on the empty cell with the
+    # fewest candidates. Returns the number of solutions found, up to limit.
+    best = -1
+    best_mask = 0
+    best_count = 10
+    for index in range(CELLS):
+        if grid[index]:
+            continue
+        mask = ALL_DIGITS & ~(rows[ROW_OF[index]] | cols[COL_OF[index]] | boxes[BOX_OF[index]])
+        count = mask.bit_count()
+        if count < best_count:
+            if count == 0:
+                return 0
+            best, best_mask, best_count = index, mask, count
+            if count == 1:
+                break
+    if best == -1:
+        solutions.append(grid[:])
+        return 1
+
+    digits = list(digit_bits(best_mask))
+    if rng is not None:
+        rng.shuffle(digits)
+    row, col, box = ROW_OF[best], COL_OF[best], BOX_OF[best]
+    found = 0
+    for digit in digits:
+        bit = 1 << digit
+        grid[best] = digit
+        rows[row] |= bit
+        cols[col] |= bit
+        boxes[box] |= bit
+        found += _search(grid, rows, cols, boxes, limit - found, solutions, rng)
+        rows[row] ^= bit
+        cols[col] ^= bit
+        boxes[box] ^= bit
+        grid[best] = 0
+        if found >= limit:
+            break
+    return found
+
+
+def count_solutions(grid, limit=2):
+    if not is_valid(grid):
+        return 0
+    rows, cols, boxes = unit_masks(grid)
+    return _search(list(grid), rows, cols, boxes, limit, [], None)
+
+
+def solve(grid):
+    if not is_valid(grid):
+        return None
+    rows, cols, boxes = unit_masks(grid)
+    solutions = []
+    _search(list(grid), rows, cols, boxes, 1, solutions, None)
+    return solutions[0] if solutions else None
+
+
+def random_solution(rng=None):
+    rng = rng or random.Random()
+    solutions = []
+    _search([0] * CELLS, [0] * SIZE, [0] * SIZE, [0] * SIZE, 1, solutions, rng)
+    return solutions[0]
+
+
+def _solves_with_singles(grid, hidden):
+    grid = list(grid)
+    rows, cols, boxes = unit_masks(grid)
+    progress = True
+    while progress:
+        progress = False
+        for index in range(CELLS):
+            if grid[index]:
+                continue
+            mask = ALL_DIGITS & ~(rows[ROW_OF[index]] | cols[COL_OF[index]] | boxes[BOX_OF[index]])
+            if mask and mask & (mask - 1) == 0:
+                grid[index] = mask.bit_length() - 1
+                toggle(rows, cols, boxes, index, grid[index])
+                progress = True
+        if progress or not hidden:
+            continue
+        for unit in UNITS:
+            places = {}
+            for index in unit:
+                if grid[index]:
+                    continue
+                mask = ALL_DIGITS & ~(rows[ROW_OF[index]] | cols[COL_OF[index]] | boxes[BOX_OF[index]])
+                for digit in digit_bits(mask):
+                    places.setdefault(digit, []).append(index)
+            for digit, indexes in places.items():
+                if len(indexes) == 1 and not grid[indexes[0]]:
+                    if conflicts(rows, cols, boxes, indexes[0], digit):
+                        continue
+                    grid[indexes[0]] = digit
+                    toggle(rows, cols, boxes, indexes[0], digit)
+                    progress = True
+    return all(grid)
+
+
+def grade(puzzle):
+    if _solves_with_singles(puzzle, hidden=False):
+        return "easy"
+    if _solves_with_singles(puzzle, hidden=True):
+        return "medium"
+    return "hard"
+
+
+def _dig(solution, min_clues, rng):
+    puzzle = list(solution)
+    clues = CELLS
+    order = list(range(CELLS))
+    rng.shuffle(order)
+    for index in order:
+        if clues <= min_clues:
+            break
+        value = puzzle[index]
+        puzzle[index] = 0
+        if count_solutions(puzzle, 2) == 1:
+            clues -= 1
+        else:
+            puzzle[index] = value
+    return puzzle
+
+
+def generate(level="easy", rng=None):
+    # Returns (puzzle, solution) with a unique solution graded `level`.
+    if level not in GRADES:
+        raise ValueError(f"Unknown grade: {level}")
+    rng = rng or random.Random()
+    while True:
+        solution = random_solution(rng)
+        puzzle = _dig(solution, MIN_CLUES[level], rng)
+        if grade(puzzle) == level:
+            return puzzle, solution